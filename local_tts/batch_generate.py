@@ -5,10 +5,20 @@
 import os
 import sys
 import time
+import queue
+import multiprocessing
+from collections import deque
 from pathlib import Path
 
 # 导入本地的TTS生成器
 from test import EnglishTTSGenerator
+from manifest import GenerationManifest, default_manifest_path
+
+# 单行最多尝试次数（worker在处理该行时崩溃即计一次）
+MAX_LINE_ATTEMPTS = 3
+
+# 控制torch/BLAS线程数的环境变量
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
 
 
 class BatchTTSGenerator:
@@ -88,7 +98,8 @@ class BatchTTSGenerator:
         return filename
     
     def generate_all(self, input_file, start_index=1, end_index=None, 
-                     use_custom_names=True, name_prefix="audio"):
+                     use_custom_names=True, name_prefix="audio", batch_size=8,
+                     workers=1, threads_per_worker=None, resume=False, manifest_path=None):
         """
         批量生成语音
         
@@ -98,6 +109,11 @@ class BatchTTSGenerator:
             end_index: 结束行号（包含），None表示到最后
             use_custom_names: 是否使用基于文本内容的自定义文件名
             name_prefix: 如果不使用自定义名称，使用的前缀
+            batch_size: 每批合成的行数（句子按长度分组批量推理）
+            workers: 并行的worker进程数，1表示在当前进程串行生成
+            threads_per_worker: 每个worker的torch线程数，None表示按CPU核数平分
+            resume: 是否跳过清单中已成功生成的行
+            manifest_path: 清单文件路径，None表示与输出目录同级的 <输出目录>.manifest.jsonl
             
         Returns:
             dict: 生成结果统计
@@ -120,29 +136,27 @@ class BatchTTSGenerator:
         print(f"处理范围: 第 {start_idx+1} 行 到 第 {end_idx} 行")
         print(f"共需处理: {len(texts_to_process)} 条")
         print(f"输出目录: {self.output_dir}")
-        print("="*70)
-        
-        # 加载模型（只加载一次）
-        print("\n正在加载TTS模型...")
-        if not self.generator.load_model():
-            print("❌ 模型加载失败，无法继续")
-            return {"success": 0, "failed": len(texts_to_process), "total": len(texts_to_process)}
-        
-        # 批量生成
-        results = []
-        success_count = 0
-        failed_count = 0
-        total_time = 0
+        if workers > 1:
+            print(f"worker进程: {workers}")
         
-        print("\n开始生成语音...\n")
+        # 清单：每批完成后追加写入，断点续跑时据此跳过已完成的行
+        manifest = GenerationManifest(
+            manifest_path or default_manifest_path(self.output_dir),
+            self.output_dir
+        )
+        print(f"清单文件: {manifest.path}")
+        if resume:
+            manifest.load()
+        print("="*70)
         
-        for i, text in enumerate(texts_to_process, start=1):
-            actual_line_num = start_idx + i
-            
-            print(f"[{i}/{len(texts_to_process)}] 第 {actual_line_num} 行")
-            print(f"文本: {text[:60]}{'...' if len(text) > 60 else ''}")
-            
-            # 生成文件名
+        # 生成文件名（在主进程中确定，worker只负责合成）
+        items = []
+        skipped = 0
+        for offset, text in enumerate(texts_to_process):
+            actual_line_num = start_idx + offset + 1
+            if resume and manifest.is_done(actual_line_num, text):
+                skipped += 1
+                continue
             if use_custom_names:
                 filename = self.generate_filename(actual_line_num, text)
             else:
@@ -152,36 +166,26 @@ class BatchTTSGenerator:
                 unique_id = uuid.uuid4().hex[:12]
                 timestamp = int(datetime.now().timestamp())
                 filename = f"{name_prefix}_{unique_id}_{timestamp}.wav"
-            
-            output_file = os.path.join(self.output_dir, filename)
-            
-            # 生成语音
-            start_time = time.time()
-            success = self.generator.generate_speech(text, output_file)
-            gen_time = time.time() - start_time
-            
-            if success:
-                success_count += 1
-                total_time += gen_time
-                print(f"✅ 成功! 耗时: {gen_time:.2f}秒")
-                print(f"   文件: {filename}\n")
-                
-                results.append({
-                    "line": actual_line_num,
-                    "text": text,
-                    "file": filename,
-                    "time": round(gen_time, 2),
-                    "success": True
-                })
-            else:
-                failed_count += 1
-                print(f"❌ 失败!\n")
-                
-                results.append({
-                    "line": actual_line_num,
-                    "text": text,
-                    "success": False
-                })
+            items.append((actual_line_num, text, filename))
+        
+        if resume:
+            print(f"\n⏭️  断点续跑: 跳过 {skipped} 条已完成，剩余 {len(items)} 条")
+        
+        wall_start = time.time()
+        if not items:
+            results = []
+        elif workers > 1:
+            results = self._generate_parallel(items, batch_size, workers, threads_per_worker, manifest)
+        else:
+            results = self._generate_serial(items, batch_size, manifest)
+            if results is None:
+                return {"success": 0, "failed": len(items), "skipped": skipped, "total": len(texts_to_process)}
+        wall_time = time.time() - wall_start
+        
+        results.sort(key=lambda r: r["line"])
+        success_count = sum(1 for r in results if r.get("success"))
+        failed_count = len(results) - success_count
+        total_time = sum(r["time"] for r in results if r.get("success"))
         
         # 生成结果报告
         print("\n" + "="*70)
@@ -192,11 +196,14 @@ class BatchTTSGenerator:
         print(f"   总数: {len(texts_to_process)} 条")
         print(f"   成功: {success_count} 条")
         print(f"   失败: {failed_count} 条")
+        if skipped:
+            print(f"   跳过: {skipped} 条（已完成）")
         
         if success_count > 0:
             avg_time = total_time / success_count
             print(f"   总耗时: {total_time:.2f} 秒")
             print(f"   平均耗时: {avg_time:.2f} 秒/条")
+        print(f"   实际用时: {wall_time:.2f} 秒")
         
         print(f"\n📁 输出目录: {os.path.abspath(self.output_dir)}")
         
@@ -219,10 +226,252 @@ class BatchTTSGenerator:
         return {
             "success": success_count,
             "failed": failed_count,
+            "skipped": skipped,
             "total": len(texts_to_process),
             "total_time": round(total_time, 2),
+            "wall_time": round(wall_time, 2),
             "results": results
         }
+    
+    def _generate_serial(self, items, batch_size, manifest):
+        """
+        在当前进程中逐批生成，每批结果写入清单
+        
+        Returns:
+            list: 每行的结果，模型加载失败时返回 None
+        """
+        # 加载模型（只加载一次）
+        print("\n正在加载TTS模型...")
+        if not self.generator.load_model():
+            print("❌ 模型加载失败，无法继续")
+            return None
+        
+        print(f"\n开始生成语音（每批 {batch_size} 行）...\n")
+        
+        results = []
+        for chunk_start in range(0, len(items), batch_size):
+            chunk = items[chunk_start:chunk_start + batch_size]
+            chunk_results = synthesize_chunk(self.generator, self.output_dir, chunk, batch_size)
+            manifest.append(chunk_results)
+            
+            for offset, r in enumerate(chunk_results):
+                i = chunk_start + offset + 1
+                print(f"[{i}/{len(items)}] 第 {r['line']} 行")
+                print(f"文本: {r['text'][:60]}{'...' if len(r['text']) > 60 else ''}")
+                
+                if r["success"]:
+                    print(f"✅ 成功! 耗时: {r['time']:.2f}秒（批次均摊）")
+                    print(f"   文件: {r['file']}\n")
+                else:
+                    print(f"❌ 失败!\n")
+            
+            results.extend(chunk_results)
+        return results
+    
+    def _generate_parallel(self, items, batch_size, workers, threads_per_worker, manifest):
+        """
+        多进程生成：按批次分片，空闲的worker主动领取下一批（work stealing）
+        
+        只有主进程写清单，worker每完成一批写入一次
+        
+        主进程记录每个worker正在处理的批次；worker崩溃时，该批次拆成单行重新排队，
+        并启动新的worker补位。单行连续崩溃超过 MAX_LINE_ATTEMPTS 次记为失败
+        
+        Returns:
+            list: 每行的结果
+        """
+        threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        print(f"\n启动 {workers} 个worker进程（每个 {threads} 个torch线程，每批 {batch_size} 行）...\n")
+        
+        # 子进程在导入torch前读取线程数环境变量
+        for var in THREAD_ENV_VARS:
+            os.environ[var] = str(threads)
+        
+        ctx = multiprocessing.get_context('spawn')
+        outbox = ctx.Queue()
+        
+        # 待处理批次: (批次ID, 行列表, 已尝试次数)
+        pending = deque(
+            (chunk_id, items[start:start + batch_size], 0)
+            for chunk_id, start in enumerate(range(0, len(items), batch_size))
+        )
+        next_chunk_id = len(pending)
+        
+        results = {}
+        pool = {}
+        restarts = 0
+        max_restarts = workers * MAX_LINE_ATTEMPTS + len(items)
+        
+        def start_worker(index):
+            inbox = ctx.Queue()
+            process = ctx.Process(
+                target=_shard_worker,
+                args=(index, self.generator.model_name, self.output_dir, threads, batch_size, inbox, outbox),
+                name=f'tts-shard-{index}',
+                daemon=True,
+            )
+            process.start()
+            pool[index] = {"process": process, "inbox": inbox, "task": None, "ready": False}
+        
+        def assign(index):
+            worker = pool[index]
+            while pending:
+                chunk_id, chunk, attempts = pending.popleft()
+                # 跳过已经有结果的行（崩溃前已完成的部分）
+                chunk = [item for item in chunk if item[0] not in results]
+                if chunk:
+                    worker["task"] = (chunk_id, chunk, attempts)
+                    worker["inbox"].put((chunk_id, chunk))
+                    return
+            worker["task"] = None
+        
+        def record(batch):
+            # 同一行只记录一次（崩溃前已回报的结果可能与重新分配的结果重复）
+            new = [r for r in batch if r["line"] not in results]
+            for r in new:
+                results[r["line"]] = r
+                status = "✅" if r["success"] else "❌"
+                print(f"[{len(results)}/{len(items)}] 第 {r['line']} 行 {status} {r['text'][:50]}")
+            manifest.append(new)
+        
+        for index in range(workers):
+            start_worker(index)
+        
+        try:
+            while len(results) < len(items):
+                try:
+                    kind, index, payload = outbox.get(timeout=1)
+                except queue.Empty:
+                    kind = None
+                
+                if kind == 'ready':
+                    pool[index]["ready"] = True
+                    assign(index)
+                elif kind == 'done':
+                    chunk_id, chunk_results = payload
+                    task = pool[index]["task"]
+                    if task and task[0] == chunk_id:
+                        record(chunk_results)
+                        assign(index)
+                elif kind == 'error':
+                    # 模型加载失败：不再补位，剩余worker继续处理
+                    print(f"❌ worker {index} 启动失败: {payload}")
+                    pool[index]["failed"] = True
+                
+                # 检查崩溃的worker：回收其批次并补位
+                for index, worker in list(pool.items()):
+                    if worker.get("failed") or worker["process"].is_alive():
+                        continue
+                    
+                    task = worker["task"]
+                    exitcode = worker["process"].exitcode
+                    del pool[index]
+                    print(f"⚠️  worker {index} 异常退出（exitcode={exitcode}）")
+                    
+                    if task:
+                        chunk_id, chunk, attempts = task
+                        for item in chunk:
+                            if item[0] in results:
+                                continue
+                            if attempts + 1 >= MAX_LINE_ATTEMPTS:
+                                record([{"line": item[0], "text": item[1], "success": False}])
+                            else:
+                                # 拆成单行重新排队，避免一行导致整批反复崩溃
+                                pending.appendleft((next_chunk_id, [item], attempts + 1))
+                                next_chunk_id += 1
+                        print(f"   批次 {chunk_id} 的未完成行已重新分配")
+                    
+                    if restarts < max_restarts:
+                        restarts += 1
+                        start_worker(index)
+                
+                if not any(not w.get("failed") for w in pool.values()):
+                    print("❌ 没有可用的worker，剩余行记为失败")
+                    record([
+                        {"line": line, "text": text, "success": False}
+                        for line, text, _ in items
+                    ])
+                    break
+                
+                # 空闲的worker领取重新排队的批次
+                for index, worker in pool.items():
+                    if worker["ready"] and worker["task"] is None and pending:
+                        assign(index)
+        finally:
+            for worker in pool.values():
+                if worker["process"].is_alive():
+                    worker["inbox"].put(None)
+            for worker in pool.values():
+                worker["process"].join(timeout=30)
+                if worker["process"].is_alive():
+                    worker["process"].terminate()
+        
+        return list(results.values())
+
+
+def synthesize_chunk(generator, output_dir, chunk, batch_size):
+    """
+    合成一批行（每行输出一个WAV）
+    
+    Args:
+        generator: 已加载模型的 EnglishTTSGenerator
+        output_dir: 输出目录
+        chunk: [(行号, 文本, 文件名), ...]
+        batch_size: 每个小批次的句子数
+        
+    Returns:
+        list: 每行的结果字典
+    """
+    texts = [text for _, text, _ in chunk]
+    output_files = [os.path.join(output_dir, filename) for _, _, filename in chunk]
+    
+    start_time = time.time()
+    batch_results = generator.generate_batch(texts, output_files, batch_size=batch_size)
+    gen_time = (time.time() - start_time) / len(chunk)
+    
+    results = []
+    for (line, text, filename), success in zip(chunk, batch_results):
+        if success:
+            results.append({
+                "line": line,
+                "text": text,
+                "file": filename,
+                "time": round(gen_time, 2),
+                "success": True
+            })
+        else:
+            results.append({
+                "line": line,
+                "text": text,
+                "success": False
+            })
+    return results
+
+
+def _shard_worker(index, model_name, output_dir, threads, batch_size, inbox, outbox):
+    """
+    worker进程入口：加载一次模型，循环领取批次直到收到 None
+    
+    消息格式: (类型, worker序号, 数据)，类型为 ready / done / error
+    """
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    
+    generator = EnglishTTSGenerator(model_name)
+    if not generator.load_model():
+        outbox.put(('error', index, f"模型加载失败: {model_name}"))
+        return
+    outbox.put(('ready', index, None))
+    
+    while True:
+        task = inbox.get()
+        if task is None:
+            break
+        chunk_id, chunk = task
+        outbox.put(('done', index, (chunk_id, synthesize_chunk(generator, output_dir, chunk, batch_size))))
 
 
 def main():
@@ -245,6 +494,15 @@ def main():
   
   # 使用简单文件名（不基于文本内容）
   python batch_generate.py input.txt --simple-names --prefix audio
+  
+  # 调整批次大小
+  python batch_generate.py input.txt --batch-size 16
+  
+  # 4个worker进程并行生成（每个进程加载一次模型）
+  python batch_generate.py input.txt --workers 4
+  
+  # 中断后断点续跑（跳过清单中已完成的行）
+  python batch_generate.py input.txt --resume
         """
     )
     
@@ -262,6 +520,16 @@ def main():
                        help='使用简单的序号文件名，而不是基于文本内容')
     parser.add_argument('--prefix', '-p', default='audio',
                        help='简单文件名的前缀（配合 --simple-names 使用）')
+    parser.add_argument('--batch-size', '-b', type=int, default=8,
+                       help='每批合成的行数（默认: 8）')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                       help='并行的worker进程数（默认: 1）')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='每个worker的torch线程数（默认: CPU核数/worker数）')
+    parser.add_argument('--resume', action='store_true',
+                       help='断点续跑：跳过清单中已成功生成的行')
+    parser.add_argument('--manifest', default=None,
+                       help='清单文件路径（默认: <输出目录>.manifest.jsonl）')
     
     args = parser.parse_args()
     
@@ -287,11 +555,16 @@ def main():
         start_index=args.start,
         end_index=args.end,
         use_custom_names=not args.simple_names,
-        name_prefix=args.prefix
+        name_prefix=args.prefix,
+        batch_size=max(1, args.batch_size),
+        workers=max(1, args.workers),
+        threads_per_worker=args.threads,
+        resume=args.resume,
+        manifest_path=args.manifest
     )
     
     # 返回状态码
-    if result["success"] > 0:
+    if result["success"] > 0 or (result["total"] > 0 and result["failed"] == 0):
         print("\n🎉 批量生成完成!")
         sys.exit(0)
     else:
@@ -7,20 +7,73 @@ import sys
 import requests
 import time
 import glob
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+
+# 重试退避基数（秒）
+RETRY_BACKOFF = 0.5
+
+
+class TokenBucket:
+    """令牌桶限流（线程安全）：平均每秒 rate 个请求，允许 capacity 个突发"""
+    
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate: 每秒补充的令牌数，<=0 表示不限流
+            capacity: 桶容量，默认与rate相同
+        """
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """取一个令牌，没有令牌时等待"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
 
 
 class BatchAudioUploader:
     """批量音频上传器"""
     
-    def __init__(self, api_url="http://localhost:8000"):
+    def __init__(self, api_url="http://localhost:8000", workers=4, rate=20, max_retries=3, bulk_size=0):
         """
         初始化
         
         Args:
             api_url: Django服务API地址
+            workers: 并发上传线程数
+            rate: 每秒最多发起的请求数（令牌桶限流），<=0 表示不限流
+            max_retries: 5xx或连接失败时的最大重试次数
+            bulk_size: >0 时每个请求通过批量接口登记bulk_size个文件
         """
         self.api_url = api_url
         self.upload_api = f"{api_url}/api/upload-audio/"
+        self.bulk_upload_api = f"{api_url}/api/upload-audio/bulk/"
+        self.bulk_size = bulk_size
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+        self.rate_limiter = TokenBucket(rate)
+        
+        # 所有线程共享一个keep-alive连接池
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def read_text_file(self, text_file):
         """
@@ -41,9 +94,121 @@ class BatchAudioUploader:
             print(f"❌ 读取文本文件失败: {e}")
             return []
     
+    def _post_with_retry(self, url, payload, timeout=30):
+        """
+        发送上传请求，5xx和连接错误按指数退避重试
+        
+        Returns:
+            tuple: (data, error_message)
+        """
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                # 指数退避加随机抖动：0.5s, 1s, 2s, ...
+                time.sleep(RETRY_BACKOFF * (2 ** (attempt - 1)) * (1 + random.random() * 0.5))
+            
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.post(url, json=payload, timeout=timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = '连接失败' if isinstance(e, requests.exceptions.ConnectionError) else '请求超时'
+                continue
+            
+            if response.status_code >= 500:
+                error = f"HTTP {response.status_code}"
+                continue
+            if response.status_code != 200:
+                return None, f"HTTP {response.status_code}"
+            
+            data = response.json()
+            if not data.get('success'):
+                return None, data.get('error', '未知错误')
+            return data, None
+        
+        return None, f"{error}（已重试{self.max_retries}次）"
+    
+    def _upload_one(self, audio_file, text, expire_time):
+        """
+        上传单个文件
+        
+        Returns:
+            dict: 上传结果
+        """
+        result = {
+            'file': os.path.basename(audio_file),
+            'path': audio_file,
+            'text': text,
+        }
+        
+        try:
+            data, error = self._post_with_retry(self.upload_api, {
+                'file_path': os.path.abspath(audio_file),
+                'text': text,
+                'expire_time': expire_time,
+                'tts_type': 'batch_upload'
+            })
+        except Exception as e:
+            data, error = None, str(e)
+        
+        if data:
+            result.update({
+                'success': True,
+                'record_id': data.get('record_id'),
+                'url': data.get('url'),
+                'expire_time': data.get('expire_time')
+            })
+        else:
+            result.update({'success': False, 'error': error})
+        return result
+    
+    def _upload_batch_of_one(self, audio_file, text, expire_time):
+        """逐个上传模式：包装成与批量模式相同的结果列表"""
+        return [self._upload_one(audio_file, text, expire_time)]
+    
+    def _upload_bulk(self, chunk, expire_time):
+        """
+        通过批量接口上传一组文件（一次请求）
+        
+        Args:
+            chunk: [(audio_file, text), ...]
+            
+        Returns:
+            list: 与chunk顺序一致的上传结果
+        """
+        try:
+            data, error = self._post_with_retry(self.bulk_upload_api, {
+                'items': [
+                    {'file_path': os.path.abspath(audio_file), 'text': text, 'expire_time': expire_time}
+                    for audio_file, text in chunk
+                ],
+                'tts_type': 'batch_upload'
+            }, timeout=300)
+        except Exception as e:
+            data, error = None, str(e)
+        
+        results = []
+        for n, (audio_file, text) in enumerate(chunk):
+            result = {
+                'file': os.path.basename(audio_file),
+                'path': audio_file,
+                'text': text,
+            }
+            item = data['results'][n] if data else None
+            if item and item.get('success'):
+                result.update({
+                    'success': True,
+                    'record_id': item.get('record_id'),
+                    'url': item.get('url'),
+                    'expire_time': item.get('expire_time')
+                })
+            else:
+                result.update({'success': False, 'error': item.get('error') if item else error})
+            results.append(result)
+        return results
+    
     def upload_from_directory(self, audio_dir, text_file=None, expire_time=7200, pattern="*.wav"):
         """
-        从目录上传音频文件
+        从目录上传音频文件（线程池并发上传）
         
         Args:
             audio_dir: 音频文件目录
@@ -80,102 +245,63 @@ class BatchAudioUploader:
             print("未提供文本文件，将使用文件名作为文本内容")
         
         print("\n" + "="*70)
-        print("开始上传...")
-        print("="*70)
+        print(f"开始上传（{self.workers} 个线程，限速 {self.rate_limiter.rate or '不限'} 个/秒）...")
+        print("="*70 + "\n")
         
-        upload_results = []
+        upload_results = [None] * len(audio_files)
         success_count = 0
         failed_count = 0
+        uploaded_bytes = 0
+        start_time = time.monotonic()
         
-        for i, audio_file in enumerate(audio_files, 1):
-            filename = os.path.basename(audio_file)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            tasks = []
+            for i, audio_file in enumerate(audio_files):
+                # 获取对应的文本内容
+                if texts and i < len(texts):
+                    text = texts[i]
+                else:
+                    # 使用文件名作为文本（去除扩展名）
+                    text = os.path.splitext(os.path.basename(audio_file))[0]
+                tasks.append((audio_file, text))
             
-            # 获取对应的文本内容
-            if texts and i <= len(texts):
-                text = texts[i-1]
+            # 每个future对应一组连续的文件：起始序号 -> 结果列表
+            futures = {}
+            if self.bulk_size > 0:
+                for start in range(0, len(tasks), self.bulk_size):
+                    chunk = tasks[start:start + self.bulk_size]
+                    futures[executor.submit(self._upload_bulk, chunk, expire_time)] = start
             else:
-                # 使用文件名作为文本（去除扩展名）
-                text = os.path.splitext(filename)[0]
-            
-            print(f"\n[{i}/{len(audio_files)}] {filename}")
-            print(f"文本: {text[:60]}...")
+                for i, (audio_file, text) in enumerate(tasks):
+                    futures[executor.submit(self._upload_batch_of_one, audio_file, text, expire_time)] = i
             
-            # 上传到云端
-            try:
-                response = requests.post(
-                    self.upload_api,
-                    json={
-                        'file_path': os.path.abspath(audio_file),
-                        'text': text,
-                        'expire_time': expire_time,
-                        'tts_type': 'batch_upload'
-                    },
-                    timeout=30
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('success'):
+            done = 0
+            for future in as_completed(futures):
+                start = futures[future]
+                for offset, result in enumerate(future.result()):
+                    upload_results[start + offset] = result
+                    done += 1
+                    
+                    if result['success']:
                         success_count += 1
-                        print(f"✅ 上传成功!")
-                        print(f"   记录ID: {data.get('record_id')}")
-                        print(f"   URL: {data.get('url')[:60]}...")
-                        
-                        upload_results.append({
-                            'file': filename,
-                            'path': audio_file,
-                            'text': text,
-                            'success': True,
-                            'record_id': data.get('record_id'),
-                            'url': data.get('url'),
-                            'expire_time': data.get('expire_time')
-                        })
+                        try:
+                            uploaded_bytes += os.path.getsize(result['path'])
+                        except OSError:
+                            pass
                     else:
                         failed_count += 1
-                        error = data.get('error', '未知错误')
-                        print(f"❌ 上传失败: {error}")
-                        upload_results.append({
-                            'file': filename,
-                            'path': audio_file,
-                            'text': text,
-                            'success': False,
-                            'error': error
-                        })
-                else:
-                    failed_count += 1
-                    print(f"❌ 上传失败: HTTP {response.status_code}")
-                    upload_results.append({
-                        'file': filename,
-                        'path': audio_file,
-                        'text': text,
-                        'success': False,
-                        'error': f"HTTP {response.status_code}"
-                    })
-                    
-            except requests.exceptions.ConnectionError:
-                failed_count += 1
-                print(f"❌ 连接失败！请确保Django服务已启动")
-                upload_results.append({
-                    'file': filename,
-                    'path': audio_file,
-                    'text': text,
-                    'success': False,
-                    'error': '连接失败'
-                })
-                break
-            except Exception as e:
-                failed_count += 1
-                print(f"❌ 上传异常: {str(e)}")
-                upload_results.append({
-                    'file': filename,
-                    'path': audio_file,
-                    'text': text,
-                    'success': False,
-                    'error': str(e)
-                })
-            
-            # 稍微延迟，避免请求过快
-            time.sleep(0.5)
+                        print(f"\r❌ {result['file']}: {result['error']}" + " " * 20)
+                
+                # 实时进度与吞吐量
+                elapsed = max(time.monotonic() - start_time, 1e-6)
+                print(
+                    f"\r[{done}/{len(audio_files)}] ✅ {success_count} ❌ {failed_count} | "
+                    f"{done / elapsed:.1f} 个/秒, {uploaded_bytes / 1024 / 1024 / elapsed:.2f} MB/秒",
+                    end='', flush=True
+                )
+        
+        elapsed = time.monotonic() - start_time
+        print()
         
         # 生成上传报告
         print("\n" + "="*70)
@@ -186,6 +312,7 @@ class BatchAudioUploader:
         print(f"   总文件数: {len(audio_files)} 个")
         print(f"   上传成功: {success_count} 个")
         print(f"   上传失败: {failed_count} 个")
+        print(f"   总耗时: {elapsed:.2f} 秒（{len(audio_files) / max(elapsed, 1e-6):.1f} 个/秒）")
         
         if success_count > 0:
             print(f"\n✅ 成功上传的文件:")
@@ -205,6 +332,7 @@ class BatchAudioUploader:
             'success': success_count,
             'failed': failed_count,
             'total': len(audio_files),
+            'elapsed': round(elapsed, 2),
             'results': upload_results
         }
 
@@ -229,6 +357,12 @@ def main():
   
   # 指定API地址
   python batch_generate_and_upload.py data/ --api http://192.168.1.100:8000
+  
+  # 8个线程并发上传，限速每秒50个请求
+  python batch_generate_and_upload.py data/ --workers 8 --rate 50
+  
+  # 使用批量接口，每个请求登记200个文件
+  python batch_generate_and_upload.py data/ --bulk-size 200
         """
     )
     
@@ -241,6 +375,14 @@ def main():
                        help='文件匹配模式（默认: *.wav）')
     parser.add_argument('--expire', type=int, default=7200,
                        help='URL有效期（秒），默认7200（2小时）')
+    parser.add_argument('--workers', '-w', type=int, default=4,
+                       help='并发上传线程数（默认: 4）')
+    parser.add_argument('--rate', '-r', type=float, default=20,
+                       help='每秒最多发起的请求数，0表示不限（默认: 20）')
+    parser.add_argument('--retries', type=int, default=3,
+                       help='5xx或连接失败时的最大重试次数（默认: 3）')
+    parser.add_argument('--bulk-size', type=int, default=0,
+                       help='使用批量接口时每个请求的文件数，0表示逐个上传（默认: 0）')
     
     args = parser.parse_args()
     
@@ -269,7 +411,13 @@ def main():
         sys.exit(1)
     
     # 创建上传器
-    uploader = BatchAudioUploader(api_url=args.api)
+    uploader = BatchAudioUploader(
+        api_url=args.api,
+        workers=args.workers,
+        rate=args.rate,
+        max_retries=args.retries,
+        bulk_size=args.bulk_size
+    )
     
     # 批量上传
     result = uploader.upload_from_directory(
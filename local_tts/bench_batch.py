@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+基准测试：逐行合成 vs 批量合成
+对比 EnglishTTSGenerator.generate_speech（逐行 tts_to_file）与
+generate_batch（分句、按长度分组、小批次合成）的每秒合成句子数
+
+用法:
+    python bench_batch.py
+    python bench_batch.py --lines 100 --batch-size 16
+    python bench_batch.py -m tts_models/en/ljspeech/vits --lines 200
+"""
+import os
+import time
+import shutil
+import tempfile
+import argparse
+
+from test import EnglishTTSGenerator, split_sentences
+
+DEFAULT_INPUT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    '6Harry_Potter_and_The_Half_Blood_Prince_sentences.txt'
+)
+
+
+def load_lines(input_file, count):
+    """读取前count个非空行"""
+    lines = []
+    with open(input_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                lines.append(line)
+            if len(lines) >= count:
+                break
+    return lines
+
+
+def bench_per_line(generator, lines, output_dir):
+    """当前方式：每行调用一次 generate_speech"""
+    start = time.perf_counter()
+    ok = 0
+    for i, line in enumerate(lines):
+        if generator.generate_speech(line, os.path.join(output_dir, f"line_{i:05d}.wav")):
+            ok += 1
+    return ok, time.perf_counter() - start
+
+
+def bench_batch(generator, lines, output_dir, batch_size):
+    """批量方式：一次调用 generate_batch"""
+    output_files = [os.path.join(output_dir, f"batch_{i:05d}.wav") for i in range(len(lines))]
+    start = time.perf_counter()
+    results = generator.generate_batch(lines, output_files, batch_size=batch_size)
+    return sum(results), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='逐行合成与批量合成的吞吐量对比')
+    parser.add_argument('--input', '-i', default=DEFAULT_INPUT,
+                        help='输入文本文件（每行一段文本）')
+    parser.add_argument('--lines', '-n', type=int, default=50,
+                        help='测试的行数（默认: 50）')
+    parser.add_argument('--batch-size', '-b', type=int, default=8,
+                        help='批量合成时每个小批次的句子数（默认: 8）')
+    parser.add_argument('--model', '-m', default='tts_models/en/ljspeech/tacotron2-DDC',
+                        help='TTS模型名称')
+    args = parser.parse_args()
+
+    lines = load_lines(args.input, args.lines)
+    sentences = sum(len(split_sentences(line)) for line in lines)
+
+    print("=" * 60)
+    print("逐行合成 vs 批量合成")
+    print("=" * 60)
+    print(f"模型: {args.model}")
+    print(f"文本: {len(lines)} 行，{sentences} 句")
+
+    generator = EnglishTTSGenerator(args.model)
+    if not generator.load_model():
+        return
+
+    # 预热：首次推理包含额外的初始化开销，不计入结果
+    output_dir = tempfile.mkdtemp(prefix='bench_batch_')
+    generator.generate_speech("Warm up.", os.path.join(output_dir, "warmup.wav"))
+
+    try:
+        line_ok, line_time = bench_per_line(generator, lines, output_dir)
+        batch_ok, batch_time = bench_batch(generator, lines, output_dir, args.batch_size)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    print("\n" + "=" * 60)
+    print(f"{'方式':<12} {'成功':>6} {'耗时(秒)':>10} {'句/秒':>10}")
+    print("-" * 60)
+    print(f"{'逐行':<12} {line_ok:>6} {line_time:>10.2f} {sentences / line_time:>10.2f}")
+    print(f"{'批量':<12} {batch_ok:>6} {batch_time:>10.2f} {sentences / batch_time:>10.2f}")
+    print("-" * 60)
+    print(f"加速比: {line_time / batch_time:.2f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
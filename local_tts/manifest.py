@@ -0,0 +1,122 @@
+"""
+批量生成清单（manifest）
+每行一条JSON记录：行号、文本哈希、输出文件、音频时长、状态
+
+文件名是随机的 local_{uuid}_{timestamp}.wav，无法从文件名反推对应的行；
+清单记录了每一行的生成结果，中断后可以据此跳过已完成的行（--resume）
+"""
+import os
+import json
+import wave
+import hashlib
+from datetime import datetime
+
+
+def text_hash(text):
+    """计算文本的sha256（去除首尾空白）"""
+    return hashlib.sha256(text.strip().encode('utf-8')).hexdigest()
+
+
+def default_manifest_path(output_dir):
+    """默认清单路径：与输出目录同级，如 data -> data.manifest.jsonl"""
+    return os.path.abspath(output_dir).rstrip(os.sep) + '.manifest.jsonl'
+
+
+def wav_duration(path):
+    """读取WAV时长（秒），失败返回 None"""
+    try:
+        with wave.open(path, 'rb') as f:
+            return round(f.getnframes() / float(f.getframerate()), 3)
+    except Exception:
+        return None
+
+
+class GenerationManifest:
+    """批量生成清单（追加写入的JSONL）"""
+
+    def __init__(self, path, output_dir):
+        """
+        Args:
+            path: 清单文件路径
+            output_dir: 音频输出目录（清单中的文件名相对于该目录）
+        """
+        self.path = path
+        self.output_dir = output_dir
+        self.entries = {}
+
+    def load(self):
+        """
+        读取已有清单，同一行以最后一条记录为准
+
+        Returns:
+            int: 已记录的行数
+        """
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return 0
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 进程被杀时最后一行可能只写了一半
+                    continue
+                self.entries[entry['line']] = entry
+        return len(self.entries)
+
+    def is_done(self, line, text):
+        """
+        该行是否已成功生成（文本未变化且音频文件仍存在）
+
+        Args:
+            line: 行号
+            text: 当前的行文本
+
+        Returns:
+            bool
+        """
+        entry = self.entries.get(line)
+        return bool(
+            entry
+            and entry.get('status') == 'success'
+            and entry.get('text_hash') == text_hash(text)
+            and os.path.exists(os.path.join(self.output_dir, entry['file']))
+        )
+
+    def get_file(self, line):
+        """已完成行的输出文件名"""
+        entry = self.entries.get(line)
+        return entry['file'] if entry else None
+
+    def append(self, results):
+        """
+        追加一批结果并fsync，保证进程崩溃后已完成的批次不丢失
+
+        Args:
+            results: generate_all 的单行结果字典列表
+        """
+        if not results:
+            return
+
+        now = datetime.now().isoformat(timespec='seconds')
+        lines = []
+        for r in results:
+            entry = {
+                'line': r['line'],
+                'text_hash': text_hash(r['text']),
+                'file': r.get('file'),
+                'duration': None,
+                'time': r.get('time'),
+                'status': 'success' if r.get('success') else 'failed',
+                'updated_at': now,
+            }
+            if entry['file']:
+                entry['duration'] = wav_duration(os.path.join(self.output_dir, entry['file']))
+            self.entries[entry['line']] = entry
+            lines.append(json.dumps(entry, ensure_ascii=False))
+
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
@@ -3,8 +3,14 @@
 使用 Coqui TTS 生成英文语音
 """
 import os
+import sys
 from TTS.api import TTS
 
+# 分句和批量推理与 Django 项目共用同一份实现（project/tts_app，不依赖Django）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'project'))
+from tts_app.text_utils import split_sentences  # noqa: E402
+from tts_app.batch_inference import SENTENCE_SILENCE, synthesize_sentences  # noqa: E402
+
 
 class EnglishTTSGenerator:
     """英文语音生成器"""
@@ -70,6 +76,65 @@ class EnglishTTSGenerator:
             return False
 
 
+    def generate_batch(self, texts, output_files, batch_size=8):
+        """
+        批量生成英文语音（每个输入文本输出一个WAV）
+        
+        所有输入先拆分为句子并去重，按长度分组成小批次合成，
+        再按原顺序拼接回各自的音频文件
+        
+        Args:
+            texts: 文本列表
+            output_files: 输出文件路径列表（与texts一一对应）
+            batch_size: 每个批次的句子数
+            
+        Returns:
+            list: 每个输入是否生成成功
+        """
+        import numpy as np
+        
+        if len(texts) != len(output_files):
+            raise ValueError("texts 与 output_files 数量不一致")
+        
+        if not self.load_model():
+            return [False] * len(texts)
+        
+        sentences_per_text = [split_sentences(text) for text in texts]
+        unique_sentences = list({s for sentences in sentences_per_text for s in sentences})
+        
+        wavs, errors = synthesize_sentences(self.tts, unique_sentences, batch_size)
+        for sentence, error in errors.items():
+            print(f"❌ 句子合成失败: {sentence[:60]} - {error}")
+        
+        sample_rate = self.tts.synthesizer.output_sample_rate
+        silence = np.zeros(int(sample_rate * SENTENCE_SILENCE), dtype=np.float32)
+        
+        results = []
+        for sentences, output_file in zip(sentences_per_text, output_files):
+            if not sentences or any(s not in wavs for s in sentences):
+                results.append(False)
+                continue
+            
+            try:
+                output_dir = os.path.dirname(output_file)
+                if output_dir and not os.path.exists(output_dir):
+                    os.makedirs(output_dir, exist_ok=True)
+                
+                parts = []
+                for i, sentence in enumerate(sentences):
+                    if i > 0:
+                        parts.append(silence)
+                    parts.append(wavs[sentence])
+                
+                self.tts.synthesizer.save_wav(wav=np.concatenate(parts), path=output_file)
+                results.append(True)
+            except Exception as e:
+                print(f"❌ 写入失败: {output_file} - {e}")
+                results.append(False)
+        
+        return results
+
+
 def text_to_speech(text, output_file="output.wav", model_name="tts_models/en/ljspeech/tacotron2-DDC"):
     """
     简化的文本转语音函数（一步到位）
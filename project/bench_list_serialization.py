@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+基准测试：视频列表序列化
+对比 100 行一页时三种方式的每秒序列化行数：
+- 模型实例 + to_dict() + JsonResponse 的标准库编码（旧方式）
+- values() 投影 + 标准库编码
+- values() 投影 + orjson（安装了 orjson 时）
+
+使用临时SQLite数据库，不影响项目数据库
+
+用法:
+    python bench_list_serialization.py
+    python bench_list_serialization.py --rows 5000 --pages 200 --page-size 100
+"""
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import argparse
+from datetime import timedelta
+
+# 设置Django环境（使用临时数据库）
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tts_project.settings')
+
+from django.conf import settings
+
+TEMP_DB = os.path.join(tempfile.mkdtemp(prefix='bench_serialize_'), 'bench.sqlite3')
+settings.DATABASES['default']['NAME'] = TEMP_DB
+
+import django
+django.setup()
+
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from tts_app.models import VideoRecord
+from tts_app.serializers import VIDEO_FIELDS, RecordSerializer, orjson
+
+
+def fill_table(rows, batch_size=5000):
+    """插入视频记录（一部分已过期）"""
+    now = timezone.now()
+    categories = [value for value, _ in VideoRecord.CATEGORY_CHOICES]
+    for batch_start in range(0, rows, batch_size):
+        batch = []
+        for i in range(batch_start, min(rows, batch_start + batch_size)):
+            batch.append(VideoRecord(
+                title=f"Benchmark video {i}",
+                category=categories[i % len(categories)],
+                tags='english,listening,grade-3',
+                preurl=f"https://example.com/video_{i}.mp4?X-Tos-Signature={'x' * 64}",
+                object_key=f"video_{i}.mp4",
+                thumbnail_url=f"https://example.com/video_{i}.jpg?X-Tos-Signature={'x' * 64}",
+                thumbnail_key=f"video_{i}.jpg",
+                file_size=random.randint(1000000, 50000000),
+                status='success',
+                uptime=now - timedelta(seconds=i),
+                expire_time=now + timedelta(seconds=random.randint(-3600, 7200)),
+            ))
+        VideoRecord.objects.bulk_create(batch)
+
+
+def page_querysets(rows, pages, page_size):
+    """随机页（与 api_video_list 相同的排序和切片）"""
+    offsets = [random.randrange(max(1, rows - page_size)) for _ in range(pages)]
+    return [VideoRecord.objects.order_by('-uptime')[offset:offset + page_size] for offset in offsets]
+
+
+def run_to_dict(page):
+    """旧方式：模型实例 + to_dict() + 标准库编码（JsonResponse 默认）"""
+    now = timezone.now()
+    return json.dumps([record.to_dict(now) for record in page], cls=DjangoJSONEncoder)
+
+
+def run_values_json(page, serializer):
+    """values() 投影 + 标准库编码"""
+    return json.dumps(serializer.serialize(page), cls=DjangoJSONEncoder)
+
+
+def run_values_orjson(page, serializer):
+    """values() 投影 + orjson"""
+    return orjson.dumps(serializer.serialize(page))
+
+
+def measure(func, pages):
+    """执行所有页，返回 (行数, 耗时秒)"""
+    count = 0
+    start = time.perf_counter()
+    for page in pages:
+        func(page.all())
+        count += len(page)
+    return count, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='视频列表序列化基准测试')
+    parser.add_argument('--rows', type=int, default=10000,
+                        help='表行数（默认: 10000）')
+    parser.add_argument('--pages', type=int, default=200,
+                        help='序列化的页数（默认: 200）')
+    parser.add_argument('--page-size', type=int, default=100,
+                        help='每页行数（默认: 100，api_video_list 的上限）')
+    parser.add_argument('--fields', default='id,title,preurl',
+                        help='字段选择测试使用的字段（默认: id,title,preurl）')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("视频列表序列化基准测试")
+    print("=" * 70)
+    print(f"临时数据库: {TEMP_DB}")
+    print(f"orjson: {'已安装' if orjson is not None else '未安装（跳过orjson测试）'}")
+
+    call_command('migrate', verbosity=0)
+    print(f"\n插入 {args.rows} 行...")
+    fill_table(args.rows)
+
+    pages = page_querysets(args.rows, args.pages, args.page_size)
+    full = RecordSerializer(VIDEO_FIELDS)
+    selected = RecordSerializer(VIDEO_FIELDS, args.fields.split(','))
+
+    cases = [
+        ('to_dict + json', run_to_dict),
+        ('values + json', lambda page: run_values_json(page, full)),
+        (f'values({args.fields}) + json', lambda page: run_values_json(page, selected)),
+    ]
+    if orjson is not None:
+        cases += [
+            ('values + orjson', lambda page: run_values_orjson(page, full)),
+            (f'values({args.fields}) + orjson', lambda page: run_values_orjson(page, selected)),
+        ]
+
+    # 预热（查询编译、连接建立）
+    for _, func in cases:
+        func(pages[0].all())
+
+    results = [(name, *measure(func, pages)) for name, func in cases]
+    baseline = results[0][1] / results[0][2]
+
+    print("\n" + "=" * 70)
+    print(f"{'方式':<36} {'行/秒':>12} {'每页(ms)':>10} {'加速比':>8}")
+    print("-" * 70)
+    for name, count, elapsed in results:
+        rate = count / elapsed
+        print(f"{name:<36} {rate:>12.0f} {elapsed / len(pages) * 1000:>10.2f} {rate / baseline:>7.2f}x")
+    print("=" * 70)
+
+    os.remove(TEMP_DB)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+基准测试：记录搜索
+对比 LIKE '%q%' 全表扫描（旧方式）与 FTS5 全文索引的查询延迟
+
+使用临时SQLite数据库，不影响项目数据库；语料为 local_tts 的11k句子文件，
+表行数超过语料时重复语料并加序号
+
+用法:
+    python bench_search.py
+    python bench_search.py --sizes 11000 100000 500000 --queries 200
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+
+# 设置Django环境（使用临时数据库）
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tts_project.settings')
+
+from django.conf import settings
+
+TEMP_DB = os.path.join(tempfile.mkdtemp(prefix='bench_search_'), 'bench.sqlite3')
+settings.DATABASES['default']['NAME'] = TEMP_DB
+
+import django
+django.setup()
+
+from django.core.management import call_command
+from django.db.models import Q
+from django.utils import timezone
+from tts_app.models import AudioRecord
+from tts_app.services.search_service import SearchService
+from tts_app.text_utils import compute_text_hash
+
+CORPUS_FILE = os.path.join(
+    PROJECT_DIR, '..', 'local_tts', '6Harry_Potter_and_The_Half_Blood_Prince_sentences.txt'
+)
+
+
+def load_corpus():
+    """读取句子语料（不存在时生成合成文本）"""
+    if os.path.exists(CORPUS_FILE):
+        with open(CORPUS_FILE, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f if line.strip()]
+        if lines:
+            return lines
+    return [f"This is synthetic benchmark sentence number {i}." for i in range(10000)]
+
+
+def fill_table(corpus, start, end, batch_size=5000):
+    """插入第 start 到 end 条记录（超过语料长度时文本加序号）"""
+    now = timezone.now()
+    for batch_start in range(start, end, batch_size):
+        batch = []
+        for i in range(batch_start, min(end, batch_start + batch_size)):
+            text = corpus[i % len(corpus)] if i < len(corpus) else f"{corpus[i % len(corpus)]} #{i}"
+            batch.append(AudioRecord(
+                text=text,
+                text_hash=compute_text_hash(text),
+                tts_type='local',
+                status='success',
+                uptime=now,
+            ))
+        AudioRecord.objects.bulk_create(batch)
+
+
+def percentile(samples, pct):
+    """计算百分位数（毫秒）"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index] * 1000
+
+
+def sample_queries(corpus, count):
+    """从语料中随机取词作为查询（一部分截断为前缀）"""
+    words = [word.strip('.,!?;:"\'') for line in corpus for word in line.split()]
+    words = [word for word in words if len(word) >= 4]
+    queries = []
+    for n in range(count):
+        word = random.choice(words)
+        queries.append(word[:3] if n % 3 == 0 else word)
+    return queries
+
+
+def search_like(query, limit):
+    """旧查询：LIKE '%q%'（含 id 转字符串匹配）"""
+    return list(AudioRecord.objects.filter(
+        Q(text__icontains=query) | Q(id__icontains=query)
+    ).order_by('-uptime').values_list('id', flat=True)[:limit])
+
+
+def search_fts(query, limit):
+    """新查询：FTS5 前缀匹配"""
+    return list(SearchService.search_audio(
+        AudioRecord.objects.all(), query
+    ).order_by('-uptime').values_list('id', flat=True)[:limit])
+
+
+def search_ranked(query, limit):
+    """新查询：FTS5 按 bm25 排序"""
+    return list(SearchService.search_audio(
+        AudioRecord.objects.all(), query, ranked=True
+    ).values_list('id', flat=True)[:limit])
+
+
+def measure(search, queries, limit):
+    """执行查询，返回每次耗时（秒）"""
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query, limit)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='记录搜索基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[11000, 100000],
+                        help='表行数（默认: 11000 100000）')
+    parser.add_argument('--queries', type=int, default=200,
+                        help='每种方式的查询次数（默认: 200）')
+    parser.add_argument('--limit', type=int, default=20,
+                        help='每次查询返回的行数（默认: 20）')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("记录搜索基准测试: LIKE vs FTS5")
+    print("=" * 70)
+    print(f"临时数据库: {TEMP_DB}")
+
+    call_command('migrate', verbosity=0)
+    corpus = load_corpus()
+    print(f"语料: {len(corpus)} 句")
+
+    rows = 0
+    results = []
+    for size in sorted(args.sizes):
+        print(f"\n插入数据至 {size} 行（触发器同步更新全文索引）...")
+        start = time.time()
+        fill_table(corpus, rows, size)
+        rows = size
+        print(f"   耗时 {time.time() - start:.1f} 秒")
+
+        queries = sample_queries(corpus, args.queries)
+        like = measure(search_like, queries, args.limit)
+        fts = measure(search_fts, queries, args.limit)
+        ranked = measure(search_ranked, queries, args.limit)
+        results.append((size, like, fts, ranked))
+
+    print("\n" + "=" * 70)
+    print(f"{'行数':>10} | {'LIKE p50':>10} {'LIKE p99':>10} | {'FTS p50':>10} {'FTS p99':>10} | {'bm25 p50':>10}")
+    print("-" * 70)
+    for size, like, fts, ranked in results:
+        print(f"{size:>10} | {percentile(like, 50):>8.3f}ms {percentile(like, 99):>8.3f}ms | "
+              f"{percentile(fts, 50):>8.3f}ms {percentile(fts, 99):>8.3f}ms | "
+              f"{percentile(ranked, 50):>8.3f}ms")
+    print("=" * 70)
+
+    os.remove(TEMP_DB)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+基准测试：api_get_audio_url 去重查询
+对比按 text（无索引TextField，全表扫描）与按 text_hash（text_hash+status+uptime 复合索引）查找的延迟
+
+使用临时SQLite数据库，不影响项目数据库
+
+用法:
+    python bench_text_hash_lookup.py
+    python bench_text_hash_lookup.py --sizes 10000 100000 1000000 --queries 500
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+
+# 设置Django环境（使用临时数据库）
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tts_project.settings')
+
+from django.conf import settings
+
+TEMP_DB = os.path.join(tempfile.mkdtemp(prefix='bench_lookup_'), 'bench.sqlite3')
+settings.DATABASES['default']['NAME'] = TEMP_DB
+
+import django
+django.setup()
+
+from django.core.management import call_command
+from django.utils import timezone
+from tts_app.models import AudioRecord
+from tts_app.text_utils import compute_text_hash
+
+CORPUS_FILE = os.path.join(
+    PROJECT_DIR, '..', 'local_tts', '6Harry_Potter_and_The_Half_Blood_Prince_sentences.txt'
+)
+
+
+def load_corpus():
+    """读取句子语料（不存在时生成合成文本）"""
+    if os.path.exists(CORPUS_FILE):
+        with open(CORPUS_FILE, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f if line.strip()]
+        if lines:
+            return lines
+    return [f"This is synthetic benchmark sentence number {i}." for i in range(10000)]
+
+
+def fill_table(corpus, start, end, batch_size=5000):
+    """插入第 start 到 end 条记录（文本在语料基础上加序号保证唯一）"""
+    now = timezone.now()
+    statuses = ['success'] * 8 + ['failed', 'pending']
+    for batch_start in range(start, end, batch_size):
+        batch = []
+        for i in range(batch_start, min(end, batch_start + batch_size)):
+            text = f"{corpus[i % len(corpus)]} #{i}"
+            batch.append(AudioRecord(
+                text=text,
+                text_hash=compute_text_hash(text),
+                tts_type='local',
+                status=statuses[i % len(statuses)],
+                path=f"/tmp/local_{i:012d}.wav",
+                uptime=now,
+            ))
+        AudioRecord.objects.bulk_create(batch)
+
+
+def percentile(samples, pct):
+    """计算百分位数（毫秒）"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index] * 1000
+
+
+def measure(lookup, texts):
+    """执行查找，返回每次耗时（秒）"""
+    samples = []
+    for text in texts:
+        start = time.perf_counter()
+        lookup(text)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def lookup_by_text(text):
+    """旧查询：按TextField精确匹配"""
+    return AudioRecord.objects.filter(
+        text=text,
+        status='success'
+    ).order_by('-uptime').first()
+
+
+def lookup_by_hash(text):
+    """新查询：按text_hash复合索引"""
+    return AudioRecord.objects.filter(
+        text_hash=compute_text_hash(text),
+        status='success'
+    ).order_by('-uptime').first()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='去重查询基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help='表行数（默认: 10000 100000 1000000）')
+    parser.add_argument('--queries', type=int, default=1000,
+                        help='text_hash查询次数（默认: 1000）')
+    parser.add_argument('--scan-queries', type=int, default=50,
+                        help='按text全表扫描的查询次数（默认: 50）')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("去重查询基准测试: text vs text_hash")
+    print("=" * 70)
+    print(f"临时数据库: {TEMP_DB}")
+
+    call_command('migrate', verbosity=0)
+    corpus = load_corpus()
+    print(f"语料: {len(corpus)} 句")
+
+    rows = 0
+    results = []
+    for size in sorted(args.sizes):
+        print(f"\n插入数据至 {size} 行...")
+        start = time.time()
+        fill_table(corpus, rows, size)
+        rows = size
+        print(f"   耗时 {time.time() - start:.1f} 秒")
+
+        # 一半命中已有文本，一半未命中（新文本）
+        def sample_texts(count):
+            texts = []
+            for n in range(count):
+                if n % 2 == 0:
+                    i = random.randrange(rows)
+                    texts.append(f"{corpus[i % len(corpus)]} #{i}")
+                else:
+                    texts.append(f"Brand new sentence that is not in the table {n}")
+            return texts
+
+        scan = measure(lookup_by_text, sample_texts(args.scan_queries))
+        indexed = measure(lookup_by_hash, sample_texts(args.queries))
+
+        results.append((size, scan, indexed))
+        print(f"   text      p50={percentile(scan, 50):8.3f}ms  p99={percentile(scan, 99):8.3f}ms")
+        print(f"   text_hash p50={percentile(indexed, 50):8.3f}ms  p99={percentile(indexed, 99):8.3f}ms")
+
+    print("\n" + "=" * 70)
+    print(f"{'行数':>10} | {'text p50':>10} {'text p99':>10} | {'hash p50':>10} {'hash p99':>10}")
+    print("-" * 70)
+    for size, scan, indexed in results:
+        print(f"{size:>10} | {percentile(scan, 50):>8.3f}ms {percentile(scan, 99):>8.3f}ms | "
+              f"{percentile(indexed, 50):>8.3f}ms {percentile(indexed, 99):>8.3f}ms")
+    print("=" * 70)
+
+    os.remove(TEMP_DB)
+
+
+if __name__ == "__main__":
+    main()
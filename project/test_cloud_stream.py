@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+流式云TTS测试脚本 - 使用本地模拟服务，不调用火山引擎
+
+模拟服务按 HTTP Chunked 逐行返回JSON（与 OpenSpeech 流式接口相同的格式），
+每块之间有延迟，用于验证：
+- 音频块边接收边写入WAV，最终文件与服务端发送的PCM一致
+- 首块时间（TTFB）明显小于总耗时
+- 服务端错误、连接中断时返回失败且不留下半个文件
+- 默认配置（开启句子级缓存）下 generate_speech 逐句使用流式接口，音调参数传给服务端，
+  再次合成相同句子时命中缓存，不再请求
+
+用法:
+    python test_cloud_stream.py
+    python test_cloud_stream.py --chunks 20 --delay 0.1
+"""
+import os
+import sys
+import json
+import time
+import wave
+import base64
+import shutil
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 设置Django环境
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tts_project.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.test.utils import setup_test_environment
+from django.test.runner import DiscoverRunner
+from tts_app.services import metrics
+from tts_app.services.tts_service import CloudTTSService
+
+SAMPLE_RATE = 24000
+
+
+class FakeStreamHandler(BaseHTTPRequestHandler):
+    """模拟流式TTS接口：每块 chunk_ms 毫秒的PCM，块之间延迟 delay 秒"""
+
+    protocol_version = 'HTTP/1.1'
+    chunks = 10
+    chunk_ms = 200
+    delay = 0.05
+    mode = 'ok'  # ok / error / drop
+    bodies = []  # 收到的请求体
+
+    def log_message(self, format, *args):
+        pass
+
+    def _write_line(self, message):
+        data = (json.dumps(message) + '\n').encode('utf-8')
+        self.wfile.write(f'{len(data):X}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        FakeStreamHandler.bodies.append(body)
+        assert self.headers['X-Api-Resource-Id']
+        assert body['req_params']['audio_params']['format'] == 'pcm'
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        frames = SAMPLE_RATE * self.chunk_ms // 1000
+        for i in range(self.chunks):
+            time.sleep(self.delay)
+            if self.mode == 'error' and i == 2:
+                self._write_line({'code': 45000001, 'message': 'quota exceeded', 'data': None})
+                break
+            if self.mode == 'drop' and i == 2:
+                # 不发送结束标记直接断开
+                self.wfile.write(b'0\r\n\r\n')
+                self.close_connection = True
+                return
+            pcm = bytes([i % 256]) * (frames * 2)
+            self._write_line({'code': 0, 'message': '', 'data': base64.b64encode(pcm).decode('ascii')})
+        else:
+            self._write_line({'code': 20000000, 'message': 'OK', 'data': None})
+        self.wfile.write(b'0\r\n\r\n')
+
+
+def start_server():
+    """在后台线程启动模拟服务，返回 (server, url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeStreamHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/api/v3/tts/unidirectional'
+
+
+def make_service(url):
+    service = CloudTTSService()
+    service.stream_url = url
+    service.stream_sample_rate = SAMPLE_RATE
+    return service
+
+
+def test_stream_to_file(url):
+    """正常流式：文件内容正确，TTFB < 总耗时"""
+    print("\n" + "=" * 70)
+    print("测试1: 流式写入WAV")
+    print("=" * 70)
+
+    received = []
+    service = make_service(url)
+    success, path, error, timings = service.generate_speech_stream(
+        "Hello, this is a streaming test.", on_chunk=received.append
+    )
+    assert success, error
+
+    with wave.open(path, 'rb') as wav:
+        frames = wav.readframes(wav.getnframes())
+        assert wav.getframerate() == SAMPLE_RATE
+    assert frames == b''.join(received), "WAV内容与收到的数据块不一致"
+    assert timings['chunks'] == FakeStreamHandler.chunks
+    assert timings['ttfb'] < timings['total']
+
+    duration = len(frames) / 2 / SAMPLE_RATE
+    print(f"✅ 块数: {timings['chunks']}，音频时长: {duration:.2f}秒")
+    print(f"✅ 首块(TTFB): {timings['ttfb'] * 1000:.0f}ms，总耗时: {timings['total'] * 1000:.0f}ms")
+    os.remove(path)
+
+
+def test_failures(url):
+    """服务端错误、连接中断：返回失败，不留下文件"""
+    print("\n" + "=" * 70)
+    print("测试2: 服务端错误和连接中断")
+    print("=" * 70)
+
+    for mode in ('error', 'drop'):
+        FakeStreamHandler.mode = mode
+        before = set(os.listdir(settings.AUDIO_OUTPUT_DIR))
+        success, path, error, _ = make_service(url).generate_speech_stream("Failure case.")
+        after = set(os.listdir(settings.AUDIO_OUTPUT_DIR))
+        assert not success and path is None
+        assert before == after, "失败时不应留下音频文件"
+        print(f"✅ {mode}: {error}")
+    FakeStreamHandler.mode = 'ok'
+
+
+def test_default_settings(url):
+    """默认配置（开启句子级缓存）：generate_speech 逐句使用流式接口，音调参数传给服务端"""
+    print("\n" + "=" * 70)
+    print("测试3: 默认配置下 generate_speech 使用流式接口")
+    print("=" * 70)
+
+    assert getattr(settings, 'SENTENCE_CACHE_ENABLED', True), "该测试验证默认开启句子级缓存时的路径"
+    settings.CLOUD_TTS_STREAMING = True
+    service = make_service(url)
+    service.pitch_ratio = 1.5
+    text = "The first sentence. The second sentence."
+
+    FakeStreamHandler.bodies = []
+    success, path, error = service.generate_speech(text)
+    assert success, error
+    texts = sorted(body['req_params']['text'] for body in FakeStreamHandler.bodies)
+    assert texts == ["The first sentence.", "The second sentence."], texts
+    for body in FakeStreamHandler.bodies:
+        additions = json.loads(body['req_params']['additions'])
+        assert additions['post_process']['pitch'] == 7, additions
+    with wave.open(path, 'rb') as wav:
+        assert wav.getframerate() == SAMPLE_RATE
+        duration = wav.getnframes() / SAMPLE_RATE
+    # 两句各 chunks * chunk_ms 毫秒，加上句间静音
+    assert duration >= 2 * FakeStreamHandler.chunks * FakeStreamHandler.chunk_ms / 1000
+    os.remove(path)
+    print(f"✅ 流式请求 {len(FakeStreamHandler.bodies)} 次（每句一次），音调 1.5 倍 -> 7 个半音，音频 {duration:.2f}秒")
+
+    FakeStreamHandler.bodies = []
+    success, path, error = service.generate_speech(text)
+    assert success, error
+    assert not FakeStreamHandler.bodies, "相同句子应命中句子缓存"
+    os.remove(path)
+    print("✅ 再次合成相同句子命中缓存，没有发出流式请求")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='流式云TTS测试（本地模拟服务）')
+    parser.add_argument('--chunks', type=int, default=10, help='模拟服务返回的块数（默认: 10）')
+    parser.add_argument('--delay', type=float, default=0.05, help='块之间的延迟秒数（默认: 0.05）')
+    args = parser.parse_args()
+
+    FakeStreamHandler.chunks = args.chunks
+    FakeStreamHandler.delay = args.delay
+
+    work_dir = tempfile.mkdtemp(prefix='cloud_stream_test_')
+    settings.SENTENCE_AUDIO_DIR = os.path.join(work_dir, 'sentences')
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+
+    server, url = start_server()
+    print(f"模拟流式TTS服务: {url}")
+    try:
+        test_stream_to_file(url)
+        test_failures(url)
+        test_default_settings(url)
+    finally:
+        server.shutdown()
+        metrics.flush()
+        runner.teardown_databases(old_config)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("\n✅ 所有测试通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+视频后处理流水线测试脚本 - 使用本地目录模拟对象存储和测试数据库，不连接TOS
+
+验证：
+- 上传接口在视频传完后立即返回，记录已是 success，缩略图、字幕阶段在后台执行
+- 暂存的字幕上传成功后删除；各阶段状态、耗时记录在 pipeline 中
+- 失败的阶段可以单独重试，已成功的阶段不能重试；卡在 pending / running 超时的阶段可以重试
+- 表单参数无效时返回400，并删除请求体解析时已经流式上传的视频
+
+未安装FFmpeg时缩略图阶段失败，脚本只检查其状态被正确记录
+
+用法:
+    python test_media_pipeline.py
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# 设置Django环境
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tts_project.settings')
+
+import django
+django.setup()
+
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.test.runner import DiscoverRunner
+from django.utils import timezone
+from tts_app.models import VideoRecord
+from tts_app.services import metrics
+from tts_app.services.media_pipeline import MediaPipeline
+from tts_app.services.storage_service import StorageService, reset_shared_clients
+
+SUBTITLE = '1\n00:00:01,000 --> 00:00:02,000\nHello\n'
+
+
+def video_store():
+    return StorageService(bucket_name=settings.TOS_VIDEO_BUCKET_NAME).get_client()
+
+
+def wait_pipeline(record_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        record = VideoRecord.objects.get(id=record_id)
+        if record.get_pipeline_status() != 'processing':
+            return record
+        time.sleep(0.05)
+    raise AssertionError(f"记录{record_id} 后处理超时")
+
+
+def test_upload_returns_early(client, work_dir):
+    """上传接口：视频传完即返回，字幕在后台上传"""
+    print("\n" + "=" * 70)
+    print("测试1: 上传接口不等待后处理")
+    print("=" * 70)
+
+    video_path = os.path.join(work_dir, 'demo.mp4')
+    with open(video_path, 'wb') as f:
+        f.write(os.urandom(200 * 1024))
+    subtitle_path = os.path.join(work_dir, 'demo.srt')
+    with open(subtitle_path, 'w', encoding='utf-8') as f:
+        f.write(SUBTITLE)
+
+    with open(video_path, 'rb') as video, open(subtitle_path, 'rb') as subtitle:
+        response = client.post('/api/upload-video-file/', {
+            'video_file': video, 'subtitle_file': subtitle, 'title': '流水线',
+        })
+    body = response.json()
+    assert response.status_code == 200, body
+    assert body['thumbnail_url'] is None and body['subtitle_url'] is None
+    assert set(body['pipeline']) == set(MediaPipeline.STAGES)
+    record = VideoRecord.objects.get(id=body['record_id'])
+    assert record.status == 'success' and record.preurl
+    print(f"✅ 上传返回，记录{record.id} 已可播放，pipeline: "
+          f"{ {stage: state['status'] for stage, state in body['pipeline'].items()} }")
+
+    record = wait_pipeline(record.id)
+    subtitle_state = record.pipeline['subtitle']
+    assert subtitle_state['status'] == 'success', subtitle_state
+    assert subtitle_state['attempts'] == 1 and subtitle_state['seconds'] is not None
+    assert record.subtitle_url and record.subtitle_name == 'demo.srt'
+    assert not os.path.exists(subtitle_state['source']), "字幕上传成功后应删除暂存文件"
+    stored = video_store().object_path(settings.TOS_VIDEO_BUCKET_NAME, record.subtitle_key)
+    assert stored.read_text(encoding='utf-8') == SUBTITLE
+
+    thumbnail_state = record.pipeline['thumbnail']
+    assert thumbnail_state['status'] in ('success', 'failed'), thumbnail_state
+    if thumbnail_state['status'] == 'success':
+        assert record.thumbnail_url
+    else:
+        assert thumbnail_state['error'] and record.get_pipeline_status() == 'failed'
+    print(f"✅ 字幕阶段成功（{subtitle_state['seconds']}秒），缩略图阶段: "
+          f"{thumbnail_state['status']} {thumbnail_state.get('error') or ''}")
+
+
+def test_retry_failed_stage(client):
+    """失败的阶段单独重试"""
+    print("\n" + "=" * 70)
+    print("测试2: 重试失败的阶段")
+    print("=" * 70)
+
+    store = video_store()
+    bucket = settings.TOS_VIDEO_BUCKET_NAME
+    object_key = 'video_retry_1.mp4'
+    path = store.object_path(bucket, object_key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'video')
+
+    # 字幕还没有上传到对象存储：字幕阶段失败
+    record = VideoRecord.objects.create(
+        title='重试', object_key=object_key, subtitle_key='sub_retry_1.srt', subtitle_name='retry.srt',
+        preurl='file://video', expire_time=timezone.now() + timedelta(hours=1), status='success',
+    )
+    MediaPipeline.start(record)
+    record = wait_pipeline(record.id)
+    assert record.pipeline['subtitle']['status'] == 'failed', record.pipeline
+    print(f"✅ 字幕阶段失败: {record.pipeline['subtitle']['error']}")
+
+    store.object_path(bucket, 'sub_retry_1.srt').write_text(SUBTITLE, encoding='utf-8')
+    response = client.post(f'/api/video/{record.id}/pipeline/retry/', {'stages': 'subtitle'})
+    body = response.json()
+    assert response.status_code == 200, body
+    assert body['stages'] == ['subtitle']
+    record = wait_pipeline(record.id)
+    assert record.pipeline['subtitle']['status'] == 'success' and record.pipeline['subtitle']['attempts'] == 2
+    assert record.subtitle_url
+    print("✅ 重试后字幕阶段成功（第2次）")
+
+    # 已成功的阶段不能重试，未知阶段报错
+    response = client.post(f'/api/video/{record.id}/pipeline/retry/', {'stages': 'subtitle'})
+    assert response.status_code == 400, response.json()
+    response = client.post(f'/api/video/{record.id}/pipeline/retry/', {'stages': 'transcode'})
+    assert response.status_code == 400 and '未知' in response.json()['error']
+    print("✅ 已成功/未知的阶段不能重试")
+
+    # 卡在 running 超时（进程退出）：允许重试
+    pipeline = dict(record.pipeline)
+    pipeline['subtitle'] = dict(pipeline['subtitle'], status='running', started_at=(
+        timezone.now() - timedelta(seconds=settings.MEDIA_PIPELINE_STAGE_TIMEOUT + 1)
+    ).isoformat(timespec='seconds'))
+    VideoRecord.objects.filter(id=record.id).update(pipeline=pipeline)
+    record.refresh_from_db()
+    success, stages, error = MediaPipeline.retry(record, ['subtitle'])
+    assert success and stages == ['subtitle'], error
+    record = wait_pipeline(record.id)
+    assert record.pipeline['subtitle']['status'] == 'success'
+    print("✅ 超时的 running 阶段可以重试")
+
+    # 进程重启时线程池中排队的阶段丢失：未超时不能重试，超时后可以重试
+    queued_at = timezone.now() - timedelta(seconds=settings.MEDIA_PIPELINE_STAGE_TIMEOUT + 1)
+    pipeline = dict(record.pipeline)
+    pipeline['subtitle'] = dict(pipeline['subtitle'], status='pending', queued_at=timezone.now().isoformat(timespec='seconds'))
+    VideoRecord.objects.filter(id=record.id).update(pipeline=pipeline)
+    record.refresh_from_db()
+    success, _, error = MediaPipeline.retry(record, ['subtitle'])
+    assert not success and '只能重试' in error, error
+    pipeline['subtitle']['queued_at'] = queued_at.isoformat(timespec='seconds')
+    VideoRecord.objects.filter(id=record.id).update(pipeline=pipeline)
+    record.refresh_from_db()
+    success, stages, error = MediaPipeline.retry(record, ['subtitle'])
+    assert success and stages == ['subtitle'], error
+    record = wait_pipeline(record.id)
+    assert record.pipeline['subtitle']['status'] == 'success' and record.pipeline['subtitle']['queued_at']
+    print("✅ 排队超时（进程重启丢失）的 pending 阶段可以重试")
+
+
+def test_invalid_form_discards_upload(client, work_dir):
+    """表单参数无效：视频已在解析请求体时上传完成，返回400前删除该对象"""
+    print("\n" + "=" * 70)
+    print("测试3: 表单参数无效时删除已上传的视频")
+    print("=" * 70)
+
+    bucket_dir = os.path.dirname(video_store().object_path(settings.TOS_VIDEO_BUCKET_NAME, 'probe'))
+    before_objects = set(os.listdir(bucket_dir))
+    before_records = VideoRecord.objects.count()
+    uploaded = metrics.get('video_upload.streamed')
+
+    video_path = os.path.join(work_dir, 'invalid.mp4')
+    with open(video_path, 'wb') as f:
+        f.write(os.urandom(100 * 1024))
+    with open(video_path, 'rb') as video:
+        # expire_time 放在视频之后：处理器读到它之前已经完成上传
+        response = client.post('/api/upload-video-file/', {'video_file': video, 'expire_time': 'abc'})
+
+    assert response.status_code == 400, response.json()
+    assert metrics.get('video_upload.streamed') == uploaded + 1, "视频应已流式上传"
+    assert set(os.listdir(bucket_dir)) == before_objects, "对象存储中不应留下无记录的视频"
+    assert VideoRecord.objects.count() == before_records
+    print(f"✅ {response.json()['error']}，已上传的视频已删除")
+
+
+def main():
+    work_dir = tempfile.mkdtemp(prefix='media_pipeline_test_')
+    settings.TOS_LOCAL_STORE_DIR = os.path.join(work_dir, 'store')
+    settings.MEDIA_PIPELINE_STAGING_DIR = os.path.join(work_dir, 'staging')
+    reset_shared_clients()
+    # 后台线程与请求线程并发写入：使用文件数据库（内存数据库的共享缓存不等待锁）
+    connections['default'].settings_dict['TEST']['NAME'] = os.path.join(work_dir, 'test.sqlite3')
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    try:
+        client = Client()
+        test_upload_returns_early(client, work_dir)
+        test_retry_failed_stage(client)
+        test_invalid_form_discards_upload(client, work_dir)
+    finally:
+        # 剩余的计数写入测试数据库，避免进程退出时写入开发数据库
+        metrics.flush()
+        runner.teardown_databases(old_config)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        reset_shared_clients()
+
+    print("\n✅ 所有测试通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+媒体信息探测和多缩略图提取测试脚本
+
+验证：
+- ffprobe 输出解析：时长、分辨率（竖拍视频按旋转信息交换宽高）、码率、编码、音轨；跳过封面图流
+- FFmpeg 进程池：同时运行的进程数不超过 FFMPEG_MAX_PROCESSES
+- 安装了 FFmpeg 时：生成测试视频，一次调用提取候选缩略图和雪碧图；安装了 ffprobe 时探测测试视频
+
+用法:
+    python test_media_probe.py
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+
+# 设置Django环境
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tts_project.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from tts_app.services import metrics
+from tts_app.services.ffmpeg_pool import run_ffmpeg
+from tts_app.services.media_probe_service import MediaProbeService
+from tts_app.services.thumbnail_service import ThumbnailService
+
+# 本脚本不创建测试数据库，耗时统计只在进程内汇总
+settings.METRICS_SHARED = False
+
+PORTRAIT_PHONE_VIDEO = {
+    'streams': [
+        {'codec_type': 'video', 'codec_name': 'h264', 'width': 1920, 'height': 1080,
+         'duration': '12.480000', 'side_data_list': [{'side_data_type': 'Display Matrix', 'rotation': -90}]},
+        {'codec_type': 'audio', 'codec_name': 'aac'},
+        {'codec_type': 'video', 'codec_name': 'mjpeg', 'width': 320, 'height': 240,
+         'disposition': {'attached_pic': 1}},
+    ],
+    'format': {'duration': '12.500000', 'size': '3125000', 'bit_rate': '2000000'},
+}
+
+SILENT_VIDEO = {
+    'streams': [
+        {'codec_type': 'video', 'codec_name': 'vp9', 'width': 640, 'height': 360, 'tags': {'rotate': '0'}},
+    ],
+    'format': {'duration': '10.0', 'size': '1250000'},
+}
+
+
+def test_parse():
+    """ffprobe 输出解析"""
+    print("\n" + "=" * 70)
+    print("测试1: ffprobe 输出解析")
+    print("=" * 70)
+
+    info = MediaProbeService.parse(PORTRAIT_PHONE_VIDEO)
+    assert info == {
+        'duration': 12.5, 'width': 1080, 'height': 1920, 'bitrate': 2000000,
+        'video_codec': 'h264', 'audio_codec': 'aac', 'has_audio': True,
+    }, info
+    print(f"✅ 竖拍视频: {info}")
+
+    info = MediaProbeService.parse(SILENT_VIDEO)
+    assert (info['width'], info['height']) == (640, 360)
+    assert info['bitrate'] == 1000000, "没有 bit_rate 时按文件大小和时长计算"
+    assert info['has_audio'] is False and info['audio_codec'] is None
+    print(f"✅ 无音轨视频: {info}")
+
+    only_cover = {'streams': [PORTRAIT_PHONE_VIDEO['streams'][2]], 'format': {}}
+    assert MediaProbeService.parse(only_cover) is None, "只有封面图时不是视频"
+    print("✅ 只有封面图流时判定为没有视频流")
+
+
+def test_process_limit():
+    """同时运行的进程数不超过上限"""
+    print("\n" + "=" * 70)
+    print("测试2: FFmpeg 进程数上限")
+    print("=" * 70)
+
+    limit = getattr(settings, 'FFMPEG_MAX_PROCESSES', 2)
+    jobs = limit * 3
+    cmd = [sys.executable, '-c', 'import time; time.sleep(0.3)']
+    start = time.perf_counter()
+    threads = [threading.Thread(target=run_ffmpeg, args=(cmd, 10)) for _ in range(jobs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed >= 0.3 * jobs / limit * 0.9, f"{jobs} 个进程 {elapsed:.2f} 秒完成，超过了并发上限"
+    waited = metrics.timings()['ffmpeg.wait']
+    assert waited['max_ms'] >= 250, waited
+    print(f"✅ 上限 {limit}: {jobs} 个进程用时 {elapsed:.2f} 秒，最长排队 {waited['max_ms']:.0f} 毫秒")
+
+
+def test_extract(work_dir):
+    """一次调用提取候选缩略图和雪碧图（需要 FFmpeg）"""
+    print("\n" + "=" * 70)
+    print("测试3: 提取候选缩略图和雪碧图")
+    print("=" * 70)
+
+    if not shutil.which('ffmpeg'):
+        print("⚠️ 未安装 FFmpeg，跳过")
+        return
+
+    video_path = os.path.join(work_dir, 'sample.mp4')
+    subprocess.run([
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', 'testsrc=duration=40:size=640x360:rate=25',
+        '-c:v', 'libx264', '-g', '50', '-y', video_path,
+    ], check=True)
+
+    duration, size = 40.0, (640, 360)
+    if shutil.which('ffprobe'):
+        success, info, error = MediaProbeService().probe(video_path)
+        assert success, error
+        assert (info['width'], info['height']) == size and abs(info['duration'] - 40) < 0.5
+        assert info['video_codec'] == 'h264' and info['has_audio'] is False
+        duration = info['duration']
+        print(f"✅ ffprobe: {info}")
+
+    service = ThumbnailService()
+    service.sprite_interval = 2
+    output_dir = os.path.join(work_dir, 'frames')
+    os.makedirs(output_dir)
+    success, result, error = service.extract_frames(video_path, output_dir, duration, size, count=5)
+    assert success, error
+    times = [thumb['time'] for thumb in result['thumbnails']]
+    assert len(times) == 5 and times == sorted(times), times
+    assert all(os.path.getsize(thumb['path']) > 0 for thumb in result['thumbnails'])
+
+    sprite = result['sprite']
+    assert (sprite['count'], sprite['columns'], sprite['rows']) == (20, 10, 2), sprite
+    assert sprite['tile_height'] == 90 and os.path.getsize(sprite['path']) > 0
+    print(f"✅ 候选缩略图时间: {times}")
+    print(f"✅ 雪碧图: {sprite['columns']}x{sprite['rows']} 格，每格 {sprite['interval']} 秒")
+
+
+def main():
+    work_dir = tempfile.mkdtemp(prefix='media_probe_test_')
+    try:
+        test_parse()
+        test_process_limit()
+        test_extract(work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("\n✅ 所有测试通过")
+
+
+if __name__ == "__main__":
+    main()
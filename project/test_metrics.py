@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+运行指标测试脚本 - 使用测试数据库，不连接TOS
+
+验证：
+- 多个进程（模拟Web进程和worker）的计数器和耗时统计汇总到同一处，/api/metrics/ 返回总和
+- 同一进程内多线程并发累加不丢失
+- 调用方处于事务中时不写入数据库，事务回滚不影响已记录的计数
+
+用法:
+    python test_metrics.py
+"""
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import subprocess
+
+# 设置Django环境
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tts_project.settings')
+
+import django
+django.setup()
+
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.test.runner import DiscoverRunner
+from tts_app.models import MetricCounter
+from tts_app.services import metrics
+
+CHILD_INCREMENTS = 50
+
+
+def run_child(db_path):
+    """子进程：连接同一个测试数据库，累加后退出（退出前写入剩余增量）"""
+    connections['default'].settings_dict['NAME'] = db_path
+    for _ in range(CHILD_INCREMENTS):
+        metrics.incr('test.requests')
+    metrics.incr('test.bytes', 1024)
+    metrics.observe('test.latency', 0.25)
+
+
+def test_cross_process(db_path):
+    print("\n" + "=" * 60)
+    print("测试1: 多个进程汇总到同一处")
+    print("=" * 60)
+
+    processes = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child', db_path])
+        for _ in range(3)
+    ]
+    for process in processes:
+        assert process.wait(timeout=60) == 0
+
+    # 当前进程（Web进程）自己的计数尚未写入，读取时一并计入
+    metrics.incr('test.requests')
+    metrics.observe('test.latency', 0.5)
+
+    response = Client().get('/api/metrics/')
+    assert response.status_code == 200
+    data = response.json()['data']
+    assert data['counters']['test.requests'] == 3 * CHILD_INCREMENTS + 1, data['counters']
+    assert data['counters']['test.bytes'] == 3 * 1024
+    latency = data['timings']['test.latency']
+    assert latency['count'] == 4 and latency['max_ms'] == 500.0, latency
+    assert MetricCounter.objects.get(name='test.requests').value == 3 * CHILD_INCREMENTS + 1
+    print(f"✅ 3 个子进程 + 当前进程: test.requests = {data['counters']['test.requests']}，timings = {latency}")
+
+
+def test_concurrent_threads():
+    print("\n" + "=" * 60)
+    print("测试2: 多线程并发累加")
+    print("=" * 60)
+
+    from django.conf import settings
+    old_interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 10)
+    # 每次累加都尝试写入，放大并发写入的冲突
+    settings.METRICS_FLUSH_INTERVAL = 0
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(100):
+                metrics.incr('test.threads')
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connections.close_all()
+
+    try:
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        settings.METRICS_FLUSH_INTERVAL = old_interval
+
+    assert not errors, errors
+    assert metrics.get('test.threads') == 800, metrics.get('test.threads')
+    print("✅ 8 个线程各累加 100 次: test.threads = 800")
+
+
+def test_atomic_block():
+    print("\n" + "=" * 60)
+    print("测试3: 事务中的计数在事务外写入")
+    print("=" * 60)
+
+    try:
+        with transaction.atomic():
+            metrics.incr('test.in_transaction', 2)
+            assert not metrics.flush()
+            raise RuntimeError('rollback')
+    except RuntimeError:
+        pass
+
+    assert not MetricCounter.objects.filter(name='test.in_transaction').exists()
+    assert metrics.flush()
+    assert MetricCounter.objects.get(name='test.in_transaction').value == 2
+    print("✅ 事务回滚后计数仍然保留，并在事务外写入")
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        run_child(sys.argv[2])
+        return
+
+    work_dir = tempfile.mkdtemp(prefix='metrics_test_')
+    db_path = os.path.join(work_dir, 'test.sqlite3')
+    # 子进程需要连接同一个数据库：使用文件数据库
+    connections['default'].settings_dict['TEST']['NAME'] = db_path
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    try:
+        test_cross_process(db_path)
+        test_concurrent_threads()
+        test_atomic_block()
+    finally:
+        metrics.flush()
+        runner.teardown_databases(old_config)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("\n✅ 所有测试通过")
+
+
+if __name__ == "__main__":
+    main()
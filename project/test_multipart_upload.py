@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+分片上传/断点续传测试脚本 - 使用本地目录模拟对象存储（LocalObjectStore），不连接TOS
+
+验证：
+- 大文件分片并行上传，合并后内容与原文件一致，成功后删除断点文件
+- 上传中途失败后断点记录已完成的分片，再次上传只上传剩余分片
+- 文件变化或分片上传任务失效时放弃断点，重新上传
+- upload_and_get_url 超过 TOS_MULTIPART_THRESHOLD 时自动使用分片上传
+
+用法:
+    python test_multipart_upload.py
+    python test_multipart_upload.py --size-mb 20 --part-kb 512 --concurrency 8
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import threading
+
+# 设置Django环境
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tts_project.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from tts_app.services.local_object_store import LocalObjectStore
+from tts_app.services.storage_service import StorageService, UploadCheckpoint, reset_shared_clients
+
+# 本脚本不创建测试数据库，运行指标只在进程内汇总
+settings.METRICS_SHARED = False
+
+BUCKET = 'test-bucket'
+
+
+class FlakyObjectStore(LocalObjectStore):
+    """上传 fail_after 个分片后，之后的分片全部失败（模拟网络中断）"""
+
+    fail_after = None
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.uploaded = []
+        self._count_lock = threading.Lock()
+
+    def upload_part(self, bucket, key, upload_id, part_number, content=None, **kwargs):
+        with self._count_lock:
+            if self.fail_after is not None and len(self.uploaded) >= self.fail_after:
+                raise ConnectionError('模拟网络中断')
+            self.uploaded.append(part_number)
+        return super().upload_part(bucket, key, upload_id, part_number, content=content, **kwargs)
+
+
+def make_storage(store):
+    storage = StorageService(bucket_name=BUCKET)
+    storage.client = store
+    return storage
+
+
+def make_file(path, size):
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_parallel_upload(store, file_path, part_size, concurrency):
+    """正常分片上传：内容一致，断点文件已删除"""
+    print("\n" + "=" * 70)
+    print("测试1: 分片并行上传")
+    print("=" * 70)
+
+    store.uploaded.clear()
+    success, object_key, error = make_storage(store).upload_large_file(
+        file_path, 'video/full.mp4', part_size=part_size, concurrency=concurrency
+    )
+    assert success, error
+    assert read(store.object_path(BUCKET, object_key)) == read(file_path), "合并后的对象与原文件不一致"
+    assert not os.path.exists(UploadCheckpoint.path_for(file_path)), "成功后应删除断点文件"
+    expected_parts = -(-os.path.getsize(file_path) // part_size)
+    assert sorted(store.uploaded) == list(range(1, expected_parts + 1))
+    print(f"✅ {expected_parts} 个分片，内容一致")
+
+
+def test_resume(store, file_path, part_size, concurrency):
+    """中途失败后续传：只上传剩余分片"""
+    print("\n" + "=" * 70)
+    print("测试2: 中断后断点续传")
+    print("=" * 70)
+
+    total_parts = -(-os.path.getsize(file_path) // part_size)
+    fail_after = total_parts // 2
+    store.uploaded.clear()
+    store.fail_after = fail_after
+    success, _, error = make_storage(store).upload_large_file(
+        file_path, 'video/resume.mp4', part_size=part_size, concurrency=concurrency
+    )
+    assert not success
+    checkpoint_path = UploadCheckpoint.path_for(file_path)
+    with open(checkpoint_path, encoding='utf-8') as f:
+        recorded = json.load(f)['parts']
+    assert len(recorded) == fail_after, f"断点应记录 {fail_after} 个分片，实际 {len(recorded)}"
+    print(f"✅ 第一次上传失败: {error}")
+    print(f"✅ 断点记录 {len(recorded)}/{total_parts} 个分片")
+
+    store.uploaded.clear()
+    store.fail_after = None
+    success, object_key, error = make_storage(store).upload_large_file(
+        file_path, 'video/resume.mp4', part_size=part_size, concurrency=concurrency
+    )
+    assert success, error
+    assert not set(store.uploaded) & {int(n) for n in recorded}, "续传时不应重新上传已完成的分片"
+    assert len(store.uploaded) == total_parts - fail_after
+    assert read(store.object_path(BUCKET, object_key)) == read(file_path)
+    assert not os.path.exists(checkpoint_path)
+    print(f"✅ 续传只上传剩余 {len(store.uploaded)} 个分片，内容一致")
+
+
+def test_stale_checkpoint(store, file_path, part_size, concurrency):
+    """文件变化、任务失效：放弃断点重新上传"""
+    print("\n" + "=" * 70)
+    print("测试3: 断点失效")
+    print("=" * 70)
+
+    total_parts = -(-os.path.getsize(file_path) // part_size)
+    checkpoint_path = UploadCheckpoint.path_for(file_path)
+
+    # 分片上传任务已被取消（例如过期清理）
+    store.fail_after = 1
+    make_storage(store).upload_large_file(file_path, 'video/stale.mp4', part_size=part_size, concurrency=1)
+    with open(checkpoint_path, encoding='utf-8') as f:
+        upload_id = json.load(f)['upload_id']
+    shutil.rmtree(store.root / '.multipart' / upload_id)
+    store.fail_after = None
+    store.uploaded.clear()
+    success, object_key, error = make_storage(store).upload_large_file(
+        file_path, 'video/stale.mp4', part_size=part_size, concurrency=concurrency
+    )
+    assert success, error
+    assert len(store.uploaded) == total_parts
+    print("✅ 任务失效: 重新上传全部分片")
+
+    # 文件内容变化：取消旧任务，重新上传
+    store.fail_after = 1
+    make_storage(store).upload_large_file(file_path, 'video/changed.mp4', part_size=part_size, concurrency=1)
+    with open(checkpoint_path, encoding='utf-8') as f:
+        upload_id = json.load(f)['upload_id']
+    make_file(file_path, os.path.getsize(file_path) + 1)
+    store.fail_after = None
+    success, object_key, error = make_storage(store).upload_large_file(
+        file_path, 'video/changed.mp4', part_size=part_size, concurrency=concurrency
+    )
+    assert success, error
+    assert not (store.root / '.multipart' / upload_id).exists(), "文件变化后应取消旧任务"
+    assert read(store.object_path(BUCKET, object_key)) == read(file_path)
+    print("✅ 文件变化: 取消旧任务并重新上传")
+
+
+def test_threshold(store, work_dir, part_size):
+    """upload_and_get_url 按大小选择上传方式"""
+    print("\n" + "=" * 70)
+    print("测试4: 按大小自动选择分片上传")
+    print("=" * 70)
+
+    settings.TOS_MULTIPART_PART_SIZE = part_size
+    settings.TOS_MULTIPART_THRESHOLD = part_size * 2
+    small_path = os.path.join(work_dir, 'small.bin')
+    large_path = os.path.join(work_dir, 'large.bin')
+    make_file(small_path, part_size)
+    make_file(large_path, part_size * 3 + 1)
+
+    store.uploaded.clear()
+    success, url, _, error = make_storage(store).upload_and_get_url(small_path, 'small.bin')
+    assert success, error
+    assert store.uploaded == [], "小文件应直接上传"
+    success, url, _, error = make_storage(store).upload_and_get_url(large_path, 'large.bin')
+    assert success, error
+    assert len(store.uploaded) == 4
+    assert read(store.object_path(BUCKET, 'large.bin')) == read(large_path)
+    print(f"✅ 小文件单次上传，大文件分片上传: {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分片上传/断点续传测试（本地模拟对象存储）')
+    parser.add_argument('--size-mb', type=float, default=5, help='测试文件大小（MB，默认: 5）')
+    parser.add_argument('--part-kb', type=int, default=256, help='分片大小（KB，默认: 256）')
+    parser.add_argument('--concurrency', type=int, default=4, help='并行上传的分片数（默认: 4）')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='multipart_test_')
+    store = FlakyObjectStore(os.path.join(work_dir, 'store'))
+    file_path = os.path.join(work_dir, 'video.mp4')
+    make_file(file_path, int(args.size_mb * 1024 * 1024))
+    part_size = args.part_kb * 1024
+    print(f"本地模拟对象存储: {store.root}")
+
+    try:
+        test_parallel_upload(store, file_path, part_size, args.concurrency)
+        test_resume(store, file_path, part_size, args.concurrency)
+        test_stale_checkpoint(store, file_path, part_size, args.concurrency)
+        test_threshold(store, work_dir, part_size)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        reset_shared_clients()
+
+    print("\n✅ 所有测试通过")
+
+
+if __name__ == "__main__":
+    main()
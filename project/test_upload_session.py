@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+浏览器直传上传会话测试脚本 - 使用本地目录模拟对象存储和测试数据库，不连接TOS
+
+“浏览器直传”这一步直接写入模拟存储（与预签名PUT请求效果相同），验证服务端流程：
+- 小文件：单次PUT，complete 后创建记录，后处理流水线签名字幕
+- 大文件：分片上传，客户端提交ETag或由服务端列出分片合并；重复 complete 返回同一记录
+- 分片未传完时 complete 失败且会话保留；大小不一致、取消会话
+- part_numbers 越界、超出单次上限时返回400（不展开范围）
+- 并发 complete 只创建一条记录
+
+用法:
+    python test_upload_session.py
+"""
+import os
+import sys
+import time
+import json
+import shutil
+import tempfile
+import threading
+
+# 设置Django环境
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tts_project.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.db import connections, close_old_connections
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.test.runner import DiscoverRunner
+from tts_app.models import UploadSession, VideoRecord
+from tts_app.services import metrics
+from tts_app.services.upload_session_service import UploadSessionService
+from tts_app.services.storage_service import StorageService, reset_shared_clients
+
+PART_SIZE = 256 * 1024
+
+
+def video_store():
+    return StorageService(bucket_name=settings.TOS_VIDEO_BUCKET_NAME).get_client()
+
+
+def create_session(client, **params):
+    response = client.post('/api/upload-sessions/', json.dumps(params), content_type='application/json')
+    return response.status_code, response.json()
+
+
+def complete(client, session_id, **params):
+    response = client.post(
+        f'/api/upload-sessions/{session_id}/complete/', json.dumps(params), content_type='application/json'
+    )
+    return response.status_code, response.json()
+
+
+def wait_processed(record_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        record = VideoRecord.objects.get(id=record_id)
+        if record.get_pipeline_status() != 'processing':
+            return record
+        time.sleep(0.05)
+    raise AssertionError(f"记录{record_id} 后台处理超时")
+
+
+def test_single_put(client, work_dir):
+    """单次PUT直传 + 字幕"""
+    print("\n" + "=" * 70)
+    print("测试1: 单次PUT直传")
+    print("=" * 70)
+
+    data = os.urandom(100 * 1024)
+    status, body = create_session(
+        client, file_name='demo.mp4', file_size=len(data), content_type='video/mp4',
+        subtitle_name='demo.srt', tags='教程,Python'
+    )
+    assert status == 201, body
+    assert body['mode'] == 'single' and body['video']['method'] == 'PUT'
+    assert body['video']['headers'] == {'Content-Type': 'video/mp4'}
+    assert body['subtitle'] is not None
+
+    # complete 之前未上传：失败，会话保留
+    status, result = complete(client, body['session_id'])
+    assert status == 400 and '尚未上传' in result['error'], result
+
+    store = video_store()
+    video_path = os.path.join(work_dir, 'demo.mp4')
+    with open(video_path, 'wb') as f:
+        f.write(data)
+    subtitle_path = os.path.join(work_dir, 'demo.srt')
+    with open(subtitle_path, 'w', encoding='utf-8') as f:
+        f.write('1\n00:00:01,000 --> 00:00:02,000\nHello\n')
+    store.put_object_from_file(settings.TOS_VIDEO_BUCKET_NAME, body['object_key'], video_path)
+    subtitle_key = UploadSession.objects.get(session_id=body['session_id']).subtitle_key
+    store.put_object_from_file(settings.TOS_VIDEO_BUCKET_NAME, subtitle_key, subtitle_path)
+
+    status, result = complete(client, body['session_id'])
+    assert status == 202, result
+    assert result['status'] == 'success' and result['pipeline']['subtitle']['status'] == 'pending'
+    record = wait_processed(result['record_id'])
+    assert record.pipeline['subtitle']['status'] == 'success' and record.subtitle_url
+    assert record.file_size == len(data) and record.title == 'demo'
+    assert record.get_tags_list() == ['教程', 'Python']
+    print(f"✅ 记录{record.id}: {record.status}，字幕: {record.subtitle_name}")
+
+
+def test_multipart(client):
+    """分片直传：客户端提交ETag / 服务端列出分片；重复 complete"""
+    print("\n" + "=" * 70)
+    print("测试2: 分片直传")
+    print("=" * 70)
+
+    settings.TOS_MULTIPART_PART_SIZE = PART_SIZE
+    settings.TOS_MULTIPART_THRESHOLD = PART_SIZE * 2
+    data = os.urandom(PART_SIZE * 3 + 1000)
+    store = video_store()
+    bucket = settings.TOS_VIDEO_BUCKET_NAME
+
+    for send_etags in (True, False):
+        status, body = create_session(client, file_name='big.mov', file_size=len(data), title='大文件')
+        assert status == 201, body
+        assert body['mode'] == 'multipart' and body['part_count'] == 4 and len(body['parts']) == 4
+        session = UploadSession.objects.get(session_id=body['session_id'])
+
+        etags = []
+        for part in body['parts'][:3]:
+            number = part['part_number']
+            output = store.upload_part(bucket, session.object_key, session.upload_id, number,
+                                       content=data[(number - 1) * PART_SIZE:number * PART_SIZE])
+            etags.append({'part_number': number, 'etag': output.etag})
+
+        # 续传：重新获取URL，服务端报告已收到的分片
+        response = client.get(f"/api/upload-sessions/{session.session_id}/parts/?part_numbers=3-4")
+        refreshed = response.json()
+        assert [p['part_number'] for p in refreshed['parts']] == [3, 4]
+        assert sorted(refreshed['uploaded']) == ['1', '2', '3']
+
+        # 越界、倒序、格式错误的范围直接返回400，不展开
+        for spec in ('0-2', '3-2', '1-1000000000', 'a-b'):
+            response = client.get(f"/api/upload-sessions/{session.session_id}/parts/?part_numbers={spec}")
+            assert response.status_code == 400, (spec, response.json())
+        settings.UPLOAD_SESSION_MAX_SIGN_PARTS = 3
+        response = client.get(f"/api/upload-sessions/{session.session_id}/parts/?part_numbers=1-2,3-4")
+        assert response.status_code == 400 and '最多' in response.json()['error']
+        del settings.UPLOAD_SESSION_MAX_SIGN_PARTS
+
+        if send_etags:
+            # 少一个分片：大小不一致之前先合并失败，会话保留
+            status, result = complete(client, session.session_id, parts=etags + [{'part_number': 4, 'etag': '"x"'}])
+            assert status == 400, result
+            assert UploadSession.objects.get(id=session.id).status == 'uploading'
+
+        output = store.upload_part(bucket, session.object_key, session.upload_id, 4, content=data[3 * PART_SIZE:])
+        etags.append({'part_number': 4, 'etag': output.etag})
+
+        status, result = complete(client, session.session_id, **({'parts': etags} if send_etags else {}))
+        assert status == 202, result
+        assert store.object_path(bucket, session.object_key).read_bytes() == data
+        record = wait_processed(result['record_id'])
+        assert record.status == 'success' and record.title == '大文件'
+
+        status, again = complete(client, session.session_id)
+        assert status == 202 and again['record_id'] == result['record_id'], "重复 complete 应返回同一记录"
+        print(f"✅ {'客户端提交ETag' if send_etags else '服务端列出分片'}: 记录{record.id}，内容一致")
+
+
+def test_mismatch_and_abort(client):
+    """大小不一致、取消会话"""
+    print("\n" + "=" * 70)
+    print("测试3: 大小不一致和取消")
+    print("=" * 70)
+
+    store = video_store()
+    bucket = settings.TOS_VIDEO_BUCKET_NAME
+
+    status, body = create_session(client, file_name='short.mp4', file_size=1000)
+    path = store.object_path(bucket, body['object_key'])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'x' * 10)
+    status, result = complete(client, body['session_id'])
+    assert status == 400 and '大小不一致' in result['error'], result
+    assert not path.exists(), "大小不一致时应删除对象"
+    print(f"✅ 大小不一致: {result['error']}")
+    status, result = complete(client, body['session_id'])
+    assert status == 409, result
+
+    status, body = create_session(client, file_name='cancel.mp4', file_size=PART_SIZE * 3)
+    session = UploadSession.objects.get(session_id=body['session_id'])
+    response = client.post(f"/api/upload-sessions/{session.session_id}/abort/")
+    assert response.status_code == 200, response.json()
+    assert not (store.root / '.multipart' / session.upload_id).exists()
+    status, result = complete(client, session.session_id)
+    assert status == 409, result
+    print("✅ 取消会话: 分片上传任务已取消")
+
+    status, body = create_session(client, file_name='notes.txt', file_size=10)
+    assert status == 400, body
+    print(f"✅ 格式校验: {body['error']}")
+
+
+def test_concurrent_complete(client):
+    """并发 complete：只有领取到会话的调用创建记录"""
+    print("\n" + "=" * 70)
+    print("测试4: 并发 complete")
+    print("=" * 70)
+
+    data = os.urandom(1000)
+    status, body = create_session(client, file_name='race.mp4', file_size=len(data))
+    assert status == 201, body
+    path = video_store().object_path(settings.TOS_VIDEO_BUCKET_NAME, body['object_key'])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+    results = []
+
+    def call():
+        try:
+            session = UploadSession.objects.get(session_id=body['session_id'])
+            results.append(UploadSessionService.complete(session))
+        finally:
+            close_old_connections()
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert VideoRecord.objects.filter(object_key=body['object_key']).count() == 1
+    record_ids = {record.id for success, record, _ in results if success}
+    assert len(record_ids) == 1, results
+    for success, _, error in results:
+        assert success or '完成中' in error, error
+    session = UploadSession.objects.get(session_id=body['session_id'])
+    assert session.status == 'completed' and session.record_id in record_ids
+    wait_processed(session.record_id)
+    print(f"✅ {len(threads)} 个并发请求，创建 1 条记录（{sum(1 for r in results if r[0])} 个请求返回该记录）")
+
+
+def main():
+    work_dir = tempfile.mkdtemp(prefix='upload_session_test_')
+    settings.TOS_LOCAL_STORE_DIR = os.path.join(work_dir, 'store')
+    reset_shared_clients()
+    # 后处理流水线的后台线程并发写入：使用文件数据库（内存数据库的共享缓存不等待锁）
+    connections['default'].settings_dict['TEST']['NAME'] = os.path.join(work_dir, 'test.sqlite3')
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    try:
+        client = Client()
+        test_single_put(client, work_dir)
+        test_multipart(client)
+        test_mismatch_and_abort(client)
+        test_concurrent_complete(client)
+    finally:
+        # 剩余的计数写入测试数据库，避免进程退出时写入开发数据库
+        metrics.flush()
+        runner.teardown_databases(old_config)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        reset_shared_clients()
+
+    print("\n✅ 所有测试通过")
+
+
+if __name__ == "__main__":
+    main()
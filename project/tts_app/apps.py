@@ -1,8 +1,34 @@
+import os
+import sys
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using='default', **kwargs):
+    """每次 migrate 之后补建被SQLite重建表时删除的全文索引触发器"""
+    from django.db import connections
+    from .services.search_service import ensure_search_index
+    ensure_search_index(connections[using])
 
 
 class TtsAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tts_app'
     verbose_name = 'TTS应用'
+    
+    def ready(self):
+        post_migrate.connect(ensure_search_index, sender=self)
+        
+        # 进程内URL续期：只在Web服务进程中启动（runserver自动重载时只在子进程启动）
+        if not getattr(settings, 'URL_RENEWAL_IN_PROCESS', False):
+            return
+        is_runserver = len(sys.argv) > 1 and sys.argv[1] == 'runserver'
+        if is_runserver and os.environ.get('RUN_MAIN') != 'true':
+            return
+        if len(sys.argv) > 1 and sys.argv[0].endswith('manage.py') and not is_runserver:
+            return
+        
+        from .services.renewal_service import start_in_process_scheduler
+        start_in_process_scheduler()
 
@@ -0,0 +1,90 @@
+"""
+Coqui TTS 按句批量合成
+不依赖Django，项目（services/tts_service.py）和 local_tts 批量工具（local_tts/test.py）共用
+"""
+
+# 支持填充批量推理的模型（输入长度可变，inference 接受 x_lengths）
+BATCH_INFERENCE_MODELS = {'Vits'}
+
+# 句间静音时长（秒）
+SENTENCE_SILENCE = 0.2
+
+
+def infer_padded(tts, sentences):
+    """
+    填充批量推理（仅 BATCH_INFERENCE_MODELS 中的模型）
+
+    Args:
+        tts: 已加载的 TTS.api.TTS 实例
+        sentences: 句子列表
+
+    Returns:
+        list: 每个句子的波形（numpy数组）
+    """
+    import torch
+
+    model = tts.synthesizer.tts_model
+    ids = [model.tokenizer.text_to_ids(s) for s in sentences]
+    lengths = torch.LongTensor([len(seq) for seq in ids])
+
+    x = torch.zeros((len(ids), int(lengths.max())), dtype=torch.long)
+    for i, seq in enumerate(ids):
+        x[i, :len(seq)] = torch.LongTensor(seq)
+
+    device = next(model.parameters()).device
+    with torch.no_grad():
+        outputs = model.inference(x.to(device), aux_input={'x_lengths': lengths.to(device)})
+
+    # 按各样本的有效帧数截掉填充部分
+    wavs = outputs['model_outputs'].squeeze(1).cpu().numpy()
+    frames = outputs['y_mask'].sum(dim=[1, 2]).long().cpu().numpy()
+    hop_length = model.config.audio.hop_length
+    return [wavs[i, :frames[i] * hop_length] for i in range(len(sentences))]
+
+
+def synthesize_sentences(tts, sentences, batch_size, on_progress=None):
+    """
+    按长度分组合成句子
+
+    句子按长度排序后切成小批次，同一批次长度接近，填充浪费最少；
+    不支持批量推理的模型（如Tacotron2）逐句合成
+
+    Args:
+        tts: 已加载的 TTS.api.TTS 实例
+        sentences: 句子列表（不重复）
+        batch_size: 每个批次的句子数
+        on_progress: 可选回调 on_progress(已完成句子数, 句子总数)，每个批次完成后调用
+
+    Returns:
+        tuple: ({句子: 波形}, {句子: 错误信息})
+    """
+    import numpy as np
+
+    model = tts.synthesizer.tts_model
+    use_padded = type(model).__name__ in BATCH_INFERENCE_MODELS
+
+    ordered = sorted(sentences, key=len)
+    wavs = {}
+    errors = {}
+    for start in range(0, len(ordered), batch_size):
+        chunk = ordered[start:start + batch_size]
+        if on_progress:
+            on_progress(start, len(ordered))
+
+        if use_padded:
+            try:
+                for sentence, wav in zip(chunk, infer_padded(tts, chunk)):
+                    wavs[sentence] = wav
+                continue
+            except Exception as e:
+                print(f"⚠️  批量推理失败，改为逐句合成: {e}")
+
+        for sentence in chunk:
+            try:
+                wavs[sentence] = np.asarray(tts.tts(text=sentence), dtype=np.float32)
+            except Exception as e:
+                errors[sentence] = str(e)
+
+    if on_progress:
+        on_progress(len(ordered), len(ordered))
+    return wavs, errors
@@ -2,6 +2,7 @@
 TTS应用表单
 """
 from django import forms
+from django.conf import settings
 from .models import AudioRecord
 
 
@@ -27,8 +28,8 @@ class TTSForm(forms.Form):
             'placeholder': '请输入要转换的英文文本...',
             'required': True,
         }),
-        max_length=1000,
-        help_text='最多1000个字符'
+        max_length=getattr(settings, 'LONG_TEXT_MAX_CHARS', 20000),
+        help_text=f"最多{getattr(settings, 'LONG_TEXT_MAX_CHARS', 20000)}个字符，长文本按句拆分合成"
     )
     
     tts_type = forms.ChoiceField(
@@ -0,0 +1,36 @@
+"""
+合成音频缓存管理
+
+用法:
+    python manage.py audio_cache --stats
+    python manage.py audio_cache --evict
+    python manage.py audio_cache --evict --max-mb 500
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = '查看合成音频缓存统计，或按LRU淘汰本地WAV文件'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stats', action='store_true',
+                            help='显示缓存统计')
+        parser.add_argument('--evict', action='store_true',
+                            help='按LRU淘汰本地WAV，直到不超过上限')
+        parser.add_argument('--max-mb', type=int, default=None,
+                            help='本地WAV总大小上限（MB），默认使用 AUDIO_CACHE_MAX_BYTES')
+
+    def handle(self, *args, **options):
+        from tts_app.services.cache_service import AudioCacheService
+
+        if options['evict']:
+            max_bytes = options['max_mb'] * 1024 * 1024 if options['max_mb'] is not None else None
+            count, freed = AudioCacheService.evict_local_files(max_bytes)
+            self.stdout.write(self.style.SUCCESS(
+                f'淘汰 {count} 个本地文件，释放 {freed / 1024 / 1024:.1f}MB'
+            ))
+
+        if options['stats'] or not options['evict']:
+            stats = AudioCacheService.stats()
+            self.stdout.write(f"缓存条目: {stats['entries']}")
+            self.stdout.write(f"本地WAV大小: {stats['local_bytes'] / 1024 / 1024:.1f}MB")
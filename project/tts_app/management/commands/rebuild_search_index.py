@@ -0,0 +1,23 @@
+"""
+重建全文搜索索引（SQLite FTS5）
+
+迁移会自动创建索引；SQLite重建表结构（部分ALTER操作）时触发器会丢失，
+或怀疑索引与数据不一致时执行本命令
+
+用法:
+    python manage.py rebuild_search_index
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = '重新创建全文搜索索引表和同步触发器，并从原表重建索引'
+
+    def handle(self, *args, **options):
+        from tts_app.services.search_service import install_search_index
+
+        if install_search_index(connection):
+            self.stdout.write(self.style.SUCCESS('全文搜索索引已重建'))
+        else:
+            self.stdout.write(self.style.WARNING('当前数据库不支持FTS5，搜索使用LIKE匹配'))
@@ -0,0 +1,48 @@
+"""
+后台续期即将过期的预签名URL
+
+用法:
+    python manage.py renew_urls                 # 常驻，每 URL_RENEWAL_INTERVAL 秒执行一轮
+    python manage.py renew_urls --once          # 只执行一轮
+    python manage.py renew_urls --window 1800   # 续期30分钟内过期的记录
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = '批量续期即将过期的音频/视频预签名URL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='只执行一轮后退出')
+        parser.add_argument('--interval', type=float, default=None,
+                            help='两轮之间的间隔（秒）')
+        parser.add_argument('--window', type=int, default=None,
+                            help='续期在该时间（秒）内过期的记录')
+        parser.add_argument('--expire', type=int, default=None,
+                            help='续期后的有效期（秒）')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='每批处理的记录数')
+
+    def handle(self, *args, **options):
+        from tts_app.services.renewal_service import RenewalService, run_renewal_loop
+
+        kwargs = {
+            'window': options['window'],
+            'expire_seconds': options['expire'],
+            'batch_size': options['batch_size'],
+        }
+
+        if options['once']:
+            stats = RenewalService(**kwargs).run_once()
+            self.stdout.write(self.style.SUCCESS(
+                f"续期完成: 音频 {stats['audio_renewed']}，视频 {stats['video_renewed']}，"
+                f"失败 {stats['failed']}，耗时 {stats['elapsed']}秒（{stats['rate']}条/秒）"
+            ))
+            return
+
+        self.stdout.write(self.style.SUCCESS('URL续期进程已启动'))
+        try:
+            run_renewal_loop(interval=options['interval'], **kwargs)
+        except KeyboardInterrupt:
+            self.stdout.write('URL续期进程已停止')
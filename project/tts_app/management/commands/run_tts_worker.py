@@ -0,0 +1,74 @@
+"""
+启动TTS任务worker进程
+
+用法:
+    python manage.py run_tts_worker              # 单个worker
+    python manage.py run_tts_worker --workers 4  # 4个worker进程
+"""
+import multiprocessing
+from django.core.management.base import BaseCommand
+
+
+def _worker_main(index, poll_interval, max_jobs):
+    """子进程入口（spawn方式启动，需要重新初始化Django）"""
+    import django
+    django.setup()
+
+    from tts_app.services.job_service import run_worker, default_worker_id
+    try:
+        run_worker(
+            worker_id=default_worker_id(index),
+            poll_interval=poll_interval,
+            max_jobs=max_jobs,
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+class Command(BaseCommand):
+    help = '启动TTS异步任务worker，执行语音合成和上传'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', '-w', type=int, default=1,
+                            help='worker进程数（默认: 1）')
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help='队列为空时的轮询间隔（秒）')
+        parser.add_argument('--max-jobs', type=int, default=None,
+                            help='每个worker最多处理的任务数（默认: 不限制）')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        poll_interval = options['poll_interval']
+        max_jobs = options['max_jobs']
+
+        if workers == 1:
+            from tts_app.services.job_service import run_worker
+            try:
+                run_worker(poll_interval=poll_interval, max_jobs=max_jobs)
+            except KeyboardInterrupt:
+                self.stdout.write('worker已停止')
+            return
+
+        # 多进程：每个进程独立加载TTS模型
+        ctx = multiprocessing.get_context('spawn')
+        processes = []
+        for index in range(workers):
+            p = ctx.Process(
+                target=_worker_main,
+                args=(index, poll_interval, max_jobs),
+                name=f'tts-worker-{index}',
+            )
+            p.start()
+            processes.append(p)
+
+        self.stdout.write(self.style.SUCCESS(f'已启动 {workers} 个worker进程'))
+
+        try:
+            for p in processes:
+                p.join()
+        except KeyboardInterrupt:
+            self.stdout.write('正在停止worker...')
+            for p in processes:
+                p.terminate()
+            for p in processes:
+                p.join()
@@ -0,0 +1,39 @@
+"""
+句子级音频缓存管理
+
+用法:
+    python manage.py sentence_cache --stats
+    python manage.py sentence_cache --evict
+    python manage.py sentence_cache --evict --max-mb 200
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = '查看句子级音频缓存统计，或按LRU淘汰句子PCM文件'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stats', action='store_true',
+                            help='显示缓存统计')
+        parser.add_argument('--evict', action='store_true',
+                            help='按LRU淘汰句子PCM，直到不超过上限')
+        parser.add_argument('--max-mb', type=int, default=None,
+                            help='句子PCM总大小上限（MB），默认使用 SENTENCE_CACHE_MAX_BYTES')
+
+    def handle(self, *args, **options):
+        from tts_app.services.sentence_store import SentenceAudioStore
+
+        store = SentenceAudioStore()
+
+        if options['evict']:
+            max_bytes = options['max_mb'] * 1024 * 1024 if options['max_mb'] is not None else None
+            count, freed = store.evict(max_bytes)
+            self.stdout.write(self.style.SUCCESS(
+                f'淘汰 {count} 个句子，释放 {freed / 1024 / 1024:.1f}MB'
+            ))
+
+        if options['stats'] or not options['evict']:
+            stats = store.stats()
+            self.stdout.write(f"缓存句子: {stats['entries']}")
+            self.stdout.write(f"PCM大小: {stats['bytes'] / 1024 / 1024:.1f}MB / {stats['max_bytes'] / 1024 / 1024:.0f}MB")
+            self.stdout.write(f"累计命中: {stats['total_hits']}")
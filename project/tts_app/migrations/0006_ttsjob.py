@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_app', '0005_add_video_category_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TTSJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tts_type', models.CharField(choices=[('local', '本地生成'), ('cloud', '云服务生成')], default='local', max_length=10, verbose_name='生成方式')),
+                ('expire_seconds', models.IntegerField(default=3600, verbose_name='URL有效期(秒)')),
+                ('status', models.CharField(choices=[('queued', '排队中'), ('running', '处理中'), ('success', '成功'), ('failed', '失败')], default='queued', max_length=10, verbose_name='状态')),
+                ('stage', models.CharField(choices=[('queued', '等待处理'), ('synthesizing', '语音合成'), ('uploading', '上传中'), ('done', '已完成')], default='queued', max_length=20, verbose_name='当前阶段')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='进度(%)')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='尝试次数')),
+                ('worker_id', models.CharField(blank=True, max_length=64, null=True, verbose_name='处理进程')),
+                ('error_message', models.TextField(blank=True, null=True, verbose_name='错误信息')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='开始时间')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='心跳时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+                ('record', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='tts_app.audiorecord', verbose_name='音频记录')),
+            ],
+            options={
+                'verbose_name': 'TTS任务',
+                'verbose_name_plural': 'TTS任务',
+                'db_table': 'tts_jobs',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='tts_jobs_status_created_idx')],
+            },
+        ),
+    ]
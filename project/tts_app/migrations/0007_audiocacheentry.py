@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_app', '0006_ttsjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AudioCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(max_length=64, unique=True, verbose_name='缓存Key')),
+                ('tts_type', models.CharField(choices=[('local', '本地生成'), ('cloud', '云服务生成')], default='local', max_length=10, verbose_name='生成方式')),
+                ('object_key', models.CharField(max_length=300, verbose_name='对象存储Key')),
+                ('path', models.CharField(blank=True, help_text='本地WAV被LRU淘汰后为空，对象存储中的文件仍然保留', max_length=300, null=True, verbose_name='本地文件路径')),
+                ('file_size', models.BigIntegerField(default=0, verbose_name='文件大小(bytes)')),
+                ('hit_count', models.PositiveIntegerField(default=0, verbose_name='命中次数')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间')),
+                ('last_access', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='最近访问时间')),
+                ('record', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cache_entries', to='tts_app.audiorecord', verbose_name='音频记录')),
+            ],
+            options={
+                'verbose_name': '音频缓存',
+                'verbose_name_plural': '音频缓存',
+                'db_table': 'audio_cache_entries',
+            },
+        ),
+    ]
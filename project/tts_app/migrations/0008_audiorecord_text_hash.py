@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:36
+
+import hashlib
+import re
+
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 2000
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _text_hash(text):
+    """与 tts_app.text_utils.compute_text_hash 保持一致（迁移中不引用应用代码）"""
+    normalized = _WHITESPACE_RE.sub(' ', text or '').strip().casefold()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def backfill_text_hash(apps, schema_editor):
+    """分批回填已有记录的text_hash，每批单独提交，避免大表长事务"""
+    AudioRecord = apps.get_model('tts_app', 'AudioRecord')
+
+    last_id = 0
+    while True:
+        batch = list(
+            AudioRecord.objects.filter(id__gt=last_id, text_hash__isnull=True)
+            .order_by('id')
+            .only('id', 'text')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+
+        for record in batch:
+            record.text_hash = _text_hash(record.text)
+
+        with transaction.atomic():
+            AudioRecord.objects.bulk_update(batch, ['text_hash'])
+
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('tts_app', '0007_audiocacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audiorecord',
+            name='text_hash',
+            field=models.CharField(blank=True, editable=False, help_text='规范化文本的sha256，保存时自动计算', max_length=64, null=True, verbose_name='文本哈希'),
+        ),
+        migrations.RunPython(backfill_text_hash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='audiorecord',
+            index=models.Index(fields=['text_hash', 'status', 'uptime'], name='audio_text_hash_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_app', '0008_audiorecord_text_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='audiorecord',
+            name='expire_time',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='过期时间'),
+        ),
+        migrations.AlterField(
+            model_name='videorecord',
+            name='expire_time',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='过期时间'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:53
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_app', '0009_expire_time_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='audiorecord',
+            name='uptime',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='创建时间'),
+        ),
+        migrations.AlterField(
+            model_name='videorecord',
+            name='uptime',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='上传时间'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# 全文搜索索引（SQLite FTS5 + 同步触发器），其他数据库不做任何操作
+#
+# SQL 固定在迁移中，不引用应用代码（search_service 以后修改不影响历史迁移）。
+# 之后修改 audio_records / video_records 结构时SQLite会重建原表、删除触发器，
+# 由 post_migrate 中的 ensure_search_index 统一补建，迁移中不需要再处理
+
+from django.db import migrations
+
+# 表名 -> (原表, 索引列)
+FTS_TABLES = {
+    'audio_records_fts': ('audio_records', ['text']),
+    'video_records_fts': ('video_records', ['title', 'tags']),
+}
+
+
+def _install_sql(fts, table, columns):
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"DROP TRIGGER IF EXISTS {fts}_ai",
+        f"DROP TRIGGER IF EXISTS {fts}_ad",
+        f"DROP TRIGGER IF EXISTS {fts}_au",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for fts, (table, columns) in FTS_TABLES.items():
+            try:
+                cursor.execute(_install_sql(fts, table, columns)[0])
+            except Exception as e:
+                print(f"❌ 创建全文索引失败（SQLite未启用FTS5？），搜索将使用LIKE: {e}")
+                return
+            for sql in _install_sql(fts, table, columns)[1:]:
+                cursor.execute(sql)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for fts in FTS_TABLES:
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_app', '0010_uptime_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
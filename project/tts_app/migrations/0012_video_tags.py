@@ -0,0 +1,80 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def split_existing_tags(apps, schema_editor):
+    """把已有的逗号分隔标签拆分到 tags / video_record_tags"""
+    from tts_app.text_utils import normalize_tag, split_tags
+
+    VideoRecord = apps.get_model('tts_app', 'VideoRecord')
+    Tag = apps.get_model('tts_app', 'Tag')
+    VideoTag = apps.get_model('tts_app', 'VideoTag')
+
+    videos = {}
+    for video_id, tags in VideoRecord.objects.exclude(tags__isnull=True).exclude(tags='').values_list('id', 'tags'):
+        names = list(dict.fromkeys(name for name in map(normalize_tag, split_tags(tags)) if name))
+        if names:
+            videos[video_id] = names
+
+    all_names = {name for names in videos.values() for name in names}
+    Tag.objects.bulk_create([Tag(name=name) for name in all_names], batch_size=500)
+    tag_ids = dict(Tag.objects.values_list('name', 'id'))
+
+    VideoTag.objects.bulk_create([
+        VideoTag(video_id=video_id, tag_id=tag_ids[name], position=position)
+        for video_id, names in videos.items()
+        for position, name in enumerate(names)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_app', '0011_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='规范化后的标签名（小写、合并空白）', max_length=50, unique=True, verbose_name='标签名')),
+            ],
+            options={
+                'verbose_name': '标签',
+                'verbose_name_plural': '标签',
+                'db_table': 'tags',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='VideoTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0, help_text='标签在 tags 字符串中的位置', verbose_name='顺序')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='video_tags', to='tts_app.tag', verbose_name='标签')),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='video_tags', to='tts_app.videorecord', verbose_name='视频')),
+            ],
+            options={
+                'verbose_name': '视频标签',
+                'verbose_name_plural': '视频标签',
+                'db_table': 'video_record_tags',
+            },
+        ),
+        migrations.AddField(
+            model_name='videorecord',
+            name='tag_objects',
+            field=models.ManyToManyField(blank=True, related_name='videos', through='tts_app.VideoTag', to='tts_app.tag', verbose_name='标签索引'),
+        ),
+        migrations.AddIndex(
+            model_name='videotag',
+            index=models.Index(fields=['tag', 'video'], name='video_tag_tag_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='videotag',
+            constraint=models.UniqueConstraint(fields=('video', 'tag'), name='video_tag_unique'),
+        ),
+        migrations.RunPython(split_existing_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:11
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_app', '0012_video_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentenceAudio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(max_length=64, unique=True, verbose_name='缓存Key')),
+                ('engine', models.CharField(default='local', max_length=10, verbose_name='合成引擎')),
+                ('sample_rate', models.PositiveIntegerField(verbose_name='采样率')),
+                ('file_size', models.PositiveIntegerField(default=0, verbose_name='文件大小(bytes)')),
+                ('hit_count', models.PositiveIntegerField(default=0, verbose_name='命中次数')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间')),
+                ('last_access', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='最近访问时间')),
+            ],
+            options={
+                'verbose_name': '句子音频缓存',
+                'verbose_name_plural': '句子音频缓存',
+                'db_table': 'sentence_audio',
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_app', '0013_sentence_audio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.CharField(max_length=32, unique=True, verbose_name='会话ID')),
+                ('mode', models.CharField(choices=[('single', '单次上传'), ('multipart', '分片上传')], default='single', max_length=10, verbose_name='上传方式')),
+                ('status', models.CharField(choices=[('uploading', '上传中'), ('completed', '已完成'), ('aborted', '已取消'), ('failed', '失败')], default='uploading', max_length=10, verbose_name='状态')),
+                ('file_name', models.CharField(max_length=255, verbose_name='原始文件名')),
+                ('content_type', models.CharField(blank=True, max_length=100, null=True, verbose_name='Content-Type')),
+                ('file_size', models.BigIntegerField(verbose_name='文件大小(bytes)')),
+                ('object_key', models.CharField(max_length=300, verbose_name='对象存储Key')),
+                ('upload_id', models.CharField(blank=True, max_length=200, null=True, verbose_name='分片上传任务ID')),
+                ('part_size', models.BigIntegerField(blank=True, null=True, verbose_name='分片大小(bytes)')),
+                ('part_count', models.PositiveIntegerField(default=1, verbose_name='分片数')),
+                ('subtitle_key', models.CharField(blank=True, max_length=300, null=True, verbose_name='字幕存储Key')),
+                ('subtitle_name', models.CharField(blank=True, max_length=200, null=True, verbose_name='字幕文件名')),
+                ('title', models.CharField(max_length=200, verbose_name='视频标题')),
+                ('category', models.CharField(choices=[('default', '默认'), ('education', '教育'), ('entertainment', '娱乐'), ('technology', '科技'), ('life', '生活'), ('music', '音乐'), ('movie', '电影'), ('game', '游戏'), ('news', '新闻'), ('sports', '体育'), ('other', '其他')], default='default', max_length=20, verbose_name='分类')),
+                ('tags', models.CharField(blank=True, max_length=500, null=True, verbose_name='标签')),
+                ('expire_seconds', models.IntegerField(default=3600, verbose_name='URL有效期(秒)')),
+                ('error_message', models.TextField(blank=True, null=True, verbose_name='错误信息')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='上传URL过期时间')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+                ('record', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_sessions', to='tts_app.videorecord', verbose_name='视频记录')),
+            ],
+            options={
+                'verbose_name': '上传会话',
+                'verbose_name_plural': '上传会话',
+                'db_table': 'upload_sessions',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
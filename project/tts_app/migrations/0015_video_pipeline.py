@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_app', '0014_upload_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videorecord',
+            name='pipeline',
+            field=models.JSONField(blank=True, default=dict, help_text='上传后处理各阶段（缩略图、字幕等）的状态，见 services/media_pipeline.py', verbose_name='后处理状态'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_app', '0015_video_pipeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videorecord',
+            name='audio_codec',
+            field=models.CharField(blank=True, max_length=32, null=True, verbose_name='音频编码'),
+        ),
+        migrations.AddField(
+            model_name='videorecord',
+            name='bitrate',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='码率(bps)'),
+        ),
+        migrations.AddField(
+            model_name='videorecord',
+            name='duration',
+            field=models.FloatField(blank=True, null=True, verbose_name='时长(秒)'),
+        ),
+        migrations.AddField(
+            model_name='videorecord',
+            name='has_audio',
+            field=models.BooleanField(blank=True, null=True, verbose_name='是否有音轨'),
+        ),
+        migrations.AddField(
+            model_name='videorecord',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='高度'),
+        ),
+        migrations.AddField(
+            model_name='videorecord',
+            name='sprite',
+            field=models.JSONField(blank=True, default=dict, help_text='进度条预览雪碧图 {"key", "url", "interval", "columns", "rows", "count", "tile_width", "tile_height"}', verbose_name='预览雪碧图'),
+        ),
+        migrations.AddField(
+            model_name='videorecord',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=list, help_text='[{"key", "url", "time"}]，第一张为封面（thumbnail_key）', verbose_name='候选缩略图'),
+        ),
+        migrations.AddField(
+            model_name='videorecord',
+            name='video_codec',
+            field=models.CharField(blank=True, max_length=32, null=True, verbose_name='视频编码'),
+        ),
+        migrations.AddField(
+            model_name='videorecord',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='宽度'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:41
+
+import os
+
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 2000
+
+# 合成引擎生成的记录：path 的文件名即对象存储Key
+SYNTHESIZED_TYPES = ('local', 'cloud')
+
+
+def backfill_object_key(apps, schema_editor):
+    """
+    分批回填已有记录的object_key，每批单独提交
+
+    优先使用缓存条目登记的Key；没有缓存条目的合成记录使用 path 的文件名；
+    上传的记录 path 是源文件路径，没有缓存条目时无法得知Key，保持为空
+    """
+    AudioRecord = apps.get_model('tts_app', 'AudioRecord')
+    AudioCacheEntry = apps.get_model('tts_app', 'AudioCacheEntry')
+
+    last_id = 0
+    while True:
+        batch = list(
+            AudioRecord.objects.filter(id__gt=last_id, object_key__isnull=True)
+            .order_by('id')
+            .only('id', 'tts_type', 'path')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        cached = dict(
+            AudioCacheEntry.objects.filter(record_id__in=[record.id for record in batch])
+            .values_list('record_id', 'object_key')
+        )
+        updated = []
+        for record in batch:
+            if record.id in cached:
+                record.object_key = cached[record.id]
+            elif record.path and record.tts_type in SYNTHESIZED_TYPES:
+                record.object_key = os.path.basename(record.path)
+            else:
+                continue
+            updated.append(record)
+
+        with transaction.atomic():
+            AudioRecord.objects.bulk_update(updated, ['object_key'])
+
+
+def remove_upload_cache_entries(apps, schema_editor):
+    """上传的音频不再登记到合成缓存：删除指向上传记录的缓存条目，避免覆盖本地模型的合成结果"""
+    AudioCacheEntry = apps.get_model('tts_app', 'AudioCacheEntry')
+    AudioCacheEntry.objects.filter(record__isnull=False).exclude(
+        record__tts_type__in=SYNTHESIZED_TYPES
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('tts_app', '0016_video_media_info'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audiorecord',
+            name='object_key',
+            field=models.CharField(blank=True, help_text='签名、续期、删除都使用此Key', max_length=300, null=True, verbose_name='对象存储Key'),
+        ),
+        migrations.AlterField(
+            model_name='audiorecord',
+            name='path',
+            field=models.CharField(blank=True, help_text='生成的本地WAV或上传时的源文件路径，不一定是对象存储Key', max_length=300, null=True, verbose_name='文件路径'),
+        ),
+        migrations.RunPython(backfill_object_key, migrations.RunPython.noop),
+        migrations.RunPython(remove_upload_cache_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_app', '0017_audiorecord_object_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='uploadsession',
+            name='status',
+            field=models.CharField(choices=[('uploading', '上传中'), ('completing', '完成中'), ('completed', '已完成'), ('aborted', '已取消'), ('failed', '失败')], default='uploading', max_length=10, verbose_name='状态'),
+        ),
+    ]
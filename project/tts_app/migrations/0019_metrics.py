@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_app', '0018_upload_session_completing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='指标名')),
+                ('value', models.BigIntegerField(default=0, verbose_name='累计值')),
+            ],
+            options={
+                'verbose_name': '指标计数器',
+                'verbose_name_plural': '指标计数器',
+                'db_table': 'metric_counters',
+            },
+        ),
+        migrations.CreateModel(
+            name='MetricTiming',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='指标名')),
+                ('count', models.BigIntegerField(default=0, verbose_name='次数')),
+                ('total', models.FloatField(default=0.0, verbose_name='总耗时(秒)')),
+                ('max', models.FloatField(default=0.0, verbose_name='最大耗时(秒)')),
+            ],
+            options={
+                'verbose_name': '指标耗时',
+                'verbose_name_plural': '指标耗时',
+                'db_table': 'metric_timings',
+            },
+        ),
+    ]
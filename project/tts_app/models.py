@@ -1,8 +1,114 @@
 """
 TTS应用数据库模型
 """
-from django.db import models
+from django.db import models, transaction
+from django.db.models import BooleanField, Case, Count, Value, When
 from django.utils import timezone
+from .text_utils import compute_text_hash, normalize_tag, split_tags
+
+
+class ExpiringQuerySet(models.QuerySet):
+    """
+    带过期时间（expire_time）记录的查询集
+    
+    过期判断在SQL中完成（走 expire_time 索引），列表接口整批使用同一个 now
+    """
+    
+    def expired(self, now=None):
+        """已过期的记录"""
+        return self.filter(expire_time__lt=now or timezone.now())
+    
+    def expiring_within(self, delta, now=None):
+        """尚未过期、但在 delta（timedelta）内过期的记录"""
+        now = now or timezone.now()
+        return self.filter(expire_time__gte=now, expire_time__lt=now + delta)
+    
+    def with_expiry(self, now=None):
+        """
+        注解过期标志 expired_flag（SQL中计算）
+        
+        模型的 is_expired()/to_dict() 优先使用该标志，不再逐行读取时钟
+        """
+        return self.annotate(
+            expired_flag=Case(
+                When(expire_time__lt=now or timezone.now(), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        )
+
+
+class VideoRecordQuerySet(ExpiringQuerySet):
+    """视频记录查询集"""
+    
+    def with_tags(self, tags):
+        """
+        按标签过滤（每个标签都必须有，走 video_record_tags 的 (tag, video) 索引）
+        
+        Args:
+            tags: 标签列表（不区分大小写）
+        """
+        queryset = self
+        for name in {normalize_tag(tag) for tag in tags or []} - {''}:
+            queryset = queryset.filter(
+                id__in=VideoTag.objects.filter(tag__name=name).values('video_id')
+            )
+        return queryset
+
+
+def format_remaining_time(expire_time, now):
+    """
+    剩余时间（人类可读格式）
+    
+    Args:
+        expire_time: 过期时间
+        now: 当前时间快照
+        
+    Returns:
+        str 或 None（无过期时间或已过期）
+    """
+    if not expire_time or now > expire_time:
+        return None
+    
+    remaining = expire_time - now
+    days = remaining.days
+    hours = remaining.seconds // 3600
+    minutes = (remaining.seconds % 3600) // 60
+    
+    if days > 0:
+        return f"{days}天{hours}小时"
+    elif hours > 0:
+        return f"{hours}小时{minutes}分钟"
+    else:
+        return f"{minutes}分钟"
+
+
+def pipeline_status(pipeline):
+    """
+    后处理整体状态
+    
+    Args:
+        pipeline: VideoRecord.pipeline
+        
+    Returns:
+        str | None: processing（有阶段未结束）、failed（有阶段失败）、success；没有后处理时为None
+    """
+    statuses = {state.get('status') for state in (pipeline or {}).values()}
+    if not statuses:
+        return None
+    if statuses & {'pending', 'running'}:
+        return 'processing'
+    if 'failed' in statuses:
+        return 'failed'
+    return 'success'
+
+
+def public_pipeline(pipeline):
+    """接口输出的后处理状态（去掉暂存文件路径）"""
+    return {
+        stage: {key: value for key, value in state.items() if key != 'source'}
+        for stage, state in (pipeline or {}).items()
+    }
 
 
 class AudioRecord(models.Model):
@@ -20,6 +126,14 @@ class AudioRecord(models.Model):
     ]
     
     text = models.TextField(verbose_name='文本内容', help_text='要转换的英文文本')
+    text_hash = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='文本哈希',
+        help_text='规范化文本的sha256，保存时自动计算'
+    )
     tts_type = models.CharField(
         max_length=10, 
         choices=TTS_TYPE_CHOICES, 
@@ -42,15 +156,25 @@ class AudioRecord(models.Model):
         max_length=300, 
         null=True, 
         blank=True,
-        verbose_name='文件路径'
+        verbose_name='文件路径',
+        help_text='生成的本地WAV或上传时的源文件路径，不一定是对象存储Key'
+    )
+    object_key = models.CharField(
+        max_length=300,
+        null=True,
+        blank=True,
+        verbose_name='对象存储Key',
+        help_text='签名、续期、删除都使用此Key'
     )
     uptime = models.DateTimeField(
         default=timezone.now,
+        db_index=True,
         verbose_name='创建时间'
     )
     expire_time = models.DateTimeField(
         null=True, 
         blank=True,
+        db_index=True,
         verbose_name='过期时间'
     )
     error_message = models.TextField(
@@ -59,40 +183,54 @@ class AudioRecord(models.Model):
         verbose_name='错误信息'
     )
     
+    objects = ExpiringQuerySet.as_manager()
+    
     class Meta:
         db_table = 'audio_records'
         verbose_name = '音频记录'
         verbose_name_plural = '音频记录'
         ordering = ['-uptime']
+        indexes = [
+            models.Index(fields=['text_hash', 'status', 'uptime'], name='audio_text_hash_idx'),
+        ]
     
     def __str__(self):
         return f"[{self.get_tts_type_display()}] {self.text[:30]}..."
     
-    def is_expired(self):
-        """判断是否过期"""
-        if self.expire_time:
-            return timezone.now() > self.expire_time
-        return False
+    def save(self, *args, **kwargs):
+        """保存前计算文本哈希"""
+        self.text_hash = compute_text_hash(self.text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'text_hash'}
+        super().save(*args, **kwargs)
     
-    def get_remaining_time(self):
-        """获取剩余时间（人类可读格式）"""
-        if not self.expire_time or self.is_expired():
-            return None
-        
-        remaining = self.expire_time - timezone.now()
-        days = remaining.days
-        hours = remaining.seconds // 3600
-        minutes = (remaining.seconds % 3600) // 60
+    def is_expired(self, now=None):
+        """
+        判断是否过期
         
-        if days > 0:
-            return f"{days}天{hours}小时"
-        elif hours > 0:
-            return f"{hours}小时{minutes}分钟"
-        else:
-            return f"{minutes}分钟"
+        Args:
+            now: 当前时间快照；不传时优先使用 with_expiry() 注解的标志
+        """
+        if not self.expire_time:
+            return False
+        if now is None:
+            if hasattr(self, 'expired_flag'):
+                return self.expired_flag
+            now = timezone.now()
+        return now > self.expire_time
     
-    def to_dict(self):
-        """转换为字典"""
+    def get_remaining_time(self, now=None):
+        """获取剩余时间（人类可读格式）"""
+        return format_remaining_time(self.expire_time, now or timezone.now())
+    
+    def to_dict(self, now=None):
+        """
+        转换为字典
+        
+        Args:
+            now: 当前时间快照（列表接口整批共用一个）
+        """
         return {
             'id': self.id,
             'text': self.text,
@@ -102,13 +240,127 @@ class AudioRecord(models.Model):
             'status_display': self.get_status_display(),
             'preurl': self.preurl,
             'path': self.path,
+            'object_key': self.object_key,
             'uptime': self.uptime.strftime('%Y-%m-%d %H:%M:%S'),
             'expire_time': self.expire_time.strftime('%Y-%m-%d %H:%M:%S') if self.expire_time else None,
-            'is_expired': self.is_expired(),
+            'is_expired': self.is_expired(now),
             'error_message': self.error_message,
         }
 
 
+class AudioCacheEntry(models.Model):
+    """
+    合成音频缓存条目（内容寻址）
+    
+    cache_key = sha256(规范化文本 + 引擎 + 模型 + 音色 + 语速/音调/音量)
+    同一个cache_key只对应一个对象存储文件，相同请求不会重复合成和上传
+    """
+    
+    cache_key = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='缓存Key'
+    )
+    tts_type = models.CharField(
+        max_length=10,
+        choices=AudioRecord.TTS_TYPE_CHOICES,
+        default='local',
+        verbose_name='生成方式'
+    )
+    object_key = models.CharField(
+        max_length=300,
+        verbose_name='对象存储Key'
+    )
+    path = models.CharField(
+        max_length=300,
+        null=True,
+        blank=True,
+        verbose_name='本地文件路径',
+        help_text='本地WAV被LRU淘汰后为空，对象存储中的文件仍然保留'
+    )
+    file_size = models.BigIntegerField(
+        default=0,
+        verbose_name='文件大小(bytes)'
+    )
+    record = models.ForeignKey(
+        AudioRecord,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='cache_entries',
+        verbose_name='音频记录'
+    )
+    hit_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='命中次数'
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='创建时间'
+    )
+    last_access = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name='最近访问时间'
+    )
+    
+    class Meta:
+        db_table = 'audio_cache_entries'
+        verbose_name = '音频缓存'
+        verbose_name_plural = '音频缓存'
+    
+    def __str__(self):
+        return f"[缓存] {self.cache_key[:12]} -> {self.object_key}"
+
+
+class SentenceAudio(models.Model):
+    """
+    句子级音频缓存条目
+
+    cache_key = sha256(规范化句子 + 引擎 + 模型 + 音色 + 语速/音调/音量 + 采样率)
+    PCM文件（16bit单声道，无文件头）保存在 SENTENCE_AUDIO_DIR，总大小超过上限时按LRU淘汰
+    """
+
+    cache_key = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='缓存Key'
+    )
+    engine = models.CharField(
+        max_length=10,
+        default='local',
+        verbose_name='合成引擎'
+    )
+    sample_rate = models.PositiveIntegerField(
+        verbose_name='采样率'
+    )
+    file_size = models.PositiveIntegerField(
+        default=0,
+        verbose_name='文件大小(bytes)'
+    )
+    hit_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='命中次数'
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='创建时间'
+    )
+    last_access = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name='最近访问时间'
+    )
+
+    class Meta:
+        db_table = 'sentence_audio'
+        verbose_name = '句子音频缓存'
+        verbose_name_plural = '句子音频缓存'
+
+    def __str__(self):
+        return f"[句子] {self.cache_key[:12]} ({self.engine}, {self.file_size} bytes)"
+
+
 class VideoRecord(models.Model):
     """视频记录模型"""
     
@@ -150,6 +402,13 @@ class VideoRecord(models.Model):
         verbose_name='标签',
         help_text='多个标签用逗号分隔'
     )
+    tag_objects = models.ManyToManyField(
+        'Tag',
+        through='VideoTag',
+        related_name='videos',
+        blank=True,
+        verbose_name='标签索引'
+    )
     preurl = models.URLField(
         max_length=500, 
         null=True, 
@@ -180,6 +439,18 @@ class VideoRecord(models.Model):
         blank=True,
         verbose_name='缩略图存储Key'
     )
+    thumbnails = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='候选缩略图',
+        help_text='[{"key", "url", "time"}]，第一张为封面（thumbnail_key）'
+    )
+    sprite = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='预览雪碧图',
+        help_text='进度条预览雪碧图 {"key", "url", "interval", "columns", "rows", "count", "tile_width", "tile_height"}'
+    )
     subtitle_url = models.URLField(
         max_length=500, 
         null=True, 
@@ -203,6 +474,43 @@ class VideoRecord(models.Model):
         blank=True,
         verbose_name='文件大小(bytes)'
     )
+    duration = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='时长(秒)'
+    )
+    width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='宽度'
+    )
+    height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='高度'
+    )
+    bitrate = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='码率(bps)'
+    )
+    video_codec = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        verbose_name='视频编码'
+    )
+    audio_codec = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        verbose_name='音频编码'
+    )
+    has_audio = models.BooleanField(
+        null=True,
+        blank=True,
+        verbose_name='是否有音轨'
+    )
     status = models.CharField(
         max_length=10,
         choices=STATUS_CHOICES,
@@ -211,11 +519,13 @@ class VideoRecord(models.Model):
     )
     uptime = models.DateTimeField(
         default=timezone.now,
+        db_index=True,
         verbose_name='上传时间'
     )
     expire_time = models.DateTimeField(
         null=True, 
         blank=True,
+        db_index=True,
         verbose_name='过期时间'
     )
     error_message = models.TextField(
@@ -223,6 +533,14 @@ class VideoRecord(models.Model):
         blank=True,
         verbose_name='错误信息'
     )
+    pipeline = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='后处理状态',
+        help_text='上传后处理各阶段（缩略图、字幕等）的状态，见 services/media_pipeline.py'
+    )
+    
+    objects = VideoRecordQuerySet.as_manager()
     
     class Meta:
         db_table = 'video_records'
@@ -233,34 +551,49 @@ class VideoRecord(models.Model):
     def __str__(self):
         return f"[视频] {self.title[:30]}..."
     
-    def is_expired(self):
-        """判断是否过期"""
-        if self.expire_time:
-            return timezone.now() > self.expire_time
-        return False
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """记录加载时的标签字符串，保存时只有标签变化才同步标签索引"""
+        instance = super().from_db(db, field_names, values)
+        if 'tags' in field_names:
+            instance._loaded_tags = instance.tags
+        return instance
     
-    def get_remaining_time(self):
-        """获取剩余时间（人类可读格式）"""
-        if not self.expire_time or self.is_expired():
-            return None
-        
-        remaining = self.expire_time - timezone.now()
-        days = remaining.days
-        hours = remaining.seconds // 3600
-        minutes = (remaining.seconds % 3600) // 60
+    def save(self, *args, **kwargs):
+        """保存后同步标签索引（tags 未变化时不访问标签表）"""
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'tags' not in update_fields:
+            return
+        if getattr(self, '_loaded_tags', None) != self.tags:
+            self.sync_tags()
+    
+    def is_expired(self, now=None):
+        """
+        判断是否过期
         
-        if days > 0:
-            return f"{days}天{hours}小时"
-        elif hours > 0:
-            return f"{hours}小时{minutes}分钟"
-        else:
-            return f"{minutes}分钟"
+        Args:
+            now: 当前时间快照；不传时优先使用 with_expiry() 注解的标志
+        """
+        if not self.expire_time:
+            return False
+        if now is None:
+            if hasattr(self, 'expired_flag'):
+                return self.expired_flag
+            now = timezone.now()
+        return now > self.expire_time
+    
+    def get_remaining_time(self, now=None):
+        """获取剩余时间（人类可读格式）"""
+        return format_remaining_time(self.expire_time, now or timezone.now())
+    
+    def get_pipeline_status(self):
+        """后处理整体状态，见 pipeline_status()"""
+        return pipeline_status(self.pipeline)
     
     def get_tags_list(self):
         """获取标签列表"""
-        if self.tags:
-            return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
-        return []
+        return split_tags(self.tags)
     
     def set_tags_from_list(self, tags_list):
         """从列表设置标签"""
@@ -269,8 +602,32 @@ class VideoRecord(models.Model):
         else:
             self.tags = None
     
-    def to_dict(self):
-        """转换为字典"""
+    def sync_tags(self):
+        """按 tags 字符串重建该视频的标签索引（save() 自动调用）"""
+        names = list(dict.fromkeys(
+            name for name in (normalize_tag(tag) for tag in split_tags(self.tags)) if name
+        ))
+        
+        with transaction.atomic():
+            Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+            tag_ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+            
+            VideoTag.objects.filter(video=self).delete()
+            VideoTag.objects.bulk_create([
+                VideoTag(video=self, tag_id=tag_ids[name], position=position)
+                for position, name in enumerate(names)
+            ])
+        self._loaded_tags = self.tags
+    
+    def to_dict(self, now=None):
+        """
+        转换为字典
+        
+        Args:
+            now: 当前时间快照（列表接口整批共用一个）
+        """
+        is_expired = self.is_expired(now)
+        now = now or timezone.now()
         return {
             'id': self.id,
             'title': self.title,
@@ -283,16 +640,443 @@ class VideoRecord(models.Model):
             'object_key': self.object_key,
             'thumbnail_url': self.thumbnail_url,
             'thumbnail_key': self.thumbnail_key,
+            'thumbnails': self.thumbnails,
+            'sprite': self.sprite,
             'subtitle_url': self.subtitle_url,
             'subtitle_key': self.subtitle_key,
             'subtitle_name': self.subtitle_name,
             'file_size': self.file_size,
+            'duration': self.duration,
+            'width': self.width,
+            'height': self.height,
+            'bitrate': self.bitrate,
+            'video_codec': self.video_codec,
+            'audio_codec': self.audio_codec,
+            'has_audio': self.has_audio,
             'status': self.status,
             'status_display': self.get_status_display(),
             'uptime': self.uptime.strftime('%Y-%m-%d %H:%M:%S'),
             'expire_time': self.expire_time.strftime('%Y-%m-%d %H:%M:%S') if self.expire_time else None,
-            'is_expired': self.is_expired(),
-            'remaining_time': self.get_remaining_time(),
+            'is_expired': is_expired,
+            'remaining_time': None if is_expired else format_remaining_time(self.expire_time, now),
             'error_message': self.error_message,
+            'pipeline': public_pipeline(self.pipeline),
+            'pipeline_status': self.get_pipeline_status(),
         }
 
+
+
+class Tag(models.Model):
+    """视频标签（规范化后的标签名，VideoRecord.tags 的倒排索引）"""
+    
+    name = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name='标签名',
+        help_text='规范化后的标签名（小写、合并空白）'
+    )
+    
+    class Meta:
+        db_table = 'tags'
+        verbose_name = '标签'
+        verbose_name_plural = '标签'
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    @staticmethod
+    def counts(limit=None, status='success'):
+        """
+        各标签的视频数量（按数量倒序）
+        
+        Args:
+            limit: 最多返回的标签数（可选）
+            status: 只统计该状态的视频，None 表示全部
+            
+        Returns:
+            list: [{'name': 标签名, 'count': 视频数}, ...]
+        """
+        links = VideoTag.objects.all()
+        if status:
+            links = links.filter(video__status=status)
+        rows = (
+            links.values('tag__name')
+            .annotate(count=Count('video_id'))
+            .order_by('-count', 'tag__name')
+        )
+        if limit:
+            rows = rows[:limit]
+        return [{'name': row['tag__name'], 'count': row['count']} for row in rows]
+
+
+class VideoTag(models.Model):
+    """视频-标签关联（through表）"""
+    
+    video = models.ForeignKey(
+        VideoRecord,
+        on_delete=models.CASCADE,
+        related_name='video_tags',
+        verbose_name='视频'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='video_tags',
+        verbose_name='标签'
+    )
+    position = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='顺序',
+        help_text='标签在 tags 字符串中的位置'
+    )
+    
+    class Meta:
+        db_table = 'video_record_tags'
+        verbose_name = '视频标签'
+        verbose_name_plural = '视频标签'
+        constraints = [
+            models.UniqueConstraint(fields=['video', 'tag'], name='video_tag_unique'),
+        ]
+        indexes = [
+            # 按标签查视频（?tag= 过滤和标签统计）
+            models.Index(fields=['tag', 'video'], name='video_tag_tag_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.video_id} - {self.tag_id}"
+
+
+class TTSJob(models.Model):
+    """TTS异步任务模型（基于数据库的任务队列）"""
+    
+    STATUS_CHOICES = [
+        ('queued', '排队中'),
+        ('running', '处理中'),
+        ('success', '成功'),
+        ('failed', '失败'),
+    ]
+    
+    STAGE_CHOICES = [
+        ('queued', '等待处理'),
+        ('synthesizing', '语音合成'),
+        ('uploading', '上传中'),
+        ('done', '已完成'),
+    ]
+    
+    record = models.ForeignKey(
+        AudioRecord,
+        on_delete=models.CASCADE,
+        related_name='jobs',
+        verbose_name='音频记录'
+    )
+    tts_type = models.CharField(
+        max_length=10,
+        choices=AudioRecord.TTS_TYPE_CHOICES,
+        default='local',
+        verbose_name='生成方式'
+    )
+    expire_seconds = models.IntegerField(
+        default=3600,
+        verbose_name='URL有效期(秒)'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='queued',
+        verbose_name='状态'
+    )
+    stage = models.CharField(
+        max_length=20,
+        choices=STAGE_CHOICES,
+        default='queued',
+        verbose_name='当前阶段'
+    )
+    progress = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='进度(%)'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='尝试次数'
+    )
+    worker_id = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        verbose_name='处理进程'
+    )
+    error_message = models.TextField(
+        null=True,
+        blank=True,
+        verbose_name='错误信息'
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='创建时间'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='开始时间'
+    )
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='心跳时间'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='完成时间'
+    )
+    
+    class Meta:
+        db_table = 'tts_jobs'
+        verbose_name = 'TTS任务'
+        verbose_name_plural = 'TTS任务'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='tts_jobs_status_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"[任务{self.id}] {self.get_status_display()} - 记录{self.record_id}"
+    
+    def is_finished(self):
+        """是否已结束（成功或失败）"""
+        return self.status in ('success', 'failed')
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'job_id': self.id,
+            'record_id': self.record_id,
+            'tts_type': self.tts_type,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'stage': self.stage,
+            'stage_display': self.get_stage_display(),
+            'progress': self.progress,
+            'attempts': self.attempts,
+            'error_message': self.error_message,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S') if self.started_at else None,
+            'finished_at': self.finished_at.strftime('%Y-%m-%d %H:%M:%S') if self.finished_at else None,
+        }
+
+
+class UploadSession(models.Model):
+    """
+    浏览器直传上传会话
+
+    客户端先创建会话拿到预签名PUT（或分片PUT）URL，直接把视频上传到对象存储，
+    再调用 complete 接口：服务端确认对象存在、大小一致后创建 VideoRecord，缩略图和字幕在后台处理
+    """
+
+    MODE_CHOICES = [
+        ('single', '单次上传'),
+        ('multipart', '分片上传'),
+    ]
+
+    STATUS_CHOICES = [
+        ('uploading', '上传中'),
+        ('completing', '完成中'),
+        ('completed', '已完成'),
+        ('aborted', '已取消'),
+        ('failed', '失败'),
+    ]
+
+    session_id = models.CharField(
+        max_length=32,
+        unique=True,
+        verbose_name='会话ID'
+    )
+    mode = models.CharField(
+        max_length=10,
+        choices=MODE_CHOICES,
+        default='single',
+        verbose_name='上传方式'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='uploading',
+        verbose_name='状态'
+    )
+    file_name = models.CharField(
+        max_length=255,
+        verbose_name='原始文件名'
+    )
+    content_type = models.CharField(
+        max_length=100,
+        null=True,
+        blank=True,
+        verbose_name='Content-Type'
+    )
+    file_size = models.BigIntegerField(
+        verbose_name='文件大小(bytes)'
+    )
+    object_key = models.CharField(
+        max_length=300,
+        verbose_name='对象存储Key'
+    )
+    upload_id = models.CharField(
+        max_length=200,
+        null=True,
+        blank=True,
+        verbose_name='分片上传任务ID'
+    )
+    part_size = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='分片大小(bytes)'
+    )
+    part_count = models.PositiveIntegerField(
+        default=1,
+        verbose_name='分片数'
+    )
+    subtitle_key = models.CharField(
+        max_length=300,
+        null=True,
+        blank=True,
+        verbose_name='字幕存储Key'
+    )
+    subtitle_name = models.CharField(
+        max_length=200,
+        null=True,
+        blank=True,
+        verbose_name='字幕文件名'
+    )
+    title = models.CharField(
+        max_length=200,
+        verbose_name='视频标题'
+    )
+    category = models.CharField(
+        max_length=20,
+        choices=VideoRecord.CATEGORY_CHOICES,
+        default='default',
+        verbose_name='分类'
+    )
+    tags = models.CharField(
+        max_length=500,
+        null=True,
+        blank=True,
+        verbose_name='标签'
+    )
+    expire_seconds = models.IntegerField(
+        default=3600,
+        verbose_name='URL有效期(秒)'
+    )
+    record = models.ForeignKey(
+        VideoRecord,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='upload_sessions',
+        verbose_name='视频记录'
+    )
+    error_message = models.TextField(
+        null=True,
+        blank=True,
+        verbose_name='错误信息'
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='创建时间'
+    )
+    expires_at = models.DateTimeField(
+        db_index=True,
+        verbose_name='上传URL过期时间'
+    )
+    completed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='完成时间'
+    )
+
+    class Meta:
+        db_table = 'upload_sessions'
+        verbose_name = '上传会话'
+        verbose_name_plural = '上传会话'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"[上传会话 {self.session_id[:8]}] {self.file_name} - {self.get_status_display()}"
+
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'session_id': self.session_id,
+            'mode': self.mode,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'file_name': self.file_name,
+            'file_size': self.file_size,
+            'object_key': self.object_key,
+            'part_size': self.part_size,
+            'part_count': self.part_count,
+            'subtitle_key': self.subtitle_key,
+            'record_id': self.record_id,
+            'error_message': self.error_message,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'expires_at': self.expires_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'completed_at': self.completed_at.strftime('%Y-%m-%d %H:%M:%S') if self.completed_at else None,
+        }
+
+
+class MetricCounter(models.Model):
+    """
+    运行指标计数器
+
+    Web进程、run_tts_worker、renew_urls 等所有进程的计数都累加到同一行，
+    由 services/metrics.py 按间隔批量写入（value = value + n）
+    """
+
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='指标名'
+    )
+    value = models.BigIntegerField(
+        default=0,
+        verbose_name='累计值'
+    )
+
+    class Meta:
+        db_table = 'metric_counters'
+        verbose_name = '指标计数器'
+        verbose_name_plural = '指标计数器'
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class MetricTiming(models.Model):
+    """运行指标耗时统计（所有进程汇总的次数、总耗时和最大耗时，单位秒）"""
+
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='指标名'
+    )
+    count = models.BigIntegerField(
+        default=0,
+        verbose_name='次数'
+    )
+    total = models.FloatField(
+        default=0.0,
+        verbose_name='总耗时(秒)'
+    )
+    max = models.FloatField(
+        default=0.0,
+        verbose_name='最大耗时(秒)'
+    )
+
+    class Meta:
+        db_table = 'metric_timings'
+        verbose_name = '指标耗时'
+        verbose_name_plural = '指标耗时'
+
+    def __str__(self):
+        return f"{self.name}: {self.count}次"
@@ -0,0 +1,200 @@
+"""
+游标（keyset）分页
+按 (uptime, id) 倒序分页：下一页从上一页最后一条记录之后继续，
+不使用 OFFSET（深分页不需要跳过前面的行），也不需要 COUNT
+
+游标是不透明字符串（base64编码的 uptime+id），客户端原样回传即可
+
+总数（可选）按查询条件缓存 LIST_COUNT_CACHE_TIMEOUT 秒，是近似值
+"""
+import json
+import base64
+import hashlib
+from datetime import datetime
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+
+def encode_cursor(uptime, record_id):
+    """
+    生成游标
+
+    Args:
+        uptime: 记录的 uptime
+        record_id: 记录ID
+
+    Returns:
+        str: URL安全的base64字符串
+    """
+    payload = json.dumps({'u': uptime.isoformat(), 'i': record_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    解析游标
+
+    Returns:
+        tuple: (uptime, record_id)
+
+    Raises:
+        ValueError: 游标无效
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(payload['u']), int(payload['i'])
+    except Exception:
+        raise ValueError('无效的分页游标')
+
+
+class CursorPage:
+    """一页结果（可直接在模板中迭代）"""
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """按 (uptime, id) 倒序的游标分页"""
+
+    def __init__(self, queryset, per_page):
+        """
+        Args:
+            queryset: 已过滤的查询集（排序由分页器决定）
+            per_page: 每页条数
+        """
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def page(self, cursor=None, direction='next'):
+        """
+        取一页
+
+        先只查询 (uptime, id) 确定本页的记录（走 uptime 索引，多取一条判断是否还有下一页），
+        再按ID取本页数据，数据查询可以继续用 values() 投影或模型实例
+
+        Args:
+            cursor: 游标，None 表示第一页
+            direction: next（游标之后，更旧）或 prev（游标之前，更新）
+
+        Returns:
+            CursorPage: object_list 为本页的查询集（已按 uptime、id 倒序）
+
+        Raises:
+            ValueError: 游标或方向无效
+        """
+        if direction not in ('next', 'prev'):
+            raise ValueError('direction 必须是 next 或 prev')
+
+        keys = self.queryset
+        if cursor:
+            uptime, record_id = decode_cursor(cursor)
+            if direction == 'next':
+                keys = keys.filter(Q(uptime__lt=uptime) | Q(uptime=uptime, id__lt=record_id))
+            else:
+                keys = keys.filter(Q(uptime__gt=uptime) | Q(uptime=uptime, id__gt=record_id))
+
+        if cursor and direction == 'prev':
+            keys = list(keys.order_by('uptime', 'id').values_list('uptime', 'id')[:self.per_page + 1])
+            more = len(keys) > self.per_page
+            keys = keys[:self.per_page][::-1]
+            has_next, has_previous = True, more
+        else:
+            keys = list(keys.order_by('-uptime', '-id').values_list('uptime', 'id')[:self.per_page + 1])
+            more = len(keys) > self.per_page
+            keys = keys[:self.per_page]
+            has_next, has_previous = more, bool(cursor)
+
+        object_list = self.queryset.filter(
+            id__in=[record_id for _, record_id in keys]
+        ).order_by('-uptime', '-id')
+
+        return CursorPage(
+            object_list,
+            next_cursor=encode_cursor(*keys[-1]) if keys and has_next else None,
+            previous_cursor=encode_cursor(*keys[0]) if keys and has_previous else None,
+        )
+
+
+def cached_count(queryset, timeout=None):
+    """
+    近似总数：按SQL缓存 COUNT 结果
+
+    Args:
+        queryset: 已过滤的查询集
+        timeout: 缓存秒数，默认 LIST_COUNT_CACHE_TIMEOUT
+
+    Returns:
+        int
+    """
+    timeout = timeout if timeout is not None else getattr(settings, 'LIST_COUNT_CACHE_TIMEOUT', 60)
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.sha1(repr((sql, params)).encode('utf-8')).hexdigest()
+    key = f'list_count:{queryset.model._meta.label_lower}:{digest}'
+
+    total = cache.get(key)
+    if total is None:
+        total = queryset.count()
+        cache.set(key, total, timeout)
+    return total
+
+
+def int_param(request, name, default, minimum=None, maximum=None):
+    """
+    读取整数查询参数，超出范围时限制到 [minimum, maximum]
+
+    Args:
+        request: 请求
+        name: 参数名
+        default: 未传或为空时的默认值
+        minimum / maximum: 可选的上下限
+
+    Raises:
+        ValueError: 参数不是整数
+    """
+    raw = request.GET.get(name, '').strip()
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f'{name} 必须是整数')
+    if minimum is not None:
+        value = max(value, minimum)
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+
+def page_from_request(request, queryset, per_page):
+    """
+    根据 ?cursor=...&direction=next|prev 取一页
+
+    Raises:
+        ValueError: 游标或方向无效
+    """
+    cursor = request.GET.get('cursor', '').strip() or None
+    direction = request.GET.get('direction', 'next').strip() or 'next'
+    return KeysetPaginator(queryset, per_page).page(cursor, direction)
@@ -0,0 +1,186 @@
+"""
+列表接口的快速序列化
+基于 .values() 投影，不创建模型实例，只查询请求字段需要的列
+
+与 record.to_dict() 输出一致（字段名、顺序、格式），区别在于：
+- 显示名称（get_xxx_display）改为预先构建的查找表
+- 时间格式化、过期判断整批共用一个 now
+- 支持 ?fields=id,title,preurl 只返回部分字段
+- 安装了 orjson 时使用 orjson 编码响应
+"""
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .models import AudioRecord, VideoRecord, format_remaining_time, pipeline_status, public_pipeline
+from .text_utils import split_tags
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def format_datetime(value):
+    """格式化为 'YYYY-MM-DD HH:MM:SS'（与 strftime('%Y-%m-%d %H:%M:%S') 相同，更快）"""
+    return value.isoformat(sep=' ', timespec='seconds')[:19] if value else None
+
+
+def _is_expired(expire_time, now):
+    """同 is_expired(now)：没有过期时间视为未过期"""
+    return bool(expire_time) and now > expire_time
+
+
+def _column(name):
+    """直接输出的数据库列"""
+    return (name,), lambda row, now: row[name]
+
+
+def _display(name, choices):
+    """choices字段的显示名称（预先构建查找表）"""
+    labels = dict(choices)
+    return (name,), lambda row, now: labels.get(row[name], row[name])
+
+
+def _datetime(name):
+    """时间列"""
+    return (name,), lambda row, now: format_datetime(row[name])
+
+
+# 输出字段 -> (依赖的数据库列, 取值函数)，顺序与 to_dict() 一致
+AUDIO_FIELDS = {
+    'id': _column('id'),
+    'text': _column('text'),
+    'tts_type': _column('tts_type'),
+    'tts_type_display': _display('tts_type', AudioRecord.TTS_TYPE_CHOICES),
+    'status': _column('status'),
+    'status_display': _display('status', AudioRecord.STATUS_CHOICES),
+    'preurl': _column('preurl'),
+    'path': _column('path'),
+    'object_key': _column('object_key'),
+    'uptime': _datetime('uptime'),
+    'expire_time': _datetime('expire_time'),
+    'is_expired': (('expire_time',), lambda row, now: _is_expired(row['expire_time'], now)),
+    'error_message': _column('error_message'),
+}
+
+VIDEO_FIELDS = {
+    'id': _column('id'),
+    'title': _column('title'),
+    'category': _column('category'),
+    'category_display': _display('category', VideoRecord.CATEGORY_CHOICES),
+    'tags': _column('tags'),
+    'tags_list': (('tags',), lambda row, now: split_tags(row['tags'])),
+    'preurl': _column('preurl'),
+    'path': _column('path'),
+    'object_key': _column('object_key'),
+    'thumbnail_url': _column('thumbnail_url'),
+    'thumbnail_key': _column('thumbnail_key'),
+    'thumbnails': _column('thumbnails'),
+    'sprite': _column('sprite'),
+    'subtitle_url': _column('subtitle_url'),
+    'subtitle_key': _column('subtitle_key'),
+    'subtitle_name': _column('subtitle_name'),
+    'file_size': _column('file_size'),
+    'duration': _column('duration'),
+    'width': _column('width'),
+    'height': _column('height'),
+    'bitrate': _column('bitrate'),
+    'video_codec': _column('video_codec'),
+    'audio_codec': _column('audio_codec'),
+    'has_audio': _column('has_audio'),
+    'status': _column('status'),
+    'status_display': _display('status', VideoRecord.STATUS_CHOICES),
+    'uptime': _datetime('uptime'),
+    'expire_time': _datetime('expire_time'),
+    'is_expired': (('expire_time',), lambda row, now: _is_expired(row['expire_time'], now)),
+    'remaining_time': (
+        ('expire_time',),
+        lambda row, now: format_remaining_time(row['expire_time'], now),
+    ),
+    'error_message': _column('error_message'),
+    'pipeline': (('pipeline',), lambda row, now: public_pipeline(row['pipeline'])),
+    'pipeline_status': (('pipeline',), lambda row, now: pipeline_status(row['pipeline'])),
+}
+
+
+class RecordSerializer:
+    """基于 .values() 的列表序列化器"""
+
+    def __init__(self, spec, fields=None):
+        """
+        Args:
+            spec: 字段定义（AUDIO_FIELDS / VIDEO_FIELDS）
+            fields: 需要输出的字段列表，None 表示全部
+
+        Raises:
+            ValueError: 包含未知字段
+        """
+        if fields:
+            unknown = [name for name in fields if name not in spec]
+            if unknown:
+                raise ValueError(
+                    f'未知字段: {", ".join(unknown)}。可选字段: {", ".join(spec)}'
+                )
+            # 保持 spec 中的顺序，去掉重复
+            fields = [name for name in spec if name in fields]
+        else:
+            fields = list(spec)
+
+        self.fields = fields
+        self.getters = [(name, spec[name][1]) for name in fields]
+        columns = []
+        for name in fields:
+            for column in spec[name][0]:
+                if column not in columns:
+                    columns.append(column)
+        self.columns = columns
+
+    @classmethod
+    def from_request(cls, request, spec):
+        """
+        根据 ?fields=a,b,c 创建序列化器
+
+        Raises:
+            ValueError: 包含未知字段
+        """
+        raw = request.GET.get('fields', '').strip()
+        fields = [name.strip() for name in raw.split(',') if name.strip()] if raw else None
+        return cls(spec, fields)
+
+    def serialize(self, queryset, now=None):
+        """
+        序列化查询集（只查询需要的列）
+
+        Args:
+            queryset: 已过滤、排序、切片的查询集
+            now: 当前时间快照
+
+        Returns:
+            list: 字典列表
+        """
+        now = now or timezone.now()
+        getters = self.getters
+        return [
+            {name: getter(row, now) for name, getter in getters}
+            for row in queryset.values(*self.columns)
+        ]
+
+
+def fast_json_response(data, status=200):
+    """
+    JSON响应：安装了 orjson 时使用 orjson 编码，否则与 JsonResponse 相同
+
+    Args:
+        data: 可JSON序列化的字典
+        status: HTTP状态码
+
+    Returns:
+        HttpResponse
+    """
+    if orjson is not None:
+        content = orjson.dumps(data)
+    else:
+        content = json.dumps(data, cls=DjangoJSONEncoder)
+    return HttpResponse(content, content_type='application/json', status=status)
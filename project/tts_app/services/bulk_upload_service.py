@@ -0,0 +1,195 @@
+"""
+批量上传服务
+一次请求登记多个本地音频文件：并发上传到对象存储，批量写入数据库
+
+与逐个调用 api_upload_audio 相比：
+- 所有文件共用一个StorageService（一个TOS客户端和连接池）
+- 记录用 bulk_create 一次插入，上传结果用 bulk_update 一次写回
+- 单个文件失败不影响其他文件，按条目返回结果
+- 多个条目引用同一个文件时只上传一次，这些记录共用一个对象
+"""
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import transaction
+
+from ..models import AudioRecord
+from ..text_utils import compute_text_hash
+from .storage_service import StorageService
+
+ALLOWED_AUDIO_EXTENSIONS = ['.wav', '.mp3', '.flac', '.ogg', '.m4a', '.aac']
+
+# bulk_create / bulk_update 每批行数
+DB_BATCH_SIZE = 500
+
+
+class BulkUploadService:
+    """批量上传音频文件"""
+
+    def __init__(self, storage_service=None, max_workers=None):
+        """
+        Args:
+            storage_service: 共享的StorageService，默认新建一个
+            max_workers: 并发上传线程数，默认使用 BULK_UPLOAD_WORKERS
+        """
+        self.storage_service = storage_service or StorageService()
+        self.max_workers = max_workers or getattr(settings, 'BULK_UPLOAD_WORKERS', 8)
+
+    @staticmethod
+    def validate_item(item):
+        """
+        校验单个条目
+
+        Returns:
+            tuple: (file_path, text, expire_seconds, error_message)
+        """
+        if not isinstance(item, dict):
+            return None, None, None, '条目必须是对象'
+
+        file_path = str(item.get('file_path') or '').strip()
+        text = str(item.get('text') or '').strip()
+
+        try:
+            expire_seconds = int(item.get('expire_time', 3600))
+        except (TypeError, ValueError):
+            return file_path, text, None, 'expire_time必须是整数'
+
+        if not file_path:
+            return file_path, text, expire_seconds, '文件路径不能为空'
+        if not text:
+            return file_path, text, expire_seconds, '文本内容不能为空'
+        if len(text) > 1000:
+            return file_path, text, expire_seconds, '文本内容不能超过1000字符'
+        if not os.path.exists(file_path):
+            return file_path, text, expire_seconds, f'文件不存在: {file_path}'
+
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext not in ALLOWED_AUDIO_EXTENSIONS:
+            return file_path, text, expire_seconds, (
+                f'不支持的音频格式: {file_ext}。支持的格式: {", ".join(ALLOWED_AUDIO_EXTENSIONS)}'
+            )
+
+        return file_path, text, expire_seconds, None
+
+    @staticmethod
+    def make_object_key(file_path, timestamp):
+        """
+        生成对象存储Key：原文件名_毫秒时间戳_随机ID.扩展名
+
+        同一请求中的条目共用时间戳，不同目录下的同名文件（a/out.wav、b/out.wav）靠随机ID区分
+        """
+        name, ext = os.path.splitext(os.path.basename(file_path))
+        return f"{name}_{timestamp}_{uuid.uuid4().hex[:8]}{ext.lower()}"
+
+    def _upload(self, file_path, object_key, expire_seconds):
+        """
+        上传单个文件并生成预签名URL（在线程池中执行，不访问数据库）
+
+        Returns:
+            tuple: (success, preurl, expire_time, error_message)
+        """
+        try:
+            return self.storage_service.upload_and_get_url(
+                file_path,
+                object_key=object_key,
+                expires=expire_seconds
+            )
+        except Exception as e:
+            return False, None, None, str(e)
+
+    def upload(self, items, tts_type='batch_upload'):
+        """
+        批量上传并登记
+
+        Args:
+            items: [{file_path, text, expire_time}, ...]
+            tts_type: 记录类型标记
+
+        Returns:
+            list: 与items顺序一致的结果字典
+        """
+        results = [None] * len(items)
+        valid = []
+
+        # 1. 校验
+        for index, item in enumerate(items):
+            file_path, text, expire_seconds, error = self.validate_item(item)
+            if error:
+                results[index] = {'index': index, 'success': False, 'file_path': file_path, 'error': error}
+            else:
+                valid.append((index, file_path, text, expire_seconds))
+
+        if not valid:
+            return results
+
+        # 2. 批量创建pending记录（bulk_create不调用save，需要显式计算text_hash）
+        records = [
+            AudioRecord(
+                text=text,
+                text_hash=compute_text_hash(text),
+                tts_type=tts_type,
+                status='pending',
+                path=file_path,
+            )
+            for _, file_path, text, _ in valid
+        ]
+        with transaction.atomic():
+            records = AudioRecord.objects.bulk_create(records, batch_size=DB_BATCH_SIZE)
+
+        # 3. 并发上传（重复的文件只上传一次；URL有效期取引用它的条目中最长的）
+        timestamp = int(time.time() * 1000)
+        uploads = {}
+        for _, file_path, _, expire_seconds in valid:
+            if file_path in uploads:
+                uploads[file_path][1] = max(uploads[file_path][1], expire_seconds)
+            else:
+                uploads[file_path] = [self.make_object_key(file_path, timestamp), expire_seconds]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            uploaded = dict(zip(uploads, executor.map(
+                self._upload,
+                list(uploads),
+                [object_key for object_key, _ in uploads.values()],
+                [expire_seconds for _, expire_seconds in uploads.values()],
+            )))
+        object_keys = [uploads[file_path][0] for _, file_path, _, _ in valid]
+        outcomes = [uploaded[file_path] for _, file_path, _, _ in valid]
+
+        # 4. 批量写回上传结果
+        for (index, file_path, _, _), record, object_key, outcome in zip(valid, records, object_keys, outcomes):
+            success, preurl, expire_time, error_msg = outcome
+            if success:
+                record.status = 'success'
+                record.object_key = object_key
+                record.preurl = preurl
+                record.expire_time = expire_time
+                results[index] = {
+                    'index': index,
+                    'success': True,
+                    'file_path': file_path,
+                    'record_id': record.id,
+                    'url': preurl,
+                    'expire_time': expire_time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'object_key': object_key,
+                }
+            else:
+                record.status = 'failed'
+                record.error_message = f'上传失败: {error_msg}'
+                results[index] = {
+                    'index': index,
+                    'success': False,
+                    'file_path': file_path,
+                    'record_id': record.id,
+                    'error': record.error_message,
+                }
+
+        with transaction.atomic():
+            AudioRecord.objects.bulk_update(
+                records,
+                ['status', 'object_key', 'preurl', 'expire_time', 'error_message'],
+                batch_size=DB_BATCH_SIZE,
+            )
+
+        return results
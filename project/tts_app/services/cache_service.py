@@ -0,0 +1,218 @@
+"""
+合成音频缓存服务（内容寻址）
+
+缓存key由以下内容计算sha256：
+- 规范化后的文本（去除首尾空白、合并连续空白、忽略大小写）
+- 引擎（local/cloud）、模型名称、音色、语速/音调/音量
+
+同一个key只对应一个对象存储文件；本地WAV按LRU淘汰，总大小受 AUDIO_CACHE_MAX_BYTES 限制
+
+只登记合成引擎生成的音频；上传的音频（custom、batch_upload等）不登记，
+否则上传的文件会替换相同文本的本地模型合成结果
+"""
+import os
+import json
+import hashlib
+from django.conf import settings
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from ..models import AudioRecord, AudioCacheEntry
+from ..text_utils import normalize_text, compute_text_hash
+from . import metrics
+
+
+def cache_engine_for(tts_type):
+    """记录类型对应的合成引擎（local/cloud）"""
+    return 'cloud' if tts_type == 'cloud' else 'local'
+
+
+def build_cache_key(text, tts_type='local'):
+    """
+    计算缓存key
+
+    Args:
+        text: 原始文本
+        tts_type: local 或 cloud
+
+    Returns:
+        str: 64位十六进制sha256
+    """
+    from .tts_service import TTSServiceFactory
+
+    engine = cache_engine_for(tts_type)
+    params = TTSServiceFactory.get_service(engine).get_cache_params()
+    payload = json.dumps(
+        {'text': normalize_text(text), **params},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AudioCacheService:
+    """合成音频缓存"""
+
+    @staticmethod
+    def get(cache_key):
+        """
+        查找缓存条目（命中时更新访问时间和命中次数）
+
+        Returns:
+            AudioCacheEntry 或 None
+        """
+        entry = AudioCacheEntry.objects.filter(
+            cache_key=cache_key
+        ).select_related('record').first()
+
+        if entry is None:
+            metrics.incr('audio_cache.miss')
+            return None
+
+        metrics.incr('audio_cache.hit')
+        AudioCacheEntry.objects.filter(id=entry.id).update(
+            hit_count=F('hit_count') + 1,
+            last_access=timezone.now(),
+        )
+        return entry
+
+    @classmethod
+    def lookup_record(cls, text, tts_type):
+        """
+        查找可复用的成功记录
+
+        优先使用缓存条目；未命中时回退到按规范化文本匹配的旧记录
+        （缓存上线前由同一引擎生成的记录，不含上传的记录），找到后补建缓存条目
+
+        Returns:
+            tuple: (cache_key, AudioRecord 或 None)
+        """
+        cache_key = build_cache_key(text, tts_type)
+
+        entry = cls.get(cache_key)
+        if entry and entry.record and entry.record.status == 'success':
+            return cache_key, entry.record
+
+        # 回退：按文本哈希查找（走 text_hash+status+uptime 索引），只匹配同一引擎生成的记录
+        legacy = AudioRecord.objects.filter(
+            tts_type=cache_engine_for(tts_type),
+            text_hash=compute_text_hash(text),
+            status='success',
+        ).exclude(object_key__isnull=True).order_by('-uptime').first()
+
+        if legacy:
+            metrics.incr('audio_cache.legacy_hit')
+            cls.store(cache_key, legacy)
+            return cache_key, legacy
+
+        return cache_key, None
+
+    @staticmethod
+    def store(cache_key, record):
+        """
+        登记缓存条目（同一key已存在时指向最新记录）
+
+        Args:
+            cache_key: 缓存key
+            record: 合成成功的AudioRecord（object_key 为其对象存储Key）
+
+        Returns:
+            AudioCacheEntry
+        """
+        path = record.path if record.path and os.path.exists(record.path) else None
+        file_size = os.path.getsize(path) if path else 0
+
+        entry, _ = AudioCacheEntry.objects.update_or_create(
+            cache_key=cache_key,
+            defaults={
+                'tts_type': cache_engine_for(record.tts_type),
+                'object_key': record.object_key,
+                'path': path,
+                'file_size': file_size,
+                'record': record,
+                'last_access': timezone.now(),
+            }
+        )
+        return entry
+
+    @staticmethod
+    def release_object(object_key):
+        """删除对象存储文件前，移除指向它的缓存条目"""
+        AudioCacheEntry.objects.filter(object_key=object_key).delete()
+
+    @staticmethod
+    def evict_local_files(max_bytes=None):
+        """
+        按LRU淘汰 AUDIO_OUTPUT_DIR 中的本地WAV，直到总大小不超过上限
+
+        有缓存条目的文件按最近访问时间排序，其他文件按修改时间排序；
+        只删除本地文件，对象存储中的文件和记录保持不变
+
+        Returns:
+            tuple: (evicted_count, freed_bytes)
+        """
+        max_bytes = max_bytes if max_bytes is not None else getattr(
+            settings, 'AUDIO_CACHE_MAX_BYTES', 2 * 1024 * 1024 * 1024
+        )
+        audio_dir = str(settings.AUDIO_OUTPUT_DIR)
+
+        files = {}
+        total = 0
+        with os.scandir(audio_dir) as it:
+            for item in it:
+                if item.is_file() and item.name.lower().endswith('.wav'):
+                    stat = item.stat()
+                    files[item.path] = (stat.st_mtime, stat.st_size)
+                    total += stat.st_size
+
+        if total <= max_bytes:
+            return 0, 0
+
+        # 有缓存条目的文件使用最近访问时间
+        last_access = dict(
+            AudioCacheEntry.objects.filter(path__in=list(files)).values_list('path', 'last_access')
+        )
+        candidates = sorted(
+            files.items(),
+            key=lambda item: last_access[item[0]].timestamp() if item[0] in last_access else item[1][0]
+        )
+
+        evicted = []
+        freed = 0
+        for path, (_, size) in candidates:
+            if total - freed <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            evicted.append(path)
+            freed += size
+
+        if evicted:
+            AudioCacheEntry.objects.filter(path__in=evicted).update(path=None)
+            metrics.incr('audio_cache.evicted', len(evicted))
+            print(f"🧹 本地音频缓存淘汰 {len(evicted)} 个文件，释放 {freed / 1024 / 1024:.1f}MB")
+
+        return len(evicted), freed
+
+    @staticmethod
+    def stats():
+        """缓存统计"""
+        counters = metrics.snapshot()
+        legacy_hits = counters.get('audio_cache.legacy_hit', 0)
+        hits = counters.get('audio_cache.hit', 0) + legacy_hits
+        misses = counters.get('audio_cache.miss', 0) - legacy_hits
+        lookups = hits + misses
+        aggregates = AudioCacheEntry.objects.aggregate(
+            local_bytes=Sum('file_size', filter=Q(path__isnull=False)),
+        )
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else None,
+            'entries': AudioCacheEntry.objects.count(),
+            'local_bytes': aggregates['local_bytes'] or 0,
+            'max_local_bytes': getattr(settings, 'AUDIO_CACHE_MAX_BYTES', None),
+            'evicted': counters.get('audio_cache.evicted', 0),
+        }
@@ -0,0 +1,41 @@
+"""
+FFmpeg 进程池
+所有 ffmpeg / ffprobe 调用都通过 run_ffmpeg 执行，同时运行的进程数不超过 FFMPEG_MAX_PROCESSES，
+上传高峰时多余的调用排队等待，而不是同时启动几十个解码进程拖垮主机
+
+名额按进程计算（每个 Django worker 进程各自一个上限）
+"""
+import os
+import time
+import threading
+import subprocess
+from django.conf import settings
+
+from . import metrics
+
+_slots = threading.BoundedSemaphore(getattr(settings, 'FFMPEG_MAX_PROCESSES', 2))
+
+
+def run_ffmpeg(cmd, timeout):
+    """
+    在进程池名额内运行 ffmpeg / ffprobe 命令
+
+    Args:
+        cmd: 命令参数列表
+        timeout: 进程运行超时（秒，不含排队等待时间）
+
+    Returns:
+        subprocess.CompletedProcess: stdout/stderr 为文本
+
+    Raises:
+        FileNotFoundError: 未安装 FFmpeg
+        subprocess.TimeoutExpired: 运行超时
+    """
+    start = time.perf_counter()
+    with _slots:
+        metrics.observe('ffmpeg.wait', time.perf_counter() - start)
+        started = time.perf_counter()
+        try:
+            return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        finally:
+            metrics.observe(f'ffmpeg.{os.path.basename(cmd[0])}', time.perf_counter() - started)
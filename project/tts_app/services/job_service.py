@@ -0,0 +1,439 @@
+"""
+TTS异步任务服务
+基于Django数据库（SQLite）实现的任务队列，无需外部消息中间件
+
+- Web请求只负责创建任务并立即返回任务ID
+- 独立的worker进程（python manage.py run_tts_worker）领取任务，执行语音合成和上传
+- 任务进度写回数据库，供状态接口轮询/长轮询查询
+"""
+import os
+import time
+import socket
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import AudioRecord, TTSJob
+from ..text_utils import compute_text_hash
+from .tts_service import TTSServiceFactory
+from .storage_service import StorageService
+from .cache_service import AudioCacheService, build_cache_key
+from .longform_service import LongTextService, is_long_text
+
+
+class JobService:
+    """TTS任务队列服务"""
+
+    @staticmethod
+    def enqueue(record, expire_seconds=3600):
+        """
+        为pending状态的音频记录创建任务
+
+        Args:
+            record: AudioRecord实例（status='pending'）
+            expire_seconds: 生成后预签名URL的有效期（秒）
+
+        Returns:
+            TTSJob: 新创建的任务
+        """
+        return TTSJob.objects.create(
+            record=record,
+            tts_type=record.tts_type,
+            expire_seconds=expire_seconds,
+        )
+
+    @staticmethod
+    def find_inflight(text, tts_type):
+        """
+        查找相同文本正在排队或处理中的任务，避免突发的重复请求重复入队
+
+        Returns:
+            TTSJob 或 None
+        """
+        return TTSJob.objects.filter(
+            record__text_hash=compute_text_hash(text),
+            tts_type=tts_type,
+            status__in=['queued', 'running'],
+        ).select_related('record').order_by('created_at').first()
+
+    @staticmethod
+    def claim_next(worker_id):
+        """
+        领取下一个排队中的任务
+
+        使用带状态条件的UPDATE实现乐观锁：多个worker同时领取同一任务时，
+        只有一个能把status从queued改为running
+
+        Returns:
+            TTSJob 或 None
+        """
+        while True:
+            candidate = TTSJob.objects.filter(
+                status='queued'
+            ).order_by('created_at').values_list('id', flat=True).first()
+
+            if candidate is None:
+                return None
+
+            now = timezone.now()
+            claimed = TTSJob.objects.filter(id=candidate, status='queued').update(
+                status='running',
+                stage='synthesizing',
+                progress=10,
+                worker_id=worker_id,
+                attempts=F('attempts') + 1,
+                started_at=now,
+                heartbeat_at=now,
+            )
+            if claimed:
+                return TTSJob.objects.select_related('record').get(id=candidate)
+            # 被其他worker抢先领取，继续尝试下一个
+
+    @staticmethod
+    def claim_more_local(worker_id, limit):
+        """
+        额外领取最多limit个排队中的本地任务，与已领取的本地任务合并为一个批次合成
+
+        Returns:
+            list: 领取到的TTSJob
+        """
+        if limit <= 0:
+            return []
+
+        candidates = list(TTSJob.objects.filter(
+            status='queued'
+        ).exclude(tts_type='cloud').order_by('created_at').values_list('id', flat=True)[:limit])
+        if not candidates:
+            return []
+
+        now = timezone.now()
+        # 同一个worker的同一时刻作为批次标记，只取回本次UPDATE领取成功的任务
+        TTSJob.objects.filter(id__in=candidates, status='queued').update(
+            status='running',
+            stage='synthesizing',
+            progress=10,
+            worker_id=worker_id,
+            attempts=F('attempts') + 1,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        return list(TTSJob.objects.filter(
+            id__in=candidates, status='running', worker_id=worker_id, started_at=now
+        ).select_related('record').order_by('created_at'))
+
+    @staticmethod
+    def requeue_stale(timeout=None, max_attempts=None):
+        """
+        回收心跳超时的任务（worker崩溃或被杀死）
+
+        未超过最大尝试次数的重新入队，否则标记为失败
+
+        Returns:
+            tuple: (requeued_count, failed_count)
+        """
+        timeout = timeout or getattr(settings, 'TTS_JOB_STALE_TIMEOUT', 600)
+        max_attempts = max_attempts or getattr(settings, 'TTS_JOB_MAX_ATTEMPTS', 3)
+        deadline = timezone.now() - timedelta(seconds=timeout)
+
+        stale = TTSJob.objects.filter(status='running', heartbeat_at__lt=deadline)
+
+        requeued = stale.filter(attempts__lt=max_attempts).update(
+            status='queued',
+            stage='queued',
+            progress=0,
+            worker_id=None,
+        )
+
+        failed_jobs = list(stale.filter(attempts__gte=max_attempts).values_list('id', 'record_id'))
+        if failed_jobs:
+            error_msg = f'任务超时（已尝试{max_attempts}次）'
+            TTSJob.objects.filter(id__in=[j[0] for j in failed_jobs]).update(
+                status='failed',
+                error_message=error_msg,
+                finished_at=timezone.now(),
+            )
+            AudioRecord.objects.filter(id__in=[j[1] for j in failed_jobs]).update(
+                status='failed',
+                error_message=error_msg,
+            )
+
+        return requeued, len(failed_jobs)
+
+    @staticmethod
+    def _update_stage(job, stage, progress):
+        """更新任务阶段和心跳"""
+        job.stage = stage
+        job.progress = progress
+        job.heartbeat_at = timezone.now()
+        job.save(update_fields=['stage', 'progress', 'heartbeat_at'])
+
+    @staticmethod
+    def _finish(job, success, error_msg=None):
+        """结束任务"""
+        job.status = 'success' if success else 'failed'
+        job.stage = 'done'
+        job.progress = 100 if success else job.progress
+        job.error_message = error_msg
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'stage', 'progress', 'error_message', 'finished_at'])
+
+    @classmethod
+    def run_job(cls, job):
+        """
+        执行任务：生成语音 -> 上传到对象存储 -> 生成预签名URL -> 更新记录
+
+        Args:
+            job: 已领取（running）的TTSJob
+
+        Returns:
+            bool: 是否成功
+        """
+        record = job.record
+
+        try:
+            # 0. 相同内容已合成过：复用对象存储文件，不重新合成和上传
+            cache_key = build_cache_key(record.text, job.tts_type)
+            entry = AudioCacheService.get(cache_key)
+            if entry:
+                return cls._finish_from_cache(job, record, entry)
+
+            # 1. 生成语音（长文本按句拆分并行合成，句子级缓存）
+            if is_long_text(record.text):
+                def on_progress(done, total):
+                    cls._update_stage(job, 'synthesizing', 10 + 50 * done // max(total, 1))
+
+                success, file_path, error_msg, _ = LongTextService(job.tts_type).synthesize(
+                    record.text, on_progress=on_progress
+                )
+            else:
+                tts_service = TTSServiceFactory.get_service(job.tts_type)
+                success, file_path, error_msg = tts_service.generate_speech(record.text)
+
+            return cls._complete(job, cache_key, success, file_path, error_msg)
+
+        except Exception as e:
+            return cls._fail(job, str(e))
+
+    @classmethod
+    def run_local_batch(cls, jobs):
+        """
+        批量执行本地任务：命中缓存的直接完成，其余一次性交给 generate_batch 合成
+
+        Args:
+            jobs: 已领取（running）的本地TTSJob列表
+
+        Returns:
+            list: 每个任务是否成功
+        """
+        results = {}
+        pending = []
+        for job in jobs:
+            # 长文本单独走长文本流程
+            if is_long_text(job.record.text):
+                results[job.id] = cls.run_job(job)
+                continue
+            try:
+                cache_key = build_cache_key(job.record.text, job.tts_type)
+                entry = AudioCacheService.get(cache_key)
+                if entry:
+                    results[job.id] = cls._finish_from_cache(job, job.record, entry)
+                else:
+                    pending.append((job, cache_key))
+            except Exception as e:
+                results[job.id] = cls._fail(job, str(e))
+
+        if pending:
+            job_ids = [job.id for job, _ in pending]
+            worker_id = pending[0][0].worker_id
+
+            def on_progress(done, total):
+                # 每个小批次刷新整批任务的进度和心跳，合成耗时较长时不会被当作worker崩溃回收
+                TTSJob.objects.filter(id__in=job_ids, status='running', worker_id=worker_id).update(
+                    stage='synthesizing',
+                    progress=10 + 50 * done // max(total, 1),
+                    heartbeat_at=timezone.now(),
+                )
+
+            try:
+                tts_service = TTSServiceFactory.get_service('local')
+                outputs = tts_service.generate_batch(
+                    [job.record.text for job, _ in pending], on_progress=on_progress
+                )
+            except Exception as e:
+                outputs = [(False, None, str(e))] * len(pending)
+
+            for (job, cache_key), (success, file_path, error_msg) in zip(pending, outputs):
+                try:
+                    results[job.id] = cls._complete(job, cache_key, success, file_path, error_msg)
+                except Exception as e:
+                    results[job.id] = cls._fail(job, str(e))
+
+        return [results[job.id] for job in jobs]
+
+    @classmethod
+    def _complete(cls, job, cache_key, success, file_path, error_msg):
+        """合成结束后：上传到对象存储 -> 生成预签名URL -> 更新记录"""
+        record = job.record
+
+        if not success:
+            record.status = 'failed'
+            record.error_message = error_msg
+            record.save()
+            cls._finish(job, False, f'语音生成失败: {error_msg}')
+            return False
+
+        record.path = file_path
+        record.save(update_fields=['path'])
+        cls._update_stage(job, 'uploading', 60)
+
+        # 2. 上传到对象存储并生成预签名URL
+        storage_service = StorageService()
+        object_key = os.path.basename(file_path)
+
+        success, preurl, expire_time, error_msg = storage_service.upload_and_get_url(
+            file_path,
+            object_key=object_key,
+            expires=job.expire_seconds
+        )
+
+        if not success:
+            record.status = 'failed'
+            record.error_message = f'上传失败: {error_msg}'
+            record.save()
+            cls._finish(job, False, f'上传失败: {error_msg}')
+            return False
+
+        # 3. 更新记录状态
+        record.object_key = object_key
+        record.preurl = preurl
+        record.expire_time = expire_time
+        record.status = 'success'
+        record.save()
+
+        # 4. 登记缓存，并控制本地WAV总大小
+        AudioCacheService.store(cache_key, record)
+        AudioCacheService.evict_local_files()
+
+        cls._finish(job, True)
+        return True
+
+    @classmethod
+    def _fail(cls, job, error):
+        """处理异常：记录和任务都标记为失败"""
+        record = job.record
+        record.status = 'failed'
+        record.error_message = error
+        record.save()
+        cls._finish(job, False, f'处理失败: {error}')
+        return False
+
+    @classmethod
+    def _finish_from_cache(cls, job, record, entry):
+        """使用缓存条目完成任务：只生成预签名URL"""
+        cls._update_stage(job, 'uploading', 60)
+
+        storage_service = StorageService()
+        success, preurl, expire_time, error_msg = storage_service.generate_presigned_url(
+            entry.object_key,
+            expires=job.expire_seconds
+        )
+
+        if not success:
+            record.status = 'failed'
+            record.error_message = f'生成预签名URL失败: {error_msg}'
+            record.save()
+            cls._finish(job, False, f'生成预签名URL失败: {error_msg}')
+            return False
+
+        # 对象存储Key以缓存条目为准；path只记录仍在本地的缓存文件（可能已被淘汰）
+        record.object_key = entry.object_key
+        record.path = entry.path
+        record.preurl = preurl
+        record.expire_time = expire_time
+        record.status = 'success'
+        record.save()
+
+        cls._finish(job, True)
+        return True
+
+    @staticmethod
+    def wait_for(job_id, timeout):
+        """
+        等待任务结束（长轮询）
+
+        Args:
+            job_id: 任务ID
+            timeout: 最长等待秒数
+
+        Returns:
+            TTSJob: 最新状态的任务（可能仍未结束）
+        """
+        interval = getattr(settings, 'TTS_JOB_WAIT_INTERVAL', 0.5)
+        deadline = time.monotonic() + timeout
+
+        job = TTSJob.objects.get(id=job_id)
+        while not job.is_finished() and time.monotonic() < deadline:
+            time.sleep(interval)
+            job.refresh_from_db()
+        return job
+
+
+def default_worker_id(index=0):
+    """生成worker标识：主机名-进程号-序号"""
+    return f"{socket.gethostname()}-{os.getpid()}-{index}"
+
+
+def run_worker(worker_id=None, poll_interval=None, max_jobs=None):
+    """
+    worker主循环：不断领取并执行任务
+
+    Args:
+        worker_id: worker标识
+        poll_interval: 队列为空时的轮询间隔（秒）
+        max_jobs: 最多执行的任务数，None表示一直运行
+    """
+    worker_id = worker_id or default_worker_id()
+    poll_interval = poll_interval or getattr(settings, 'TTS_JOB_POLL_INTERVAL', 1.0)
+    reap_interval = getattr(settings, 'TTS_JOB_REAP_INTERVAL', 30)
+    batch_size = getattr(settings, 'TTS_JOB_BATCH_SIZE', 8)
+    processed = 0
+    last_reap = time.monotonic() - reap_interval
+
+    print(f"🚀 TTS worker 已启动: {worker_id}")
+
+    while max_jobs is None or processed < max_jobs:
+        close_old_connections()
+
+        # 定期回收崩溃worker遗留的任务
+        if time.monotonic() - last_reap >= reap_interval:
+            JobService.requeue_stale()
+            last_reap = time.monotonic()
+
+        job = JobService.claim_next(worker_id)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        # 本地任务：顺带领取更多排队中的本地任务，一起批量合成
+        if job.tts_type != 'cloud' and batch_size > 1:
+            limit = batch_size - 1
+            if max_jobs is not None:
+                limit = min(limit, max_jobs - processed - 1)
+            jobs = [job] + JobService.claim_more_local(worker_id, limit)
+        else:
+            jobs = [job]
+
+        if len(jobs) == 1:
+            print(f"[{worker_id}] 开始处理任务 {job.id}（记录 {job.record_id}）")
+            results = [JobService.run_job(job)]
+        else:
+            print(f"[{worker_id}] 开始批量处理 {len(jobs)} 个本地任务: {[j.id for j in jobs]}")
+            results = JobService.run_local_batch(jobs)
+
+        processed += len(jobs)
+        for j, ok in zip(jobs, results):
+            print(f"[{worker_id}] 任务 {j.id} {'✅ 成功' if ok else '❌ 失败'}")
+
+    print(f"🛑 TTS worker 已退出: {worker_id}（共处理 {processed} 个任务）")
@@ -0,0 +1,140 @@
+"""
+本地目录模拟的对象存储
+实现 StorageService 用到的 TosClientV2 接口子集，用于离线开发和测试分片上传/断点续传：
+
+- 对象：<root>/<bucket>/<key>
+- 分片上传：<root>/.multipart/<upload_id>/ 下每个分片一个文件，meta.json 记录bucket和key
+- ETag：分片内容的MD5（与TOS一样带双引号）
+- 预签名URL：file:// 地址（本地文件，不能在浏览器中跨域访问）
+
+settings.TOS_LOCAL_STORE_DIR 不为空时 get_shared_client 返回本类实例
+"""
+import os
+import json
+import uuid
+import shutil
+import hashlib
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlencode
+
+import requests
+import tos
+
+
+class LocalObjectStore:
+    """本地目录对象存储（分片和对象都先写临时文件再改名，可在多个上传线程中使用）"""
+
+    def __init__(self, root):
+        """
+        Args:
+            root: 存储根目录
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # connection_stats() 遍历 session.adapters；本地存储没有连接，统计为0
+        self.session = requests.Session()
+
+    def object_path(self, bucket, key):
+        return self.root / bucket / key
+
+    def _upload_dir(self, upload_id):
+        return self.root / '.multipart' / upload_id
+
+    def _load_upload(self, bucket, key, upload_id):
+        meta_path = self._upload_dir(upload_id) / 'meta.json'
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            raise tos.exceptions.TosClientError(f"NoSuchUpload: {upload_id}")
+        if meta['bucket'] != bucket or meta['key'] != key:
+            raise tos.exceptions.TosClientError(f"NoSuchUpload: {upload_id}")
+        return meta
+
+    @staticmethod
+    def _write_atomic(path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def put_object_from_file(self, bucket, key, file_path, **kwargs):
+        path = self.object_path(bucket, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(file_path, path)
+        return SimpleNamespace(etag=f'"{hashlib.md5(path.read_bytes()).hexdigest()}"')
+
+    def delete_object(self, bucket, key):
+        path = self.object_path(bucket, key)
+        if path.exists():
+            path.unlink()
+
+    def head_object(self, bucket, key, **kwargs):
+        path = self.object_path(bucket, key)
+        if not path.is_file():
+            raise tos.exceptions.TosClientError(f"NoSuchKey: {key}")
+        return SimpleNamespace(content_length=path.stat().st_size)
+
+    def pre_signed_url(self, http_method, bucket, key=None, expires=3600, query=None, **kwargs):
+        params = {'X-Tos-Expires': expires, **(query or {})}
+        return SimpleNamespace(
+            signed_url=f"{self.object_path(bucket, key).resolve().as_uri()}?{urlencode(params)}"
+        )
+
+    def create_multipart_upload(self, bucket, key, **kwargs):
+        upload_id = uuid.uuid4().hex
+        self._write_atomic(
+            self._upload_dir(upload_id) / 'meta.json',
+            json.dumps({'bucket': bucket, 'key': key}).encode('utf-8'),
+        )
+        return SimpleNamespace(bucket=bucket, key=key, upload_id=upload_id)
+
+    def upload_part(self, bucket, key, upload_id, part_number, content=None, **kwargs):
+        self._load_upload(bucket, key, upload_id)
+        data = content.read() if hasattr(content, 'read') else bytes(content or b'')
+        self._write_atomic(self._upload_dir(upload_id) / f"{part_number:05d}.part", data)
+        return SimpleNamespace(part_number=part_number, etag=f'"{hashlib.md5(data).hexdigest()}"')
+
+    def list_parts(self, bucket, key, upload_id, part_number_marker=None, max_parts=1000):
+        self._load_upload(bucket, key, upload_id)
+        parts = []
+        for path in sorted(self._upload_dir(upload_id).glob('*.part')):
+            number = int(path.stem)
+            if part_number_marker and number <= part_number_marker:
+                continue
+            data = path.read_bytes()
+            parts.append(tos.models2.UploadedPart(number, f'"{hashlib.md5(data).hexdigest()}"', len(data)))
+        truncated = len(parts) > max_parts
+        parts = parts[:max_parts]
+        return SimpleNamespace(
+            parts=parts,
+            is_truncated=truncated,
+            next_part_number_marker=parts[-1].part_number if truncated else None,
+        )
+
+    def complete_multipart_upload(self, bucket, key, upload_id, parts, **kwargs):
+        self._load_upload(bucket, key, upload_id)
+        upload_dir = self._upload_dir(upload_id)
+        path = self.object_path(bucket, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        part_paths = []
+        for part in sorted(parts, key=lambda p: p.part_number):
+            part_path = upload_dir / f"{part.part_number:05d}.part"
+            if not part_path.exists():
+                raise tos.exceptions.TosClientError(f"InvalidPart: {part.part_number}")
+            if f'"{hashlib.md5(part_path.read_bytes()).hexdigest()}"' != part.etag:
+                raise tos.exceptions.TosClientError(f"InvalidPart: {part.part_number} ETag不匹配")
+            part_paths.append(part_path)
+
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(tmp_path, 'wb') as out:
+            for part_path in part_paths:
+                out.write(part_path.read_bytes())
+        os.replace(tmp_path, path)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        return SimpleNamespace(bucket=bucket, key=key, etag=f'"{hashlib.md5(path.read_bytes()).hexdigest()}"')
+
+    def abort_multipart_upload(self, bucket, key, upload_id):
+        self._load_upload(bucket, key, upload_id)
+        shutil.rmtree(self._upload_dir(upload_id), ignore_errors=True)
+        return SimpleNamespace(upload_id=upload_id)
@@ -0,0 +1,97 @@
+"""
+长文本语音合成服务
+文本按句拆分，句子去重后并行合成（本地模型按长度分组批量推理，云服务并发请求），
+再按原顺序拼接为一个WAV：句间插入静音，句子首尾淡入淡出（静音为0时相邻句子交叉淡化）
+
+每个句子的PCM保存在句子级缓存（sentence_store），
+修改段落后重新合成时只合成改动过的句子
+"""
+import os
+import uuid
+from datetime import datetime
+from django.conf import settings
+
+from ..text_utils import split_sentences
+from .tts_service import TTSServiceFactory, SENTENCE_SILENCE, concat_pcm, save_pcm_wav
+from .cache_service import cache_engine_for
+from .sentence_store import SentenceAudioStore, synthesize_with_cache
+
+
+def is_long_text(text):
+    """是否使用长文本流程（超过 LONG_TEXT_THRESHOLD 个字符）"""
+    return len(text or '') > getattr(settings, 'LONG_TEXT_THRESHOLD', 300)
+
+
+class LongTextService:
+    """长文本合成：拆句 -> 查句子缓存 -> 并行合成未命中的句子 -> 拼接"""
+
+    def __init__(self, tts_type='local', silence=None, crossfade=None, store=None):
+        """
+        Args:
+            tts_type: local 或 cloud
+            silence: 句间静音（秒），默认 LONG_TEXT_SILENCE
+            crossfade: 淡入淡出/交叉淡化时长（秒），默认 LONG_TEXT_CROSSFADE
+            store: 句子缓存，默认 SentenceAudioStore()
+        """
+        self.tts_type = cache_engine_for(tts_type)
+        self.service = TTSServiceFactory.get_service(self.tts_type)
+        self.silence = silence if silence is not None else getattr(
+            settings, 'LONG_TEXT_SILENCE', SENTENCE_SILENCE
+        )
+        self.crossfade = crossfade if crossfade is not None else getattr(
+            settings, 'LONG_TEXT_CROSSFADE', 0.01
+        )
+        self.store = store or SentenceAudioStore()
+
+    def synthesize(self, text, on_progress=None):
+        """
+        合成长文本
+
+        Args:
+            text: 英文文本
+            on_progress: 可选回调 on_progress(已完成句子数, 不重复句子总数)，合成过程中按批次调用，
+                任务用它刷新心跳（合成时间超过 TTS_JOB_STALE_TIMEOUT 的任务不会被当作卡住而重新排队）
+
+        Returns:
+            tuple: (success, file_path, error_message, stats)
+                stats: {'sentences': 句子数, 'unique': 不重复句子数, 'cached': 缓存命中数, 'synthesized': 新合成数}
+        """
+        sentences = split_sentences(text)
+        unique = list(dict.fromkeys(sentences))
+        stats = {'sentences': len(sentences), 'unique': len(unique), 'cached': 0, 'synthesized': 0}
+        if not sentences:
+            return False, None, "文本为空", stats
+
+        print(f"正在合成长文本（{self.tts_type}）: {len(sentences)} 句，{len(unique)} 句不重复")
+        if on_progress:
+            on_progress(0, len(unique))
+
+        # 1. 查句子缓存，并行合成未命中的句子
+        pcms, errors, cache_stats = synthesize_with_cache(self.service, unique, self.store, on_progress)
+        stats.update(cache_stats)
+
+        failed = [s for s in unique if s not in pcms]
+        if failed:
+            error_msg = f"长文本合成失败: {errors.get(failed[0], '未知错误')}（{len(failed)} 句失败）"
+            print(f"❌ {error_msg}")
+            return False, None, error_msg, stats
+        if on_progress:
+            on_progress(len(unique), len(unique))
+
+        # 2. 按原顺序拼接
+        try:
+            sample_rate = self.service.get_stream_sample_rate()
+            audio = concat_pcm([pcms[s] for s in sentences], sample_rate, self.silence, self.crossfade)
+            filename = f"{self.tts_type}_{uuid.uuid4().hex[:12]}_{int(datetime.now().timestamp())}.wav"
+            output_path = os.path.join(settings.AUDIO_OUTPUT_DIR, filename)
+            save_pcm_wav(output_path, audio, sample_rate)
+        except Exception as e:
+            error_msg = f"长文本拼接失败: {str(e)}"
+            print(f"❌ {error_msg}")
+            return False, None, error_msg, stats
+
+        print(
+            f"✅ 长文本合成成功: {output_path}"
+            f"（缓存命中 {stats['cached']} 句，新合成 {stats['synthesized']} 句）"
+        )
+        return True, output_path, None, stats
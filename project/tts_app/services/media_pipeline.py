@@ -0,0 +1,421 @@
+"""
+视频上传后处理流水线
+视频上传完成、记录创建后，缩略图、字幕等处理拆成相互独立的阶段，提交到后台线程池并发执行，
+上传接口只等视频本身传完就返回
+
+每个阶段的状态保存在 VideoRecord.pipeline（JSON）中：
+    {"probe": {"status": "success", "attempts": 1, "error": null, "seconds": 0.1, ...},
+     "thumbnail": {"status": "success", "attempts": 1, "error": null, "seconds": 0.8, ...},
+     "subtitle": {"status": "failed", "attempts": 1, "error": "...", "source": "暂存的字幕文件"}}
+
+probe（ffprobe读取时长、分辨率等）结束后才执行 thumbnail（按时长均匀取帧），其他阶段并发执行
+
+状态: pending（等待）→ running（执行中）→ success / failed；没有输入的阶段为 skipped
+失败的阶段可以单独重试（MediaPipeline.retry），不影响已成功的阶段；
+阶段在进程内线程池中排队，进程重启时排队中（pending）和执行中（running）的阶段会丢失，
+超过 MEDIA_PIPELINE_STAGE_TIMEOUT 仍未结束的这两种阶段同样允许重试
+"""
+import os
+import time
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from ..models import VideoRecord
+from .storage_service import StorageService
+from . import metrics
+
+# 处理阶段的后台线程池（阶段之间、视频之间并发）
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'MEDIA_PIPELINE_WORKERS', 4),
+    thread_name_prefix='media-pipeline'
+)
+
+# 同一进程内串行化 pipeline 字段的读-改-写（多个阶段同时结束时不丢失状态）
+_state_lock = threading.Lock()
+
+
+def _now_str():
+    return timezone.now().isoformat(timespec='seconds')
+
+
+def _video_storage():
+    return StorageService(bucket_name=getattr(settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video'))
+
+
+def _derived_key(object_key, prefix, ext):
+    """由视频key派生缩略图/字幕key：video_<id>_<ts>.mp4 -> thumb_<id>_<ts>.jpg"""
+    stem = os.path.splitext(os.path.basename(object_key))[0]
+    if stem.startswith('video_'):
+        stem = stem[len('video_'):]
+    return f"{prefix}_{stem}{ext}"
+
+
+def _expire_seconds(record):
+    """缩略图/字幕URL与视频URL同时过期"""
+    if not record.expire_time:
+        return 3600
+    return max(int((record.expire_time - timezone.now()).total_seconds()), 60)
+
+
+def update_stage(record_id, stage, fields=None, **changes):
+    """
+    更新一个阶段的状态（以及该阶段产出的记录字段）
+
+    Args:
+        record_id: 视频记录ID
+        stage: 阶段名
+        fields: 同时更新的记录字段，如 {'thumbnail_key': ..., 'thumbnail_url': ...}
+        **changes: 阶段状态中要修改的项
+
+    Returns:
+        dict: 更新后的 pipeline
+    """
+    with _state_lock, transaction.atomic():
+        record = VideoRecord.objects.select_for_update().only('id', 'pipeline').get(id=record_id)
+        pipeline = dict(record.pipeline or {})
+        state = dict(pipeline.get(stage) or {})
+        state.update(changes)
+        pipeline[stage] = state
+        VideoRecord.objects.filter(id=record_id).update(pipeline=pipeline, **(fields or {}))
+    return pipeline
+
+
+def _video_source(storage_service, record, video_source):
+    """本地视频（上传时保留的临时文件）存在时直接读取，否则使用预签名URL"""
+    if video_source and os.path.exists(video_source):
+        return True, video_source, None
+    success, url, _, error_msg = storage_service.generate_presigned_url(record.object_key, expires=3600)
+    return success, url, error_msg
+
+
+def run_probe(record, state, video_source):
+    """
+    媒体信息阶段：ffprobe 读取时长、分辨率、码率、编码、是否有音轨
+
+    Returns:
+        tuple: (success, fields, error_message)
+    """
+    from .media_probe_service import MediaProbeService
+
+    success, source, error_msg = _video_source(_video_storage(), record, video_source)
+    if not success:
+        return False, None, error_msg
+    return MediaProbeService().probe(source)
+
+
+def run_thumbnail(record, state, video_source):
+    """
+    缩略图阶段：一次 FFmpeg 调用提取多张候选缩略图和雪碧图并上传，第一张作为封面；
+    时长未知（probe 失败）时退回为截取单帧
+
+    Returns:
+        tuple: (success, fields, error_message)
+    """
+    from .thumbnail_service import ThumbnailService
+
+    storage_service = _video_storage()
+    success, source, error_msg = _video_source(storage_service, record, video_source)
+    if not success:
+        return False, None, error_msg
+
+    work_dir = tempfile.mkdtemp(prefix='thumbs_')
+    try:
+        thumb_service = ThumbnailService()
+        if record.duration:
+            success, result, error_msg = thumb_service.extract_frames(
+                source, work_dir, record.duration, video_size=(record.width, record.height)
+            )
+        else:
+            success, thumb_path, error_msg = thumb_service.generate_thumbnail(
+                source, output_path=os.path.join(work_dir, 'thumb_01.jpg')
+            )
+            result = {'thumbnails': [{'path': thumb_path, 'time': None}], 'sprite': None}
+        if not success:
+            return False, None, error_msg
+
+        # 上传候选缩略图和雪碧图，一次批量签名
+        thumbnails = []
+        for index, thumb in enumerate(result['thumbnails'], start=1):
+            key = _derived_key(record.object_key, 'thumb', f'_{index}.jpg')
+            success, _, error_msg = storage_service.upload_file(thumb['path'], key)
+            if not success:
+                return False, None, f"缩略图上传失败: {error_msg}"
+            thumbnails.append({'key': key, 'time': thumb['time']})
+        sprite = {}
+        if result['sprite']:
+            key = _derived_key(record.object_key, 'sprite', '.jpg')
+            success, _, error_msg = storage_service.upload_file(result['sprite'].pop('path'), key)
+            if not success:
+                return False, None, f"雪碧图上传失败: {error_msg}"
+            sprite = dict(result['sprite'], key=key)
+
+        signed = storage_service.generate_presigned_urls(
+            [thumb['key'] for thumb in thumbnails] + [sprite.get('key')], expires=_expire_seconds(record)
+        )
+        for item in thumbnails + ([sprite] if sprite else []):
+            item['url'] = signed.get(item['key'], (None,))[0]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return True, {
+        'thumbnail_key': thumbnails[0]['key'],
+        'thumbnail_url': thumbnails[0]['url'],
+        'thumbnails': thumbnails,
+        'sprite': sprite,
+    }, None
+
+
+def run_subtitle(record, state, video_source):
+    """
+    字幕阶段：上传暂存的字幕文件；字幕已在对象存储中（浏览器直传）时确认存在并签名
+
+    Returns:
+        tuple: (success, fields, error_message)
+    """
+    storage_service = _video_storage()
+    source = state.get('source')
+    if source:
+        if not os.path.exists(source):
+            return False, None, f"字幕暂存文件不存在: {source}"
+        subtitle_key = _derived_key(record.object_key, 'sub', os.path.splitext(source)[1].lower())
+        success, subtitle_url, _, error_msg = storage_service.upload_and_get_url(
+            source, object_key=subtitle_key, expires=_expire_seconds(record)
+        )
+        if not success:
+            return False, None, f"字幕上传失败: {error_msg}"
+        os.remove(source)
+        return True, {'subtitle_key': subtitle_key, 'subtitle_url': subtitle_url}, None
+
+    exists, _, error_msg = storage_service.head_object(record.subtitle_key)
+    if not exists:
+        return False, None, f"字幕未上传: {error_msg}"
+    success, subtitle_url, _, error_msg = storage_service.generate_presigned_url(
+        record.subtitle_key, expires=_expire_seconds(record)
+    )
+    if not success:
+        return False, None, error_msg
+    return True, {'subtitle_url': subtitle_url}, None
+
+
+class MediaPipeline:
+    """视频上传后处理流水线"""
+
+    # 阶段名 -> 处理函数 (record, state, video_source) -> (success, fields, error_message)
+    STAGES = {
+        'probe': run_probe,
+        'thumbnail': run_thumbnail,
+        'subtitle': run_subtitle,
+    }
+
+    # 阶段依赖：同时提交时在依赖的阶段结束后执行（依赖失败也会执行）
+    AFTER = {
+        'thumbnail': 'probe',
+    }
+
+    # 需要读取视频内容的阶段（全部结束后删除上传时保留的本地视频）
+    VIDEO_STAGES = ('probe', 'thumbnail')
+
+    @staticmethod
+    def staging_dir():
+        directory = str(getattr(
+            settings, 'MEDIA_PIPELINE_STAGING_DIR', os.path.join(settings.BASE_DIR, 'media', 'staging')
+        ))
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    @classmethod
+    def stage_upload(cls, uploaded_file, name):
+        """
+        把请求中的小文件（字幕）暂存到本地，供后台阶段上传；成功后由阶段删除，失败时保留以便重试
+
+        Args:
+            uploaded_file: request.FILES 中的文件
+            name: 暂存文件名
+
+        Returns:
+            str: 暂存文件路径
+        """
+        path = os.path.join(cls.staging_dir(), name)
+        with open(path, 'wb') as destination:
+            for chunk in uploaded_file.chunks():
+                destination.write(chunk)
+        return path
+
+    @classmethod
+    def start(cls, record, video_source=None, subtitle_source=None):
+        """
+        初始化各阶段状态并提交到后台执行
+
+        Args:
+            record: 已上传视频的 VideoRecord（需有 object_key）
+            video_source: 本地视频文件（可选）；交给流水线后由流水线在视频阶段结束后删除，
+                          没有时各阶段通过预签名URL读取视频
+            subtitle_source: 暂存的字幕文件（可选）；没有且 record.subtitle_key 为空时跳过字幕阶段
+
+        Returns:
+            dict: 初始的 pipeline 状态
+        """
+        pipeline = {}
+        queued_at = _now_str()
+        for stage in cls.STAGES:
+            pipeline[stage] = {'status': 'pending', 'attempts': 0, 'error': None, 'queued_at': queued_at}
+        pipeline['subtitle']['source'] = subtitle_source
+        if not subtitle_source and not record.subtitle_key:
+            pipeline['subtitle']['status'] = 'skipped'
+
+        VideoRecord.objects.filter(id=record.id).update(pipeline=pipeline)
+        record.pipeline = pipeline
+
+        stages = [stage for stage, state in pipeline.items() if state['status'] == 'pending']
+        cls._submit(record.id, stages, video_source)
+        metrics.incr('media_pipeline.started')
+        return pipeline
+
+    @classmethod
+    def retry(cls, record, stages=None):
+        """
+        重试失败（或超时卡在排队、执行中）的阶段
+
+        Args:
+            record: VideoRecord
+            stages: 要重试的阶段名列表，默认全部失败的阶段
+
+        Returns:
+            tuple: (success, retried_stages, error_message)
+        """
+        pipeline = record.pipeline or {}
+        stuck_after = getattr(settings, 'MEDIA_PIPELINE_STAGE_TIMEOUT', 600)
+
+        def stuck(since):
+            return (timezone.now() - datetime.fromisoformat(since)).total_seconds() > stuck_after
+
+        def retryable(state):
+            if state.get('status') == 'failed':
+                return True
+            # 进程退出时线程池中排队、执行中的阶段不会结束，超时后允许重试
+            if state.get('status') == 'running' and state.get('started_at'):
+                return stuck(state['started_at'])
+            if state.get('status') == 'pending':
+                # 没有 queued_at 的是记录排队时间之前提交的阶段，早已不在线程池中
+                return not state.get('queued_at') or stuck(state['queued_at'])
+            return False
+
+        if stages is None:
+            stages = [stage for stage, state in pipeline.items() if stage in cls.STAGES and retryable(state)]
+            if not stages:
+                return False, [], '没有需要重试的阶段'
+        else:
+            unknown = [stage for stage in stages if stage not in cls.STAGES]
+            if unknown:
+                return False, [], f'未知的阶段: {", ".join(unknown)}'
+            not_retryable = [stage for stage in stages if not retryable(pipeline.get(stage, {}))]
+            if not_retryable:
+                return False, [], f'只能重试失败的阶段: {", ".join(not_retryable)}'
+
+        queued_at = _now_str()
+        for stage in stages:
+            record.pipeline = update_stage(record.id, stage, status='pending', error=None, queued_at=queued_at)
+        cls._submit(record.id, stages, None)
+        metrics.incr('media_pipeline.retried', len(stages))
+        return True, stages, None
+
+    @classmethod
+    def _submit(cls, record_id, stages, video_source):
+        # 有依赖的阶段接在依赖阶段之后，同一个任务里顺序执行
+        chains = []
+        for stage in stages:
+            if cls.AFTER.get(stage) in stages:
+                continue
+            chain = [stage]
+            while True:
+                next_stage = next((other for other in stages if cls.AFTER.get(other) == chain[-1]), None)
+                if next_stage is None:
+                    break
+                chain.append(next_stage)
+            chains.append(chain)
+
+        video_chains = [chain for chain in chains if set(chain) & set(cls.VIDEO_STAGES)]
+        remaining = [len(video_chains)]
+        remaining_lock = threading.Lock()
+
+        def release_video_source(_future):
+            with remaining_lock:
+                remaining[0] -= 1
+                done = remaining[0] == 0
+            if done and video_source and os.path.exists(video_source):
+                os.remove(video_source)
+
+        for chain in chains:
+            future = _executor.submit(cls.run_chain, record_id, chain, video_source)
+            if video_source and chain in video_chains:
+                future.add_done_callback(release_video_source)
+        if video_source and not video_chains and os.path.exists(video_source):
+            os.remove(video_source)
+
+    @classmethod
+    def run_chain(cls, record_id, chain, video_source=None):
+        """依次执行一组有依赖关系的阶段"""
+        for stage in chain:
+            cls.run_stage(record_id, stage, video_source)
+
+    @classmethod
+    def run_stage(cls, record_id, stage, video_source=None):
+        """
+        执行一个阶段（在后台线程中执行，也可以直接调用）
+
+        Returns:
+            bool: 是否成功
+        """
+        close_old_connections()
+        start = time.perf_counter()
+        try:
+            record = VideoRecord.objects.get(id=record_id)
+            state = (record.pipeline or {}).get(stage) or {}
+            update_stage(
+                record_id, stage,
+                status='running', attempts=state.get('attempts', 0) + 1, started_at=_now_str(),
+            )
+            try:
+                success, fields, error_msg = cls.STAGES[stage](record, state, video_source)
+            except Exception as e:
+                success, fields, error_msg = False, None, str(e)
+
+            seconds = round(time.perf_counter() - start, 3)
+            update_stage(
+                record_id, stage, fields=fields if success else None,
+                status='success' if success else 'failed', error=error_msg,
+                finished_at=_now_str(), seconds=seconds,
+            )
+            metrics.observe(f'media_pipeline.{stage}', seconds)
+            if success:
+                print(f"✅ 视频{record_id} {stage} 完成（{seconds:.1f}秒）")
+            else:
+                metrics.incr(f'media_pipeline.{stage}_failed')
+                print(f"❌ 视频{record_id} {stage} 失败: {error_msg}")
+            return success
+        except VideoRecord.DoesNotExist:
+            return False
+        except Exception as e:
+            print(f"❌ 视频{record_id} {stage} 处理异常: {e}")
+            # 状态写入失败（如数据库锁）时尽量标记为失败，避免阶段一直停在 pending 无法重试
+            try:
+                update_stage(record_id, stage, status='failed', error=str(e), finished_at=_now_str())
+            except Exception:
+                pass
+            return False
+        finally:
+            close_old_connections()
+
+
+def discard_staged(pipeline):
+    """删除流水线暂存的文件（删除视频记录时调用）"""
+    for state in (pipeline or {}).values():
+        source = state.get('source') if isinstance(state, dict) else None
+        if source and os.path.exists(source):
+            os.remove(source)
@@ -0,0 +1,123 @@
+"""
+视频媒体信息探测服务
+
+运行一次 ffprobe，读取时长、分辨率、码率、编码格式、是否有音轨，保存到 VideoRecord
+"""
+import json
+import os
+import subprocess
+
+from .ffmpeg_pool import run_ffmpeg
+
+
+class MediaProbeService:
+    """视频媒体信息探测服务"""
+
+    # 写入 VideoRecord 的字段
+    FIELDS = ('duration', 'width', 'height', 'bitrate', 'video_codec', 'audio_codec', 'has_audio')
+
+    def __init__(self):
+        self.timeout = 30  # ffprobe 只读取文件头，30秒足够（包括URL）
+
+    def probe(self, video_path):
+        """
+        探测视频媒体信息
+
+        Args:
+            video_path: 视频文件路径，或 http(s) URL（ffprobe 只按需读取文件头）
+
+        Returns:
+            tuple: (success, info, error_msg)，info 的键见 FIELDS，无法确定的值为 None
+        """
+        is_url = video_path.startswith(('http://', 'https://'))
+        if not is_url and not os.path.exists(video_path):
+            return False, None, f"视频文件不存在: {video_path}"
+
+        cmd = [
+            'ffprobe',
+            '-v', 'error',
+            '-print_format', 'json',
+            '-show_format',
+            '-show_streams',
+            video_path
+        ]
+        try:
+            result = run_ffmpeg(cmd, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            return False, None, "媒体信息探测超时"
+        except FileNotFoundError:
+            return False, None, "未找到 ffprobe，请确保已安装 FFmpeg"
+
+        if result.returncode != 0:
+            error_msg = result.stderr[:500] if result.stderr else "未知错误"
+            return False, None, f"ffprobe 错误: {error_msg}"
+
+        try:
+            info = self.parse(json.loads(result.stdout or '{}'))
+        except ValueError as e:
+            return False, None, f"ffprobe 输出解析失败: {e}"
+        if info is None:
+            return False, None, "没有视频流"
+        return True, info, None
+
+    @staticmethod
+    def parse(data):
+        """
+        解析 ffprobe -show_format -show_streams 的JSON输出
+
+        Args:
+            data: ffprobe 输出的 dict
+
+        Returns:
+            dict | None: 媒体信息；没有视频流时为 None
+        """
+        streams = data.get('streams') or []
+        fmt = data.get('format') or {}
+
+        # 封面图（attached_pic）也是视频流，跳过
+        video = next((
+            s for s in streams
+            if s.get('codec_type') == 'video' and not (s.get('disposition') or {}).get('attached_pic')
+        ), None)
+        if video is None:
+            return None
+        audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+
+        duration = _to_float(fmt.get('duration')) or _to_float(video.get('duration'))
+        width, height = video.get('width'), video.get('height')
+
+        # 手机竖拍的视频以横向编码，旋转信息在 tags.rotate 或 side_data 中
+        rotation = _to_float((video.get('tags') or {}).get('rotate'))
+        for side_data in video.get('side_data_list') or []:
+            if 'rotation' in side_data:
+                rotation = _to_float(side_data['rotation'])
+        if rotation is not None and int(abs(rotation)) % 180 == 90:
+            width, height = height, width
+
+        bitrate = _to_int(fmt.get('bit_rate'))
+        if bitrate is None and duration and fmt.get('size'):
+            bitrate = int(int(fmt['size']) * 8 / duration)
+
+        return {
+            'duration': round(duration, 3) if duration else None,
+            'width': width,
+            'height': height,
+            'bitrate': bitrate,
+            'video_codec': video.get('codec_name'),
+            'audio_codec': audio.get('codec_name') if audio else None,
+            'has_audio': audio is not None,
+        }
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,194 @@
+"""
+运行指标
+计数器和耗时统计先在进程内累加，每隔 METRICS_FLUSH_INTERVAL 秒批量写入数据库
+（metric_counters / metric_timings，value = value + n 原子累加），
+Web进程、run_tts_worker、renew_urls 等所有进程汇总到同一处，通过 /api/metrics/ 查看；
+METRICS_SHARED = False 时只在进程内统计，不读写数据库
+"""
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+# 尚未写入数据库的增量
+_counters = {}
+_timings = {}
+_last_flush = time.monotonic()
+
+
+def _shared():
+    return getattr(settings, 'METRICS_SHARED', True)
+
+
+def _flush_interval():
+    return getattr(settings, 'METRICS_FLUSH_INTERVAL', 10)
+
+
+def incr(name, value=1):
+    """计数器加值"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+    _maybe_flush()
+
+
+def get(name, default=0):
+    """读取计数器（所有进程的累计值）"""
+    return snapshot().get(name, default)
+
+
+def snapshot():
+    """所有计数器的快照（所有进程的累计值）"""
+    from ..models import MetricCounter
+
+    result = {}
+    if _shared():
+        flush()
+        try:
+            result = dict(MetricCounter.objects.values_list('name', 'value'))
+        except DatabaseError:
+            pass
+    # 共享关闭、调用方处于事务中或写入失败时，未写入的增量仍保留在进程内，一并计入
+    with _lock:
+        for name, value in _counters.items():
+            result[name] = result.get(name, 0) + value
+    return result
+
+
+def observe(name, seconds):
+    """记录一次耗时（秒），汇总次数、平均值和最大值"""
+    with _lock:
+        stat = _timings.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+        stat['count'] += 1
+        stat['total'] += seconds
+        stat['max'] = max(stat['max'], seconds)
+    _maybe_flush()
+
+
+def timings():
+    """所有耗时统计的快照（毫秒，所有进程汇总）"""
+    from ..models import MetricTiming
+
+    stats = {}
+    if _shared():
+        flush()
+        try:
+            stats = {
+                row['name']: row
+                for row in MetricTiming.objects.values('name', 'count', 'total', 'max')
+            }
+        except DatabaseError:
+            pass
+    with _lock:
+        for name, pending in _timings.items():
+            stat = stats.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            stat['count'] += pending['count']
+            stat['total'] += pending['total']
+            stat['max'] = max(stat['max'], pending['max'])
+
+    return {
+        name: {
+            'count': stat['count'],
+            'avg_ms': round(stat['total'] / stat['count'] * 1000, 1),
+            'max_ms': round(stat['max'] * 1000, 1),
+        }
+        for name, stat in stats.items()
+        if stat['count']
+    }
+
+
+def _maybe_flush():
+    """距上次写入超过间隔时写入数据库；调用方处于事务中时推迟，避免随调用方的事务回滚"""
+    if not _shared() or time.monotonic() - _last_flush < _flush_interval():
+        return
+    if connection.in_atomic_block:
+        return
+    flush()
+
+
+def flush():
+    """
+    把进程内累加的增量写入数据库
+
+    Returns:
+        bool: 是否写入成功（失败时增量保留在进程内，下次再写）
+    """
+    global _last_flush
+
+    if not _shared() or connection.in_atomic_block:
+        return False
+
+    with _flush_lock:
+        with _lock:
+            counters = dict(_counters)
+            timing_stats = {name: dict(stat) for name, stat in _timings.items()}
+            _counters.clear()
+            _timings.clear()
+            _last_flush = time.monotonic()
+
+        if not counters and not timing_stats:
+            return True
+
+        try:
+            with transaction.atomic():
+                for name, value in counters.items():
+                    _write_counter(name, value)
+                for name, stat in timing_stats.items():
+                    _write_timing(name, stat)
+            return True
+        except DatabaseError as e:
+            with _lock:
+                for name, value in counters.items():
+                    _counters[name] = _counters.get(name, 0) + value
+                for name, pending in timing_stats.items():
+                    stat = _timings.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+                    stat['count'] += pending['count']
+                    stat['total'] += pending['total']
+                    stat['max'] = max(stat['max'], pending['max'])
+            print(f"⚠️ 运行指标写入数据库失败，稍后重试: {e}")
+            return False
+
+
+def _write_counter(name, value):
+    """value = value + n；行不存在时创建，并发创建冲突时改为累加"""
+    from ..models import MetricCounter
+
+    if MetricCounter.objects.filter(name=name).update(value=F('value') + value):
+        return
+    try:
+        with transaction.atomic():
+            MetricCounter.objects.create(name=name, value=value)
+    except IntegrityError:
+        MetricCounter.objects.filter(name=name).update(value=F('value') + value)
+
+
+def _write_timing(name, stat):
+    """累加次数和总耗时，最大耗时取两者中较大的"""
+    from ..models import MetricTiming
+
+    fields = {
+        'count': F('count') + stat['count'],
+        'total': F('total') + stat['total'],
+        'max': Greatest(F('max'), stat['max']),
+    }
+    if MetricTiming.objects.filter(name=name).update(**fields):
+        return
+    try:
+        with transaction.atomic():
+            MetricTiming.objects.create(name=name, **stat)
+    except IntegrityError:
+        MetricTiming.objects.filter(name=name).update(**fields)
+
+
+@atexit.register
+def _flush_at_exit():
+    """进程退出前写入剩余的增量（renew_urls 等短命令的计数不丢失）"""
+    try:
+        flush()
+    except Exception:
+        pass
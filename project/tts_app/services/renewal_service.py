@@ -0,0 +1,208 @@
+"""
+URL续期服务
+后台批量续期即将过期的预签名URL，读接口不再同步签名和写库
+
+- 管理命令: python manage.py renew_urls（常驻，或 --once 执行一次）
+- 进程内调度: URL_RENEWAL_IN_PROCESS = True 时随Web进程启动后台线程
+"""
+import time
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import AudioRecord, VideoRecord
+from .storage_service import StorageService
+from .video_url_service import renew_video_urls, save_renewed_urls
+from . import metrics
+
+
+class RenewalService:
+    """预签名URL批量续期"""
+
+    def __init__(self, window=None, expire_seconds=None, batch_size=None):
+        """
+        Args:
+            window: 续期在该时间（秒）内过期的记录，默认 URL_RENEWAL_WINDOW
+            expire_seconds: 续期后的有效期（秒），默认 URL_RENEWAL_EXPIRE
+            batch_size: 每批处理的记录数，默认 URL_RENEWAL_BATCH_SIZE
+        """
+        self.window = window or getattr(settings, 'URL_RENEWAL_WINDOW', 900)
+        self.expire_seconds = expire_seconds or getattr(settings, 'URL_RENEWAL_EXPIRE', 7200)
+        self.batch_size = batch_size or getattr(settings, 'URL_RENEWAL_BATCH_SIZE', 500)
+
+    def _expiring(self, model, deadline):
+        """即将过期（或已过期、没有过期时间）的成功记录，走 expire_time 索引"""
+        return model.objects.filter(
+            Q(expire_time__lt=deadline) | Q(expire_time__isnull=True),
+            status='success',
+        )
+
+    def renew_audio(self, deadline):
+        """
+        续期音频记录（签名 object_key；上传记录的path是源文件路径，不能用来推算Key。
+        共享同一文件的记录只签名一次）
+
+        Returns:
+            tuple: (renewed_count, failed_count)
+        """
+        storage_service = StorageService()
+        renewed = failed = 0
+        last_id = 0
+
+        while True:
+            batch = list(
+                self._expiring(AudioRecord, deadline)
+                .filter(id__gt=last_id, object_key__isnull=False)
+                .exclude(object_key='')
+                .order_by('id')
+                .only('id', 'object_key', 'preurl', 'expire_time')[:self.batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            signed = storage_service.generate_presigned_urls(
+                [record.object_key for record in batch],
+                expires=self.expire_seconds,
+            )
+
+            updated = []
+            for record in batch:
+                result = signed.get(record.object_key)
+                if result:
+                    record.preurl, record.expire_time = result
+                    updated.append(record)
+                else:
+                    failed += 1
+
+            AudioRecord.objects.bulk_update(updated, ['preurl', 'expire_time'])
+            renewed += len(updated)
+
+        return renewed, failed
+
+    def renew_videos(self, deadline):
+        """
+        续期视频记录（视频、缩略图、字幕一起签名）
+
+        Returns:
+            tuple: (renewed_count, failed_count)
+        """
+        renewed = failed = 0
+        last_id = 0
+
+        while True:
+            batch = list(
+                self._expiring(VideoRecord, deadline)
+                .filter(id__gt=last_id)
+                .exclude(object_key__isnull=True)
+                .exclude(object_key='')
+                .order_by('id')[:self.batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            updated = renew_video_urls(batch, self.expire_seconds)
+            save_renewed_urls(updated)
+            renewed += len(updated)
+            failed += len(batch) - len(updated)
+
+        return renewed, failed
+
+    def run_once(self):
+        """
+        执行一轮续期
+
+        Returns:
+            dict: 本轮续期统计
+        """
+        start = time.monotonic()
+        deadline = timezone.now() + timedelta(seconds=self.window)
+
+        audio_renewed, audio_failed = self.renew_audio(deadline)
+        video_renewed, video_failed = self.renew_videos(deadline)
+        elapsed = time.monotonic() - start
+
+        metrics.incr('renewal.runs')
+        metrics.incr('renewal.audio', audio_renewed)
+        metrics.incr('renewal.video', video_renewed)
+        metrics.incr('renewal.failed', audio_failed + video_failed)
+
+        renewed = audio_renewed + video_renewed
+        return {
+            'audio_renewed': audio_renewed,
+            'video_renewed': video_renewed,
+            'failed': audio_failed + video_failed,
+            'elapsed': round(elapsed, 3),
+            'rate': round(renewed / elapsed, 1) if elapsed > 0 else None,
+        }
+
+    @staticmethod
+    def backlog(window=None):
+        """
+        待续期的记录数（用于运行指标）
+
+        Returns:
+            dict: 各表已过期和即将过期的成功记录数
+        """
+        window = window or getattr(settings, 'URL_RENEWAL_WINDOW', 900)
+        now = timezone.now()
+        result = {}
+        for name, model in (('audio', AudioRecord), ('video', VideoRecord)):
+            success = model.objects.filter(status='success')
+            result[name] = {
+                'expired': success.expired(now).count(),
+                'expiring': success.expiring_within(timedelta(seconds=window), now).count(),
+            }
+        return result
+
+
+def run_renewal_loop(interval=None, stop_event=None, **kwargs):
+    """
+    续期主循环
+
+    Args:
+        interval: 两轮之间的间隔（秒），默认 URL_RENEWAL_INTERVAL
+        stop_event: threading.Event，设置后退出
+        **kwargs: 传给 RenewalService
+    """
+    interval = interval or getattr(settings, 'URL_RENEWAL_INTERVAL', 60)
+    service = RenewalService(**kwargs)
+    stop_event = stop_event or threading.Event()
+
+    while not stop_event.is_set():
+        close_old_connections()
+        try:
+            stats = service.run_once()
+            if stats['audio_renewed'] or stats['video_renewed'] or stats['failed']:
+                print(
+                    f"🔄 URL续期: 音频 {stats['audio_renewed']}，视频 {stats['video_renewed']}，"
+                    f"失败 {stats['failed']}，耗时 {stats['elapsed']}秒（{stats['rate']}条/秒）"
+                )
+        except Exception as e:
+            metrics.incr('renewal.errors')
+            print(f"❌ URL续期失败: {e}")
+        stop_event.wait(interval)
+
+
+_scheduler_lock = threading.Lock()
+_scheduler_thread = None
+
+
+def start_in_process_scheduler():
+    """在当前进程启动后台续期线程（重复调用只启动一次）"""
+    global _scheduler_thread
+    with _scheduler_lock:
+        if _scheduler_thread is not None and _scheduler_thread.is_alive():
+            return _scheduler_thread
+        _scheduler_thread = threading.Thread(
+            target=run_renewal_loop,
+            name='url-renewal',
+            daemon=True,
+        )
+        _scheduler_thread.start()
+        print("🚀 进程内URL续期线程已启动")
+        return _scheduler_thread
@@ -0,0 +1,228 @@
+"""
+全文搜索服务（SQLite FTS5）
+
+- audio_records_fts: AudioRecord.text
+- video_records_fts: VideoRecord.title / tags
+
+索引是外部内容表（content=原表），由数据库触发器同步，
+save()、bulk_create()、bulk_update()、QuerySet.update() 都会更新索引
+
+索引表由迁移 0011 创建；SQLite修改表结构时会重建原表、删除触发器，
+每次 migrate 之后由 post_migrate 调用 ensure_search_index 补建（迁移中不需要处理）
+
+查询规则：
+- 纯数字：按ID精确查找
+- 英文等：每个词前缀匹配（hel -> hello），多个词同时出现，按 bm25 排序
+- 包含中文：unicode61 分词不切分中文，回退到 LIKE 子串匹配
+- 非SQLite数据库或SQLite未编译FTS5时，全部回退到 LIKE
+"""
+import re
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# 表名 -> (原表, 索引列)
+FTS_TABLES = {
+    'audio_records_fts': ('audio_records', ['text']),
+    'video_records_fts': ('video_records', ['title', 'tags']),
+}
+
+# 中文、日文、韩文字符
+CJK_RE = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]')
+
+# 查询词（字母、数字，其他字符作为分隔符，与 unicode61 分词一致）
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_available = {}
+
+
+def install_search_index(conn):
+    """
+    创建FTS5索引表和同步触发器，并从原表重建索引（可重复执行）
+
+    Args:
+        conn: 数据库连接（migration 中为 schema_editor.connection）
+
+    Returns:
+        bool: 是否已安装（非SQLite或不支持FTS5时返回False）
+    """
+    if conn.vendor != 'sqlite':
+        return False
+
+    with conn.cursor() as cursor:
+        for fts, (table, columns) in FTS_TABLES.items():
+            cols = ', '.join(columns)
+            new_values = ', '.join(f'new.{c}' for c in columns)
+            old_values = ', '.join(f'old.{c}' for c in columns)
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                    f"{cols}, content='{table}', content_rowid='id', "
+                    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                )
+            except Exception as e:
+                print(f"❌ 创建全文索引失败（SQLite未启用FTS5？），搜索将使用LIKE: {e}")
+                return False
+
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            cursor.execute(
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END"
+            )
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    _available.clear()
+    return True
+
+
+def ensure_search_index(conn):
+    """
+    补建被删除的同步触发器（post_migrate 时调用）
+
+    只处理已安装的索引（迁移 0011 之后）；触发器齐全时不做任何操作，
+    有缺失时重新安装并重建索引（触发器缺失期间写入的数据没有进入索引）
+
+    Returns:
+        bool: 是否重新安装了触发器
+    """
+    if conn.vendor != 'sqlite':
+        return False
+
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = set(cursor.fetchall())
+
+    installed = [fts for fts in FTS_TABLES if ('table', fts) in existing]
+    missing = [
+        fts for fts in installed
+        if any(('trigger', f'{fts}_{suffix}') not in existing for suffix in ('ai', 'ad', 'au'))
+    ]
+    if not missing:
+        return False
+
+    print(f"🔧 重新创建全文索引触发器: {', '.join(missing)}")
+    return install_search_index(conn)
+
+
+def uninstall_search_index(conn):
+    """删除FTS5索引表和触发器（migration 回滚时使用）"""
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        for fts in FTS_TABLES:
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+    _available.clear()
+
+
+def fts_available(fts):
+    """当前数据库是否有该FTS5表（结果按连接别名缓存）"""
+    key = (connection.alias, fts)
+    if key not in _available:
+        _available[key] = (
+            connection.vendor == 'sqlite'
+            and fts in connection.introspection.table_names()
+        )
+    return _available[key]
+
+
+def build_match_query(query):
+    """
+    构建FTS5 MATCH表达式：每个词前缀匹配，多个词同时出现
+
+    Args:
+        query: 用户输入
+
+    Returns:
+        str 或 None（没有可搜索的词）
+    """
+    tokens = TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return None
+    # 每个词加引号，避免 AND/OR/NOT/NEAR 等被当作运算符
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+class SearchService:
+    """音频/视频记录搜索"""
+
+    @staticmethod
+    def _fts_filter(queryset, fts, match, ranked):
+        """按FTS结果过滤，ranked 时按 bm25 相关度排序"""
+        if not ranked:
+            return queryset.filter(
+                id__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match])
+            )
+        # 排序需要 rank 列：直接联接FTS表（关联子查询会对每一行重新执行MATCH）
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            tables=[fts],
+            where=[f"{fts}.rowid = {table}.id", f"{fts} MATCH %s"],
+            params=[match],
+            select={'search_rank': f"{fts}.rank"},
+        ).order_by('search_rank', '-id')
+
+    @classmethod
+    def search_audio(cls, queryset, query, ranked=False):
+        """
+        搜索音频记录文本
+
+        Args:
+            queryset: AudioRecord 查询集
+            query: 搜索关键词
+            ranked: 是否按相关度排序（否则保留调用方的排序/分页）
+
+        Returns:
+            QuerySet
+        """
+        query = query.strip()
+        if not query:
+            return queryset
+        if query.isdigit():
+            return queryset.filter(id=int(query))
+
+        match = build_match_query(query)
+        if match and not CJK_RE.search(query) and fts_available('audio_records_fts'):
+            return cls._fts_filter(queryset, 'audio_records_fts', match, ranked)
+        return queryset.filter(text__icontains=query)
+
+    @classmethod
+    def search_videos(cls, queryset, query='', tags=None, ranked=False):
+        """
+        搜索视频记录标题和标签
+
+        Args:
+            queryset: VideoRecord 查询集
+            query: 搜索关键词（匹配标题或标签）
+            tags: 标签过滤列表（每个标签都必须有，不区分大小写）
+            ranked: 是否按相关度排序
+
+        Returns:
+            QuerySet
+        """
+        query = (query or '').strip()
+
+        # 标签过滤走标签索引（video_record_tags），完整标签匹配
+        if tags:
+            queryset = queryset.with_tags(tags)
+
+        if not query:
+            return queryset
+        if query.isdigit():
+            return queryset.filter(id=int(query))
+
+        match = build_match_query(query)
+        if match and not CJK_RE.search(query) and fts_available('video_records_fts'):
+            return cls._fts_filter(queryset, 'video_records_fts', match, ranked)
+        return queryset.filter(Q(title__icontains=query) | Q(tags__icontains=query))
@@ -0,0 +1,235 @@
+"""
+句子级音频缓存
+常见句子在不同记录之间大量重复（句子语料、用户文本），每个句子只合成一次：
+
+- key：规范化句子 + 引擎参数（模型、音色、语速等）+ 采样率 的sha256
+- 文件：16bit单声道PCM，无文件头（比浮点波形小一半，拼接时不需要解码），
+  按key前两位分目录，避免单个目录文件过多
+- 索引：SentenceAudio 表记录大小、命中次数、最近访问时间，总大小超过 SENTENCE_CACHE_MAX_BYTES 时按LRU淘汰
+
+LocalTTSService / CloudTTSService 合成多句文本时通过 synthesize_with_cache 先查缓存，只合成未命中的句子
+"""
+import os
+import json
+import uuid
+import hashlib
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from ..models import SentenceAudio
+from ..text_utils import normalize_text
+from . import metrics
+
+
+def sentence_key(sentence, cache_params, sample_rate):
+    """
+    计算句子缓存key
+
+    Args:
+        sentence: 句子
+        cache_params: 引擎参数（TTS服务的 get_cache_params()）
+        sample_rate: 采样率
+
+    Returns:
+        str: 64位十六进制sha256
+    """
+    payload = json.dumps(
+        {'text': normalize_text(sentence), 'sample_rate': sample_rate, **cache_params},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SentenceAudioStore:
+    """句子PCM存储（文件 + SentenceAudio 索引）"""
+
+    def __init__(self, directory=None, max_bytes=None):
+        """
+        Args:
+            directory: PCM文件目录，默认 SENTENCE_AUDIO_DIR
+            max_bytes: 总大小上限，默认 SENTENCE_CACHE_MAX_BYTES
+        """
+        self.directory = str(directory or getattr(
+            settings, 'SENTENCE_AUDIO_DIR', os.path.join(settings.BASE_DIR, 'media', 'sentences')
+        ))
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(
+            settings, 'SENTENCE_CACHE_MAX_BYTES', 1024 * 1024 * 1024
+        )
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.pcm")
+
+    def get_many(self, keys):
+        """
+        读取多个句子的PCM，并更新命中次数和最近访问时间
+
+        索引存在但文件丢失的条目视为未命中并删除
+
+        Args:
+            keys: 缓存key列表
+
+        Returns:
+            dict: {key: PCM字节}（只包含命中的key）
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        missing_files = []
+        for key in SentenceAudio.objects.filter(cache_key__in=keys).values_list('cache_key', flat=True):
+            try:
+                with open(self.path_for(key), 'rb') as f:
+                    found[key] = f.read()
+            except FileNotFoundError:
+                missing_files.append(key)
+
+        if missing_files:
+            SentenceAudio.objects.filter(cache_key__in=missing_files).delete()
+        if found:
+            SentenceAudio.objects.filter(cache_key__in=list(found)).update(
+                hit_count=F('hit_count') + 1,
+                last_access=timezone.now(),
+            )
+
+        metrics.incr('sentence_cache.hit', len(found))
+        metrics.incr('sentence_cache.miss', len(keys) - len(found))
+        return found
+
+    def put_many(self, items, engine, sample_rate):
+        """
+        保存多个句子的PCM，超过上限时按LRU淘汰
+
+        Args:
+            items: {key: PCM字节}
+            engine: local 或 cloud
+            sample_rate: 采样率
+        """
+        if not items:
+            return
+
+        now = timezone.now()
+        entries = []
+        for key, pcm in items.items():
+            path = self.path_for(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再改名，并发写入同一key时不会读到半个文件
+            tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(pcm)
+            os.replace(tmp_path, path)
+            entries.append(SentenceAudio(
+                cache_key=key,
+                engine=engine,
+                sample_rate=sample_rate,
+                file_size=len(pcm),
+                created_at=now,
+                last_access=now,
+            ))
+
+        # 其他进程刚写入相同key时忽略冲突（文件内容相同）
+        SentenceAudio.objects.bulk_create(entries, ignore_conflicts=True)
+        metrics.incr('sentence_cache.stored', len(entries))
+        self.evict()
+
+    def evict(self, max_bytes=None):
+        """
+        按最近访问时间淘汰，直到总大小不超过上限
+
+        Returns:
+            tuple: (evicted_count, freed_bytes)
+        """
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        total = SentenceAudio.objects.aggregate(total=Sum('file_size'))['total'] or 0
+        if total <= max_bytes:
+            return 0, 0
+
+        evicted = []
+        freed = 0
+        for entry_id, key, size in SentenceAudio.objects.order_by('last_access').values_list(
+            'id', 'cache_key', 'file_size'
+        ).iterator(chunk_size=500):
+            if total - freed <= max_bytes:
+                break
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+            evicted.append(entry_id)
+            freed += size
+
+        for start in range(0, len(evicted), 500):
+            SentenceAudio.objects.filter(id__in=evicted[start:start + 500]).delete()
+
+        metrics.incr('sentence_cache.evicted', len(evicted))
+        print(f"✅ 句子缓存淘汰 {len(evicted)} 条，释放 {freed / 1024 / 1024:.1f}MB")
+        return len(evicted), freed
+
+    def stats(self):
+        """缓存统计（命中率为所有进程汇总的统计）"""
+        counters = metrics.snapshot()
+        hits = counters.get('sentence_cache.hit', 0)
+        misses = counters.get('sentence_cache.miss', 0)
+        lookups = hits + misses
+        aggregates = SentenceAudio.objects.aggregate(total=Sum('file_size'), hit_count=Sum('hit_count'))
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else None,
+            'entries': SentenceAudio.objects.count(),
+            'bytes': aggregates['total'] or 0,
+            'max_bytes': self.max_bytes,
+            'total_hits': aggregates['hit_count'] or 0,
+            'evicted': counters.get('sentence_cache.evicted', 0),
+        }
+
+
+def synthesize_with_cache(service, sentences, store=None, on_progress=None):
+    """
+    合成多个句子：先查句子缓存，只合成未命中的句子并写入缓存
+
+    Args:
+        service: LocalTTSService 或 CloudTTSService
+        sentences: 句子列表（可重复）
+        store: 句子存储，默认 SentenceAudioStore()
+        on_progress: 可选回调 on_progress(已完成句子数, 不重复句子总数)，缓存命中的句子算作已完成，
+            合成过程中按批次（云服务按句子）调用
+
+    Returns:
+        tuple: ({句子: PCM字节}, {句子: 错误信息}, stats)
+            stats: {'cached': 缓存命中句子数, 'synthesized': 新合成句子数}
+    """
+    unique = list(dict.fromkeys(sentences))
+    stats = {'cached': 0, 'synthesized': 0}
+    sample_rate = service.get_stream_sample_rate()
+    if not sample_rate:
+        return {}, {sentence: "模型加载失败" for sentence in unique}, stats
+
+    store = store or SentenceAudioStore()
+    params = service.get_cache_params()
+    keys = {sentence: sentence_key(sentence, params, sample_rate) for sentence in unique}
+
+    cached = store.get_many(keys.values())
+    pcms = {sentence: cached[key] for sentence, key in keys.items() if key in cached}
+    misses = [sentence for sentence in unique if sentence not in pcms]
+    stats['cached'] = len(pcms)
+
+    errors = {}
+    if misses:
+        def report(done, total):
+            on_progress(stats['cached'] + done, len(unique))
+
+        try:
+            synthesized, errors = service.synthesize_pcm(misses, on_progress=report if on_progress else None)
+        except Exception as e:
+            synthesized, errors = {}, {sentence: str(e) for sentence in misses}
+
+        # 部分句子失败时，成功的句子仍写入缓存，重试时只合成失败的句子
+        store.put_many(
+            {keys[sentence]: pcm for sentence, pcm in synthesized.items()},
+            engine=params['engine'],
+            sample_rate=sample_rate,
+        )
+        pcms.update(synthesized)
+        stats['synthesized'] = len(synthesized)
+
+    return pcms, errors, stats
@@ -1,13 +1,435 @@
 """
 对象存储服务
 上传文件到TOS并生成预签名URL
+
+TOS客户端在进程内按 (AK, endpoint, region, bucket) 共享：
+每个 StorageService 实例不再新建 TosClientV2，上传/签名复用已建立的keep-alive连接
+
+预签名URL在进程内按 (bucket, key, method) 缓存：剩余有效期足够时直接返回已签名的URL
+
+大文件使用分片上传（MultipartUploader）：数据按 TOS_MULTIPART_PART_SIZE 切片，
+线程池并行上传，同时在内存中的分片不超过 TOS_MULTIPART_CONCURRENCY 个
+
+本地大文件（超过 TOS_MULTIPART_THRESHOLD）由 upload_large_file 分片上传，已完成的分片记录在
+文件旁的断点文件（<文件>.tosupload）中，上传中断后再次上传同一文件时只上传剩余分片
+
+TOS_LOCAL_STORE_DIR 不为空时使用本地目录模拟对象存储（LocalObjectStore），用于离线开发和测试
 """
 import os
+import json
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import tos
 from datetime import timedelta
 from django.conf import settings
 from django.utils import timezone
 
+from . import metrics
+
+_clients_lock = threading.Lock()
+_clients = {}
+
+
+def get_shared_client(ak, sk, endpoint, region, bucket_name):
+    """
+    获取进程内共享的TOS客户端（线程安全）
+
+    Args:
+        ak, sk, endpoint, region: TOS连接参数
+        bucket_name: bucket名称
+
+    Returns:
+        tos.TosClientV2
+    """
+    key = (ak, endpoint, region, bucket_name)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            metrics.incr('storage.client_reused')
+            return client
+
+        local_store_dir = getattr(settings, 'TOS_LOCAL_STORE_DIR', None)
+        if local_store_dir:
+            from .local_object_store import LocalObjectStore
+            client = LocalObjectStore(local_store_dir)
+            _clients[key] = client
+            return client
+
+        client = tos.TosClientV2(
+            ak,
+            sk,
+            endpoint,
+            region,
+            max_connections=getattr(settings, 'TOS_MAX_CONNECTIONS', 64),
+            connection_time=getattr(settings, 'TOS_CONNECT_TIMEOUT', 10),
+            request_timeout=getattr(settings, 'TOS_REQUEST_TIMEOUT', 120),
+            max_retry_count=getattr(settings, 'TOS_MAX_RETRY_COUNT', 3),
+        )
+        _clients[key] = client
+        metrics.incr('storage.client_created')
+        return client
+
+
+_presign_lock = threading.Lock()
+_presign_cache = OrderedDict()
+
+
+def _presign_floor(expires):
+    """
+    缓存URL可复用的最低剩余有效期（秒）
+
+    取 PRESIGN_CACHE_MIN_REMAINING 与 请求有效期*PRESIGN_CACHE_MIN_RATIO 中较大者，
+    避免请求长有效期时拿到即将过期的URL
+    """
+    return max(
+        getattr(settings, 'PRESIGN_CACHE_MIN_REMAINING', 300),
+        expires * getattr(settings, 'PRESIGN_CACHE_MIN_RATIO', 0.5),
+    )
+
+
+def _presign_cache_get(cache_key, expires):
+    """查找可复用的预签名URL，返回 (url, expire_time) 或 None"""
+    with _presign_lock:
+        cached = _presign_cache.get(cache_key)
+        if cached is None:
+            return None
+        url, expire_time = cached
+        if (expire_time - timezone.now()).total_seconds() < _presign_floor(expires):
+            del _presign_cache[cache_key]
+            return None
+        _presign_cache.move_to_end(cache_key)
+        return cached
+
+
+def _presign_cache_put(cache_key, url, expire_time):
+    """登记预签名URL，超过 PRESIGN_CACHE_MAX_ENTRIES 时淘汰最久未用的"""
+    max_entries = getattr(settings, 'PRESIGN_CACHE_MAX_ENTRIES', 10000)
+    with _presign_lock:
+        _presign_cache[cache_key] = (url, expire_time)
+        _presign_cache.move_to_end(cache_key)
+        while len(_presign_cache) > max_entries:
+            _presign_cache.popitem(last=False)
+
+
+def invalidate_presigned_url(bucket_name, object_key):
+    """删除对象后移除其缓存的预签名URL"""
+    with _presign_lock:
+        for cache_key in [k for k in _presign_cache if k[0] == bucket_name and k[1] == object_key]:
+            del _presign_cache[cache_key]
+
+
+def reset_shared_clients():
+    """关闭并清空共享客户端（修改TOS配置后调用）"""
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                client.session.close()
+            except Exception:
+                pass
+        _clients.clear()
+
+
+def connection_stats():
+    """
+    共享客户端的连接复用统计
+
+    Returns:
+        dict: clients（客户端数）、connections（新建的TCP/TLS连接数）、
+              requests（发出的HTTP请求数）、reuse_rate（复用已有连接的请求占比）
+    """
+    connections = 0
+    requests_sent = 0
+    with _clients_lock:
+        clients = list(_clients.items())
+
+    buckets = []
+    for (_, _, _, bucket_name), client in clients:
+        buckets.append(bucket_name)
+        for adapter in client.session.adapters.values():
+            pools = adapter.poolmanager.pools
+            for pool_key in list(pools.keys()):
+                pool = pools.get(pool_key)
+                if pool is None:
+                    continue
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+
+    return {
+        'clients': len(clients),
+        'buckets': sorted(buckets),
+        'connections': connections,
+        'requests': requests_sent,
+        'reuse_rate': round(1 - connections / requests_sent, 4) if requests_sent else None,
+    }
+
+
+class MultipartUploader:
+    """
+    分片上传写入器
+
+    调用方不断 write() 数据（可以是请求体的小块），满一个分片就提交给线程池上传；
+    上传中的分片达到并发上限时 write() 阻塞，内存占用不超过 (concurrency + 1) * part_size
+
+    用法:
+        uploader = MultipartUploader(storage_service, object_key)
+        uploader.start()
+        for chunk in chunks:
+            uploader.write(chunk)
+        success, error_msg = uploader.complete()
+
+    也可以用 upload_part() 按编号提交分片（续传时跳过已完成的分片）
+    """
+
+    def __init__(self, storage, object_key, part_size=None, concurrency=None, content_type=None,
+                 on_part_uploaded=None, abort_on_error=True):
+        """
+        Args:
+            storage: StorageService实例（决定bucket）
+            object_key: 对象存储中的key
+            part_size: 分片大小（字节），默认 TOS_MULTIPART_PART_SIZE（最后一片可以更小）
+            concurrency: 并行上传的分片数，默认 TOS_MULTIPART_CONCURRENCY
+            content_type: 可选的Content-Type
+            on_part_uploaded: 分片上传成功的回调 (part_number, etag)，在上传线程中调用
+            abort_on_error: 失败时是否取消分片上传；续传时传False，保留已上传的分片
+        """
+        self.storage = storage
+        self.object_key = object_key
+        self.part_size = part_size or getattr(settings, 'TOS_MULTIPART_PART_SIZE', 8 * 1024 * 1024)
+        self.concurrency = concurrency or getattr(settings, 'TOS_MULTIPART_CONCURRENCY', 4)
+        self.content_type = content_type
+        self.on_part_uploaded = on_part_uploaded
+        self.abort_on_error = abort_on_error
+        self.upload_id = None
+        self.error = None
+        self.bytes_written = 0
+        self._buffer = bytearray()
+        self._parts = {}
+        self._resumed_parts = 0
+        self._futures = []
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._executor = None
+        self._started_at = None
+        self._finished_at = None
+
+    def start(self, upload_id=None, uploaded_parts=None):
+        """
+        创建分片上传任务
+
+        Args:
+            upload_id: 续传已有的分片上传任务时传入，不再新建
+            uploaded_parts: 续传时已完成的分片 {part_number: etag}
+        """
+        if upload_id:
+            self.upload_id = upload_id
+            self._parts.update(uploaded_parts or {})
+            self._resumed_parts = len(self._parts)
+        else:
+            output = self.storage.get_client().create_multipart_upload(
+                self.storage.bucket_name, self.object_key, content_type=self.content_type
+            )
+            self.upload_id = output.upload_id
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='tos-part')
+        self._started_at = time.perf_counter()
+        return self.upload_id
+
+    def _upload_part(self, part_number, data):
+        try:
+            output = self.storage.get_client().upload_part(
+                self.storage.bucket_name, self.object_key, self.upload_id, part_number, content=bytes(data)
+            )
+            self._parts[part_number] = output.etag
+            if self.on_part_uploaded is not None:
+                self.on_part_uploaded(part_number, output.etag)
+        except Exception as e:
+            self.error = self.error or f"分片 {part_number} 上传失败: {getattr(e, 'message', e)}"
+        finally:
+            self._slots.release()
+
+    def _submit(self, data):
+        self.upload_part(len(self._futures) + 1, data)
+
+    def upload_part(self, part_number, data):
+        """
+        按编号提交一个分片（上传中的分片达到上限时阻塞）
+
+        Raises:
+            RuntimeError: 之前的分片上传失败
+        """
+        if self.error:
+            raise RuntimeError(self.error)
+        # 上传中的分片达到上限时阻塞，限制内存占用（也让读取速度跟上传速度匹配）
+        self._slots.acquire()
+        self.bytes_written += len(data)
+        self._futures.append(self._executor.submit(self._upload_part, part_number, data))
+
+    def write(self, data):
+        """
+        写入数据（满一个分片时提交上传）
+
+        Raises:
+            RuntimeError: 之前的分片上传失败
+        """
+        if self.error:
+            raise RuntimeError(self.error)
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            part = self._buffer[:self.part_size]
+            del self._buffer[:self.part_size]
+            self._submit(part)
+
+    def complete(self):
+        """
+        上传剩余数据、等待所有分片完成并合并
+
+        Returns:
+            tuple: (success, error_message)
+        """
+        try:
+            if self._buffer or not (self._futures or self._parts):
+                self._submit(self._buffer)
+                self._buffer = bytearray()
+            for future in self._futures:
+                future.result()
+            if self.error:
+                raise RuntimeError(self.error)
+
+            parts = [tos.models2.UploadedPart(number, etag) for number, etag in sorted(self._parts.items())]
+            self.storage.get_client().complete_multipart_upload(
+                self.storage.bucket_name, self.object_key, self.upload_id, parts
+            )
+        except Exception as e:
+            self.error = self.error or f"分片上传失败: {getattr(e, 'message', e)}"
+            if self.abort_on_error:
+                self.abort()
+            else:
+                self._executor.shutdown(wait=True)
+            return False, self.error
+        finally:
+            self._finished_at = time.perf_counter()
+            self._executor.shutdown(wait=False)
+
+        metrics.incr('storage.multipart_uploads')
+        metrics.incr('storage.multipart_bytes', self.bytes_written)
+        metrics.observe('storage.multipart_upload', self._finished_at - self._started_at)
+        return True, None
+
+    def abort(self):
+        """取消分片上传（删除已上传的分片）"""
+        if self._executor is not None:
+            for future in self._futures:
+                future.cancel()
+            self._executor.shutdown(wait=True)
+        if self.upload_id is None:
+            return
+        try:
+            self.storage.get_client().abort_multipart_upload(
+                self.storage.bucket_name, self.object_key, self.upload_id
+            )
+        except Exception as e:
+            print(f"❌ 取消分片上传失败: {self.object_key} - {e}")
+
+    def stats(self):
+        """
+        吞吐统计
+
+        Returns:
+            dict: bytes、parts、seconds、mb_per_s（本次上传的数据；续传时不含之前已完成的分片）
+        """
+        end = self._finished_at or time.perf_counter()
+        seconds = end - self._started_at if self._started_at else 0
+        return {
+            'bytes': self.bytes_written,
+            'parts': len(self._futures),
+            'seconds': round(seconds, 3),
+            'mb_per_s': round(self.bytes_written / 1024 / 1024 / seconds, 2) if seconds else None,
+        }
+
+
+class UploadCheckpoint:
+    """
+    分片上传断点文件（JSON）
+
+    记录 bucket、object_key、upload_id、文件大小/修改时间、分片大小和已完成分片的ETag；
+    文件或分片参数变化后断点失效，重新上传
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path_for(local_file_path):
+        """断点文件路径：TOS_UPLOAD_CHECKPOINT_DIR 下，未配置时放在上传文件旁"""
+        checkpoint_dir = getattr(settings, 'TOS_UPLOAD_CHECKPOINT_DIR', None)
+        if not checkpoint_dir:
+            return f"{local_file_path}.tosupload"
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        name = os.path.basename(local_file_path)
+        digest = uuid.uuid5(uuid.NAMESPACE_URL, os.path.abspath(local_file_path)).hex[:12]
+        return os.path.join(str(checkpoint_dir), f"{name}.{digest}.tosupload")
+
+    def load(self, bucket_name, object_key, file_stat, part_size):
+        """
+        读取与当前文件和参数匹配的断点
+
+        Returns:
+            dict | None: 断点内容；不存在、损坏或不匹配时为None（不匹配时 self.data 保留旧断点，便于取消旧任务）
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = None
+            return None
+
+        expected = {
+            'bucket': bucket_name,
+            'object_key': object_key,
+            'file_size': file_stat.st_size,
+            'file_mtime': file_stat.st_mtime,
+            'part_size': part_size,
+        }
+        if any(self.data.get(name) != value for name, value in expected.items()):
+            return None
+        return self.data
+
+    def begin(self, bucket_name, object_key, file_stat, part_size, upload_id):
+        """新建断点"""
+        self.data = {
+            'bucket': bucket_name,
+            'object_key': object_key,
+            'file_size': file_stat.st_size,
+            'file_mtime': file_stat.st_mtime,
+            'part_size': part_size,
+            'upload_id': upload_id,
+            'parts': {},
+        }
+        self._save()
+
+    def record_part(self, part_number, etag):
+        """记录完成的分片（上传线程中调用）"""
+        with self._lock:
+            self.data['parts'][str(part_number)] = etag
+            self._save()
+
+    def uploaded_parts(self):
+        return {int(number): etag for number, etag in (self.data or {}).get('parts', {}).items()}
+
+    def _save(self):
+        # 先写临时文件再改名，进程中途被杀也不会留下半个JSON
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
 
 class StorageService:
     """TOS对象存储服务"""
@@ -27,13 +449,14 @@ class StorageService:
         self.client = None
     
     def get_client(self):
-        """获取TOS客户端"""
+        """获取TOS客户端（进程内共享，见 get_shared_client）"""
         if self.client is None:
-            self.client = tos.TosClientV2(
+            self.client = get_shared_client(
                 self.ak,
                 self.sk,
                 self.endpoint,
-                self.region
+                self.region,
+                self.bucket_name
             )
         return self.client
     
@@ -83,38 +506,304 @@ class StorageService:
             print(f"❌ {error_msg}")
             return False, None, error_msg
     
-    def generate_presigned_url(self, object_key, expires=3600):
+    def upload_large_file(self, local_file_path, object_key=None, part_size=None, concurrency=None):
         """
-        生成预签名URL
+        分片并行上传大文件（断点续传）
+        
+        已完成的分片记录在断点文件中（见 UploadCheckpoint）；上传失败或进程中断后，
+        再次上传同一文件到同一key时复用原分片上传任务，只上传剩余分片
         
         Args:
-            object_key: 对象存储中的key
-            expires: 过期时间（秒），默认3600秒（1小时）
+            local_file_path: 本地文件路径
+            object_key: 对象存储中的key，默认使用文件名
+            part_size: 分片大小（字节），默认 TOS_MULTIPART_PART_SIZE
+            concurrency: 并行上传的分片数，默认 TOS_MULTIPART_CONCURRENCY
             
         Returns:
-            tuple: (success, presigned_url, expire_time, error_message)
+            tuple: (success, object_key, error_message)
         """
+        if not os.path.exists(local_file_path):
+            return False, None, f"文件不存在: {local_file_path}"
+        
+        if object_key is None:
+            object_key = os.path.basename(local_file_path)
+        part_size = part_size or getattr(settings, 'TOS_MULTIPART_PART_SIZE', 8 * 1024 * 1024)
+        file_stat = os.stat(local_file_path)
+        total_parts = max(1, -(-file_stat.st_size // part_size))
+        checkpoint = UploadCheckpoint(UploadCheckpoint.path_for(local_file_path))
+        
         try:
-            client = self.get_client()
+            resumed = checkpoint.load(self.bucket_name, object_key, file_stat, part_size)
+            uploaded_parts = {}
+            if resumed:
+                uploaded_parts = self._list_uploaded_parts(resumed['upload_id'], object_key, checkpoint.uploaded_parts())
+                if uploaded_parts is None:
+                    # 分片上传任务已过期或被取消，重新上传
+                    resumed, uploaded_parts = None, {}
+            elif checkpoint.data and checkpoint.data.get('upload_id'):
+                # 文件或参数已变化，取消旧任务释放已上传的分片
+                self._abort_upload(checkpoint.data.get('object_key'), checkpoint.data['upload_id'])
             
-            print(f"正在生成预签名URL: {object_key}, 有效期: {expires}秒")
+            uploader = MultipartUploader(
+                self, object_key, part_size=part_size, concurrency=concurrency,
+                on_part_uploaded=checkpoint.record_part, abort_on_error=False,
+            )
+            if resumed:
+                uploader.start(upload_id=resumed['upload_id'], uploaded_parts=uploaded_parts)
+                metrics.incr('storage.multipart_resumed')
+                print(f"正在续传文件到TOS: {local_file_path} -> {object_key}"
+                      f"（已完成 {len(uploaded_parts)}/{total_parts} 个分片）")
+            else:
+                uploader.start()
+                checkpoint.begin(self.bucket_name, object_key, file_stat, part_size, uploader.upload_id)
+                print(f"正在分片上传文件到TOS: {local_file_path} -> {object_key}"
+                      f"（{total_parts} 个分片，并发 {uploader.concurrency}）")
+            
+            with open(local_file_path, 'rb') as f:
+                for part_number in range(1, total_parts + 1):
+                    if part_number in uploaded_parts:
+                        continue
+                    f.seek((part_number - 1) * part_size)
+                    try:
+                        uploader.upload_part(part_number, f.read(part_size))
+                    except RuntimeError:
+                        # 已有分片失败：不再提交，等待上传中的分片写入断点
+                        break
             
-            # 生成预签名URL
-            result = client.pre_signed_url(
-                tos.HttpMethodType.Http_Method_Get,
-                bucket=self.bucket_name,
-                key=object_key,
-                expires=expires
+            success, error_msg = uploader.complete()
+        except Exception as e:
+            success, error_msg = False, str(e)
+        
+        if not success:
+            error_msg = f"分片上传失败: {error_msg}"
+            print(f"❌ {error_msg}（已完成的分片已记录，重新上传时续传）")
+            return False, None, error_msg
+        
+        checkpoint.remove()
+        stats = uploader.stats()
+        print(f"✅ 文件分片上传成功: {object_key}"
+              f"（本次 {stats['parts']} 个分片，{stats['bytes'] / 1024 / 1024:.1f}MB，"
+              f"{stats['mb_per_s'] or 0:.1f}MB/s）")
+        return True, object_key, None
+    
+    def list_parts(self, object_key, upload_id):
+        """
+        列出分片上传任务中服务端已有的分片
+        
+        Returns:
+            dict: {part_number: etag}
+        
+        Raises:
+            分片上传任务不存在（已完成、已取消或过期）时抛出SDK异常
+        """
+        client = self.get_client()
+        parts = {}
+        marker = None
+        while True:
+            output = client.list_parts(self.bucket_name, object_key, upload_id, part_number_marker=marker)
+            for part in output.parts:
+                parts[part.part_number] = part.etag
+            if not output.is_truncated:
+                return parts
+            marker = output.next_part_number_marker
+    
+    def _list_uploaded_parts(self, upload_id, object_key, recorded_parts):
+        """
+        核对断点中记录的分片：只保留服务端存在且ETag一致的分片
+        
+        Returns:
+            dict | None: {part_number: etag}；分片上传任务不存在时为None
+        """
+        try:
+            server_parts = self.list_parts(object_key, upload_id)
+        except Exception as e:
+            print(f"断点失效，重新上传: {getattr(e, 'message', e)}")
+            return None
+        return {
+            number: etag for number, etag in recorded_parts.items()
+            if server_parts.get(number) == etag
+        }
+    
+    def _abort_upload(self, object_key, upload_id):
+        """取消分片上传任务（失败时忽略）"""
+        try:
+            self.get_client().abort_multipart_upload(self.bucket_name, object_key, upload_id)
+        except Exception as e:
+            print(f"❌ 取消分片上传失败: {object_key} - {e}")
+    
+    def create_multipart_upload(self, object_key, content_type=None):
+        """
+        创建分片上传任务（分片由浏览器直接上传时使用）
+        
+        Returns:
+            tuple: (success, upload_id, error_message)
+        """
+        try:
+            output = self.get_client().create_multipart_upload(
+                self.bucket_name, object_key, content_type=content_type
             )
+            return True, output.upload_id, None
+        except Exception as e:
+            error_msg = f"创建分片上传失败: {getattr(e, 'message', e)}"
+            print(f"❌ {error_msg}")
+            return False, None, error_msg
+    
+    def complete_multipart_upload(self, object_key, upload_id, parts=None):
+        """
+        合并分片
+        
+        Args:
+            object_key: 对象存储中的key
+            upload_id: 分片上传任务ID
+            parts: [(part_number, etag)]；为None时以服务端已有的分片为准（浏览器读不到ETag时）
             
-            # 计算过期时间（使用Django的timezone.now()以支持时区）
-            expire_time = timezone.now() + timedelta(seconds=expires)
+        Returns:
+            tuple: (success, error_message)
+        """
+        try:
+            if parts is None:
+                parts = self.list_parts(object_key, upload_id).items()
+            uploaded = [tos.models2.UploadedPart(int(number), etag) for number, etag in sorted(parts)]
+            if not uploaded:
+                return False, "没有已上传的分片"
+            self.get_client().complete_multipart_upload(self.bucket_name, object_key, upload_id, uploaded)
+            invalidate_presigned_url(self.bucket_name, object_key)
+            metrics.incr('storage.multipart_uploads')
+            print(f"✅ 分片合并成功: {object_key}（{len(uploaded)} 个分片）")
+            return True, None
+        except Exception as e:
+            error_msg = f"分片合并失败: {getattr(e, 'message', e)}"
+            print(f"❌ {error_msg}")
+            return False, error_msg
+    
+    def abort_multipart_upload(self, object_key, upload_id):
+        """
+        取消分片上传任务
+        
+        Returns:
+            tuple: (success, error_message)
+        """
+        try:
+            self.get_client().abort_multipart_upload(self.bucket_name, object_key, upload_id)
+            return True, None
+        except Exception as e:
+            error_msg = f"取消分片上传失败: {getattr(e, 'message', e)}"
+            print(f"❌ {error_msg}")
+            return False, error_msg
+    
+    def head_object(self, object_key):
+        """
+        查询对象大小（确认浏览器直传是否完成）
+        
+        Returns:
+            tuple: (exists, size, error_message)
+        """
+        try:
+            output = self.get_client().head_object(self.bucket_name, object_key)
+            return True, output.content_length, None
+        except Exception as e:
+            return False, None, f"对象不存在或无法访问: {getattr(e, 'message', e)}"
+    
+    def generate_presigned_put_url(self, object_key, expires=3600, content_type=None):
+        """
+        生成上传用的预签名PUT URL（浏览器直传，不经过Django）
+        
+        Args:
+            object_key: 对象存储中的key
+            expires: 有效期（秒）
+            content_type: 签名中包含的Content-Type，上传时必须携带相同的请求头
             
-            print(f"✅ 预签名URL生成成功")
-            print(f"   URL: {result.signed_url[:100]}...")
-            print(f"   过期时间: {expire_time}")
+        Returns:
+            tuple: (success, presigned_url, expire_time, error_message)
+        """
+        header = {'Content-Type': content_type} if content_type else None
+        try:
+            url, expire_time = self._sign(object_key, expires, tos.HttpMethodType.Http_Method_Put, header=header)
+            metrics.incr('presign.put_signed')
+            return True, url, expire_time, None
+        except Exception as e:
+            error_msg = f"生成上传URL失败: {getattr(e, 'message', e)}"
+            print(f"❌ {error_msg}")
+            return False, None, None, error_msg
+    
+    def generate_presigned_part_urls(self, object_key, upload_id, part_numbers, expires=3600):
+        """
+        为分片上传任务的分片生成预签名PUT URL
+        
+        Args:
+            object_key: 对象存储中的key
+            upload_id: 分片上传任务ID
+            part_numbers: 分片编号列表（从1开始）
+            expires: 有效期（秒）
             
-            return True, result.signed_url, expire_time, None
+        Returns:
+            tuple: (success, {part_number: url}, expire_time, error_message)
+        """
+        urls = {}
+        expire_time = None
+        try:
+            for part_number in part_numbers:
+                urls[part_number], expire_time = self._sign(
+                    object_key, expires, tos.HttpMethodType.Http_Method_Put,
+                    query={'partNumber': str(part_number), 'uploadId': upload_id},
+                )
+        except Exception as e:
+            error_msg = f"生成分片上传URL失败: {getattr(e, 'message', e)}"
+            print(f"❌ {error_msg}")
+            return False, {}, None, error_msg
+        metrics.incr('presign.put_signed', len(urls))
+        return True, urls, expire_time, None
+    
+    def _sign(self, object_key, expires, method, header=None, query=None):
+        """调用SDK计算预签名URL（本地计算，不发起网络请求）"""
+        extra = {}
+        if header:
+            extra['header'] = header
+        if query:
+            extra['query'] = query
+        result = self.get_client().pre_signed_url(
+            method,
+            bucket=self.bucket_name,
+            key=object_key,
+            expires=expires,
+            **extra
+        )
+        # 计算过期时间（使用Django的timezone.now()以支持时区）
+        return result.signed_url, timezone.now() + timedelta(seconds=expires)
+    
+    def generate_presigned_url(self, object_key, expires=3600, method=tos.HttpMethodType.Http_Method_Get,
+                               use_cache=True):
+        """
+        生成预签名URL
+        
+        缓存中同一 (bucket, key, method) 的URL剩余有效期足够时直接返回，
+        返回的过期时间是该URL实际的过期时间
+        
+        Args:
+            object_key: 对象存储中的key
+            expires: 过期时间（秒），默认3600秒（1小时）
+            method: HTTP方法，默认GET
+            use_cache: 是否复用缓存的URL；显式续期时传False，总是重新签名
+            
+        Returns:
+            tuple: (success, presigned_url, expire_time, error_message)
+        """
+        cache_key = (self.bucket_name, object_key, method)
+        
+        if use_cache:
+            cached = _presign_cache_get(cache_key, expires)
+            if cached:
+                metrics.incr('presign.cache_hit')
+                return True, cached[0], cached[1], None
+        
+        try:
+            signed_url, expire_time = self._sign(object_key, expires, method)
+            _presign_cache_put(cache_key, signed_url, expire_time)
+            metrics.incr('presign.signed')
+            
+            print(f"✅ 预签名URL生成成功: {object_key}, 有效期: {expires}秒")
+            
+            return True, signed_url, expire_time, None
             
         except tos.exceptions.TosClientError as e:
             error_msg = f"TOS客户端错误: {e.message}"
@@ -129,10 +818,51 @@ class StorageService:
             print(f"❌ {error_msg}")
             return False, None, None, error_msg
     
+    def generate_presigned_urls(self, object_keys, expires=3600, method=tos.HttpMethodType.Http_Method_Get,
+                                use_cache=True):
+        """
+        批量生成预签名URL（渲染列表时一次签名所有key）
+        
+        Args:
+            object_keys: 对象存储key列表（忽略空值，重复的key只签名一次）
+            expires: 过期时间（秒）
+            method: HTTP方法，默认GET
+            use_cache: 是否复用缓存的URL
+            
+        Returns:
+            dict: {object_key: (presigned_url, expire_time)}，签名失败的key不在结果中
+        """
+        results = {}
+        signed = 0
+        for object_key in dict.fromkeys(k for k in object_keys if k):
+            cache_key = (self.bucket_name, object_key, method)
+            
+            cached = _presign_cache_get(cache_key, expires) if use_cache else None
+            if cached:
+                results[object_key] = cached
+                continue
+            
+            try:
+                signed_url, expire_time = self._sign(object_key, expires, method)
+            except Exception as e:
+                print(f"❌ 生成预签名URL失败: {object_key} - {e}")
+                continue
+            _presign_cache_put(cache_key, signed_url, expire_time)
+            results[object_key] = (signed_url, expire_time)
+            signed += 1
+        
+        metrics.incr('presign.signed', signed)
+        metrics.incr('presign.cache_hit', len(results) - signed)
+        if signed:
+            print(f"✅ 批量生成预签名URL: {signed} 个新签名，{len(results) - signed} 个复用缓存")
+        return results
+    
     def upload_and_get_url(self, local_file_path, object_key=None, expires=3600):
         """
         上传文件并生成预签名URL（一步到位）
         
+        文件不小于 TOS_MULTIPART_THRESHOLD 时使用 upload_large_file
+        
         Args:
             local_file_path: 本地文件路径
             object_key: 对象存储中的key
@@ -141,8 +871,12 @@ class StorageService:
         Returns:
             tuple: (success, presigned_url, expire_time, error_message)
         """
-        # 上传文件
-        success, obj_key, error = self.upload_file(local_file_path, object_key)
+        # 上传文件（超过阈值的大文件分片并行上传，支持断点续传）
+        threshold = getattr(settings, 'TOS_MULTIPART_THRESHOLD', 64 * 1024 * 1024)
+        if os.path.exists(local_file_path) and os.path.getsize(local_file_path) >= threshold:
+            success, obj_key, error = self.upload_large_file(local_file_path, object_key)
+        else:
+            success, obj_key, error = self.upload_file(local_file_path, object_key)
         if not success:
             return False, None, None, error
         
@@ -165,6 +899,7 @@ class StorageService:
             print(f"正在删除文件: {object_key}")
             
             client.delete_object(self.bucket_name, object_key)
+            invalidate_presigned_url(self.bucket_name, object_key)
             
             print(f"✅ 文件删除成功: {object_key}")
             return True, None
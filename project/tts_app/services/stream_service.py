@@ -0,0 +1,146 @@
+"""
+流式语音合成服务
+文本按句拆分后逐句合成，每句合成完立即以WAV流（长度未知的流式文件头 + PCM）推送给客户端，
+不必等整段音频生成、上传和签名
+
+推送结束后，完整音频已写入 AUDIO_OUTPUT_DIR，由后台线程上传到对象存储、
+更新记录并登记到合成缓存（与异步任务生成的记录等价）
+"""
+import os
+import uuid
+import wave
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+
+from ..models import AudioRecord
+from ..text_utils import split_sentences
+from .tts_service import TTSServiceFactory, streaming_wav_header
+from .storage_service import StorageService
+from .cache_service import AudioCacheService
+from . import metrics
+
+# 推送结束后上传和写库的后台线程
+_finalize_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='tts-stream-finalize')
+
+
+def finalize_stream(record_id, cache_key, file_path, expire_seconds):
+    """
+    上传流式生成的音频并更新记录（在后台线程中执行）
+
+    Returns:
+        bool: 是否成功
+    """
+    close_old_connections()
+    try:
+        record = AudioRecord.objects.get(id=record_id)
+        object_key = os.path.basename(file_path)
+        success, preurl, expire_time, error_msg = StorageService().upload_and_get_url(
+            file_path,
+            object_key=object_key,
+            expires=expire_seconds
+        )
+
+        if not success:
+            record.status = 'failed'
+            record.error_message = f'上传失败: {error_msg}'
+            record.save()
+            metrics.incr('tts_stream.upload_failed')
+            print(f"❌ 流式音频上传失败 记录{record_id}: {error_msg}")
+            return False
+
+        record.path = file_path
+        record.object_key = object_key
+        record.preurl = preurl
+        record.expire_time = expire_time
+        record.status = 'success'
+        record.save()
+
+        AudioCacheService.store(cache_key, record)
+        AudioCacheService.evict_local_files()
+        print(f"✅ 流式音频已上传 记录{record_id}")
+        return True
+    except Exception as e:
+        metrics.incr('tts_stream.upload_failed')
+        print(f"❌ 流式音频后台处理失败 记录{record_id}: {e}")
+        return False
+    finally:
+        close_old_connections()
+
+
+class SpeechStream:
+    """一次流式合成（可直接作为 StreamingHttpResponse 的内容迭代）"""
+
+    def __init__(self, text, tts_type='local', expire_seconds=3600, cache_key=None):
+        """
+        Args:
+            text: 英文文本
+            tts_type: local 或 cloud
+            expire_seconds: 上传后预签名URL的有效期（秒）
+            cache_key: 合成缓存key（用于登记缓存）
+        """
+        self.text = text
+        self.tts_type = tts_type
+        self.expire_seconds = expire_seconds
+        self.cache_key = cache_key
+        self.service = TTSServiceFactory.get_service(tts_type)
+        self.sentences = split_sentences(text)
+        self.record = AudioRecord.objects.create(
+            text=text,
+            tts_type=tts_type,
+            status='pending'
+        )
+
+    def _fail(self, error_msg, file_path=None):
+        """标记记录失败并删除不完整的文件"""
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+        AudioRecord.objects.filter(id=self.record.id).update(
+            status='failed',
+            error_message=error_msg
+        )
+        metrics.incr('tts_stream.failed')
+        print(f"❌ {error_msg}")
+
+    def __iter__(self):
+        """
+        依次产出：流式WAV文件头、各句PCM数据
+
+        客户端中途断开（生成器被关闭）或合成出错时，记录标记为失败并删除不完整的文件
+        """
+        sample_rate = self.service.get_stream_sample_rate()
+        if not sample_rate:
+            self._fail('流式合成失败: 模型加载失败')
+            return
+
+        filename = f"stream_{uuid.uuid4().hex[:12]}_{int(datetime.now().timestamp())}.wav"
+        file_path = os.path.join(settings.AUDIO_OUTPUT_DIR, filename)
+        metrics.incr('tts_stream.requests')
+
+        wav = wave.open(file_path, 'wb')
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        error_msg = '客户端断开连接'
+        try:
+            yield streaming_wav_header(sample_rate)
+            for chunk in self.service.iter_pcm(self.sentences):
+                wav.writeframesraw(chunk)
+                yield chunk
+            error_msg = None
+        except GeneratorExit:
+            metrics.incr('tts_stream.client_disconnected')
+            raise
+        except Exception as e:
+            # 响应头已发出，只能提前结束响应
+            error_msg = str(e)
+        finally:
+            wav.close()
+            if error_msg is None:
+                metrics.incr('tts_stream.completed')
+                _finalize_executor.submit(
+                    finalize_stream, self.record.id, self.cache_key, file_path, self.expire_seconds
+                )
+            else:
+                self._fail(f"流式合成失败: {error_msg}", file_path)
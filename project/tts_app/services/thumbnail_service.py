@@ -1,11 +1,22 @@
 """
 视频缩略图生成服务
 
-使用 FFmpeg 从视频中提取帧作为缩略图
+使用 FFmpeg 从视频中提取帧作为缩略图：
+- generate_thumbnail: 截取单帧（不知道视频时长时使用）
+- extract_frames: 一次解码同时输出多张候选缩略图和进度条预览雪碧图
 """
 import os
+import re
+import math
 import subprocess
 import tempfile
+from urllib.parse import urlparse
+from django.conf import settings
+
+from .ffmpeg_pool import run_ffmpeg
+
+# showinfo 滤镜输出的帧时间
+_PTS_TIME_RE = re.compile(r'pts_time:\s*([\d.]+)')
 
 
 class ThumbnailService:
@@ -14,13 +25,22 @@ class ThumbnailService:
     def __init__(self):
         self.default_time = "00:00:01"  # 默认从1秒处截取
         self.default_width = 480        # 默认缩略图宽度，高度按比例自动计算
+        self.count = getattr(settings, 'VIDEO_THUMBNAIL_COUNT', 5)
+        self.mode = getattr(settings, 'VIDEO_THUMBNAIL_MODE', 'interval')
+        self.scene_threshold = getattr(settings, 'VIDEO_THUMBNAIL_SCENE_THRESHOLD', 0.3)
+        self.keyframes_only = getattr(settings, 'VIDEO_THUMBNAIL_KEYFRAMES_ONLY', True)
+        self.timeout = getattr(settings, 'VIDEO_THUMBNAIL_TIMEOUT', 300)
+        self.sprite_interval = getattr(settings, 'VIDEO_SPRITE_INTERVAL', 10)
+        self.sprite_max_frames = getattr(settings, 'VIDEO_SPRITE_MAX_FRAMES', 100)
+        self.sprite_columns = getattr(settings, 'VIDEO_SPRITE_COLUMNS', 10)
+        self.sprite_tile_width = getattr(settings, 'VIDEO_SPRITE_TILE_WIDTH', 160)
     
     def generate_thumbnail(self, video_path, output_path=None, time_position=None, width=None):
         """
         从视频生成缩略图（保持原始宽高比）
         
         Args:
-            video_path: 视频文件路径
+            video_path: 视频文件路径，或 http(s) URL（如预签名URL，FFmpeg按需Range读取）
             output_path: 缩略图输出路径（可选，不提供则自动生成）
             time_position: 截取时间点，格式 "HH:MM:SS" 或秒数（可选）
             width: 缩略图宽度（可选），高度自动按比例计算
@@ -29,7 +49,8 @@ class ThumbnailService:
             tuple: (success, thumbnail_path, error_msg)
         """
         # 检查视频文件
-        if not os.path.exists(video_path):
+        is_url = video_path.startswith(('http://', 'https://'))
+        if not is_url and not os.path.exists(video_path):
             return False, None, f"视频文件不存在: {video_path}"
         
         # 设置参数
@@ -39,7 +60,7 @@ class ThumbnailService:
         # 生成输出路径
         if output_path is None:
             temp_dir = tempfile.gettempdir()
-            base_name = os.path.splitext(os.path.basename(video_path))[0]
+            base_name = os.path.splitext(os.path.basename(urlparse(video_path).path if is_url else video_path))[0]
             output_path = os.path.join(temp_dir, f"{base_name}_thumb.jpg")
         
         try:
@@ -60,12 +81,7 @@ class ThumbnailService:
                 output_path
             ]
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30  # 30秒超时
-            )
+            result = run_ffmpeg(cmd, timeout=30)  # 30秒超时
             
             if result.returncode != 0:
                 # FFmpeg 错误
@@ -85,6 +101,135 @@ class ThumbnailService:
         except Exception as e:
             return False, None, f"生成缩略图失败: {str(e)}"
     
+    def sprite_layout(self, duration, video_size=None):
+        """
+        计算雪碧图布局：每 sprite_interval 秒一格，最多 sprite_max_frames 格（超过时加大间隔）
+        
+        Args:
+            duration: 视频时长（秒）
+            video_size: (width, height)，用于计算每格高度（可选）
+            
+        Returns:
+            dict: {interval, count, columns, rows, tile_width, tile_height}
+        """
+        count = max(1, min(math.ceil(duration / self.sprite_interval), self.sprite_max_frames))
+        columns = min(self.sprite_columns, count)
+        tile_height = None
+        if video_size and all(video_size):
+            # scale=W:-2 按比例缩放并取偶数
+            tile_height = int(round(self.sprite_tile_width * video_size[1] / video_size[0] / 2)) * 2
+        return {
+            'interval': round(duration / count, 3),
+            'count': count,
+            'columns': columns,
+            'rows': math.ceil(count / columns),
+            'tile_width': self.sprite_tile_width,
+            'tile_height': tile_height,
+        }
+    
+    def extract_frames(self, video_path, output_dir, duration, video_size=None, count=None, mode=None,
+                       sprite=True):
+        """
+        一次 FFmpeg 调用提取多张候选缩略图和雪碧图（视频只解码一遍）
+        
+        - interval: 均匀分布的 count 张（第 i 张在 (i+0.5)*时长/count 附近）
+        - scene: 场景变化处的最多 count 张（需要解码全部帧）；一张都没选出时回退为 interval
+        
+        keyframes_only 时只解码关键帧，速度快很多，帧时间落在最近的关键帧上
+        
+        Args:
+            video_path: 视频文件路径或 http(s) URL
+            output_dir: 输出目录
+            duration: 视频时长（秒，来自 MediaProbeService）
+            video_size: (width, height)（可选，用于雪碧图每格高度）
+            count: 候选缩略图数量（可选）
+            mode: interval / scene（可选）
+            sprite: 是否同时生成雪碧图
+            
+        Returns:
+            tuple: (success, result, error_msg)
+                result: {"thumbnails": [{"path", "time"}], "sprite": {"path", "interval", "columns", ...} 或 None}
+        """
+        is_url = video_path.startswith(('http://', 'https://'))
+        if not is_url and not os.path.exists(video_path):
+            return False, None, f"视频文件不存在: {video_path}"
+        if not duration or duration <= 0:
+            return False, None, "视频时长未知"
+        
+        count = count or self.count
+        mode = mode or self.mode
+        gap = duration / count
+        if mode == 'scene':
+            # 场景变化帧，相邻两张至少间隔半个均分间隔，避免集中在同一段
+            select = (f"gt(scene,{self.scene_threshold})"
+                      f"*if(isnan(prev_selected_t),1,gte(t-prev_selected_t,{gap / 2:.3f}))")
+        else:
+            select = f"if(isnan(prev_selected_t),gte(t,{gap / 2:.3f}),gte(t-prev_selected_t,{gap:.3f}))"
+        
+        # showinfo 输出选中帧的时间
+        thumbs_chain = f"select='{select}',showinfo,scale={self.default_width}:-2"
+        thumb_pattern = os.path.join(output_dir, 'thumb_%02d.jpg')
+        layout = self.sprite_layout(duration, video_size) if sprite else None
+        if layout:
+            sprite_path = os.path.join(output_dir, 'sprite.jpg')
+            sprite_select = f"if(isnan(prev_selected_t),1,gte(t-prev_selected_t,{layout['interval']:.3f}))"
+            graph = (
+                f"[0:v]split=2[t][s];"
+                f"[t]{thumbs_chain}[thumbs];"
+                f"[s]select='{sprite_select}',scale={layout['tile_width']}:-2,"
+                f"tile={layout['columns']}x{layout['rows']}[sprite]"
+            )
+        else:
+            graph = f"[0:v]{thumbs_chain}[thumbs]"
+        
+        cmd = ['ffmpeg', '-hide_banner']
+        if self.keyframes_only:
+            cmd += ['-skip_frame', 'nokey']
+        cmd += [
+            '-i', video_path,
+            '-filter_complex', graph,
+            '-vsync', 'vfr',
+            '-map', '[thumbs]', '-frames:v', str(count), '-q:v', '2', '-y', thumb_pattern,
+        ]
+        if layout:
+            cmd += ['-map', '[sprite]', '-frames:v', '1', '-q:v', '3', '-y', sprite_path]
+        
+        try:
+            result = run_ffmpeg(cmd, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            return False, None, "缩略图提取超时"
+        except FileNotFoundError:
+            return False, None, "未找到 FFmpeg，请确保已安装 FFmpeg"
+        
+        if result.returncode != 0:
+            error_msg = result.stderr[-500:] if result.stderr else "未知错误"
+            return False, None, f"FFmpeg 错误: {error_msg}"
+        
+        times = [float(t) for t in _PTS_TIME_RE.findall(result.stderr or '')]
+        thumbnails = []
+        for index in range(count):
+            path = thumb_pattern % (index + 1)
+            if not os.path.exists(path):
+                break
+            thumbnails.append({'path': path, 'time': round(times[index], 3) if index < len(times) else None})
+        
+        if not thumbnails and mode == 'scene':
+            # 没有明显的场景变化：改为均匀取帧（雪碧图已生成，不再重复）
+            print("场景检测没有选出帧，改为均匀取帧")
+            success, fallback, error_msg = self.extract_frames(
+                video_path, output_dir, duration, video_size, count, mode='interval', sprite=False
+            )
+            if not success:
+                return False, None, error_msg
+            thumbnails = fallback['thumbnails']
+        if not thumbnails:
+            return False, None, "缩略图生成失败：没有输出帧"
+        
+        sprite_info = None
+        if layout and os.path.exists(sprite_path):
+            sprite_info = dict(layout, path=sprite_path)
+        return True, {'thumbnails': thumbnails, 'sprite': sprite_info}, None
+    
     def check_ffmpeg_installed(self):
         """检查 FFmpeg 是否已安装"""
         try:
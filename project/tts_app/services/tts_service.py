@@ -4,9 +4,79 @@ TTS语音生成服务
 """
 import os
 import json
+import math
+import time
+import wave
 import uuid
+import base64
+import struct
+import threading
 from datetime import datetime
 from django.conf import settings
+from ..text_utils import split_sentences
+from ..batch_inference import SENTENCE_SILENCE, synthesize_sentences
+from . import metrics
+
+
+def float_to_pcm16(wav):
+    """浮点波形（-1.0~1.0）转16bit小端PCM字节"""
+    import numpy as np
+    return (np.clip(np.asarray(wav, dtype=np.float32), -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+
+def concat_pcm(chunks, sample_rate, silence=SENTENCE_SILENCE, crossfade=0.01):
+    """
+    拼接多段16bit单声道PCM
+
+    - silence > 0：句间插入静音，每句首尾各做 crossfade 秒的线性淡入/淡出，避免爆音
+    - silence = 0：相邻句子重叠 crossfade 秒做交叉淡化
+
+    Args:
+        chunks: PCM字节列表（按播放顺序）
+        sample_rate: 采样率
+        silence: 句间静音（秒）
+        crossfade: 淡入淡出/交叉淡化时长（秒）
+
+    Returns:
+        bytes: 拼接后的PCM
+    """
+    import numpy as np
+
+    fade = int(sample_rate * crossfade)
+    gap = np.zeros(int(sample_rate * silence), dtype=np.float32)
+
+    parts = []
+    prev = None
+    for chunk in chunks:
+        wav = np.frombuffer(chunk, dtype='<i2').astype(np.float32)
+        if not wav.size:
+            continue
+        if prev is not None:
+            n = min(fade, prev.size, wav.size)
+            ramp = np.linspace(1.0, 0.0, n, dtype=np.float32)
+            if gap.size:
+                if n:
+                    prev[-n:] *= ramp
+                    wav[:n] *= ramp[::-1]
+                parts.append(gap)
+            elif n:
+                prev[-n:] = prev[-n:] * ramp + wav[:n] * ramp[::-1]
+                wav = wav[n:]
+        parts.append(wav)
+        prev = wav
+
+    if not parts:
+        return b''
+    return np.clip(np.concatenate(parts), -32768, 32767).astype('<i2').tobytes()
+
+
+def save_pcm_wav(path, pcm, sample_rate):
+    """16bit单声道PCM保存为WAV文件"""
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
 
 
 class LocalTTSService:
@@ -15,6 +85,19 @@ class LocalTTSService:
     def __init__(self):
         self.model_name = settings.LOCAL_TTS_MODEL
         self.tts = None
+        # 同一个模型实例不支持并发推理（流式接口在请求线程中逐句合成）
+        self._infer_lock = threading.Lock()
+    
+    def get_cache_params(self):
+        """影响合成结果的参数（用于生成缓存key）"""
+        return {
+            'engine': 'local',
+            'model': self.model_name,
+            'voice': None,
+            'speed': 1.0,
+            'pitch': 1.0,
+            'volume': 1.0,
+        }
     
     def load_model(self):
         """加载本地TTS模型"""
@@ -40,26 +123,130 @@ class LocalTTSService:
         Returns:
             tuple: (success, file_path, error_message)
         """
-        try:
-            # 加载模型
-            if not self.load_model():
-                return False, None, "模型加载失败"
-            
-            # 生成唯一文件名
-            filename = f"local_{uuid.uuid4().hex[:12]}_{int(datetime.now().timestamp())}.wav"
-            output_path = os.path.join(settings.AUDIO_OUTPUT_DIR, filename)
-            
-            # 生成语音
-            print(f"正在生成语音（本地）: {text[:50]}...")
-            self.tts.tts_to_file(text=text, file_path=output_path)
-            
-            print(f"✅ 本地语音生成成功: {output_path}")
-            return True, output_path, None
+        print(f"正在生成语音（本地）: {text[:50]}...")
+        return self.generate_batch([text])[0]
+    
+    def generate_batch(self, texts, batch_size=None, on_progress=None):
+        """
+        批量生成语音（每个输入文本输出一个WAV）
+        
+        所有输入先拆分为句子并去重，已缓存的句子直接复用（SENTENCE_CACHE_ENABLED），
+        其余按长度分组成小批次合成，再按原顺序拼接回各自的音频文件
+        
+        Args:
+            texts: 英文文本列表
+            batch_size: 每个批次的句子数，默认使用 LOCAL_TTS_BATCH_SIZE
+            on_progress: 可选回调 on_progress(已完成句子数, 不重复句子总数)，每个批次调用一次
             
+        Returns:
+            list: 每个输入的 (success, file_path, error_message)
+        """
+        if not self.load_model():
+            return [(False, None, "模型加载失败")] * len(texts)
+        
+        sentences_per_text = [split_sentences(text) for text in texts]
+        unique_sentences = list(dict.fromkeys(s for sentences in sentences_per_text for s in sentences))
+        
+        try:
+            if getattr(settings, 'SENTENCE_CACHE_ENABLED', True):
+                # 句子级缓存：只合成没有合成过的句子
+                from .sentence_store import synthesize_with_cache
+                pcms, errors, _ = synthesize_with_cache(self, unique_sentences, on_progress=on_progress)
+            else:
+                pcms, errors = self.synthesize_pcm(unique_sentences, batch_size, on_progress)
         except Exception as e:
             error_msg = f"本地TTS生成失败: {str(e)}"
             print(f"❌ {error_msg}")
-            return False, None, error_msg
+            return [(False, None, error_msg)] * len(texts)
+        
+        sample_rate = self.tts.synthesizer.output_sample_rate
+        
+        results = []
+        for sentences in sentences_per_text:
+            failed = [s for s in sentences if s not in pcms]
+            if not sentences or failed:
+                reason = errors.get(failed[0], '文本为空') if failed else '文本为空'
+                error_msg = f"本地TTS生成失败: {reason}"
+                print(f"❌ {error_msg}")
+                results.append((False, None, error_msg))
+                continue
+            
+            try:
+                # 生成唯一文件名
+                filename = f"local_{uuid.uuid4().hex[:12]}_{int(datetime.now().timestamp())}.wav"
+                output_path = os.path.join(settings.AUDIO_OUTPUT_DIR, filename)
+                
+                save_pcm_wav(output_path, concat_pcm([pcms[s] for s in sentences], sample_rate), sample_rate)
+                
+                print(f"✅ 本地语音生成成功: {output_path}")
+                results.append((True, output_path, None))
+            except Exception as e:
+                error_msg = f"本地TTS生成失败: {str(e)}"
+                print(f"❌ {error_msg}")
+                results.append((False, None, error_msg))
+        
+        return results
+    
+    def get_stream_sample_rate(self):
+        """流式输出的采样率（需要先加载模型）"""
+        return self.tts.synthesizer.output_sample_rate if self.load_model() else None
+    
+    def iter_pcm(self, sentences):
+        """
+        逐句合成，返回16bit单声道PCM（句间插入 SENTENCE_SILENCE 静音）
+        
+        Args:
+            sentences: 句子列表
+            
+        Yields:
+            bytes: 每个句子（及其前面的静音）的PCM数据
+        """
+        if not self.load_model():
+            raise RuntimeError("模型加载失败")
+        
+        sample_rate = self.tts.synthesizer.output_sample_rate
+        silence = b'\x00\x00' * int(sample_rate * SENTENCE_SILENCE)
+        for i, sentence in enumerate(sentences):
+            with self._infer_lock:
+                pcm = float_to_pcm16(self.tts.tts(text=sentence))
+            yield (silence + pcm) if i > 0 else pcm
+    
+    def synthesize_pcm(self, sentences, batch_size=None, on_progress=None):
+        """
+        合成多个句子，返回每句的16bit单声道PCM（采样率见 get_stream_sample_rate）
+        
+        句子按长度分组批量合成
+        
+        Args:
+            sentences: 句子列表（不重复）
+            batch_size: 每个批次的句子数，默认使用 LOCAL_TTS_BATCH_SIZE
+            on_progress: 可选回调 on_progress(已完成句子数, 句子总数)，每个批次调用一次
+            
+        Returns:
+            tuple: ({句子: PCM字节}, {句子: 错误信息})
+        """
+        if not self.load_model():
+            return {}, {sentence: "模型加载失败" for sentence in sentences}
+        
+        batch_size = batch_size or getattr(settings, 'LOCAL_TTS_BATCH_SIZE', 8)
+        with self._infer_lock:
+            wavs, errors = synthesize_sentences(self.tts, list(sentences), batch_size, on_progress)
+        return {sentence: float_to_pcm16(wav) for sentence, wav in wavs.items()}, errors
+
+
+def streaming_wav_header(sample_rate, channels=1, sampwidth=2):
+    """
+    流式WAV文件头（总长度未知，RIFF和data长度填最大值）
+
+    播放器收到这样的头之后可以边下载边播放后续的PCM数据
+    """
+    byte_rate = sample_rate * channels * sampwidth
+    return (
+        b'RIFF' + struct.pack('<I', 0xFFFFFFFF) + b'WAVE'
+        + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, channels, sample_rate,
+                                byte_rate, channels * sampwidth, sampwidth * 8)
+        + b'data' + struct.pack('<I', 0xFFFFFFFF)
+    )
 
 
 class CloudTTSService:
@@ -69,6 +256,29 @@ class CloudTTSService:
         self.appid = settings.VOLC_APPID
         self.access_token = settings.VOLC_ACCESS_TOKEN
         self.cluster = getattr(settings, 'VOLC_CLUSTER', 'volcano_tts')
+        self.voice_type = getattr(settings, 'VOLC_VOICE_TYPE', 'BV504_streaming')  # 英文语音
+        self.speed_ratio = getattr(settings, 'VOLC_SPEED_RATIO', 1.0)
+        self.volume_ratio = getattr(settings, 'VOLC_VOLUME_RATIO', 1.0)
+        self.pitch_ratio = getattr(settings, 'VOLC_PITCH_RATIO', 1.0)
+        self.streaming = getattr(settings, 'CLOUD_TTS_STREAMING', False)
+        self.stream_url = getattr(
+            settings, 'VOLC_STREAM_URL', 'https://openspeech.bytedance.com/api/v3/tts/unidirectional'
+        )
+        self.stream_resource_id = getattr(settings, 'VOLC_STREAM_RESOURCE_ID', 'volc.service_type.10029')
+        self.stream_sample_rate = getattr(settings, 'VOLC_STREAM_SAMPLE_RATE', 24000)
+        self.stream_timeout = getattr(settings, 'VOLC_STREAM_TIMEOUT', 30)
+        self.query_timeout = getattr(settings, 'VOLC_QUERY_TIMEOUT', 60)
+    
+    def get_cache_params(self):
+        """影响合成结果的参数（用于生成缓存key）"""
+        return {
+            'engine': 'cloud',
+            'model': self.cluster,
+            'voice': self.voice_type,
+            'speed': self.speed_ratio,
+            'pitch': self.pitch_ratio,
+            'volume': self.volume_ratio,
+        }
     
     def generate_speech(self, text):
         """
@@ -80,49 +290,17 @@ class CloudTTSService:
         Returns:
             tuple: (success, file_path, error_message)
         """
+        if getattr(settings, 'SENTENCE_CACHE_ENABLED', True):
+            # 未缓存的句子由 _synthesize_sentence_pcm 合成，开启 CLOUD_TTS_STREAMING 时逐句使用流式接口
+            return self._generate_from_sentences(text)
+        
+        if self.streaming:
+            success, output_path, error_msg, _ = self.generate_speech_stream(text)
+            return success, output_path, error_msg
+        
         try:
-            import base64
-            import requests
-            import json
-            
-            # 配置火山引擎OpenSpeech TTS服务
-            voice_type = "BV504_streaming"  # 英文语音
-            host = "openspeech.bytedance.com"
-            api_url = f"https://{host}/api/v1/tts"
-            
-            header = {"Authorization": f"Bearer;{self.access_token}"}
-            
-            request_json = {
-                "app": {
-                    "appid": self.appid,
-                    "token": self.access_token,
-                    "cluster": self.cluster
-                },
-                "user": {
-                    "uid": "388808087185088"
-                },
-                "audio": {
-                    "voice_type": voice_type,
-                    "encoding": "wav",
-                    "speed_ratio": 1.0,
-                    "volume_ratio": 1.0,
-                    "pitch_ratio": 1.0,
-                },
-                "request": {
-                    "reqid": str(uuid.uuid4()),
-                    "text": text,
-                    "text_type": "plain",
-                    "operation": "query",
-                    "with_frontend": 1,
-                    "frontend_type": "unitTson"
-                }
-            }
-            
             print(f"正在生成语音（云服务）: {text[:50]}...")
-            
-            # 调用API
-            resp = requests.post(api_url, json.dumps(request_json), headers=header)
-            resp_json = resp.json()
+            resp_json = self._query(text, encoding='wav')
             
             if "data" in resp_json:
                 # 解码音频数据
@@ -146,6 +324,305 @@ class CloudTTSService:
             error_msg = f"云TTS生成失败: {str(e)}"
             print(f"❌ {error_msg}")
             return False, None, error_msg
+    
+    def _generate_from_sentences(self, text):
+        """
+        按句合成并拼接：已缓存的句子直接复用，其余句子并发请求
+        
+        Returns:
+            tuple: (success, file_path, error_message)
+        """
+        from .sentence_store import synthesize_with_cache
+        
+        sentences = split_sentences(text)
+        if not sentences:
+            return False, None, "云TTS生成失败: 文本为空"
+        
+        mode = '流式' if self.streaming else '非流式'
+        print(f"正在生成语音（云服务{mode}，{len(sentences)} 句）: {text[:50]}...")
+        pcms, errors, stats = synthesize_with_cache(self, sentences)
+        failed = [s for s in sentences if s not in pcms]
+        if failed:
+            error_msg = f"云TTS生成失败: {errors.get(failed[0], '未知错误')}"
+            print(f"❌ {error_msg}")
+            return False, None, error_msg
+        
+        try:
+            filename = f"cloud_{uuid.uuid4().hex[:12]}_{int(datetime.now().timestamp())}.wav"
+            output_path = os.path.join(settings.AUDIO_OUTPUT_DIR, filename)
+            save_pcm_wav(
+                output_path,
+                concat_pcm([pcms[s] for s in sentences], self.stream_sample_rate),
+                self.stream_sample_rate
+            )
+        except Exception as e:
+            error_msg = f"云TTS生成失败: {str(e)}"
+            print(f"❌ {error_msg}")
+            return False, None, error_msg
+        
+        print(f"✅ 云服务语音生成成功: {output_path}（缓存命中 {stats['cached']} 句，新合成 {stats['synthesized']} 句）")
+        return True, output_path, None
+    
+    def _query(self, text, encoding='wav'):
+        """
+        调用非流式合成接口（一次返回整段音频）
+        
+        Args:
+            text: 英文文本
+            encoding: wav 或 pcm（pcm 时采样率为 VOLC_STREAM_SAMPLE_RATE）
+            
+        Returns:
+            dict: 接口返回的JSON（成功时 data 为base64音频）
+        """
+        import requests
+        
+        # 配置火山引擎OpenSpeech TTS服务
+        host = "openspeech.bytedance.com"
+        api_url = f"https://{host}/api/v1/tts"
+        
+        header = {"Authorization": f"Bearer;{self.access_token}"}
+        
+        request_json = {
+            "app": {
+                "appid": self.appid,
+                "token": self.access_token,
+                "cluster": self.cluster
+            },
+            "user": {
+                "uid": "388808087185088"
+            },
+            "audio": {
+                "voice_type": self.voice_type,
+                "encoding": encoding,
+                "speed_ratio": self.speed_ratio,
+                "volume_ratio": self.volume_ratio,
+                "pitch_ratio": self.pitch_ratio,
+            },
+            "request": {
+                "reqid": str(uuid.uuid4()),
+                "text": text,
+                "text_type": "plain",
+                "operation": "query",
+                "with_frontend": 1,
+                "frontend_type": "unitTson"
+            }
+        }
+        if encoding == 'pcm':
+            request_json["audio"]["rate"] = self.stream_sample_rate
+        
+        # 调用API（连接超时10秒，整段音频返回前最长等待 VOLC_QUERY_TIMEOUT 秒）
+        resp = requests.post(
+            api_url, json.dumps(request_json), headers=header, timeout=(10, self.query_timeout)
+        )
+        return resp.json()
+    
+    def _stream_request(self, text):
+        """
+        流式接口的请求头和请求体
+
+        语速/音量由倍率换算为 [-50, 100] 的百分比；音调由倍率换算为 [-12, 12] 个半音，
+        通过 additions.post_process.pitch 传递
+        """
+        headers = {
+            'X-Api-App-Id': self.appid,
+            'X-Api-Access-Key': self.access_token,
+            'X-Api-Resource-Id': self.stream_resource_id,
+            'X-Api-Request-Id': str(uuid.uuid4()),
+            'Content-Type': 'application/json',
+        }
+        body = {
+            'user': {'uid': '388808087185088'},
+            'req_params': {
+                'text': text,
+                'speaker': self.voice_type,
+                'audio_params': {
+                    'format': 'pcm',
+                    'sample_rate': self.stream_sample_rate,
+                    'speech_rate': round((self.speed_ratio - 1) * 100),
+                    'loudness_rate': round((self.volume_ratio - 1) * 100),
+                },
+            },
+        }
+        if self.pitch_ratio != 1.0:
+            semitones = max(-12, min(12, round(12 * math.log2(self.pitch_ratio))))
+            body['req_params']['additions'] = json.dumps({'post_process': {'pitch': semitones}})
+        return headers, body
+    
+    def iter_speech_stream(self, text, timings=None):
+        """
+        流式合成：逐块返回PCM数据（16bit单声道，采样率 VOLC_STREAM_SAMPLE_RATE）
+        
+        服务端以 HTTP Chunked 返回多行JSON，每行 data 字段是一块base64音频，
+        code 为 20000000 的行表示结束
+        
+        Args:
+            text: 英文文本
+            timings: 可选的字典，结束后填入 ttfb（首个音频块）、total（秒）、bytes、chunks
+            
+        Yields:
+            bytes: PCM数据块
+            
+        Raises:
+            RuntimeError: 服务端返回错误或连接中断
+        """
+        timings = timings if timings is not None else {}
+        timings.update({'ttfb': None, 'total': None, 'bytes': 0, 'chunks': 0})
+        headers, body = self._stream_request(text)
+        start = time.perf_counter()
+        metrics.incr('cloud_tts.stream_requests')
+        try:
+            yield from self._iter_stream_response(headers, body, timings, start)
+        except Exception:
+            metrics.incr('cloud_tts.stream_failed')
+            raise
+        
+        timings['total'] = time.perf_counter() - start
+        metrics.observe('cloud_tts.stream_total', timings['total'])
+    
+    def _iter_stream_response(self, headers, body, timings, start):
+        """发送流式请求并逐块解码音频，直到收到结束标记"""
+        import requests
+        
+        finished = False
+        with requests.post(
+            self.stream_url,
+            json=body,
+            headers=headers,
+            stream=True,
+            timeout=(10, self.stream_timeout),
+        ) as resp:
+            if resp.status_code != 200:
+                raise RuntimeError(f"流式TTS请求失败: HTTP {resp.status_code} {resp.text[:200]}")
+            
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                message = json.loads(line)
+                code = message.get('code', 0)
+                if code == 20000000:
+                    finished = True
+                    break
+                if code != 0:
+                    raise RuntimeError(f"流式TTS返回错误: {code} {message.get('message')}")
+                if not message.get('data'):
+                    # 只有句子/时间戳信息的行
+                    continue
+                
+                chunk = base64.b64decode(message['data'])
+                if timings['ttfb'] is None:
+                    timings['ttfb'] = time.perf_counter() - start
+                    metrics.observe('cloud_tts.stream_ttfb', timings['ttfb'])
+                timings['bytes'] += len(chunk)
+                timings['chunks'] += 1
+                yield chunk
+        
+        if not finished:
+            raise RuntimeError("流式TTS连接在结束标记之前中断")
+    
+    def generate_speech_stream(self, text, on_chunk=None):
+        """
+        流式生成语音：边接收边写入WAV文件
+        
+        Args:
+            text: 英文文本
+            on_chunk: 可选回调，每收到一块PCM数据调用一次（用于同时推送给HTTP客户端）
+            
+        Returns:
+            tuple: (success, file_path, error_message, timings)
+                timings: {'ttfb': 首个音频块耗时, 'total': 总耗时, 'bytes': PCM字节数, 'chunks': 块数}
+        """
+        filename = f"cloud_{uuid.uuid4().hex[:12]}_{int(datetime.now().timestamp())}.wav"
+        output_path = os.path.join(settings.AUDIO_OUTPUT_DIR, filename)
+        timings = {}
+        
+        print(f"正在流式生成语音（云服务）: {text[:50]}...")
+        try:
+            with wave.open(output_path, 'wb') as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(self.stream_sample_rate)
+                for chunk in self.iter_speech_stream(text, timings):
+                    wav.writeframesraw(chunk)
+                    if on_chunk is not None:
+                        on_chunk(chunk)
+        except Exception as e:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            error_msg = f"流式云TTS生成失败: {str(e)}"
+            print(f"❌ {error_msg}")
+            return False, None, error_msg, timings
+        
+        if not timings['bytes']:
+            os.remove(output_path)
+            return False, None, "流式云TTS没有返回音频数据", timings
+        
+        print(
+            f"✅ 流式云服务语音生成成功: {output_path}"
+            f"（首块 {timings['ttfb'] * 1000:.0f}ms，总耗时 {timings['total'] * 1000:.0f}ms）"
+        )
+        return True, output_path, None, timings
+    
+    def get_stream_sample_rate(self):
+        """流式输出的采样率"""
+        return self.stream_sample_rate
+    
+    def iter_pcm(self, sentences):
+        """
+        逐句流式合成，返回16bit单声道PCM（句间插入 SENTENCE_SILENCE 静音）
+        
+        Args:
+            sentences: 句子列表
+            
+        Yields:
+            bytes: PCM数据块（每个句子由服务端分多块返回）
+        """
+        silence = b'\x00\x00' * int(self.stream_sample_rate * SENTENCE_SILENCE)
+        for i, sentence in enumerate(sentences):
+            if i > 0:
+                yield silence
+            yield from self.iter_speech_stream(sentence)
+    
+    def _synthesize_sentence_pcm(self, sentence):
+        """合成单个句子的PCM（开启流式时使用流式接口）"""
+        if self.streaming:
+            return b''.join(self.iter_speech_stream(sentence))
+        resp_json = self._query(sentence, encoding='pcm')
+        if not resp_json.get("data"):
+            raise RuntimeError(f"云TTS返回数据异常: {resp_json}")
+        return base64.b64decode(resp_json["data"])
+    
+    def synthesize_pcm(self, sentences, on_progress=None):
+        """
+        并发合成多个句子，返回每句的16bit单声道PCM（采样率 VOLC_STREAM_SAMPLE_RATE）
+        
+        并发请求数由 LONG_TEXT_CLOUD_CONCURRENCY 控制
+        
+        Args:
+            sentences: 句子列表（不重复）
+            on_progress: 可选回调 on_progress(已完成句子数, 句子总数)，每完成一句调用一次
+            
+        Returns:
+            tuple: ({句子: PCM字节}, {句子: 错误信息})
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        
+        pcms = {}
+        errors = {}
+        if not sentences:
+            return pcms, errors
+        
+        workers = min(len(sentences), getattr(settings, 'LONG_TEXT_CLOUD_CONCURRENCY', 4))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cloud-tts') as executor:
+            futures = {executor.submit(self._synthesize_sentence_pcm, s): s for s in sentences}
+            for done, future in enumerate(as_completed(futures), 1):
+                sentence = futures[future]
+                try:
+                    pcms[sentence] = future.result()
+                except Exception as e:
+                    errors[sentence] = str(e)
+                if on_progress:
+                    on_progress(done, len(sentences))
+        return pcms, errors
 
 
 class TTSServiceFactory:
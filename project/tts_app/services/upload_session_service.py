@@ -0,0 +1,330 @@
+"""
+浏览器直传上传会话
+视频不再经过Django（浏览器 → Django → 临时文件 → TOS），而是由浏览器用预签名URL直接上传到对象存储：
+
+1. 创建会话：按文件大小选择单次PUT或分片上传，返回预签名URL（字幕同样返回一个PUT URL）
+2. 浏览器直接PUT到对象存储；分片URL过期后可重新获取
+3. complete：合并分片、确认对象大小，创建 VideoRecord；缩略图和字幕由后处理流水线（MediaPipeline）处理
+
+存储bucket需要配置CORS，允许页面域名的PUT请求（分片上传还需 ExposeHeaders: ETag）
+"""
+import os
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import UploadSession, VideoRecord
+from ..upload_handlers import VIDEO_EXTENSIONS
+from .storage_service import StorageService
+from .media_pipeline import MediaPipeline
+from . import metrics
+
+SUBTITLE_EXTENSIONS = ['.srt', '.vtt', '.ass', '.ssa']
+
+# TOS单个分片上传任务最多10000个分片
+MAX_PART_COUNT = 10000
+
+
+def _video_storage():
+    return StorageService(bucket_name=getattr(settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video'))
+
+
+class UploadSessionService:
+    """浏览器直传上传会话"""
+
+    @staticmethod
+    def _part_size(file_size):
+        """分片大小：默认 TOS_MULTIPART_PART_SIZE，文件过大时增大到分片数不超过上限（按MB取整）"""
+        part_size = getattr(settings, 'TOS_MULTIPART_PART_SIZE', 8 * 1024 * 1024)
+        min_size = -(-file_size // MAX_PART_COUNT)
+        if min_size > part_size:
+            mb = 1024 * 1024
+            part_size = -(-min_size // mb) * mb
+        return part_size
+
+    @staticmethod
+    def create(file_name, file_size, content_type=None, title='', category='default', tags=None,
+               subtitle_name=None, expire_seconds=3600):
+        """
+        创建上传会话并生成上传URL
+
+        Args:
+            file_name: 原始视频文件名（用于校验格式和默认标题）
+            file_size: 视频大小（字节）
+            content_type: 视频Content-Type（签入单次PUT的URL，上传时须携带相同请求头）
+            title, category, tags: 视频信息
+            subtitle_name: 字幕文件名（提供时同时返回字幕上传URL）
+            expire_seconds: 完成后视频URL的有效期（秒）
+
+        Returns:
+            tuple: (success, session, upload_info, error_message)
+                upload_info: {
+                    'video': {'method', 'url', 'headers'}（单次上传）,
+                    'parts': [{'part_number', 'url'}]（分片上传）,
+                    'subtitle': {'method', 'url', 'headers'} 或 None,
+                }
+        """
+        file_ext = os.path.splitext(file_name or '')[1].lower()
+        if file_ext not in VIDEO_EXTENSIONS:
+            return False, None, None, f'不支持的视频格式: {file_ext}。支持: {", ".join(VIDEO_EXTENSIONS)}'
+
+        max_bytes = getattr(settings, 'VIDEO_DIRECT_UPLOAD_MAX_BYTES', 20 * 1024 * 1024 * 1024)
+        if file_size <= 0 or file_size > max_bytes:
+            return False, None, None, f'文件大小必须在 1 字节到 {max_bytes // 1024 // 1024}MB 之间'
+
+        subtitle_ext = None
+        if subtitle_name:
+            subtitle_ext = os.path.splitext(subtitle_name)[1].lower()
+            if subtitle_ext not in SUBTITLE_EXTENSIONS:
+                return False, None, None, f'不支持的字幕格式: {subtitle_ext}'
+
+        storage_service = _video_storage()
+        url_expires = getattr(settings, 'UPLOAD_SESSION_URL_EXPIRE', 3600)
+        timestamp = int(time.time())
+        unique_id = uuid.uuid4().hex[:8]
+        session = UploadSession(
+            session_id=uuid.uuid4().hex,
+            file_name=file_name,
+            content_type=content_type or None,
+            file_size=file_size,
+            object_key=f"video_{unique_id}_{timestamp}{file_ext}",
+            subtitle_key=f"sub_{unique_id}_{timestamp}{subtitle_ext}" if subtitle_ext else None,
+            subtitle_name=subtitle_name or None,
+            title=title or os.path.splitext(os.path.basename(file_name))[0],
+            category=category or 'default',
+            tags=tags or None,
+            expire_seconds=expire_seconds,
+            expires_at=timezone.now() + timedelta(seconds=url_expires),
+        )
+        upload_info = {'video': None, 'parts': None, 'subtitle': None}
+
+        threshold = getattr(settings, 'TOS_MULTIPART_THRESHOLD', 64 * 1024 * 1024)
+        if file_size >= threshold:
+            session.mode = 'multipart'
+            session.part_size = UploadSessionService._part_size(file_size)
+            session.part_count = -(-file_size // session.part_size)
+            success, upload_id, error_msg = storage_service.create_multipart_upload(
+                session.object_key, content_type=content_type
+            )
+            if not success:
+                return False, None, None, error_msg
+            session.upload_id = upload_id
+            success, urls, _, error_msg = storage_service.generate_presigned_part_urls(
+                session.object_key, upload_id, range(1, session.part_count + 1), expires=url_expires
+            )
+            if not success:
+                storage_service.abort_multipart_upload(session.object_key, upload_id)
+                return False, None, None, error_msg
+            upload_info['parts'] = [{'part_number': number, 'url': url} for number, url in urls.items()]
+        else:
+            success, url, _, error_msg = storage_service.generate_presigned_put_url(
+                session.object_key, expires=url_expires, content_type=content_type
+            )
+            if not success:
+                return False, None, None, error_msg
+            upload_info['video'] = {
+                'method': 'PUT',
+                'url': url,
+                'headers': {'Content-Type': content_type} if content_type else {},
+            }
+
+        if session.subtitle_key:
+            success, url, _, error_msg = storage_service.generate_presigned_put_url(
+                session.subtitle_key, expires=url_expires
+            )
+            if success:
+                upload_info['subtitle'] = {'method': 'PUT', 'url': url, 'headers': {}}
+
+        session.save()
+        metrics.incr('upload_session.created')
+        print(f"✅ 创建上传会话: {session.session_id} {file_name}"
+              f"（{file_size / 1024 / 1024:.1f}MB，{session.get_mode_display()}，{session.part_count} 个分片）")
+        return True, session, upload_info, None
+
+    @staticmethod
+    def parse_part_numbers(session, spec):
+        """
+        解析分片编号参数（逗号分隔，支持范围，如 1-5,8）
+
+        先逐项校验范围再展开，并限制单次请求的分片数（UPLOAD_SESSION_MAX_SIGN_PARTS），
+        避免 1-1000000000 这样的参数展开成巨大的列表；不传时为全部分片
+
+        Returns:
+            tuple: (part_numbers, error_message)
+        """
+        if not spec:
+            return range(1, session.part_count + 1), None
+
+        limit = getattr(settings, 'UPLOAD_SESSION_MAX_SIGN_PARTS', 1000)
+        ranges = []
+        total = 0
+        for item in spec.split(','):
+            start, _, end = item.strip().partition('-')
+            try:
+                start, end = int(start), int(end or start)
+            except ValueError:
+                return None, 'part_numbers 格式错误，示例: 1-5,8'
+            if start < 1 or end < start or end > session.part_count:
+                return None, f'分片编号必须在 1 到 {session.part_count} 之间: {item.strip()}'
+            total += end - start + 1
+            if total > limit:
+                return None, f'单次最多获取 {limit} 个分片URL'
+            ranges.append((start, end))
+
+        return sorted({n for start, end in ranges for n in range(start, end + 1)}), None
+
+    @staticmethod
+    def sign_parts(session, part_numbers):
+        """
+        重新生成分片上传URL（URL过期或客户端续传时）
+
+        Returns:
+            tuple: (success, [{'part_number', 'url'}], error_message)
+        """
+        if session.mode != 'multipart':
+            return False, [], '该会话不是分片上传'
+        if session.status != 'uploading':
+            return False, [], f'会话已结束: {session.get_status_display()}'
+
+        part_numbers = sorted({n for n in part_numbers if 1 <= n <= session.part_count})
+        if not part_numbers:
+            return False, [], f'分片编号必须在 1 到 {session.part_count} 之间'
+
+        url_expires = getattr(settings, 'UPLOAD_SESSION_URL_EXPIRE', 3600)
+        success, urls, expire_time, error_msg = _video_storage().generate_presigned_part_urls(
+            session.object_key, session.upload_id, part_numbers, expires=url_expires
+        )
+        if not success:
+            return False, [], error_msg
+        session.expires_at = expire_time
+        session.save(update_fields=['expires_at'])
+        return True, [{'part_number': number, 'url': url} for number, url in urls.items()], None
+
+    @staticmethod
+    def complete(session, parts=None, title=None, category=None, tags=None):
+        """
+        完成上传：合并分片并确认对象大小，创建视频记录，缩略图和字幕交给后处理流水线
+
+        重复调用时直接返回已创建的记录；并发调用（浏览器重试）时先用条件更新领取会话
+        （uploading -> completing），只有领取成功的调用创建记录，其余调用返回会话当前状态
+
+        Args:
+            session: UploadSession
+            parts: [(part_number, etag)]；分片上传时可选，不传时以服务端已有的分片为准
+            title, category, tags: 可选，覆盖创建会话时的视频信息
+
+        Returns:
+            tuple: (success, record, error_message)
+        """
+        if session.status == 'completed' and session.record_id:
+            return True, session.record, None
+        if session.status != 'uploading':
+            return False, None, f'会话已结束: {session.get_status_display()}'
+
+        claimed = UploadSession.objects.filter(id=session.id, status='uploading').update(status='completing')
+        if not claimed:
+            session.refresh_from_db()
+            if session.status == 'completed' and session.record_id:
+                return True, session.record, None
+            if session.status == 'completing':
+                return False, None, '上传正在完成中，请稍后查询'
+            return False, None, f'会话已结束: {session.get_status_display()}'
+        session.status = 'completing'
+
+        try:
+            success, record, error_msg = UploadSessionService._complete_claimed(
+                session, parts, title, category, tags
+            )
+        except Exception:
+            UploadSessionService._release(session)
+            raise
+        if not success:
+            UploadSessionService._release(session)
+            return False, None, error_msg
+
+        metrics.incr('upload_session.completed')
+        metrics.incr('upload_session.bytes', record.file_size)
+        print(f"✅ 直传完成: {session.object_key} -> 记录{record.id}")
+        MediaPipeline.start(record)
+        return True, record, None
+
+    @staticmethod
+    def _release(session):
+        """完成失败但可以重试（如分片没传完）时，把会话退回 uploading"""
+        if UploadSession.objects.filter(id=session.id, status='completing').update(status='uploading'):
+            session.status = 'uploading'
+
+    @staticmethod
+    def _complete_claimed(session, parts, title, category, tags):
+        """已领取（completing）的会话：合并分片、确认大小、创建记录"""
+        storage_service = _video_storage()
+        exists, size, error_msg = storage_service.head_object(session.object_key)
+        if session.mode == 'multipart' and not exists:
+            success, error_msg = storage_service.complete_multipart_upload(
+                session.object_key, session.upload_id, parts
+            )
+            if not success:
+                # 分片没传完时保持会话，客户端补传后可以再次调用
+                return False, None, error_msg
+            exists, size, error_msg = storage_service.head_object(session.object_key)
+
+        if not exists:
+            return False, None, f'视频尚未上传: {error_msg}'
+        if size != session.file_size:
+            storage_service.delete_file(session.object_key)
+            session.status = 'failed'
+            session.error_message = f'文件大小不一致: 声明 {session.file_size} 字节，实际 {size} 字节'
+            session.save()
+            return False, None, session.error_message
+
+        success, preurl, expire_time, error_msg = storage_service.generate_presigned_url(
+            session.object_key, expires=session.expire_seconds
+        )
+        if not success:
+            return False, None, error_msg
+
+        valid_categories = dict(VideoRecord.CATEGORY_CHOICES)
+        record = VideoRecord.objects.create(
+            title=title or session.title,
+            category=category if category in valid_categories else session.category,
+            tags=tags if tags is not None else session.tags,
+            preurl=preurl,
+            object_key=session.object_key,
+            subtitle_key=session.subtitle_key,
+            subtitle_name=session.subtitle_name,
+            file_size=size,
+            expire_time=expire_time,
+            status='success',
+        )
+
+        session.status = 'completed'
+        session.record = record
+        session.completed_at = timezone.now()
+        session.save()
+        return True, record, None
+
+    @staticmethod
+    def abort(session):
+        """
+        取消上传：取消分片上传任务，删除已上传的对象
+
+        Returns:
+            tuple: (success, error_message)
+        """
+        if session.status != 'uploading':
+            return False, f'会话已结束: {session.get_status_display()}'
+
+        storage_service = _video_storage()
+        if session.mode == 'multipart':
+            storage_service.abort_multipart_upload(session.object_key, session.upload_id)
+        else:
+            storage_service.delete_file(session.object_key)
+        if session.subtitle_key:
+            storage_service.delete_file(session.subtitle_key)
+
+        session.status = 'aborted'
+        session.save()
+        metrics.incr('upload_session.aborted')
+        return True, None
@@ -0,0 +1,165 @@
+"""
+视频文件上传服务
+供 api_upload_video_file 和 video_upload_page 共用：
+
+- 流式上传（StreamingVideoUploadHandler）：请求体解析时视频已分片上传到TOS，这里只生成预签名URL
+- 普通上传（未安装处理器或 VIDEO_STREAMING_UPLOAD=False）：
+  Django已写入临时文件时直接上传该文件，内存中的小文件先写入临时文件再上传
+
+缩略图优先读本地文件；流式上传未保留本地副本时，FFmpeg通过预签名URL读取（HTTP Range 随机读取）
+"""
+import os
+import time
+import tempfile
+from django.conf import settings
+
+from ..upload_handlers import StreamedVideoFile, StreamingVideoUploadHandler
+
+
+class VideoUploadService:
+    """视频文件上传"""
+
+    @staticmethod
+    def install_handler(request, storage, object_key_prefix):
+        """
+        安装流式上传处理器（必须在读取 request.POST / request.FILES 之前调用）
+
+        Args:
+            request: HttpRequest
+            storage: StorageService实例（视频bucket）
+            object_key_prefix: 视频对象Key前缀，如 video_<id>_<timestamp>
+        """
+        if getattr(settings, 'VIDEO_STREAMING_UPLOAD', True):
+            request.upload_handlers.insert(
+                0, StreamingVideoUploadHandler(storage, object_key_prefix, request=request)
+            )
+
+    @staticmethod
+    def store(uploaded_file, storage, object_key, expire_seconds):
+        """
+        确保视频已上传到对象存储并生成预签名URL
+
+        Args:
+            uploaded_file: request.FILES 中的视频
+            storage: StorageService实例（视频bucket）
+            object_key: 对象存储Key（流式上传时使用处理器生成的Key）
+            expire_seconds: URL有效期（秒）
+
+        Returns:
+            tuple: (success, presigned_url, expire_time, error_message, upload)
+                upload: {
+                    'object_key': 对象存储Key,
+                    'local_path': 本地文件路径（没有时为None）,
+                    'thumbnail_source': 缩略图输入（本地路径或预签名URL）,
+                    'upload_stats': {'bytes', 'parts', 'seconds', 'mb_per_s'},
+                    'temp_path': 需要清理的临时文件,
+                }
+        """
+        upload = {
+            'object_key': object_key,
+            'local_path': None,
+            'thumbnail_source': None,
+            'upload_stats': {},
+            'temp_path': None,
+        }
+
+        if isinstance(uploaded_file, StreamedVideoFile):
+            upload['object_key'] = uploaded_file.object_key
+            upload['local_path'] = uploaded_file.local_path
+            upload['temp_path'] = uploaded_file.local_path
+            upload['upload_stats'] = uploaded_file.upload_stats
+            if uploaded_file.error:
+                return False, None, None, uploaded_file.error, upload
+
+            success, preurl, expire_time, error_msg = storage.generate_presigned_url(
+                uploaded_file.object_key, expires=expire_seconds
+            )
+            upload['thumbnail_source'] = uploaded_file.local_path or preurl
+            return success, preurl, expire_time, error_msg, upload
+
+        # 普通上传：Django已写入临时文件时直接使用，不再复制
+        if hasattr(uploaded_file, 'temporary_file_path'):
+            local_path = uploaded_file.temporary_file_path()
+        else:
+            file_ext = os.path.splitext(uploaded_file.name)[1].lower()
+            with tempfile.NamedTemporaryFile(
+                prefix='upload_', suffix=file_ext, dir=tempfile.gettempdir(), delete=False
+            ) as destination:
+                for chunk in uploaded_file.chunks():
+                    destination.write(chunk)
+            local_path = destination.name
+            upload['temp_path'] = local_path
+        upload['local_path'] = local_path
+        upload['thumbnail_source'] = local_path
+
+        start = time.perf_counter()
+        success, preurl, expire_time, error_msg = storage.upload_and_get_url(
+            local_path, object_key=object_key, expires=expire_seconds
+        )
+        seconds = time.perf_counter() - start
+        # 超过阈值的文件由 upload_and_get_url 分片上传
+        part_size = getattr(settings, 'TOS_MULTIPART_PART_SIZE', 8 * 1024 * 1024)
+        multipart = uploaded_file.size >= getattr(settings, 'TOS_MULTIPART_THRESHOLD', 64 * 1024 * 1024)
+        upload['upload_stats'] = {
+            'bytes': uploaded_file.size,
+            'parts': -(-uploaded_file.size // part_size) if multipart else 1,
+            'seconds': round(seconds, 3),
+            'mb_per_s': round(uploaded_file.size / 1024 / 1024 / seconds, 2) if seconds else None,
+        }
+        return success, preurl, expire_time, error_msg, upload
+
+    @staticmethod
+    def discard(uploaded_file, storage, upload=None):
+        """
+        请求处理失败时删除已上传到对象存储的视频和临时文件
+
+        流式上传在请求体解析完时视频就已上传完成，之后任何一步失败
+        （表单参数校验、生成预签名URL、创建记录）都要调用，避免对象存储中留下无记录的视频
+
+        Args:
+            uploaded_file: request.FILES 中的视频（可以为 None）
+            storage: StorageService实例（视频bucket）
+            upload: store() 返回的上传信息（未调用 store 时为 None）
+        """
+        object_key = None
+        if isinstance(uploaded_file, StreamedVideoFile):
+            # 流式上传失败时处理器已取消分片上传，对象不存在
+            if not uploaded_file.error:
+                object_key = uploaded_file.object_key
+            if upload is None:
+                upload = {'temp_path': uploaded_file.local_path}
+        elif upload is not None:
+            object_key = upload['object_key']
+
+        if object_key:
+            storage.delete_file(object_key)
+        VideoUploadService.cleanup(upload)
+
+    @staticmethod
+    def cleanup(upload):
+        """删除上传过程中产生的临时文件"""
+        temp_path = upload.get('temp_path') if upload else None
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    @staticmethod
+    def stage_subtitle(subtitle_file, name):
+        """
+        校验并暂存字幕文件，由后处理流水线上传
+
+        Args:
+            subtitle_file: request.FILES 中的字幕文件（可以为 None）
+            name: 暂存文件名（不含扩展名）
+
+        Returns:
+            tuple: (暂存路径, 原始文件名)，没有字幕或格式不支持时为 (None, None)
+        """
+        if subtitle_file is None:
+            return None, None
+        subtitle_ext = os.path.splitext(subtitle_file.name)[1].lower()
+        if subtitle_ext not in ['.srt', '.vtt', '.ass', '.ssa']:
+            print(f"❌ 不支持的字幕格式: {subtitle_ext}")
+            return None, None
+
+        from .media_pipeline import MediaPipeline
+        return MediaPipeline.stage_upload(subtitle_file, f"{name}{subtitle_ext}"), subtitle_file.name
@@ -0,0 +1,98 @@
+"""
+视频URL续期服务
+一次批量签名多条视频记录的视频、缩略图（含候选缩略图、雪碧图）、字幕URL
+
+缩略图、字幕相关字段同时由后处理流水线（media_pipeline）写入，续期结果用 save_renewed_urls 保存：
+只写 preurl / expire_time 和签名时的Key仍然有效的URL，不用签名前读到的旧值覆盖流水线的结果
+"""
+from django.conf import settings
+from django.db import transaction
+
+from ..models import VideoRecord
+
+from .storage_service import StorageService
+
+
+def renew_video_urls(records, expire_seconds=7200, use_cache=True):
+    """
+    为视频记录续期视频/缩略图/字幕URL（只修改实例，不保存）
+
+    Args:
+        records: VideoRecord列表（需有object_key）
+        expire_seconds: 有效期（秒）
+        use_cache: 是否复用缓存中剩余有效期足够的URL
+
+    Returns:
+        list: 视频URL续期成功的记录
+    """
+    records = [record for record in records if record.object_key]
+    if not records:
+        return []
+
+    video_bucket = getattr(settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video')
+    storage_service = StorageService(bucket_name=video_bucket)
+
+    keys = []
+    for record in records:
+        keys.extend([record.object_key, record.thumbnail_key, record.subtitle_key])
+        keys.extend(thumb.get('key') for thumb in record.thumbnails or [])
+        keys.append((record.sprite or {}).get('key'))
+    signed = storage_service.generate_presigned_urls(keys, expires=expire_seconds, use_cache=use_cache)
+
+    renewed = []
+    for record in records:
+        if record.object_key in signed:
+            record.preurl, record.expire_time = signed[record.object_key]
+            renewed.append(record)
+        if record.thumbnail_key in signed:
+            record.thumbnail_url = signed[record.thumbnail_key][0]
+        if record.subtitle_key in signed:
+            record.subtitle_url = signed[record.subtitle_key][0]
+        record.thumbnails = [
+            dict(thumb, url=signed[thumb['key']][0]) if thumb.get('key') in signed else thumb
+            for thumb in record.thumbnails or []
+        ]
+        if (record.sprite or {}).get('key') in signed:
+            record.sprite = dict(record.sprite, url=signed[record.sprite['key']][0])
+    return renewed
+
+
+def save_renewed_urls(records):
+    """
+    保存 renew_video_urls 续期后的记录（逐条 filter(id=...).update()，不使用 save() / bulk_update）
+
+    在同一事务中重新读取缩略图、字幕字段：签名之后流水线已经写入新的缩略图/字幕时，
+    只更新Key仍然相同的URL，其余保留数据库中的值
+
+    Args:
+        records: renew_video_urls 返回的记录
+    """
+    if not records:
+        return
+    with transaction.atomic():
+        current = {
+            row.id: row for row in VideoRecord.objects.select_for_update().filter(
+                id__in=[record.id for record in records]
+            ).only('id', 'thumbnail_key', 'subtitle_key', 'thumbnails', 'sprite')
+        }
+        for record in records:
+            row = current.get(record.id)
+            if row is None:
+                continue
+            fields = {'preurl': record.preurl, 'expire_time': record.expire_time}
+            if row.thumbnail_key and row.thumbnail_key == record.thumbnail_key:
+                fields['thumbnail_url'] = record.thumbnail_url
+            if row.subtitle_key and row.subtitle_key == record.subtitle_key:
+                fields['subtitle_url'] = record.subtitle_url
+
+            urls = {thumb.get('key'): thumb.get('url') for thumb in record.thumbnails or []}
+            if any(thumb.get('key') in urls for thumb in row.thumbnails or []):
+                fields['thumbnails'] = [
+                    dict(thumb, url=urls[thumb['key']]) if thumb.get('key') in urls else thumb
+                    for thumb in row.thumbnails
+                ]
+            sprite_key = (row.sprite or {}).get('key')
+            if sprite_key and sprite_key == (record.sprite or {}).get('key'):
+                fields['sprite'] = dict(row.sprite, url=record.sprite.get('url'))
+
+            VideoRecord.objects.filter(id=record.id).update(**fields)
@@ -0,0 +1,74 @@
+"""
+文本处理工具
+"""
+import re
+import hashlib
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """规范化文本：合并连续空白、去除首尾空白、忽略大小写"""
+    return _WHITESPACE_RE.sub(' ', text or '').strip().casefold()
+
+
+def compute_text_hash(text):
+    """规范化文本的sha256（用于索引查找，避免对TextField全表扫描）"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?;])\s+')
+_CLAUSE_RE = re.compile(r'(?<=[,:])\s+')
+
+
+def split_sentences(text, max_chars=200):
+    """
+    将文本拆分为句子，过长的句子再按逗号/冒号拆分
+
+    Args:
+        text: 输入文本
+        max_chars: 单句最大字符数
+
+    Returns:
+        list: 句子列表
+    """
+    sentences = []
+    for sentence in _SENTENCE_RE.split((text or '').strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            sentences.append(sentence)
+            continue
+
+        # 过长的句子按子句合并到不超过max_chars
+        current = ''
+        for clause in _CLAUSE_RE.split(sentence):
+            if current and len(current) + len(clause) + 1 > max_chars:
+                sentences.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}".strip()
+        if current:
+            sentences.append(current)
+    return sentences
+
+
+def split_tags(tags):
+    """
+    逗号分隔的标签字符串转列表（去除空白和空标签，保持顺序）
+
+    Args:
+        tags: 标签字符串，如 "english, grade-3"
+
+    Returns:
+        list: 标签列表
+    """
+    if not tags:
+        return []
+    return [tag.strip() for tag in tags.split(',') if tag.strip()]
+
+
+def normalize_tag(tag):
+    """规范化标签名（合并连续空白、去除首尾空白、忽略大小写），用于标签索引"""
+    return _WHITESPACE_RE.sub(' ', tag or '').strip().casefold()[:50]
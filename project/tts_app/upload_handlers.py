@@ -0,0 +1,150 @@
+"""
+视频上传处理器
+Django默认把上传的文件先完整写入内存/临时文件，视图再读一遍上传到TOS；
+StreamingVideoUploadHandler 在解析 multipart 请求体时把视频数据直接写入TOS分片上传，
+视频不落盘、Web进程内存占用有上限，请求体读完时对象存储中的文件也已上传完成
+
+只有需要本地可随机读取的文件（VIDEO_UPLOAD_KEEP_LOCAL_COPY=True，FFmpeg读本地文件截取缩略图）时，
+才同时写一份临时文件
+"""
+import os
+import tempfile
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+
+from .services.storage_service import MultipartUploader
+from .services import metrics
+
+# 支持的视频格式
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v']
+
+
+class StreamedVideoFile(UploadedFile):
+    """
+    已直接上传到对象存储的视频（request.FILES 中的对象）
+
+    Attributes:
+        object_key: 对象存储Key
+        local_path: 本地临时副本路径（未保留副本时为None）
+        error: 上传失败时的错误信息
+        upload_stats: 吞吐统计（bytes、parts、seconds、mb_per_s）
+    """
+
+    def __init__(self, name, content_type, size, object_key, local_path=None, error=None, upload_stats=None):
+        super().__init__(file=None, name=name, content_type=content_type, size=size)
+        self.object_key = object_key
+        self.local_path = local_path
+        self.error = error
+        self.upload_stats = upload_stats or {}
+
+    def chunks(self, chunk_size=None):
+        raise ValueError('视频已直接上传到对象存储，没有本地数据')
+
+
+class StreamingVideoUploadHandler(FileUploadHandler):
+    """把指定字段的视频边接收边分片上传到TOS"""
+
+    # 每次从请求体读取的大小
+    chunk_size = 1024 * 1024
+
+    def __init__(self, storage, object_key_prefix, field_name='video_file', request=None):
+        """
+        Args:
+            storage: StorageService实例（视频bucket）
+            object_key_prefix: 对象存储Key前缀（扩展名按上传文件名追加）
+            field_name: 表单中视频文件的字段名
+        """
+        super().__init__(request)
+        self.storage = storage
+        self.object_key_prefix = object_key_prefix
+        self.target_field = field_name
+        self.keep_local_copy = getattr(settings, 'VIDEO_UPLOAD_KEEP_LOCAL_COPY', False)
+        self.uploader = None
+        self.local_file = None
+        self.local_path = None
+        self.object_key = None
+        self.streaming = False
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        file_ext = os.path.splitext(file_name or '')[1].lower()
+        # 其他字段（字幕）和不支持的格式交给默认处理器，由视图校验
+        self.streaming = field_name == self.target_field and file_ext in VIDEO_EXTENSIONS
+        if not self.streaming:
+            return
+
+        self.object_key = f"{self.object_key_prefix}{file_ext}"
+        self.uploader = MultipartUploader(self.storage, self.object_key, content_type=content_type)
+        try:
+            self.uploader.start()
+        except Exception as e:
+            self.uploader.error = f"创建分片上传失败: {e}"
+
+        if self.keep_local_copy:
+            self.local_file = tempfile.NamedTemporaryFile(
+                prefix='upload_', suffix=file_ext, dir=tempfile.gettempdir(), delete=False
+            )
+            self.local_path = self.local_file.name
+
+        print(f"正在流式上传视频到TOS: {file_name} -> {self.object_key}")
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.streaming:
+            return raw_data
+
+        if self.local_file is not None:
+            self.local_file.write(raw_data)
+        if not self.uploader.error:
+            try:
+                self.uploader.write(raw_data)
+            except Exception as e:
+                # 出错后继续读完请求体（丢弃数据），由视图返回错误
+                self.uploader.error = self.uploader.error or str(e)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.streaming:
+            return None
+
+        self.streaming = False
+        if self.local_file is not None:
+            self.local_file.close()
+
+        if self.uploader.error:
+            self.uploader.abort()
+            success, error_msg = False, self.uploader.error
+        else:
+            success, error_msg = self.uploader.complete()
+
+        stats = self.uploader.stats()
+        if success:
+            metrics.incr('video_upload.streamed')
+            print(
+                f"✅ 视频流式上传成功: {self.object_key}"
+                f"（{stats['bytes'] / 1024 / 1024:.1f}MB，{stats['parts']} 个分片，"
+                f"{stats['seconds']:.1f}秒，{stats['mb_per_s'] or 0:.1f}MB/s）"
+            )
+        else:
+            metrics.incr('video_upload.failed')
+            print(f"❌ 视频流式上传失败: {error_msg}")
+
+        return StreamedVideoFile(
+            name=self.file_name,
+            content_type=self.content_type,
+            size=file_size,
+            object_key=self.object_key,
+            local_path=self.local_path,
+            error=None if success else error_msg,
+            upload_stats=stats,
+        )
+
+    def upload_interrupted(self):
+        """客户端中途断开：取消分片上传，删除临时副本"""
+        if self.uploader is not None and self.streaming:
+            self.uploader.abort()
+        if self.local_file is not None:
+            self.local_file.close()
+            if os.path.exists(self.local_path):
+                os.remove(self.local_path)
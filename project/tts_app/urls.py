@@ -24,18 +24,28 @@ urlpatterns = [
     # 音频API路由
     path('api/get-audio-url/', views.api_get_audio_url, name='api_get_audio_url'),
     path('api/upload-audio/', views.api_upload_audio, name='api_upload_audio'),
+    path('api/upload-audio/bulk/', views.api_upload_audio_bulk, name='api_upload_audio_bulk'),  # 批量上传
     path('api/record/<int:record_id>/', views.api_record_detail, name='api_record_detail'),
     path('api/records/', views.api_record_list, name='api_record_list'),
+    path('api/tts/stream/', views.api_tts_stream, name='api_tts_stream'),  # 流式合成
+    path('api/job/<int:job_id>/', views.api_job_status, name='api_job_status'),  # 任务状态（长轮询）
+    path('api/metrics/', views.api_metrics, name='api_metrics'),  # 运行指标
     
     # 视频API路由
     path('api/upload-video/', views.api_upload_video, name='api_upload_video'),
     path('api/upload-video-file/', views.api_upload_video_file, name='api_upload_video_file'),  # 文件上传
+    path('api/upload-sessions/', views.api_upload_session_create, name='api_upload_session_create'),  # 浏览器直传
+    path('api/upload-sessions/<str:session_id>/parts/', views.api_upload_session_parts, name='api_upload_session_parts'),
+    path('api/upload-sessions/<str:session_id>/complete/', views.api_upload_session_complete, name='api_upload_session_complete'),
+    path('api/upload-sessions/<str:session_id>/abort/', views.api_upload_session_abort, name='api_upload_session_abort'),
     path('api/get-video-url/', views.api_get_video_url, name='api_get_video_url'),
     path('api/video/<int:record_id>/', views.api_video_detail, name='api_video_detail'),
     path('api/video/<int:record_id>/subtitle/', views.api_video_subtitle, name='api_video_subtitle'),  # 字幕代理
     path('api/video/<int:record_id>/update/', views.api_video_update, name='api_video_update'),  # 更新视频信息
     path('api/video/<int:record_id>/renew/', views.api_renew_video_url, name='api_renew_video_url'),
     path('api/video/<int:record_id>/delete/', views.api_delete_video, name='api_delete_video'),
+    path('api/video/<int:record_id>/pipeline/retry/', views.api_video_pipeline_retry, name='api_video_pipeline_retry'),  # 重试后处理
     path('api/videos/', views.api_video_list, name='api_video_list'),
+    path('api/video-tags/', views.api_video_tags, name='api_video_tags'),  # 标签统计
 ]
 
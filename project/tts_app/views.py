@@ -3,13 +3,18 @@ TTS应用视图
 """
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
+from django.urls import reverse
+from django.conf import settings as django_settings
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
-from .models import AudioRecord, VideoRecord
+from .models import AudioRecord, VideoRecord, TTSJob, Tag
 from .forms import TTSForm
 from .services.tts_service import TTSServiceFactory
 from .services.storage_service import StorageService
+from .services.job_service import JobService
+from .services.cache_service import AudioCacheService
+from .services import metrics
 import os
 import json
 
@@ -29,13 +34,14 @@ def index(request):
 @require_http_methods(["POST"])
 def generate_tts(request):
     """
-    生成语音
+    生成语音（异步）
     处理流程：
     1. 验证表单
-    2. 调用TTS服务生成语音
-    3. 上传到对象存储
-    4. 生成预签名URL
-    5. 保存记录到数据库
+    2. 创建pending记录并加入任务队列
+    3. 跳转到结果页，由结果页轮询任务状态
+    
+    语音合成、上传和预签名URL生成由worker进程完成
+    （python manage.py run_tts_worker）
     """
     form = TTSForm(request.POST)
     
@@ -47,104 +53,56 @@ def generate_tts(request):
     tts_type = form.cleaned_data['tts_type']
     expire_seconds = int(form.cleaned_data['expire_time'])
     
-    # 创建记录（初始状态为pending）
-    record = AudioRecord.objects.create(
-        text=text,
-        tts_type=tts_type,
-        status='pending'
-    )
-    
     try:
-        # 1. 生成语音
-        tts_service = TTSServiceFactory.get_service(tts_type)
-        success, file_path, error_msg = tts_service.generate_speech(text)
-        
-        if not success:
-            record.status = 'failed'
-            record.error_message = error_msg
-            record.save()
-            messages.error(request, f'语音生成失败: {error_msg}')
-            return redirect('index')
-        
-        # 保存本地路径
-        record.path = file_path
-        
-        # 2. 上传到对象存储并生成预签名URL
-        storage_service = StorageService()
-        
-        # 使用唯一的对象key
-        object_key = os.path.basename(file_path)
-        
-        success, preurl, expire_time, error_msg = storage_service.upload_and_get_url(
-            file_path,
-            object_key=object_key,
-            expires=expire_seconds  # 使用用户选择的有效期
+        # 创建记录（初始状态为pending）并入队
+        record = AudioRecord.objects.create(
+            text=text,
+            tts_type=tts_type,
+            status='pending'
         )
+        JobService.enqueue(record, expire_seconds=expire_seconds)
         
-        if not success:
-            record.status = 'failed'
-            record.error_message = f'上传失败: {error_msg}'
-            record.save()
-            messages.error(request, f'文件上传失败: {error_msg}')
-            return redirect('index')
-        
-        # 3. 更新记录状态
-        record.preurl = preurl
-        record.expire_time = expire_time
-        record.status = 'success'
-        record.save()
-        
-        messages.success(request, '✅ 语音生成成功！')
+        messages.info(request, '⏳ 语音生成任务已提交，正在处理...')
         return redirect('result', record_id=record.id)
         
     except Exception as e:
-        record.status = 'failed'
-        record.error_message = str(e)
-        record.save()
-        messages.error(request, f'处理失败: {str(e)}')
+        messages.error(request, f'任务提交失败: {str(e)}')
         return redirect('index')
 
 
 def result(request, record_id):
-    """显示生成结果"""
+    """显示生成结果（处理中时页面轮询任务状态）"""
     record = get_object_or_404(AudioRecord, id=record_id)
+    job = record.jobs.order_by('-id').first()
     
     context = {
         'record': record,
+        'job': job,
     }
     return render(request, 'tts_app/result.html', context)
 
 
 def record_list(request):
-    """记录列表（支持搜索和分页）"""
-    from django.core.paginator import Paginator
-    from django.db.models import Q
+    """记录列表（支持搜索和游标分页）"""
+    from .pagination import KeysetPaginator, cached_count, page_from_request
+    from .services.search_service import SearchService
     
     # 获取搜索关键词
     search_query = request.GET.get('q', '').strip()
     
-    # 基础查询
-    records = AudioRecord.objects.all()
-    
-    # 如果有搜索关键词，进行搜索
-    if search_query:
-        records = records.filter(
-            Q(text__icontains=search_query) |  # 文本内容包含关键词
-            Q(id__icontains=search_query)       # ID包含关键词
-        )
-    
-    # 按创建时间倒序排列
-    records = records.order_by('-uptime')
+    # 全文搜索（纯数字按ID查找）
+    records = SearchService.search_audio(AudioRecord.objects.all(), search_query)
     
-    # 分页，每页10条
-    paginator = Paginator(records, 10)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # 按创建时间倒序游标分页，每页10条（无效游标回到第一页）
+    try:
+        page_obj = page_from_request(request, records, 10)
+    except ValueError:
+        page_obj = KeysetPaginator(records, 10).page()
     
     context = {
         'page_obj': page_obj,
         'search_query': search_query,
-        'total_count': paginator.count,
+        'total_count': cached_count(records),
     }
     return render(request, 'tts_app/record_list.html', context)
 
@@ -175,17 +133,16 @@ def renew_url(request, record_id):
     try:
         storage_service = StorageService()
         
-        # 检查文件是否存在
-        if not record.path or not os.path.exists(record.path):
+        # 检查对象存储Key（本地WAV可能已被缓存淘汰，对象存储中的文件仍然有效）
+        if not record.object_key:
             messages.error(request, '音频文件不存在，无法续期')
             return redirect('record_detail', record_id=record_id)
         
         # 使用现有文件重新生成预签名URL
-        object_key = os.path.basename(record.path)
-        
         success, preurl, expire_time, error_msg = storage_service.generate_presigned_url(
-            object_key=object_key,
-            expires=expire_seconds
+            object_key=record.object_key,
+            expires=expire_seconds,
+            use_cache=False
         )
         
         if success:
@@ -210,15 +167,22 @@ def delete_record(request, record_id):
     record = get_object_or_404(AudioRecord, id=record_id)
     
     try:
-        # 从对象存储删除文件
-        if record.path:
-            storage_service = StorageService()
-            object_key = os.path.basename(record.path)
-            storage_service.delete_file(object_key)
+        # 相同内容的记录共享同一个对象存储文件，只有最后一条记录删除时才删除文件
+        shared = record.object_key and AudioRecord.objects.filter(
+            object_key=record.object_key
+        ).exclude(id=record.id).exists()
         
-        # 删除本地文件
-        if record.path and os.path.exists(record.path):
-            os.remove(record.path)
+        if record.object_key and not shared:
+            # 从对象存储删除文件
+            storage_service = StorageService()
+            AudioCacheService.release_object(record.object_key)
+            storage_service.delete_file(record.object_key)
+            
+            # 删除本地生成的文件（上传记录的path是源文件，不删除）
+            local_path = os.path.abspath(record.path) if record.path else None
+            is_generated = local_path and os.path.dirname(local_path) == os.path.abspath(django_settings.AUDIO_OUTPUT_DIR)
+            if is_generated and os.path.exists(local_path):
+                os.remove(local_path)
         
         # 删除数据库记录
         record.delete()
@@ -238,12 +202,13 @@ def api_get_audio_url(request):
     
     如果文本已存在且URL有效，直接返回
     如果文本已存在但URL过期，续期后返回
-    如果文本不存在，生成后返回
+    如果文本不存在，提交异步生成任务，返回任务ID（HTTP 202）
     
     POST参数:
         text: 英文文本（必需）
         tts_type: 生成方式 local/cloud（可选，默认local）
         expire_time: 有效期秒数（可选，默认3600）
+        wait: 新生成时在请求内最多等待的秒数（可选，默认0，最大TTS_JOB_MAX_WAIT）
         
     返回:
         {
@@ -253,6 +218,16 @@ def api_get_audio_url(request):
             "is_new": false,  # 是否新生成
             "record_id": 1
         }
+        
+    任务未完成时返回:
+        {
+            "success": true,
+            "url": null,
+            "status": "queued",
+            "job_id": 12,
+            "record_id": 1,
+            "status_url": "/api/job/12/"
+        }
     """
     # 获取参数
     if request.method == 'POST':
@@ -269,6 +244,14 @@ def api_get_audio_url(request):
     text = data.get('text', '').strip()
     tts_type = data.get('tts_type', 'local')
     expire_seconds = int(data.get('expire_time', 3600))
+    max_wait = getattr(django_settings, 'TTS_JOB_MAX_WAIT', 30)
+    try:
+        wait_seconds = min(max(float(data.get('wait', 0)), 0), max_wait)
+    except (TypeError, ValueError):
+        return JsonResponse({
+            'success': False,
+            'error': 'wait必须是数字（秒）'
+        }, status=400)
     
     # 验证参数
     if not text:
@@ -277,10 +260,11 @@ def api_get_audio_url(request):
             'error': '文本内容不能为空'
         }, status=400)
     
-    if len(text) > 1000:
+    max_chars = getattr(django_settings, 'LONG_TEXT_MAX_CHARS', 20000)
+    if len(text) > max_chars:
         return JsonResponse({
             'success': False,
-            'error': '文本内容不能超过1000字符'
+            'error': f'文本内容不能超过{max_chars}字符'
         }, status=400)
     
     if tts_type not in ['local', 'cloud']:
@@ -290,12 +274,8 @@ def api_get_audio_url(request):
         }, status=400)
     
     try:
-        # 1. 查找是否已存在相同文本的成功记录
-        from django.utils import timezone
-        existing_record = AudioRecord.objects.filter(
-            text=text,
-            status='success'
-        ).order_by('-uptime').first()
+        # 1. 查找是否已有相同内容（规范化文本+引擎+模型+音色+语速等）的成功记录
+        cache_key, existing_record = AudioCacheService.lookup_record(text, tts_type)
         
         is_new = False
         
@@ -310,10 +290,9 @@ def api_get_audio_url(request):
                 print("URL已过期，正在续期...")
                 # URL过期，续期
                 storage_service = StorageService()
-                object_key = os.path.basename(existing_record.path)
                 
                 success, preurl, expire_time, error_msg = storage_service.generate_presigned_url(
-                    object_key=object_key,
+                    object_key=existing_record.object_key,
                     expires=expire_seconds
                 )
                 
@@ -344,80 +323,62 @@ def api_get_audio_url(request):
             })
         
         else:
-            # 记录不存在，需要生成
-            print(f"未找到记录，开始生成新音频...")
-            is_new = True
+            # 记录不存在，提交异步生成任务
+            # 相同文本已有排队/处理中的任务时直接复用，避免突发重复请求
+            job = JobService.find_inflight(text, tts_type)
+            if job:
+                print(f"找到处理中的任务 ID: {job.id}")
+            else:
+                print(f"未找到记录，提交生成任务...")
+                record = AudioRecord.objects.create(
+                    text=text,
+                    tts_type=tts_type,
+                    status='pending'
+                )
+                job = JobService.enqueue(record, expire_seconds=expire_seconds)
             
-            # 创建记录
-            record = AudioRecord.objects.create(
-                text=text,
-                tts_type=tts_type,
-                status='pending'
-            )
+            # 可选：在请求内等待一段时间（长轮询），任务完成则直接返回URL
+            if wait_seconds > 0:
+                job = JobService.wait_for(job.id, wait_seconds)
             
-            try:
-                # 生成语音
-                tts_service = TTSServiceFactory.get_service(tts_type)
-                success, file_path, error_msg = tts_service.generate_speech(text)
-                
-                if not success:
-                    record.status = 'failed'
-                    record.error_message = error_msg
-                    record.save()
-                    return JsonResponse({
-                        'success': False,
-                        'error': f'语音生成失败: {error_msg}'
-                    }, status=500)
-                
-                record.path = file_path
-                
-                # 上传到对象存储并生成URL
-                storage_service = StorageService()
-                object_key = os.path.basename(file_path)
-                
-                success, preurl, expire_time, error_msg = storage_service.upload_and_get_url(
-                    file_path,
-                    object_key=object_key,
-                    expires=expire_seconds
-                )
-                
-                if not success:
-                    record.status = 'failed'
-                    record.error_message = f'上传失败: {error_msg}'
-                    record.save()
-                    return JsonResponse({
-                        'success': False,
-                        'error': f'上传失败: {error_msg}'
-                    }, status=500)
-                
-                # 更新记录
-                record.preurl = preurl
-                record.expire_time = expire_time
-                record.status = 'success'
-                record.save()
-                
+            if job.status == 'success':
+                record = job.record
+                record.refresh_from_db()
                 print(f"新音频生成成功 ID: {record.id}")
-                
-                # 返回新生成的记录
                 return JsonResponse({
                     'success': True,
                     'url': record.preurl,
                     'expire_time': record.expire_time.strftime('%Y-%m-%d %H:%M:%S'),
                     'remaining_time': record.get_remaining_time(),
                     'is_new': True,
+                    'status': job.status,
+                    'job_id': job.id,
                     'record_id': record.id,
                     'tts_type': record.tts_type,
                     'created_at': record.uptime.strftime('%Y-%m-%d %H:%M:%S')
                 })
-                
-            except Exception as e:
-                record.status = 'failed'
-                record.error_message = str(e)
-                record.save()
+            
+            if job.status == 'failed':
                 return JsonResponse({
                     'success': False,
-                    'error': f'处理失败: {str(e)}'
+                    'status': job.status,
+                    'job_id': job.id,
+                    'record_id': job.record_id,
+                    'error': job.error_message
                 }, status=500)
+            
+            # 任务尚未完成，返回任务ID，客户端通过状态接口查询
+            return JsonResponse({
+                'success': True,
+                'url': None,
+                'is_new': True,
+                'status': job.status,
+                'job_id': job.id,
+                'record_id': job.record_id,
+                'tts_type': job.tts_type,
+                'status_url': reverse('api_job_status', args=[job.id]),
+                'message': '语音生成任务已提交，请通过 status_url 查询进度'
+            }, status=202)
         
     except Exception as e:
         return JsonResponse({
@@ -430,6 +391,75 @@ def api_get_audio_url(request):
 api_get_audio_url = csrf_exempt(api_get_audio_url)
 
 
+@require_http_methods(["GET"])
+def api_tts_stream(request):
+    """
+    API: 流式语音合成
+
+    GET /api/tts/stream/?text=...&tts_type=local&expire_time=3600
+
+    文本按句拆分，逐句合成后立即推送（audio/wav，流式文件头），
+    客户端（<audio> 标签、ffplay 等）收到第一句即可开始播放
+
+    - 已有有效URL的相同内容：302 跳转到预签名URL
+    - 否则新建记录（响应头 X-Record-Id），推送结束后在后台上传并登记缓存，
+      之后可通过 /api/record/<id>/ 或 /api/get-audio-url/ 获取URL
+    """
+    from django.http import HttpResponseRedirect, StreamingHttpResponse
+    from .services.stream_service import SpeechStream
+
+    text = request.GET.get('text', '').strip()
+    tts_type = request.GET.get('tts_type', 'local')
+
+    if not text:
+        return JsonResponse({
+            'success': False,
+            'error': '文本内容不能为空'
+        }, status=400)
+
+    if len(text) > 1000:
+        return JsonResponse({
+            'success': False,
+            'error': '文本内容不能超过1000字符'
+        }, status=400)
+
+    if tts_type not in ['local', 'cloud']:
+        return JsonResponse({
+            'success': False,
+            'error': 'tts_type必须是local或cloud'
+        }, status=400)
+
+    try:
+        expire_seconds = int(request.GET.get('expire_time', 3600))
+    except ValueError:
+        return JsonResponse({
+            'success': False,
+            'error': 'expire_time必须是整数'
+        }, status=400)
+
+    try:
+        cache_key, existing_record = AudioCacheService.lookup_record(text, tts_type)
+        if existing_record and existing_record.preurl and not existing_record.is_expired():
+            metrics.incr('tts_stream.cache_redirect')
+            response = HttpResponseRedirect(existing_record.preurl)
+            response['X-Record-Id'] = str(existing_record.id)
+            return response
+
+        stream = SpeechStream(text, tts_type, expire_seconds=expire_seconds, cache_key=cache_key)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'系统错误: {str(e)}'
+        }, status=500)
+
+    response = StreamingHttpResponse(stream, content_type='audio/wav')
+    response['Cache-Control'] = 'no-cache'
+    # 关闭 nginx 等反向代理的响应缓冲，否则客户端仍要等到全部生成
+    response['X-Accel-Buffering'] = 'no'
+    response['X-Record-Id'] = str(stream.record.id)
+    return response
+
+
 @require_http_methods(["GET"])
 def api_record_detail(request, record_id):
     """API: 获取记录详情（JSON格式）"""
@@ -447,32 +477,145 @@ def api_record_detail(request, record_id):
 
 
 @require_http_methods(["GET"])
-def api_record_list(request):
-    """API: 获取记录列表（JSON格式，支持搜索）"""
-    from django.db.models import Q
+def api_job_status(request, job_id):
+    """
+    API: 查询TTS任务状态（支持长轮询）
     
-    # 获取参数
-    limit = int(request.GET.get('limit', 20))
-    search_query = request.GET.get('q', '').strip()
+    GET /api/job/<id>/
     
-    # 基础查询
-    records = AudioRecord.objects.all()
+    参数:
+        wait: 最长等待秒数（可选，默认0立即返回，最大TTS_JOB_MAX_WAIT）
+              任务结束（成功/失败）时立即返回
     
-    # 搜索过滤
-    if search_query:
-        records = records.filter(
-            Q(text__icontains=search_query) |
-            Q(id__icontains=search_query)
-        )
+    返回:
+        {
+            "success": true,
+            "data": {
+                "job_id": 12,
+                "record_id": 1,
+                "status": "running",
+                "stage": "uploading",
+                "progress": 60,
+                ...
+            },
+            "record": {...}  # 任务成功时返回音频记录
+        }
+    """
+    try:
+        job = TTSJob.objects.get(id=job_id)
+    except TTSJob.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': '任务不存在'
+        }, status=404)
     
-    # 排序和限制
-    records = records.order_by('-uptime')[:limit]
+    max_wait = getattr(django_settings, 'TTS_JOB_MAX_WAIT', 30)
+    try:
+        wait_seconds = min(max(float(request.GET.get('wait', 0)), 0), max_wait)
+    except ValueError:
+        wait_seconds = 0
+    
+    if wait_seconds > 0 and not job.is_finished():
+        job = JobService.wait_for(job.id, wait_seconds)
+    
+    response = {
+        'success': True,
+        'data': job.to_dict(),
+    }
+    if job.status == 'success':
+        response['record'] = job.record.to_dict()
+    
+    return JsonResponse(response)
+
+
+@require_http_methods(["GET"])
+def api_metrics(request):
+    """
+    API: 运行指标
+    
+    GET /api/metrics/
+    
+    返回所有进程（Web、worker、管理命令）汇总的计数器和耗时统计（各进程每隔 METRICS_FLUSH_INTERVAL 秒写入一次）、合成缓存和句子缓存统计（命中/未命中、本地缓存大小等）、
+    对象存储连接复用统计，以及待续期（已过期/即将过期）的记录数
+    """
+    from .services.storage_service import connection_stats
+    from .services.renewal_service import RenewalService
+    from .services.sentence_store import SentenceAudioStore
     
     return JsonResponse({
         'success': True,
-        'count': len(records),
+        'data': {
+            'counters': metrics.snapshot(),
+            'timings': metrics.timings(),
+            'audio_cache': AudioCacheService.stats(),
+            'sentence_cache': SentenceAudioStore().stats(),
+            'storage': connection_stats(),
+            'renewal_backlog': RenewalService.backlog(),
+        }
+    })
+
+
+@require_http_methods(["GET"])
+def api_record_list(request):
+    """
+    API: 获取记录列表（JSON格式，支持搜索和游标分页）
+    
+    参数:
+        q: 搜索关键词（可选）
+        limit: 每页数量（可选，默认20，最大100）
+        cursor: 分页游标（可选，使用上次返回的 next_cursor / prev_cursor）
+        direction: next（默认，更旧的记录）或 prev（更新的记录）
+        include_total: 是否返回总数（可选，默认true；总数有缓存，是近似值）
+        sort: relevance 时按搜索相关度排序，返回前limit条（不分页）
+        fields: 只返回指定字段，逗号分隔（可选，如 id,text,preurl）
+    """
+    from .pagination import cached_count, int_param, page_from_request
+    from .services.search_service import SearchService
+    from .serializers import AUDIO_FIELDS, RecordSerializer, fast_json_response
+    
+    # 获取参数
+    try:
+        limit = int_param(request, 'limit', 20, minimum=1, maximum=100)  # 1~100条
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    search_query = request.GET.get('q', '').strip()
+    include_total = request.GET.get('include_total', 'true').lower() != 'false'
+    ranked = bool(search_query) and request.GET.get('sort') == 'relevance'
+    try:
+        serializer = RecordSerializer.from_request(request, AUDIO_FIELDS)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    # 全文搜索（纯数字按ID查找）
+    records = SearchService.search_audio(AudioRecord.objects.all(), search_query)
+    
+    if ranked:
+        # 按相关度排序，只返回前limit条
+        page_records = SearchService.search_audio(
+            AudioRecord.objects.all(), search_query, ranked=True
+        )[:limit]
+        next_cursor = prev_cursor = None
+    else:
+        # 按 (uptime, id) 倒序游标分页
+        try:
+            page = page_from_request(request, records, limit)
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        page_records = page.object_list
+        next_cursor, prev_cursor = page.next_cursor, page.previous_cursor
+    
+    # values()投影，不创建模型实例
+    data = serializer.serialize(page_records)
+    
+    return fast_json_response({
+        'success': True,
+        'count': len(data),
+        'total': cached_count(records) if include_total else None,
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
         'search_query': search_query,
-        'data': [record.to_dict() for record in records]
+        'data': data
     })
 
 
@@ -588,7 +731,8 @@ def api_upload_audio(request):
                 'error': f'上传失败: {error_msg}'
             }, status=500)
         
-        # 更新记录状态
+        # 更新记录状态（path 是源文件路径，对象存储Key单独记录）
+        record.object_key = object_key
         record.preurl = preurl
         record.expire_time = expire_time
         record.status = 'success'
@@ -615,6 +759,78 @@ def api_upload_audio(request):
         }, status=500)
 
 
+@require_http_methods(["POST"])
+@csrf_exempt
+def api_upload_audio_bulk(request):
+    """
+    API: 批量上传本地音频文件到云端
+    
+    功能：
+    - 并发上传多个本地音频文件到对象存储（共用一个TOS客户端）
+    - 批量创建和更新数据库记录
+    - 单个文件失败不影响其他文件，按条目返回结果
+    
+    POST参数（JSON格式）:
+        items: [{file_path, text, expire_time}, ...]（必需，最多 BULK_UPLOAD_MAX_ITEMS 条）
+        tts_type: 标记类型（可选，默认batch_upload）
+        
+    返回:
+        {
+            "success": true,
+            "total": 2,
+            "succeeded": 1,
+            "failed": 1,
+            "results": [
+                {"index": 0, "success": true, "record_id": 1, "url": "...", "expire_time": "...", "object_key": "..."},
+                {"index": 1, "success": false, "error": "文件不存在: ..."}
+            ]
+        }
+    """
+    from .services.bulk_upload_service import BulkUploadService
+    
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'error': '无效的JSON格式'
+        }, status=400)
+    
+    items = data.get('items') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return JsonResponse({
+            'success': False,
+            'error': 'items必须是非空数组'
+        }, status=400)
+    
+    max_items = getattr(django_settings, 'BULK_UPLOAD_MAX_ITEMS', 1000)
+    if len(items) > max_items:
+        return JsonResponse({
+            'success': False,
+            'error': f'单次最多上传{max_items}个文件'
+        }, status=400)
+    
+    tts_type = data.get('tts_type', 'batch_upload')
+    
+    try:
+        results = BulkUploadService().upload(items, tts_type=tts_type)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'处理失败: {str(e)}'
+        }, status=500)
+    
+    succeeded = sum(1 for r in results if r['success'])
+    return JsonResponse({
+        'success': succeeded > 0,
+        'total': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results,
+        'message': f'✅ 上传成功 {succeeded}/{len(results)} 个文件'
+    })
+
+
 @require_http_methods(["POST"])
 @csrf_exempt
 def api_upload_video(request):
@@ -778,9 +994,15 @@ def api_upload_video_file(request):
             "record_id": 1,
             "title": "视频标题",
             "file_size": 12345678,
+            "upload_stats": {"bytes": 12345678, "parts": 2, "seconds": 1.8, "mb_per_s": 6.54},
+            "pipeline": {"thumbnail": {"status": "pending", ...}, "subtitle": {...}},
             "message": "上传成功"
         }
         
+        缩略图和字幕由后处理流水线在后台生成/上传，返回时 thumbnail_url、subtitle_url 为空；
+        通过 /api/video/<record_id>/ 查看 pipeline 各阶段状态和最终URL，
+        失败的阶段可调用 /api/video/<record_id>/pipeline/retry/ 重试
+        
     示例 (curl):
         curl -X POST http://localhost:8000/api/upload-video-file/ \\
             -F "video_file=@/path/to/video.mp4" \\
@@ -808,7 +1030,16 @@ def api_upload_video_file(request):
     """
     import time
     import uuid
-    import tempfile
+    from .services.video_upload_service import VideoUploadService
+    
+    # 使用视频专用bucket上传
+    video_bucket = getattr(django_settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video')
+    storage_service = StorageService(bucket_name=video_bucket)
+    timestamp = int(time.time())
+    unique_id = uuid.uuid4().hex[:8]
+    
+    # 读取 request.FILES 之前安装流式上传处理器：视频边接收边分片上传到TOS，不写临时文件
+    VideoUploadService.install_handler(request, storage_service, f"video_{unique_id}_{timestamp}")
     
     # 检查是否有上传的视频文件
     if 'video_file' not in request.FILES:
@@ -817,12 +1048,21 @@ def api_upload_video_file(request):
             'error': '请上传视频文件 (video_file)'
         }, status=400)
     
+    # 流式上传时请求体读完视频就已上传到TOS，之后的每个错误分支都要删除该对象
+    uploaded_file = request.FILES['video_file']
+    
     # 获取参数
     title = request.POST.get('title', '').strip()
-    expire_seconds = int(request.POST.get('expire_time', 3600))
+    try:
+        expire_seconds = int(request.POST.get('expire_time', 3600))
+    except ValueError:
+        VideoUploadService.discard(uploaded_file, storage_service)
+        return JsonResponse({
+            'success': False,
+            'error': 'expire_time 必须是整数'
+        }, status=400)
     
     # 处理视频文件
-    uploaded_file = request.FILES['video_file']
     original_filename = uploaded_file.name
     file_ext = os.path.splitext(original_filename)[1].lower()
     filename_without_ext = os.path.splitext(original_filename)[0]
@@ -830,155 +1070,358 @@ def api_upload_video_file(request):
     # 检查视频格式
     allowed_video_ext = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v']
     if file_ext not in allowed_video_ext:
+        VideoUploadService.discard(uploaded_file, storage_service)
+        return JsonResponse({
+            'success': False,
+            'error': f'不支持的视频格式: {file_ext}。支持: {", ".join(allowed_video_ext)}'
+        }, status=400)
+    
+    # 如果没有提供标题，使用文件名
+    if not title:
+        title = filename_without_ext
+    
+    upload = None
+    
+    try:
+        # 上传视频（流式上传时请求体读完就已上传完成，这里只生成预签名URL）
+        object_key = f"video_{unique_id}_{timestamp}{file_ext}"
+        success, preurl, expire_time, error_msg, upload = VideoUploadService.store(
+            uploaded_file, storage_service, object_key, expire_seconds
+        )
+        object_key = upload['object_key']
+        file_size = uploaded_file.size
+        
+        # 创建数据库记录
+        record = VideoRecord.objects.create(
+            title=title,
+            path=upload['local_path'],
+            file_size=file_size,
+            status='pending'
+        )
+        
+        if not success:
+            record.status = 'failed'
+            record.error_message = f'视频上传失败: {error_msg}'
+            record.save()
+            VideoUploadService.discard(uploaded_file, storage_service, upload)
+            return JsonResponse({
+                'success': False,
+                'error': f'视频上传失败: {error_msg}'
+            }, status=500)
+        
+        # 字幕先暂存到本地，由后处理流水线上传
+        subtitle_path, subtitle_name = VideoUploadService.stage_subtitle(
+            request.FILES.get('subtitle_file'), f"sub_{unique_id}_{timestamp}"
+        )
+        
+        # 更新记录（视频上传完成即可播放）
+        record.preurl = preurl
+        record.object_key = object_key
+        record.subtitle_name = subtitle_name
+        record.expire_time = expire_time
+        record.status = 'success'
+        record.save()
+        
+        # 缩略图、字幕在后台并发处理；本地视频副本交给流水线，处理完后删除
+        from .services.media_pipeline import MediaPipeline
+        MediaPipeline.start(record, video_source=upload['temp_path'], subtitle_source=subtitle_path)
+        upload['temp_path'] = None
+        
+        return JsonResponse({
+            'success': True,
+            'url': preurl,
+            'thumbnail_url': None,
+            'subtitle_url': None,
+            'expire_time': expire_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'remaining_time': record.get_remaining_time(),
+            'record_id': record.id,
+            'title': title,
+            'file_size': file_size,
+            'object_key': object_key,
+            'subtitle_name': subtitle_name,
+            'bucket': video_bucket,
+            'upload_stats': upload['upload_stats'],
+            'pipeline': record.to_dict()['pipeline'],
+            'message': '✅ 视频上传成功，缩略图和字幕正在后台处理'
+        })
+        
+    except Exception as e:
+        if 'record' in locals():
+            record.status = 'failed'
+            record.error_message = str(e)
+            record.save()
+        VideoUploadService.discard(uploaded_file, storage_service, upload)
+        return JsonResponse({
+            'success': False,
+            'error': f'处理失败: {str(e)}'
+        }, status=500)
+
+
+def _parse_json_or_post(request):
+    """解析JSON请求体（Content-Type为application/json时），否则使用表单参数；JSON格式错误时返回None"""
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except json.JSONDecodeError:
+            return None
+    return request.POST
+
+
+@require_http_methods(["POST"])
+@csrf_exempt
+def api_upload_session_create(request):
+    """
+    API: 创建浏览器直传上传会话
+    
+    视频由浏览器用返回的预签名URL直接上传到对象存储（不经过Django），上传完成后调用 complete 接口
+    
+    POST参数（JSON或表单）:
+        file_name: 视频文件名（必需）
+        file_size: 视频大小，字节（必需）
+        content_type: 视频Content-Type（可选，单次上传时PUT请求须携带相同的Content-Type）
+        title: 视频标题（可选，默认使用文件名）
+        category: 分类（可选）
+        tags: 标签，逗号分隔（可选）
+        subtitle_name: 字幕文件名（可选，提供时同时返回字幕上传URL）
+        expire_time: 完成后视频URL的有效期秒数（可选，默认3600）
+        
+    返回:
+        {
+            "success": true,
+            "session_id": "...",
+            "mode": "single",           # single: 单次PUT；multipart: 分片上传
+            "video": {"method": "PUT", "url": "...", "headers": {"Content-Type": "video/mp4"}},
+            "parts": null,              # 分片上传时为 [{"part_number": 1, "url": "..."}]
+            "part_size": null,
+            "subtitle": {"method": "PUT", "url": "...", "headers": {}},
+            "expires_at": "上传URL过期时间",
+            "complete_url": "/api/upload-sessions/<session_id>/complete/"
+        }
+    """
+    from .services.upload_session_service import UploadSessionService
+    
+    data = _parse_json_or_post(request)
+    if data is None:
+        return JsonResponse({
+            'success': False,
+            'error': '无效的JSON格式'
+        }, status=400)
+    
+    file_name = str(data.get('file_name', '')).strip()
+    if not file_name:
+        return JsonResponse({
+            'success': False,
+            'error': '文件名不能为空 (file_name)'
+        }, status=400)
+    
+    try:
+        file_size = int(data.get('file_size', 0))
+        expire_seconds = int(data.get('expire_time', 3600))
+    except (TypeError, ValueError):
+        return JsonResponse({
+            'success': False,
+            'error': 'file_size 和 expire_time 必须是整数'
+        }, status=400)
+    
+    success, session, upload_info, error_msg = UploadSessionService.create(
+        file_name=file_name,
+        file_size=file_size,
+        content_type=str(data.get('content_type', '')).strip(),
+        title=str(data.get('title', '')).strip(),
+        category=str(data.get('category', '')).strip(),
+        tags=str(data.get('tags', '')).strip(),
+        subtitle_name=str(data.get('subtitle_name', '')).strip(),
+        expire_seconds=expire_seconds,
+    )
+    if not success:
+        return JsonResponse({
+            'success': False,
+            'error': error_msg
+        }, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'session_id': session.session_id,
+        'mode': session.mode,
+        'object_key': session.object_key,
+        'video': upload_info['video'],
+        'parts': upload_info['parts'],
+        'part_size': session.part_size,
+        'part_count': session.part_count,
+        'subtitle': upload_info['subtitle'],
+        'expires_at': session.expires_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'complete_url': reverse('api_upload_session_complete', args=[session.session_id]),
+        'message': '请直接上传到返回的URL，完成后调用 complete_url'
+    }, status=201)
+
+
+@require_http_methods(["GET"])
+def api_upload_session_parts(request, session_id):
+    """
+    API: 重新获取分片上传URL（URL过期或断点续传时）
+    
+    GET参数:
+        part_numbers: 分片编号，逗号分隔，支持范围（如 1-5,8），默认全部分片；
+                      单次最多 UPLOAD_SESSION_MAX_SIGN_PARTS 个，超出范围返回400
+        
+    返回:
+        {
+            "success": true,
+            "parts": [{"part_number": 1, "url": "..."}],
+            "uploaded": {"1": "etag"},  # 服务端已收到的分片
+            "expires_at": "..."
+        }
+    """
+    from .models import UploadSession
+    from .services.upload_session_service import UploadSessionService
+    
+    session = UploadSession.objects.filter(session_id=session_id).first()
+    if session is None:
+        return JsonResponse({
+            'success': False,
+            'error': '上传会话不存在'
+        }, status=404)
+    
+    part_numbers, error_msg = UploadSessionService.parse_part_numbers(
+        session, request.GET.get('part_numbers', '').strip()
+    )
+    if error_msg:
+        return JsonResponse({
+            'success': False,
+            'error': error_msg
+        }, status=400)
+    
+    success, parts, error_msg = UploadSessionService.sign_parts(session, part_numbers)
+    if not success:
+        return JsonResponse({
+            'success': False,
+            'error': error_msg
+        }, status=400)
+    
+    try:
+        uploaded = StorageService(
+            bucket_name=getattr(django_settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video')
+        ).list_parts(session.object_key, session.upload_id)
+    except Exception:
+        uploaded = {}
+    
+    return JsonResponse({
+        'success': True,
+        'parts': parts,
+        'uploaded': {str(number): etag for number, etag in uploaded.items()},
+        'expires_at': session.expires_at.strftime('%Y-%m-%d %H:%M:%S'),
+    })
+
+
+@require_http_methods(["POST"])
+@csrf_exempt
+def api_upload_session_complete(request, session_id):
+    """
+    API: 完成直传上传
+    
+    合并分片（分片上传）并确认对象大小后创建视频记录，缩略图和字幕由后处理流水线在后台处理，
+    通过 /api/video/<record_id>/ 的 pipeline 查看各阶段状态，完成后获取缩略图、字幕URL
+    
+    POST参数（JSON或表单，均可选）:
+        parts: 分片上传时各分片的ETag [{"part_number": 1, "etag": "..."}]；
+               不传时以服务端已收到的分片为准
+        title / category / tags: 覆盖创建会话时的视频信息
+        
+    返回（202）:
+        {
+            "success": true,
+            "record_id": 1,
+            "status": "success",
+            "url": "视频预签名URL",
+            "pipeline": {"thumbnail": {"status": "pending", ...}, "subtitle": {...}},
+            "detail_url": "/api/video/1/"
+        }
+    """
+    from .models import UploadSession
+    from .services.upload_session_service import UploadSessionService
+    
+    session = UploadSession.objects.filter(session_id=session_id).first()
+    if session is None:
+        return JsonResponse({
+            'success': False,
+            'error': '上传会话不存在'
+        }, status=404)
+    
+    data = _parse_json_or_post(request)
+    if data is None:
         return JsonResponse({
             'success': False,
-            'error': f'不支持的视频格式: {file_ext}。支持: {", ".join(allowed_video_ext)}'
+            'error': '无效的JSON格式'
         }, status=400)
     
-    # 如果没有提供标题，使用文件名
-    if not title:
-        title = filename_without_ext
-    
-    # 保存视频到临时文件
-    temp_dir = tempfile.gettempdir()
-    timestamp = int(time.time())
-    unique_id = uuid.uuid4().hex[:8]
-    temp_video_path = os.path.join(temp_dir, f"api_upload_{unique_id}_{timestamp}{file_ext}")
-    
-    try:
-        # 写入视频临时文件
-        with open(temp_video_path, 'wb+') as destination:
-            for chunk in uploaded_file.chunks():
-                destination.write(chunk)
-        
-        file_size = os.path.getsize(temp_video_path)
-        
-        # 创建数据库记录
-        record = VideoRecord.objects.create(
-            title=title,
-            path=temp_video_path,
-            file_size=file_size,
-            status='pending'
-        )
-        
-        # 使用视频专用bucket上传
-        from django.conf import settings as django_settings
-        video_bucket = getattr(django_settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video')
-        storage_service = StorageService(bucket_name=video_bucket)
-        
-        # 上传视频
-        object_key = f"video_{unique_id}_{timestamp}{file_ext}"
-        success, preurl, expire_time, error_msg = storage_service.upload_and_get_url(
-            temp_video_path,
-            object_key=object_key,
-            expires=expire_seconds
-        )
-        
-        if not success:
-            record.status = 'failed'
-            record.error_message = f'视频上传失败: {error_msg}'
-            record.save()
-            if os.path.exists(temp_video_path):
-                os.remove(temp_video_path)
+    parts = None
+    if data.get('parts'):
+        try:
+            parts = [(int(part['part_number']), part['etag']) for part in data['parts']]
+        except (TypeError, KeyError, ValueError):
             return JsonResponse({
                 'success': False,
-                'error': f'视频上传失败: {error_msg}'
-            }, status=500)
-        
-        # 生成缩略图
-        thumbnail_url = None
-        thumbnail_key = None
-        try:
-            from .services.thumbnail_service import ThumbnailService
-            thumb_service = ThumbnailService()
-            thumb_success, thumb_path, _ = thumb_service.generate_thumbnail(temp_video_path)
-            
-            if thumb_success and thumb_path:
-                thumbnail_key = f"thumb_{unique_id}_{timestamp}.jpg"
-                thumb_ok, thumb_preurl, _, _ = storage_service.upload_and_get_url(
-                    thumb_path, object_key=thumbnail_key, expires=expire_seconds
-                )
-                if thumb_ok:
-                    thumbnail_url = thumb_preurl
-                if os.path.exists(thumb_path):
-                    os.remove(thumb_path)
-        except Exception as e:
-            print(f"缩略图生成失败: {e}")
-        
-        # 处理字幕文件
-        subtitle_url = None
-        subtitle_key = None
-        subtitle_name = None
-        if 'subtitle_file' in request.FILES:
-            subtitle_file = request.FILES['subtitle_file']
-            subtitle_name = subtitle_file.name
-            subtitle_ext = os.path.splitext(subtitle_name)[1].lower()
-            
-            allowed_subtitle_ext = ['.srt', '.vtt', '.ass', '.ssa']
-            if subtitle_ext in allowed_subtitle_ext:
-                try:
-                    temp_subtitle_path = os.path.join(temp_dir, f"sub_{unique_id}_{timestamp}{subtitle_ext}")
-                    with open(temp_subtitle_path, 'wb+') as f:
-                        for chunk in subtitle_file.chunks():
-                            f.write(chunk)
-                    
-                    subtitle_key = f"sub_{unique_id}_{timestamp}{subtitle_ext}"
-                    sub_ok, sub_preurl, _, _ = storage_service.upload_and_get_url(
-                        temp_subtitle_path, object_key=subtitle_key, expires=expire_seconds
-                    )
-                    if sub_ok:
-                        subtitle_url = sub_preurl
-                    if os.path.exists(temp_subtitle_path):
-                        os.remove(temp_subtitle_path)
-                except Exception as e:
-                    print(f"字幕上传失败: {e}")
-            else:
-                # 不支持的字幕格式，但不阻止视频上传
-                print(f"不支持的字幕格式: {subtitle_ext}")
-        
-        # 更新记录
-        record.preurl = preurl
-        record.object_key = object_key
-        record.thumbnail_url = thumbnail_url
-        record.thumbnail_key = thumbnail_key
-        record.subtitle_url = subtitle_url
-        record.subtitle_key = subtitle_key
-        record.subtitle_name = subtitle_name
-        record.expire_time = expire_time
-        record.status = 'success'
-        record.save()
-        
-        # 清理视频临时文件
-        if os.path.exists(temp_video_path):
-            os.remove(temp_video_path)
-        
+                'error': 'parts 格式错误，应为 [{"part_number": 1, "etag": "..."}]'
+            }, status=400)
+    
+    # 已取消/失败的会话不能再完成
+    finished = session.status not in ('uploading', 'completed')
+    success, record, error_msg = UploadSessionService.complete(
+        session,
+        parts=parts,
+        title=str(data.get('title', '')).strip() or None,
+        category=str(data.get('category', '')).strip() or None,
+        tags=str(data['tags']).strip() if 'tags' in data else None,
+    )
+    if not success:
+        # 其他请求正在完成同一会话时同样返回409
         return JsonResponse({
-            'success': True,
-            'url': preurl,
-            'thumbnail_url': thumbnail_url,
-            'subtitle_url': subtitle_url,
-            'expire_time': expire_time.strftime('%Y-%m-%d %H:%M:%S'),
-            'remaining_time': record.get_remaining_time(),
-            'record_id': record.id,
-            'title': title,
-            'file_size': file_size,
-            'object_key': object_key,
-            'subtitle_name': subtitle_name,
-            'bucket': video_bucket,
-            'message': '✅ 视频上传成功'
-        })
-        
-    except Exception as e:
-        if 'record' in locals():
-            record.status = 'failed'
-            record.error_message = str(e)
-            record.save()
-        if 'temp_video_path' in locals() and os.path.exists(temp_video_path):
-            os.remove(temp_video_path)
+            'success': False,
+            'error': error_msg
+        }, status=409 if finished or session.status == 'completing' else 400)
+    
+    return JsonResponse({
+        'success': True,
+        'record_id': record.id,
+        'title': record.title,
+        'status': record.status,
+        'url': record.preurl,
+        'expire_time': record.expire_time.strftime('%Y-%m-%d %H:%M:%S') if record.expire_time else None,
+        'file_size': record.file_size,
+        'object_key': record.object_key,
+        'pipeline': record.to_dict()['pipeline'],
+        'detail_url': reverse('api_video_detail', args=[record.id]),
+        'message': '✅ 视频上传完成，缩略图和字幕正在后台处理'
+    }, status=202)
+
+
+@require_http_methods(["POST"])
+@csrf_exempt
+def api_upload_session_abort(request, session_id):
+    """API: 取消直传上传（取消分片上传任务，删除已上传的对象）"""
+    from .models import UploadSession
+    from .services.upload_session_service import UploadSessionService
+    
+    session = UploadSession.objects.filter(session_id=session_id).first()
+    if session is None:
         return JsonResponse({
             'success': False,
-            'error': f'处理失败: {str(e)}'
-        }, status=500)
+            'error': '上传会话不存在'
+        }, status=404)
+    
+    success, error_msg = UploadSessionService.abort(session)
+    if not success:
+        return JsonResponse({
+            'success': False,
+            'error': error_msg
+        }, status=409)
+    
+    return JsonResponse({
+        'success': True,
+        'session_id': session.session_id,
+        'status': session.status,
+        'message': '上传已取消'
+    })
 
 
 @require_http_methods(["POST"])
@@ -1037,17 +1480,18 @@ def api_renew_video_url(request, record_id):
         video_bucket = getattr(django_settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video')
         storage_service = StorageService(bucket_name=video_bucket)
         
-        # 生成新的预签名URL
+        # 生成新的预签名URL（显式续期，不复用缓存）
         success, preurl, expire_time, error_msg = storage_service.generate_presigned_url(
             object_key=record.object_key,
-            expires=expire_seconds
+            expires=expire_seconds,
+            use_cache=False
         )
         
         if success:
-            # 更新记录
+            # 更新记录（只写续期的字段，不覆盖后处理流水线写入的缩略图、字幕）
             record.preurl = preurl
             record.expire_time = expire_time
-            record.save()
+            record.save(update_fields=['preurl', 'expire_time'])
             
             return JsonResponse({
                 'success': True,
@@ -1089,24 +1533,23 @@ def api_video_subtitle(request, record_id):
     if not record.subtitle_url:
         return HttpResponse("该视频没有字幕", status=404, content_type="text/plain")
     
-    # 检查并续期字幕URL
-    if record.subtitle_key and (record.is_expired() or not record.subtitle_url):
+    # 字幕内容由服务端读取：URL过期时使用缓存的预签名URL，不写库（记录由后台续期）
+    subtitle_url = record.subtitle_url
+    if record.subtitle_key and record.is_expired():
         try:
-            from django.conf import settings as django_settings
             video_bucket = getattr(django_settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video')
             storage_service = StorageService(bucket_name=video_bucket)
             success, sub_url, _, _ = storage_service.generate_presigned_url(
                 record.subtitle_key, expires=3600
             )
             if success:
-                record.subtitle_url = sub_url
-                record.save(update_fields=['subtitle_url'])
+                subtitle_url = sub_url
         except Exception as e:
-            print(f"字幕URL续期失败: {e}")
+            print(f"字幕URL签名失败: {e}")
     
     try:
         # 从云存储获取字幕内容
-        response = requests.get(record.subtitle_url, timeout=10)
+        response = requests.get(subtitle_url, timeout=10)
         if response.status_code != 200:
             return HttpResponse("字幕获取失败", status=502, content_type="text/plain")
         
@@ -1264,37 +1707,11 @@ def api_video_update(request, record_id):
                 'error': f'不支持的字幕格式: {subtitle_ext}'
             }, status=400)
     
-    # 续期URL
+    # 续期URL（视频、缩略图、字幕一次批量签名）
     if expire_seconds > 0 and record.object_key:
         try:
-            from django.conf import settings as django_settings
-            video_bucket = getattr(django_settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video')
-            storage_service = StorageService(bucket_name=video_bucket)
-            
-            # 续期视频URL
-            success, preurl, expire_time, _ = storage_service.generate_presigned_url(
-                record.object_key, expires=expire_seconds
-            )
-            if success:
-                record.preurl = preurl
-                record.expire_time = expire_time
-            
-            # 续期缩略图
-            if record.thumbnail_key:
-                _, thumb_url, _, _ = storage_service.generate_presigned_url(
-                    record.thumbnail_key, expires=expire_seconds
-                )
-                if thumb_url:
-                    record.thumbnail_url = thumb_url
-            
-            # 续期字幕
-            if record.subtitle_key:
-                _, sub_url, _, _ = storage_service.generate_presigned_url(
-                    record.subtitle_key, expires=expire_seconds
-                )
-                if sub_url:
-                    record.subtitle_url = sub_url
-                    
+            from .services.video_url_service import renew_video_urls
+            renew_video_urls([record], expire_seconds)
         except Exception as e:
             print(f"续期失败: {e}")
     
@@ -1333,7 +1750,9 @@ def api_video_detail(request, record_id):
                 "uptime": "2025-12-06 12:00:00",
                 "expire_time": "2025-12-06 14:00:00",
                 "is_expired": false,
-                "remaining_time": "1小时59分钟"
+                "remaining_time": "1小时59分钟",
+                "pipeline": {"thumbnail": {"status": "success", ...}, "subtitle": {...}},
+                "pipeline_status": "success"
             },
             "auto_renewed": false
         }
@@ -1350,50 +1769,16 @@ def api_video_detail(request, record_id):
     auto_renew = request.GET.get('auto_renew', 'true').lower() != 'false'
     expire_seconds = int(request.GET.get('expire_time', 7200))
     
-    # 自动续期过期或即将过期的URL
+    # 即将过期的URL由后台续期（renew_urls）处理；这里只兜底已经过期的记录
     if auto_renew and record.status == 'success' and record.object_key:
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        needs_renewal = False
         if record.expire_time is None or record.is_expired():
-            needs_renewal = True
-        elif record.expire_time - timezone.now() < timedelta(minutes=5):
-            needs_renewal = True
-        
-        if needs_renewal:
             try:
-                from django.conf import settings as django_settings
-                video_bucket = getattr(django_settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video')
-                storage_service = StorageService(bucket_name=video_bucket)
-                
-                # 续期视频URL
-                success, preurl, expire_time, _ = storage_service.generate_presigned_url(
-                    record.object_key, expires=expire_seconds
-                )
-                if success:
-                    record.preurl = preurl
-                    record.expire_time = expire_time
-                    auto_renewed = True
-                
-                # 续期缩略图
-                if record.thumbnail_key:
-                    _, thumb_url, _, _ = storage_service.generate_presigned_url(
-                        record.thumbnail_key, expires=expire_seconds
-                    )
-                    if thumb_url:
-                        record.thumbnail_url = thumb_url
-                
-                # 续期字幕
-                if record.subtitle_key:
-                    _, sub_url, _, _ = storage_service.generate_presigned_url(
-                        record.subtitle_key, expires=expire_seconds
-                    )
-                    if sub_url:
-                        record.subtitle_url = sub_url
+                # 视频、缩略图、字幕一次批量签名
+                from .services.video_url_service import renew_video_urls, save_renewed_urls
+                auto_renewed = bool(renew_video_urls([record], expire_seconds))
                 
                 if auto_renewed:
-                    record.save()
+                    save_renewed_urls([record])
             except Exception as e:
                 print(f"自动续期失败: {e}")
     
@@ -1404,6 +1789,67 @@ def api_video_detail(request, record_id):
     })
 
 
+@require_http_methods(["POST"])
+@csrf_exempt
+def api_video_pipeline_retry(request, record_id):
+    """
+    API: 重试视频后处理流水线中失败的阶段
+    
+    POST /api/video/<id>/pipeline/retry/
+    
+    参数（JSON 或 form-data）:
+        stages: 要重试的阶段，如 "thumbnail,subtitle" 或 ["thumbnail"]（可选，默认全部失败的阶段）
+    
+    返回:
+        {
+            "success": true,
+            "stages": ["thumbnail"],
+            "pipeline": {"thumbnail": {"status": "pending", ...}, "subtitle": {"status": "success", ...}}
+        }
+    """
+    from .services.media_pipeline import MediaPipeline
+    
+    try:
+        record = VideoRecord.objects.get(id=record_id)
+    except VideoRecord.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': '记录不存在'
+        }, status=404)
+    
+    if record.status != 'success' or not record.object_key:
+        return JsonResponse({
+            'success': False,
+            'error': '只有上传成功的视频才能重试后处理'
+        }, status=400)
+    
+    params = _parse_json_or_post(request)
+    if params is None:
+        return JsonResponse({
+            'success': False,
+            'error': '无效的JSON格式'
+        }, status=400)
+    
+    stages = params.get('stages')
+    if isinstance(stages, str):
+        stages = [stage.strip() for stage in stages.split(',') if stage.strip()]
+    
+    success, stages, error_msg = MediaPipeline.retry(record, stages or None)
+    if not success:
+        return JsonResponse({
+            'success': False,
+            'error': error_msg,
+            'pipeline': record.to_dict()['pipeline']
+        }, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'stages': stages,
+        'pipeline': record.to_dict()['pipeline'],
+        'message': f'✅ 已重新提交: {", ".join(stages)}'
+    })
+
+
 @require_http_methods(["GET"])
 def api_video_list(request):
     """
@@ -1412,11 +1858,17 @@ def api_video_list(request):
     GET /api/videos/
     
     参数:
-        q: 搜索关键词（可选，按标题搜索）
-        limit: 返回数量限制（可选，默认20）
-        offset: 分页偏移量（可选，默认0）
+        q: 搜索关键词（可选，按标题和标签搜索，纯数字按ID查找）
+        tag: 标签过滤（可选，可重复或逗号分隔，每个标签都必须匹配）
+        sort: relevance 时按搜索相关度排序（不分页）
+        limit: 返回数量限制（可选，默认20，最大100）
+        cursor: 分页游标（可选，使用上次返回的 next_cursor / prev_cursor）
+        direction: next（默认，更旧的记录）或 prev（更新的记录）
+        offset: 分页偏移量（可选，兼容旧客户端；传了offset时使用偏移分页）
+        include_total: 是否返回总数（可选，默认true；总数有缓存，是近似值）
         status: 状态过滤（可选，success/pending/failed）
         auto_renew: 是否自动续期过期URL（可选，默认false，列表默认不续期）
+        fields: 只返回指定字段，逗号分隔（可选，如 id,title,preurl）
     
     返回:
         {
@@ -1424,7 +1876,9 @@ def api_video_list(request):
             "count": 10,
             "total": 50,
             "limit": 20,
-            "offset": 0,
+            "offset": null,
+            "next_cursor": "eyJ1Ijoi...",
+            "prev_cursor": null,
             "search_query": "",
             "data": [
                 {
@@ -1441,72 +1895,118 @@ def api_video_list(request):
             ]
         }
     """
-    from django.db.models import Q
+    from django.utils import timezone
+    from .pagination import cached_count, int_param, page_from_request
+    from .services.search_service import SearchService
+    from .serializers import VIDEO_FIELDS, RecordSerializer, fast_json_response
     
     # 获取参数
-    limit = min(int(request.GET.get('limit', 20)), 100)  # 最大100条
-    offset = int(request.GET.get('offset', 0))
+    try:
+        limit = int_param(request, 'limit', 20, minimum=1, maximum=100)  # 1~100条
+        offset = int_param(request, 'offset', None, minimum=0)
+        expire_seconds = int_param(request, 'expire_time', 7200, minimum=1)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    include_total = request.GET.get('include_total', 'true').lower() != 'false'
     search_query = request.GET.get('q', '').strip()
     status_filter = request.GET.get('status', '').strip()
+    tags = [tag for value in request.GET.getlist('tag') for tag in value.split(',')]
+    ranked = bool(search_query) and request.GET.get('sort') == 'relevance'
     auto_renew = request.GET.get('auto_renew', 'false').lower() == 'true'
-    expire_seconds = int(request.GET.get('expire_time', 7200))
+    try:
+        serializer = RecordSerializer.from_request(request, VIDEO_FIELDS)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
     
     # 基础查询
     records = VideoRecord.objects.all()
     
-    # 搜索过滤
-    if search_query:
-        records = records.filter(
-            Q(title__icontains=search_query) |
-            Q(id__icontains=search_query)
-        )
-    
     # 状态过滤
     if status_filter in ['success', 'pending', 'failed']:
         records = records.filter(status=status_filter)
     
-    # 获取总数
-    total = records.count()
-    
-    # 排序和分页
-    records = records.order_by('-uptime')[offset:offset+limit]
+    # 全文搜索和标签过滤（纯数字按ID查找）
+    unsearched, records = records, SearchService.search_videos(records, search_query, tags)
+    
+    # 分页：默认按 (uptime, id) 游标分页；传了offset时兼容旧的偏移分页
+    now = timezone.now()
+    next_cursor = prev_cursor = None
+    if ranked:
+        # 按相关度排序，只返回前limit条
+        page = SearchService.search_videos(unsearched, search_query, tags, ranked=True)[:limit]
+    elif offset is not None:
+        page = records.order_by('-uptime', '-id')[offset:offset+limit]
+    else:
+        try:
+            cursor_page = page_from_request(request, records, limit)
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        page = cursor_page.object_list
+        next_cursor, prev_cursor = cursor_page.next_cursor, cursor_page.previous_cursor
     
     # 是否自动续期（列表默认不续期，减少API调用）
-    result_data = []
-    for record in records:
-        data = record.to_dict()
-        
-        # 如果开启自动续期且URL过期
-        if auto_renew and record.status == 'success' and record.object_key and record.is_expired():
+    if auto_renew:
+        # 只为本页中已过期的记录创建模型实例
+        expired = list(
+            VideoRecord.objects.filter(
+                id__in=list(page.values_list('id', flat=True)),
+                status='success',
+            ).expired(now).exclude(object_key__isnull=True).exclude(object_key='')
+        )
+        if expired:
             try:
-                from django.conf import settings as django_settings
-                video_bucket = getattr(django_settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video')
-                storage_service = StorageService(bucket_name=video_bucket)
-                
-                success, preurl, expire_time, _ = storage_service.generate_presigned_url(
-                    record.object_key, expires=expire_seconds
-                )
-                if success:
-                    record.preurl = preurl
-                    record.expire_time = expire_time
-                    record.save(update_fields=['preurl', 'expire_time'])
-                    data = record.to_dict()  # 更新数据
+                # 所有过期记录的视频/缩略图/字幕一次批量签名，一次批量写回
+                from .services.video_url_service import renew_video_urls, save_renewed_urls
+                save_renewed_urls(renew_video_urls(expired, expire_seconds))
             except Exception as e:
                 print(f"续期失败: {e}")
-        
-        result_data.append(data)
     
-    return JsonResponse({
+    # values()投影，不创建模型实例
+    result_data = serializer.serialize(page, now)
+    
+    return fast_json_response({
         'success': True,
         'count': len(result_data),
-        'total': total,
+        'total': cached_count(records) if include_total else None,
         'limit': limit,
         'offset': offset,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
         'search_query': search_query,
         'data': result_data
     })
 
 
+@require_http_methods(["GET"])
+def api_video_tags(request):
+    """
+    API: 标签统计（各标签的视频数量）
+    
+    GET /api/video-tags/
+    
+    参数:
+        limit: 最多返回的标签数（可选，默认100，最大1000）
+        status: 只统计该状态的视频（可选，默认success，all表示全部）
+    
+    返回:
+        {"success": true, "count": 2, "data": [{"name": "english", "count": 12}, ...]}
+    """
+    from .pagination import int_param
+    
+    try:
+        limit = int_param(request, 'limit', 100, minimum=1, maximum=1000)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    status = request.GET.get('status', 'success').strip()
+    data = Tag.counts(limit=limit, status=None if status == 'all' else status)
+    
+    return JsonResponse({
+        'success': True,
+        'count': len(data),
+        'data': data
+    })
+
+
 @require_http_methods(["POST", "GET"])
 @csrf_exempt
 def api_get_video_url(request):
@@ -1631,6 +2131,10 @@ def api_delete_video(request, record_id):
             storage_service = StorageService(bucket_name=video_bucket)
             storage_service.delete_file(record.object_key)
         
+        # 删除后处理流水线暂存的文件
+        from .services.media_pipeline import discard_staged
+        discard_staged(record.pipeline)
+        
         # 删除数据库记录
         record.delete()
         
@@ -1651,34 +2155,25 @@ def api_delete_video(request, record_id):
 
 def video_list(request):
     """视频列表页面"""
-    from django.core.paginator import Paginator
-    from django.db.models import Q
+    from .pagination import KeysetPaginator, cached_count, page_from_request
+    from .services.search_service import SearchService
     
     # 获取搜索关键词
     search_query = request.GET.get('q', '').strip()
     
-    # 基础查询
-    videos = VideoRecord.objects.all()
-    
-    # 如果有搜索关键词，进行搜索
-    if search_query:
-        videos = videos.filter(
-            Q(title__icontains=search_query) |
-            Q(id__icontains=search_query)
-        )
-    
-    # 按上传时间倒序排列
-    videos = videos.order_by('-uptime')
+    # 全文搜索标题和标签（纯数字按ID查找）
+    videos = SearchService.search_videos(VideoRecord.objects.all(), search_query)
     
-    # 分页，每页12条（4x3网格）
-    paginator = Paginator(videos, 12)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # 按上传时间倒序游标分页，每页12条（4x3网格，无效游标回到第一页）
+    try:
+        page_obj = page_from_request(request, videos, 12)
+    except ValueError:
+        page_obj = KeysetPaginator(videos, 12).page()
     
     context = {
         'page_obj': page_obj,
         'search_query': search_query,
-        'total_count': paginator.count,
+        'total_count': cached_count(videos),
     }
     return render(request, 'tts_app/video_list.html', context)
 
@@ -1687,58 +2182,18 @@ def video_detail(request, record_id):
     """视频详情页面（自动续期过期URL）"""
     video = get_object_or_404(VideoRecord, id=record_id)
     
-    # 自动续期：如果URL已过期或即将过期（剩余不足5分钟），自动续期
+    # 即将过期的URL由后台续期（renew_urls）处理；这里只兜底已经过期的记录
     auto_renewed = False
     if video.status == 'success' and video.object_key:
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        # 检查是否需要续期（过期或剩余不足5分钟）
-        needs_renewal = False
-        if video.expire_time is None:
-            needs_renewal = True
-        elif video.is_expired():
-            needs_renewal = True
-        elif video.expire_time - timezone.now() < timedelta(minutes=5):
-            needs_renewal = True
-        
-        if needs_renewal:
+        if video.expire_time is None or video.is_expired():
             try:
-                from django.conf import settings as django_settings
-                video_bucket = getattr(django_settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video')
-                storage_service = StorageService(bucket_name=video_bucket)
-                
-                # 默认续期2小时
-                expire_seconds = 7200
-                
-                # 续期视频URL
-                success, preurl, expire_time, _ = storage_service.generate_presigned_url(
-                    video.object_key, expires=expire_seconds
-                )
-                if success:
-                    video.preurl = preurl
-                    video.expire_time = expire_time
-                    auto_renewed = True
-                
-                # 续期缩略图URL
-                if video.thumbnail_key:
-                    _, thumb_url, _, _ = storage_service.generate_presigned_url(
-                        video.thumbnail_key, expires=expire_seconds
-                    )
-                    if thumb_url:
-                        video.thumbnail_url = thumb_url
-                
-                # 续期字幕URL
-                if video.subtitle_key:
-                    _, sub_url, _, _ = storage_service.generate_presigned_url(
-                        video.subtitle_key, expires=expire_seconds
-                    )
-                    if sub_url:
-                        video.subtitle_url = sub_url
+                # 默认续期2小时；视频、缩略图、字幕一次批量签名
+                from .services.video_url_service import renew_video_urls, save_renewed_urls
+                auto_renewed = bool(renew_video_urls([video], expire_seconds=7200))
                 
                 if auto_renewed:
-                    video.save()
-                    messages.info(request, f'🔄 URL已自动续期，有效期至 {expire_time.strftime("%Y-%m-%d %H:%M:%S")}')
+                    save_renewed_urls([video])
+                    messages.info(request, f'🔄 URL已自动续期，有效期至 {video.expire_time.strftime("%Y-%m-%d %H:%M:%S")}')
                     
             except Exception as e:
                 print(f"自动续期失败: {e}")
@@ -1751,21 +2206,54 @@ def video_detail(request, record_id):
 
 
 @require_http_methods(["POST"])
+@csrf_exempt
 def video_upload_page(request):
-    """视频上传（页面表单提交，支持文件上传）"""
+    """
+    视频上传（页面表单提交，支持文件上传）
+    
+    上传处理器必须在读取 request.POST 之前安装，而CSRF中间件会先读取表单，
+    因此视图本身免CSRF中间件，在安装处理器之后再做CSRF校验
+    """
     import time
     import uuid
-    import tempfile
+    from django.views.decorators.csrf import csrf_protect
+    from .services.video_upload_service import VideoUploadService
     
-    title = request.POST.get('title', '').strip()
-    expire_seconds = int(request.POST.get('expire_time', 3600))
+    # 使用视频专用bucket上传
+    video_bucket = getattr(django_settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video')
+    storage_service = StorageService(bucket_name=video_bucket)
+    timestamp = int(time.time())
+    unique_id = uuid.uuid4().hex[:8]
+    
+    # 流式上传处理器：视频边接收边分片上传到TOS，不写临时文件
+    VideoUploadService.install_handler(request, storage_service, f"video_{unique_id}_{timestamp}")
+    
+    response = csrf_protect(_video_upload_page)(request, storage_service, unique_id, timestamp)
+    if response.status_code == 403:
+        # CSRF校验失败：删除已经流式上传的视频
+        VideoUploadService.discard(request.FILES.get('video_file'), storage_service)
+    return response
+
+
+def _video_upload_page(request, storage_service, unique_id, timestamp):
+    """video_upload_page 的表单处理部分（CSRF校验通过后执行）"""
+    from .services.video_upload_service import VideoUploadService
     
     # 检查是否有上传的文件
     if 'video_file' not in request.FILES:
         messages.error(request, '请选择一个视频文件')
         return redirect('video_list')
     
+    # 流式上传时请求体读完视频就已上传到TOS，之后的每个错误分支都要删除该对象
     uploaded_file = request.FILES['video_file']
+    title = request.POST.get('title', '').strip()
+    try:
+        expire_seconds = int(request.POST.get('expire_time', 3600))
+    except ValueError:
+        VideoUploadService.discard(uploaded_file, storage_service)
+        messages.error(request, '有效期必须是整数秒')
+        return redirect('video_list')
+    
     original_filename = uploaded_file.name
     file_ext = os.path.splitext(original_filename)[1].lower()
     filename_without_ext = os.path.splitext(original_filename)[0]
@@ -1773,6 +2261,7 @@ def video_upload_page(request):
     # 检查是否是视频文件
     allowed_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v']
     if file_ext not in allowed_extensions:
+        VideoUploadService.discard(uploaded_file, storage_service)
         messages.error(request, f'不支持的视频格式: {file_ext}')
         return redirect('video_list')
     
@@ -1780,131 +2269,57 @@ def video_upload_page(request):
     if not title:
         title = filename_without_ext
     
-    # 保存上传的文件到临时目录
-    temp_dir = tempfile.gettempdir()
-    timestamp = int(time.time())
-    unique_id = uuid.uuid4().hex[:8]
-    temp_filename = f"upload_{unique_id}_{timestamp}{file_ext}"
-    temp_path = os.path.join(temp_dir, temp_filename)
+    upload = None
     
     try:
-        # 写入临时文件
-        with open(temp_path, 'wb+') as destination:
-            for chunk in uploaded_file.chunks():
-                destination.write(chunk)
-        
-        file_size = os.path.getsize(temp_path)
+        # 上传视频（流式上传时请求体读完就已上传完成，这里只生成预签名URL）
+        object_key = f"video_{unique_id}_{timestamp}{file_ext}"
+        success, preurl, expire_time, error_msg, upload = VideoUploadService.store(
+            uploaded_file, storage_service, object_key, expire_seconds
+        )
+        object_key = upload['object_key']
+        file_size = uploaded_file.size
         
         # 创建数据库记录
         record = VideoRecord.objects.create(
             title=title,
-            path=temp_path,
+            path=upload['local_path'],
             file_size=file_size,
             status='pending'
         )
         
-        # 使用视频专用bucket上传
-        from django.conf import settings as django_settings
-        video_bucket = getattr(django_settings, 'TOS_VIDEO_BUCKET_NAME', 'web-video')
-        storage_service = StorageService(bucket_name=video_bucket)
-        
-        # 生成唯一的对象key
-        object_key = f"video_{unique_id}_{timestamp}{file_ext}"
-        
-        success, preurl, expire_time, error_msg = storage_service.upload_and_get_url(
-            temp_path,
-            object_key=object_key,
-            expires=expire_seconds
-        )
-        
         if not success:
             record.status = 'failed'
             record.error_message = f'上传失败: {error_msg}'
             record.save()
-            # 清理临时文件
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            # 删除已上传的视频和临时文件
+            VideoUploadService.discard(uploaded_file, storage_service, upload)
             messages.error(request, f'上传失败: {error_msg}')
             return redirect('video_list')
         
-        # 生成并上传缩略图
-        thumbnail_url = None
-        thumbnail_key = None
-        try:
-            from .services.thumbnail_service import ThumbnailService
-            thumb_service = ThumbnailService()
-            thumb_success, thumb_path, thumb_error = thumb_service.generate_thumbnail(temp_path)
-            
-            if thumb_success and thumb_path:
-                # 上传缩略图到云端
-                thumbnail_key = f"thumb_{unique_id}_{timestamp}.jpg"
-                thumb_upload_success, thumb_preurl, _, thumb_upload_error = storage_service.upload_and_get_url(
-                    thumb_path,
-                    object_key=thumbnail_key,
-                    expires=expire_seconds
-                )
-                if thumb_upload_success:
-                    thumbnail_url = thumb_preurl
-                
-                # 清理缩略图临时文件
-                if os.path.exists(thumb_path):
-                    os.remove(thumb_path)
-        except Exception as thumb_e:
-            # 缩略图生成失败不影响视频上传
-            print(f"缩略图生成失败: {thumb_e}")
-        
-        # 处理字幕文件上传
-        subtitle_url = None
-        subtitle_key = None
-        subtitle_name = None
-        if 'subtitle_file' in request.FILES:
-            subtitle_file = request.FILES['subtitle_file']
-            subtitle_name = subtitle_file.name
-            subtitle_ext = os.path.splitext(subtitle_name)[1].lower()
-            
-            # 验证字幕格式
-            allowed_subtitle_ext = ['.srt', '.vtt', '.ass', '.ssa']
-            if subtitle_ext in allowed_subtitle_ext:
-                try:
-                    # 保存字幕到临时文件
-                    subtitle_temp_path = os.path.join(temp_dir, f"sub_{unique_id}_{timestamp}{subtitle_ext}")
-                    with open(subtitle_temp_path, 'wb+') as f:
-                        for chunk in subtitle_file.chunks():
-                            f.write(chunk)
-                    
-                    # 上传字幕到云端
-                    subtitle_key = f"sub_{unique_id}_{timestamp}{subtitle_ext}"
-                    sub_success, sub_preurl, _, sub_error = storage_service.upload_and_get_url(
-                        subtitle_temp_path,
-                        object_key=subtitle_key,
-                        expires=expire_seconds
-                    )
-                    if sub_success:
-                        subtitle_url = sub_preurl
-                    
-                    # 清理临时文件
-                    if os.path.exists(subtitle_temp_path):
-                        os.remove(subtitle_temp_path)
-                except Exception as sub_e:
-                    print(f"字幕上传失败: {sub_e}")
+        # 字幕先暂存到本地，由后处理流水线上传
+        subtitle_path, subtitle_name = VideoUploadService.stage_subtitle(
+            request.FILES.get('subtitle_file'), f"sub_{unique_id}_{timestamp}"
+        )
         
-        # 更新记录状态
+        # 更新记录状态（视频上传完成即可播放）
         record.preurl = preurl
         record.object_key = object_key
-        record.thumbnail_url = thumbnail_url
-        record.thumbnail_key = thumbnail_key
-        record.subtitle_url = subtitle_url
-        record.subtitle_key = subtitle_key
         record.subtitle_name = subtitle_name
         record.expire_time = expire_time
         record.status = 'success'
         record.save()
         
-        # 上传成功后清理临时文件
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        # 缩略图、字幕在后台并发处理；本地视频副本交给流水线，处理完后删除
+        from .services.media_pipeline import MediaPipeline
+        MediaPipeline.start(record, video_source=upload['temp_path'], subtitle_source=subtitle_path)
+        upload['temp_path'] = None
         
-        messages.success(request, f'✅ 视频 "{title}" 上传成功！')
+        stats = upload['upload_stats']
+        messages.success(
+            request,
+            f'✅ 视频 "{title}" 上传成功！（{file_size / 1024 / 1024:.1f}MB，{stats.get("mb_per_s") or 0:.1f}MB/s）'
+        )
         return redirect('video_detail', record_id=record.id)
         
     except Exception as e:
@@ -1912,9 +2327,8 @@ def video_upload_page(request):
             record.status = 'failed'
             record.error_message = str(e)
             record.save()
-        # 清理临时文件
-        if 'temp_path' in locals() and os.path.exists(temp_path):
-            os.remove(temp_path)
+        # 删除已上传的视频和临时文件
+        VideoUploadService.discard(uploaded_file, storage_service, upload)
         messages.error(request, f'上传失败: {str(e)}')
         return redirect('video_list')
 
@@ -1943,13 +2357,14 @@ def video_renew(request, record_id):
         
         success, preurl, expire_time, error_msg = storage_service.generate_presigned_url(
             object_key=video.object_key,
-            expires=expire_seconds
+            expires=expire_seconds,
+            use_cache=False
         )
         
         if success:
             video.preurl = preurl
             video.expire_time = expire_time
-            video.save()
+            video.save(update_fields=['preurl', 'expire_time'])
             
             messages.success(request, f'✅ URL续期成功！新的有效期至 {expire_time.strftime("%Y-%m-%d %H:%M:%S")}')
         else:
@@ -1974,6 +2389,10 @@ def video_delete(request, record_id):
             storage_service = StorageService(bucket_name=video_bucket)
             storage_service.delete_file(video.object_key)
         
+        # 删除后处理流水线暂存的文件
+        from .services.media_pipeline import discard_staged
+        discard_staged(video.pipeline)
+        
         # 删除数据库记录
         video.delete()
         
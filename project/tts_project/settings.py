@@ -63,6 +63,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3.tts',
+        'OPTIONS': {
+            'timeout': 20,  # worker进程并发写入时等待锁的时间（秒）
+        },
     }
 }
 
@@ -107,18 +110,116 @@ TOS_REGION = "cn-beijing"
 TOS_BUCKET_NAME = "web-audio"           # 音频存储桶
 TOS_VIDEO_BUCKET_NAME = "web-video"     # 视频存储桶
 
+# TOS客户端连接池（进程内按bucket共享客户端，复用keep-alive连接）
+TOS_MAX_CONNECTIONS = 64        # 每个客户端的连接池大小
+TOS_CONNECT_TIMEOUT = 10        # 建立连接超时（秒）
+TOS_REQUEST_TIMEOUT = 120       # 单个请求超时（秒）
+TOS_MAX_RETRY_COUNT = 3         # SDK内部重试次数
+
+# TOS分片上传配置
+TOS_MULTIPART_PART_SIZE = 8 * 1024 * 1024  # 分片大小（字节），最后一片可以更小
+TOS_MULTIPART_CONCURRENCY = 4   # 并行上传的分片数（同时在内存中的分片数）
+TOS_MULTIPART_THRESHOLD = 64 * 1024 * 1024  # upload_and_get_url 对不小于该大小的本地文件使用分片断点续传
+TOS_UPLOAD_CHECKPOINT_DIR = None  # 断点文件目录，None表示放在上传文件旁（<文件>.tosupload）
+TOS_LOCAL_STORE_DIR = os.getenv('TOS_LOCAL_STORE_DIR') or None  # 设置后用本地目录模拟对象存储（离线开发/测试）
+
+# 视频上传配置
+VIDEO_STREAMING_UPLOAD = True   # 视频边接收边分片上传到TOS（不先写临时文件）
+VIDEO_UPLOAD_KEEP_LOCAL_COPY = False  # 流式上传时是否保留本地副本（FFmpeg读本地文件截取缩略图），否则读预签名URL
+VIDEO_DIRECT_UPLOAD_MAX_BYTES = 20 * 1024 * 1024 * 1024  # 浏览器直传（上传会话）允许的最大视频大小
+UPLOAD_SESSION_URL_EXPIRE = 3600  # 直传上传URL有效期（秒），过期后可通过 parts 接口重新获取分片URL
+UPLOAD_SESSION_MAX_SIGN_PARTS = 1000  # parts 接口单次指定 part_numbers 时最多签名的分片数
+
+# 视频上传后处理流水线（缩略图、字幕等阶段在后台并发执行，上传接口只等视频传完）
+MEDIA_PIPELINE_WORKERS = 4      # 后处理线程数（阶段之间、视频之间并发）
+MEDIA_PIPELINE_STAGING_DIR = BASE_DIR / 'media' / 'staging'  # 字幕等小文件等待后台上传时的暂存目录
+MEDIA_PIPELINE_STAGE_TIMEOUT = 600  # 阶段排队或执行超过该秒数仍为 pending / running 时视为中断，允许重试
+
+# FFmpeg 媒体处理
+FFMPEG_MAX_PROCESSES = 2        # 每个进程同时运行的 ffmpeg/ffprobe 数量上限，超出的排队等待
+VIDEO_THUMBNAIL_COUNT = 5       # 候选缩略图数量（第一张作为封面）
+VIDEO_THUMBNAIL_MODE = 'interval'  # interval: 均匀取帧；scene: 场景变化处取帧（需解码全部帧，较慢）
+VIDEO_THUMBNAIL_SCENE_THRESHOLD = 0.3  # scene 模式的场景变化阈值（0-1）
+VIDEO_THUMBNAIL_KEYFRAMES_ONLY = True  # 只解码关键帧（快很多，取帧时间落在最近的关键帧）
+VIDEO_THUMBNAIL_TIMEOUT = 300   # 提取缩略图和雪碧图的 FFmpeg 超时（秒）
+VIDEO_SPRITE_INTERVAL = 10      # 进度条预览雪碧图每格间隔（秒）
+VIDEO_SPRITE_MAX_FRAMES = 100   # 雪碧图最多格数，长视频自动加大间隔
+VIDEO_SPRITE_COLUMNS = 10       # 雪碧图每行格数
+VIDEO_SPRITE_TILE_WIDTH = 160   # 雪碧图每格宽度（像素）
+
+# 预签名URL缓存（按 bucket+key+method）
+# 缓存的URL剩余有效期不低于 max(MIN_REMAINING, 请求有效期*MIN_RATIO) 时直接复用
+PRESIGN_CACHE_MIN_REMAINING = 300   # 最低剩余有效期（秒）
+PRESIGN_CACHE_MIN_RATIO = 0.5       # 最低剩余有效期占请求有效期的比例
+PRESIGN_CACHE_MAX_ENTRIES = 10000   # 最多缓存条目数（LRU淘汰）
+
+# 预签名URL后台续期（python manage.py renew_urls，或进程内线程）
+URL_RENEWAL_WINDOW = 900        # 续期在该时间（秒）内过期的记录
+URL_RENEWAL_EXPIRE = 7200       # 续期后的有效期（秒）
+URL_RENEWAL_INTERVAL = 60       # 两轮之间的间隔（秒）
+URL_RENEWAL_BATCH_SIZE = 500    # 每批处理的记录数
+URL_RENEWAL_IN_PROCESS = False  # 是否在Web进程内启动续期线程（单进程部署时使用）
+
 # 火山引擎TTS配置（OpenSpeech API）
 VOLC_APPID = os.getenv('VOLC_APPID', '2723200895')
 VOLC_ACCESS_TOKEN = os.getenv('VOLC_ACCESS_TOKEN', 'xPartAAzIhh4Y6_zc2MpwHA3WaYayoDS')
 VOLC_CLUSTER = os.getenv('VOLC_CLUSTER', 'volcano_tts')
+VOLC_VOICE_TYPE = os.getenv('VOLC_VOICE_TYPE', 'BV504_streaming')  # 英文语音
+VOLC_SPEED_RATIO = 1.0
+VOLC_VOLUME_RATIO = 1.0
+VOLC_PITCH_RATIO = 1.0
+VOLC_QUERY_TIMEOUT = 60         # 非流式合成接口的读取超时（秒），超时的句子按失败处理
+
+# 火山引擎流式TTS（HTTP Chunked，逐块返回音频）
+CLOUD_TTS_STREAMING = False     # 云服务合成是否使用流式接口（边接收边写文件）
+VOLC_STREAM_URL = os.getenv('VOLC_STREAM_URL', 'https://openspeech.bytedance.com/api/v3/tts/unidirectional')
+VOLC_STREAM_RESOURCE_ID = os.getenv('VOLC_STREAM_RESOURCE_ID', 'volc.service_type.10029')
+VOLC_STREAM_SAMPLE_RATE = 24000  # 流式返回的PCM采样率
+VOLC_STREAM_TIMEOUT = 30        # 两个数据块之间的最长等待时间（秒）
 
 # 本地TTS配置
 LOCAL_TTS_MODEL = "tts_models/en/ljspeech/tacotron2-DDC"
+LOCAL_TTS_BATCH_SIZE = 8        # 批量合成时每个小批次的句子数
+
+# 异步TTS任务队列配置（python manage.py run_tts_worker）
+TTS_JOB_POLL_INTERVAL = 1.0     # 队列为空时worker轮询间隔（秒）
+TTS_JOB_STALE_TIMEOUT = 600     # 运行中任务心跳超时（秒），超时视为worker崩溃
+TTS_JOB_REAP_INTERVAL = 30      # 回收超时任务的检查间隔（秒）
+TTS_JOB_MAX_ATTEMPTS = 3        # 单个任务最多尝试次数
+TTS_JOB_MAX_WAIT = 30           # 长轮询最长等待时间（秒）
+TTS_JOB_BATCH_SIZE = 8          # worker一次领取并批量合成的本地任务数
 
 # 音频文件输出目录
 AUDIO_OUTPUT_DIR = BASE_DIR / 'media' / 'audio'
 os.makedirs(AUDIO_OUTPUT_DIR, exist_ok=True)
 
+# 合成音频缓存配置
+# 相同（规范化文本, 引擎, 模型, 音色, 语速/音调/音量）只合成和上传一次
+AUDIO_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # AUDIO_OUTPUT_DIR 本地WAV总大小上限，超出按LRU淘汰
+
+# 长文本合成配置（按句拆分、并行合成、拼接）
+LONG_TEXT_MAX_CHARS = 20000     # 生成页面和 /api/get-audio-url/ 允许的最大字符数
+LONG_TEXT_THRESHOLD = 300       # 超过该字符数的文本由worker按长文本流程合成
+LONG_TEXT_SILENCE = 0.2         # 句间静音（秒）
+LONG_TEXT_CROSSFADE = 0.01      # 句子首尾淡入淡出时长（秒），句间静音为0时为相邻句子的交叉淡化时长
+LONG_TEXT_CLOUD_CONCURRENCY = 4  # 云服务并发合成的句子数
+
+# 句子级音频缓存配置（相同句子在不同记录之间只合成一次）
+SENTENCE_CACHE_ENABLED = True   # 本地/云服务合成时是否复用已合成的句子
+SENTENCE_AUDIO_DIR = BASE_DIR / 'media' / 'sentences'  # 句子PCM文件目录
+SENTENCE_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 句子PCM总大小上限，超出按LRU淘汰
+
+# 批量上传配置（POST /api/upload-audio/bulk/）
+BULK_UPLOAD_MAX_ITEMS = 1000    # 单次请求最多文件数
+BULK_UPLOAD_WORKERS = 8         # 并发上传线程数
+
+# 列表分页配置（按 (uptime, id) 的游标分页）
+LIST_COUNT_CACHE_TIMEOUT = 60   # 列表总数（COUNT）缓存时间（秒），总数为近似值
+
+# 运行指标配置（/api/metrics/）
+METRICS_SHARED = True           # 计数器和耗时写入数据库，所有进程汇总；False时只统计当前进程
+METRICS_FLUSH_INTERVAL = 10     # 各进程把累加的增量写入数据库的间隔（秒）
+
 # CORS配置（允许前端访问API）
 CORS_ALLOW_ALL_ORIGINS = True  # 开发环境允许所有来源
 CORS_ALLOW_CREDENTIALS = True